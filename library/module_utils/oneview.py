@@ -22,22 +22,39 @@ from __future__ import (absolute_import,
                         unicode_literals)
 
 from future import standard_library
+import base64
+import fcntl
+import hashlib
 import json
 import logging
 import os
+import random
+import socket
+import tempfile
+import threading
+import time
 from ansible.module_utils.basic import AnsibleModule
+from contextlib import contextmanager
 from copy import deepcopy
 from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 standard_library.install_aliases()
+import http.client
+import socketserver
+import ssl
+
 logger = logging.getLogger(__name__)
 
 try:
     from hpOneView.oneview_client import OneViewClient
     from hpOneView.exceptions import (HPOneViewException,
                                       HPOneViewTaskError,
+                                      HPOneViewTimeout,
                                       HPOneViewValueError,
                                       HPOneViewResourceNotFound)
+    from hpOneView.resources.resource import ResourceClient
+    from hpOneView.resources.task_monitor import TaskMonitor
 
     HAS_HPE_ONEVIEW = True
 except ImportError:
@@ -51,6 +68,12 @@ class OneViewModuleBase(object):
     MSG_ALREADY_PRESENT = 'Resource is already present.'
     MSG_ALREADY_ABSENT = 'Resource is already absent.'
     HPE_ONEVIEW_SDK_REQUIRED = 'HPE OneView Python SDK is required for this module.'
+    MSG_FACT_NOT_GATHERED = 'Failed to gather {}: {}'
+
+    FACTS_MAX_WORKERS = 8
+    FACTS_MAX_WORKERS_ENV = 'ONEVIEW_FACTS_MAX_WORKERS'
+    MAX_NAMES_FILTER_LENGTH = 2000
+    FACTS_PAGING_PARAMS = ('page_size', 'max_items')
 
     ONEVIEW_COMMON_ARGS = dict(
         api_version=dict(type='int'),
@@ -67,18 +90,20 @@ class OneViewModuleBase(object):
 
     resource_client = None
 
-    def __init__(self, additional_arg_spec=None, validate_etag_support=False):
+    def __init__(self, additional_arg_spec=None, validate_etag_support=False, supports_check_mode=False):
         """
         OneViewModuleBase constructor.
 
         Args:
             additional_arg_spec (dict): Additional argument spec definition.
             validate_etag_support (bool): Enables support to eTag validation.
+            supports_check_mode (bool): Enables the check mode, in which the module must only report the changes
+                it would make, issuing no writes.
         """
 
         argument_spec = self._build_argument_spec(additional_arg_spec, validate_etag_support)
 
-        self.module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
+        self.module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=supports_check_mode)
 
         self._check_hpe_oneview_sdk()
         self._create_oneview_client()
@@ -93,6 +118,7 @@ class OneViewModuleBase(object):
         self.options = self.transform_list_to_dict(self.module.params.get('options'))
 
         self.validate_etag_support = validate_etag_support
+        self.etag_cache = OneViewETagCache.from_environment_variables() if validate_etag_support else None
 
     def _build_argument_spec(self, additional_arg_spec, validate_etag_support):
 
@@ -112,16 +138,80 @@ class OneViewModuleBase(object):
             self.module.fail_json(msg=self.HPE_ONEVIEW_SDK_REQUIRED)
 
     def _create_oneview_client(self):
+        session_cache = OneViewSessionCache.from_environment_variables()
+        if session_cache:
+            self.oneview_client = self._create_oneview_client_from_session_cache(session_cache)
+        elif self.module.params.get('hostname') or not self.module.params['config']:
+            self.oneview_client = OneViewClient(self._build_oneview_config())
+        else:
+            self.oneview_client = OneViewClient.from_json_file(self.module.params['config'])
+
+        self._install_connection_broker()
+
+    def _build_oneview_config(self):
+        # The same config is used with and without the session cache, from the module parameters, the environment
+        # variables read by the OneView SDK or the config file
         if self.module.params.get('hostname'):
-            config = dict(ip=self.module.params['hostname'],
-                          credentials=dict(userName=self.module.params['username'], password=self.module.params['password']),
-                          api_version=self.module.params['api_version'],
-                          image_streamer_ip=self.module.params['image_streamer_hostname'])
-            self.oneview_client = OneViewClient(config)
+            return dict(ip=self.module.params['hostname'],
+                        credentials=dict(userName=self.module.params['username'],
+                                         password=self.module.params['password']),
+                        api_version=self.module.params['api_version'],
+                        image_streamer_ip=self.module.params['image_streamer_hostname'])
         elif not self.module.params['config']:
-            self.oneview_client = OneViewClient.from_environment_variables()
+            return dict(ip=os.environ.get('ONEVIEWSDK_IP', ''),
+                        image_streamer_ip=os.environ.get('ONEVIEWSDK_IMAGE_STREAMER_IP', ''),
+                        api_version=int(os.environ.get('ONEVIEWSDK_API_VERSION', OneViewClient.DEFAULT_API_VERSION)),
+                        credentials=dict(userName=os.environ.get('ONEVIEWSDK_USERNAME', ''),
+                                         authLoginDomain=os.environ.get('ONEVIEWSDK_AUTH_LOGIN_DOMAIN', ''),
+                                         password=os.environ.get('ONEVIEWSDK_PASSWORD', ''),
+                                         sessionID=os.environ.get('ONEVIEWSDK_SESSIONID', '')),
+                        proxy=os.environ.get('ONEVIEWSDK_PROXY', ''),
+                        ssl_certificate=os.environ.get('ONEVIEWSDK_SSL_CERTIFICATE', False),
+                        timeout=os.environ.get('ONEVIEWSDK_CONNECTION_TIMEOUT'))
         else:
-            self.oneview_client = OneViewClient.from_json_file(self.module.params['config'])
+            with open(self.module.params['config']) as json_data:
+                return json.load(json_data)
+
+    def _create_oneview_client_from_session_cache(self, session_cache):
+        """
+        Creates the OneViewClient reusing a cached session token when one is available and still valid.
+        The appliance validates the token on login; a full login is only done when it rejects it.
+
+        Args:
+            session_cache (OneViewSessionCache): Session cache in use.
+
+        Returns:
+            OneViewClient: The client connected to the appliance.
+        """
+        config = self._build_oneview_config()
+        credentials = config.get('credentials') or {}
+
+        if credentials.get('sessionID'):
+            # An explicit session always takes precedence over the cache
+            return OneViewClient(config)
+
+        key = session_cache.build_key(config.get('ip'), credentials.get('userName'), config.get('api_version'))
+        session_id = session_cache.get(key)
+
+        if session_id:
+            cached_config = deepcopy(config)
+            cached_config['credentials']['sessionID'] = session_id
+            try:
+                oneview_client = OneViewClient(cached_config)
+                session_cache.set(key, oneview_client.connection.get_session_id())
+                return oneview_client
+            except HPOneViewException:
+                logger.debug("Cached session rejected by the appliance. A new login will be done.")
+                session_cache.remove(key)
+
+        oneview_client = OneViewClient(config)
+        session_cache.set(key, oneview_client.connection.get_session_id())
+        return oneview_client
+
+    def _install_connection_broker(self):
+        connection_broker = OneViewConnectionBroker.from_environment_variables()
+        if connection_broker:
+            connection_broker.install(self.oneview_client)
 
     def execute_module(self):
         """
@@ -177,6 +267,62 @@ class OneViewModuleBase(object):
         else:
             return {"changed": False, "msg": self.MSG_ALREADY_ABSENT}
 
+    def get_converged_resource(self, name, desired, collection_uri=None):
+        """
+        Gets the resource converged to the desired state by a previous execution, when neither of them changed since.
+
+        The converged resource is kept in the eTag cache along with the digest of the desired state, and it is checked
+        with a single GET conditional to its eTag, instead of getting the resource by name and comparing it.
+
+        Args:
+            name (str): Resource name.
+            desired (dict): Desired state of the resource, as informed to the module.
+            collection_uri (str): URI of the resource collection. Defaults to the URI of the resource client.
+
+        Returns:
+            tuple: The resource, or None when it is not known, and whether it is still converged to the desired state.
+        """
+        if not self.etag_cache or not name or 'newName' in desired:
+            return None, False
+
+        key = self._converged_cache_key(name, collection_uri)
+        entry = self.etag_cache.get_entry(key)
+        if not entry or entry['value'].get('digest') != ResourceDigest().of(desired):
+            return None, False
+
+        converged = entry['value']['resource']
+        response, body = self.oneview_client.connection.do_http('GET', converged['uri'], '',
+                                                                custom_headers={'If-None-Match': entry['eTag']})
+        if response.status == 304:
+            return converged, True
+
+        if response.status >= 400 or not isinstance(body, dict) or body.get('name') != name:
+            # The resource was removed or renamed, it must be found by name
+            return None, False
+
+        return body, body.get('eTag') == entry['eTag']
+
+    def set_converged_resource(self, name, desired, resource, collection_uri=None):
+        """
+        Stores the resource converged to the desired state, to be checked by get_converged_resource on the next
+        executions.
+
+        Args:
+            name (str): Resource name.
+            desired (dict): Desired state of the resource, as informed to the module.
+            resource (dict): Resource converged, with its eTag.
+            collection_uri (str): URI of the resource collection. Defaults to the URI of the resource client.
+        """
+        if not self.etag_cache or not name or not resource or not resource.get('uri'):
+            return
+
+        self.etag_cache.set(self._converged_cache_key(name, collection_uri), resource.get('eTag'),
+                            dict(digest=ResourceDigest().of(desired), resource=resource))
+
+    def _converged_cache_key(self, name, collection_uri):
+        return 'converged:{0}:{1}:{2}'.format(self.oneview_client.connection.get_host(),
+                                              collection_uri or self.resource_client.URI, name)
+
     def get_by_name(self, name):
         """
         Generic get by name implementation.
@@ -207,6 +353,7 @@ class OneViewModuleBase(object):
         """
 
         changed = False
+        diff = None
         if "newName" in self.data:
             self.data["name"] = self.data.pop("newName")
 
@@ -222,15 +369,21 @@ class OneViewModuleBase(object):
             if ResourceComparator.compare(resource, merged_data):
                 msg = self.MSG_ALREADY_PRESENT
             else:
+                # The changes are shown as a JSON patch when Ansible runs with --diff
+                if self.module._diff is True:
+                    diff = dict(prepared=json.dumps(ResourceComparator.build_patch(resource, merged_data), indent=2))
                 resource = self.resource_client.update(merged_data)
                 changed = True
                 msg = self.MSG_UPDATED
 
-        return dict(
+        result = dict(
             msg=msg,
             changed=changed,
             ansible_facts={fact_name: resource}
         )
+        if diff:
+            result['diff'] = diff
+        return result
 
     def resource_scopes_set(self, state, fact_name, scope_uris):
         """
@@ -262,6 +415,115 @@ class OneViewModuleBase(object):
 
         return state
 
+    def gather_facts_concurrently(self, fact_getters):
+        """
+        Gathers facts calling their getters concurrently, so the time spent is roughly the one of the slowest getter.
+
+        The number of getters running at the same time is limited by FACTS_MAX_WORKERS, which can be overridden by
+        the environment variable ONEVIEW_FACTS_MAX_WORKERS.
+
+        Args:
+            fact_getters (list): Tuples with the fact name and a callable without arguments that returns its value.
+
+        Returns:
+            dict: The facts gathered, by name.
+
+        Raises:
+            HPOneViewException: When any getter fails, after all of them have finished, with the messages of each
+                failed fact.
+        """
+        def gather(getter):
+            try:
+                return getter(), None
+            except HPOneViewException as exception:
+                return None, exception
+
+        results = run_concurrently([lambda getter=getter: gather(getter) for _, getter in fact_getters],
+                                   self._get_facts_max_workers())
+
+        facts = {}
+        errors = []
+        for (fact_name, _), (value, exception) in zip(fact_getters, results):
+            if exception:
+                errors.append(self.MSG_FACT_NOT_GATHERED.format(fact_name, exception.msg))
+            else:
+                facts[fact_name] = value
+
+        if errors:
+            raise HPOneViewException('; '.join(errors))
+
+        return facts
+
+    def get_all_by_names(self, resource_client, names):
+        """
+        Gets the resources with any of the names informed.
+
+        The names are searched with a single request filtering by all of them. When the filter gets longer than
+        MAX_NAMES_FILTER_LENGTH, the names are split into batches that are searched concurrently.
+
+        Args:
+            resource_client: Client of the resource type, e.g. oneview_client.server_hardware.
+            names (list): Resource names.
+
+        Returns:
+            OrderedDict: The resources by name, in the order of the names informed. The value is None for the names
+            not found. As done by get_by, the search is case-insensitive.
+        """
+        resources_by_name = OrderedDict((name, None) for name in names)
+        # The names may not be strings, e.g. numbers in YAML, so they are compared as the strings in the filter
+        names_by_key = OrderedDict()
+        for name in resources_by_name:
+            names_by_key.setdefault(str(name).lower(), []).append(name)
+
+        filters = []
+        for key_names in names_by_key.values():
+            condition = "name='{}'".format(str(key_names[0]).replace("'", "''"))
+            if filters and len(filters[-1]) + len(condition) + 4 <= self.MAX_NAMES_FILTER_LENGTH:
+                filters[-1] += ' OR ' + condition
+            else:
+                filters.append(condition)
+
+        results = run_concurrently([lambda filter_=filter_: resource_client.get_all(filter=filter_)
+                                    for filter_ in filters], self._get_facts_max_workers())
+
+        for resources in results:
+            for resource in resources:
+                for name in names_by_key.get(str(resource.get('name')).lower(), []):
+                    if resources_by_name[name] is None:
+                        resources_by_name[name] = resource
+
+        return resources_by_name
+
+    def get_all_facts(self, resource_client):
+        """
+        Gets the resources of a collection according to the facts params.
+
+        When the params C(page_size) or C(max_items) are informed, the collection is got page by page, following the
+        nextPageUri, and the pages stop being requested once max_items members are got. Otherwise, the params are
+        passed to the get_all of the resource client.
+
+        Args:
+            resource_client: Client of the resource type, e.g. oneview_client.alerts.
+
+        Returns:
+            list: The resources got.
+        """
+        params = dict(self.facts_params)
+        if not any(param in params for param in self.FACTS_PAGING_PARAMS):
+            return resource_client.get_all(**params)
+
+        page_size = params.pop('page_size', None) or DEFAULT_PAGE_SIZE
+        max_items = params.pop('max_items', None)
+        count = params.pop('count', -1)
+        if count is not None and count >= 0:
+            max_items = count if max_items is None else min(count, max_items)
+
+        return list(iterate_collection(self.oneview_client.connection, resource_client.URI, page_size=page_size,
+                                       max_items=max_items, **params))
+
+    def _get_facts_max_workers(self):
+        return int(os.environ.get(self.FACTS_MAX_WORKERS_ENV) or self.FACTS_MAX_WORKERS)
+
     @staticmethod
     def transform_list_to_dict(list_):
         """
@@ -311,6 +573,1024 @@ class OneViewModuleBase(object):
         return logger
 
 
+def _make_private_dir(path):
+    # Tolerates the directory created in the meantime by a concurrent invocation
+    if not os.path.isdir(path):
+        try:
+            os.makedirs(path, 0o700)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+
+
+@contextmanager
+def _locked_json_file(path):
+    # Loads the JSON object of the file under a lock shared by the concurrent invocations, and saves it atomically
+    # once the block changing it completes
+    file_dir = os.path.dirname(path)
+    if file_dir:
+        _make_private_dir(file_dir)
+
+    with open(path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        try:
+            with open(path) as json_file:
+                content = json.load(json_file)
+        except (IOError, OSError):
+            content = {}
+
+        yield content
+
+        fd, tmp_path = tempfile.mkstemp(dir=file_dir or '.')
+        with os.fdopen(fd, 'w') as json_file:
+            json.dump(content, json_file)
+        os.rename(tmp_path, path)
+
+
+class OneViewSessionCache(object):
+    """
+    Stores the OneView session tokens on local disk, so they can be reused across module invocations
+    instead of doing a new login on every task.
+
+    To activate the cache, setup the environment var ONEVIEW_SESSION_CACHE_DIR with the cache directory.
+    The time to live of the cached sessions, in seconds, can be defined with ONEVIEW_SESSION_CACHE_TTL.
+    e.g.: export ONEVIEW_SESSION_CACHE_DIR=~/.ansible/oneview_sessions
+    """
+    DEFAULT_TTL = 1800
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.ttl = ttl
+
+    @classmethod
+    def from_environment_variables(cls):
+        """
+        Builds the session cache from the environment variables.
+
+        Returns:
+            OneViewSessionCache: The session cache, or None when it is not activated.
+        """
+        cache_dir = os.environ.get('ONEVIEW_SESSION_CACHE_DIR')
+        if not cache_dir:
+            return None
+        ttl = int(os.environ.get('ONEVIEW_SESSION_CACHE_TTL', cls.DEFAULT_TTL))
+        return cls(cache_dir, ttl)
+
+    @staticmethod
+    def build_key(hostname, username, api_version):
+        """
+        Builds the cache key for a session.
+
+        Args:
+            hostname: OneView appliance hostname.
+            username: User name of the session.
+            api_version: API version of the session.
+
+        Returns:
+            str: Cache key.
+        """
+        value = '{0}|{1}|{2}'.format(hostname, username, api_version)
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Gets a cached session token.
+
+        Args:
+            key: Cache key built by build_key.
+
+        Returns:
+            str: The session token, or None when it is not cached or it is expired.
+        """
+        try:
+            with open(self._path(key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('timestamp', 0) > self.ttl:
+            self.remove(key)
+            return None
+
+        return entry.get('sessionID')
+
+    def set(self, key, session_id):
+        """
+        Stores a session token. The file is only readable by the current user.
+
+        Args:
+            key: Cache key built by build_key.
+            session_id: Session token.
+        """
+        if not session_id:
+            return
+        try:
+            _make_private_dir(self.cache_dir)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(dict(sessionID=session_id, timestamp=time.time()), cache_file)
+            os.rename(tmp_path, self._path(key))
+        except (IOError, OSError):
+            logger.debug("Unable to write the session cache at " + self.cache_dir)
+
+    def remove(self, key):
+        """
+        Removes a cached session token.
+
+        Args:
+            key: Cache key built by build_key.
+        """
+        try:
+            os.remove(self._path(key))
+        except (IOError, OSError):
+            pass
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.json')
+
+
+class ServerHardwareAllocationLedger(object):
+    """
+    Stores on local disk the server hardware reserved for the server profiles being created, shared by the module
+    invocations running at the same time, so each concurrent creation picks a different server hardware from the
+    available targets instead of all of them trying the first one.
+
+    The reservations expire after the lease time, so the server hardware of an interrupted creation becomes available
+    again.
+
+    To activate the ledger, setup the environment var ONEVIEW_ALLOCATION_LEDGER with the ledger file path.
+    The lease of the reservations, in seconds, can be defined with ONEVIEW_ALLOCATION_LEASE.
+    e.g.: export ONEVIEW_ALLOCATION_LEDGER=~/.ansible/oneview_allocations.json
+    """
+    DEFAULT_LEASE = 600
+
+    def __init__(self, path, lease=DEFAULT_LEASE):
+        self.path = os.path.expanduser(path)
+        self.lease = lease
+
+    @classmethod
+    def from_environment_variables(cls):
+        """
+        Builds the allocation ledger from the environment variables.
+
+        Returns:
+            ServerHardwareAllocationLedger: The allocation ledger, or None when it is not activated.
+        """
+        path = os.environ.get('ONEVIEW_ALLOCATION_LEDGER')
+        if not path:
+            return None
+        lease = int(os.environ.get('ONEVIEW_ALLOCATION_LEASE', cls.DEFAULT_LEASE))
+        return cls(path, lease)
+
+    def reserve(self, candidates, owner):
+        """
+        Reserves the first candidate not reserved by another owner. The previous reservation of the owner, if any, is
+        released.
+
+        Args:
+            candidates (list): Server hardware URIs, in the order of preference.
+            owner (str): Name of the server profile the server hardware is reserved for.
+
+        Returns:
+            str: The server hardware URI reserved, or None when all the candidates are reserved by other owners.
+        """
+        candidates = [candidate for candidate in candidates if candidate]
+        try:
+            with self._reservations() as reservations:
+                for uri in [uri for uri, reservation in reservations.items() if reservation['owner'] == owner]:
+                    del reservations[uri]
+
+                for candidate in candidates:
+                    if candidate not in reservations:
+                        reservations[candidate] = dict(owner=owner, expires=time.time() + self.lease)
+                        return candidate
+                return None
+        except (IOError, OSError, ValueError):
+            logger.debug("Unable to use the allocation ledger at " + self.path)
+            return candidates[0] if candidates else None
+
+    def release(self, candidate, owner):
+        """
+        Releases a reservation, when it belongs to the owner.
+
+        Args:
+            candidate (str): Server hardware URI.
+            owner (str): Name of the server profile the server hardware was reserved for.
+        """
+        try:
+            with self._reservations() as reservations:
+                if reservations.get(candidate, {}).get('owner') == owner:
+                    del reservations[candidate]
+        except (IOError, OSError, ValueError):
+            logger.debug("Unable to use the allocation ledger at " + self.path)
+
+    @contextmanager
+    def _reservations(self):
+        with _locked_json_file(self.path) as reservations:
+            now = time.time()
+            for uri in [uri for uri, reservation in reservations.items() if reservation.get('expires', 0) <= now]:
+                del reservations[uri]
+
+            yield reservations
+
+
+class OneViewETagCache(object):
+    """
+    Stores on local disk values the appliance computes from a resource, e.g. the server profile compliance preview,
+    along with the resource eTag, so they can be reused across module invocations while the resource does not change.
+
+    To activate the cache, setup the environment var ONEVIEW_ETAG_CACHE_DIR with the cache directory.
+    The time to live of the cached values, in seconds, can be defined with ONEVIEW_ETAG_CACHE_TTL.
+    e.g.: export ONEVIEW_ETAG_CACHE_DIR=~/.ansible/oneview_etags
+    """
+    DEFAULT_TTL = 86400
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.ttl = ttl
+
+    @classmethod
+    def from_environment_variables(cls):
+        """
+        Builds the eTag cache from the environment variables.
+
+        Returns:
+            OneViewETagCache: The eTag cache, or None when it is not activated.
+        """
+        cache_dir = os.environ.get('ONEVIEW_ETAG_CACHE_DIR')
+        if not cache_dir:
+            return None
+        ttl = int(os.environ.get('ONEVIEW_ETAG_CACHE_TTL', cls.DEFAULT_TTL))
+        return cls(cache_dir, ttl)
+
+    def get(self, key, etag):
+        """
+        Gets a cached value.
+
+        Args:
+            key (str): Cache key, e.g. the kind of value followed by the resource URI.
+            etag (str): Current eTag of the resource.
+
+        Returns:
+            The value, or None when it is not cached, it was cached for another eTag or it is expired.
+        """
+        entry = self.get_entry(key)
+        if not etag or not entry or entry['eTag'] != etag:
+            return None
+
+        return entry['value']
+
+    def get_entry(self, key):
+        """
+        Gets a cached value along with the eTag it was cached for, when the current eTag of the resource is not known.
+
+        Args:
+            key (str): Cache key, e.g. the kind of value followed by the resource URI.
+
+        Returns:
+            dict: The eTag and the value, or None when it is not cached or it is expired.
+        """
+        try:
+            with open(self._path(key)) as cache_file:
+                entry = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+        if not entry.get('eTag') or time.time() - entry.get('timestamp', 0) > self.ttl:
+            return None
+
+        return dict(eTag=entry['eTag'], value=entry.get('value'))
+
+    def set(self, key, etag, value):
+        """
+        Stores a value, replacing the one cached for a previous eTag of the resource.
+
+        Args:
+            key (str): Cache key, e.g. the kind of value followed by the resource URI.
+            etag (str): eTag of the resource the value was computed from.
+            value: JSON serializable value.
+        """
+        if not etag or value is None:
+            return
+        try:
+            _make_private_dir(self.cache_dir)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'w') as cache_file:
+                json.dump(dict(eTag=etag, value=value, timestamp=time.time()), cache_file)
+            os.rename(tmp_path, self._path(key))
+        except (IOError, OSError, TypeError, ValueError):
+            logger.debug("Unable to write the eTag cache at " + self.cache_dir)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+
+class _LocalResourceIndex(object):
+    """
+    Base of the indexes of resource URIs stored on local disk, in a JSON file with an entry per appliance, shared by the
+    concurrent module invocations under a lock. By default, the entry of an appliance maps each key to a URI.
+    """
+    ENVIRONMENT_VAR = None
+    DESCRIPTION = 'index'
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+
+    @classmethod
+    def from_environment_variables(cls):
+        """
+        Builds the index from the environment variables.
+
+        Returns:
+            The index, or None when it is not activated.
+        """
+        path = os.environ.get(cls.ENVIRONMENT_VAR)
+        if not path:
+            return None
+        return cls(path)
+
+    def get_resource(self, resource_client, host, uri, is_indexed):
+        """
+        Gets an indexed resource with a single request, checking it still has the value it was indexed by. The
+        resources not found anymore are removed from the index.
+
+        Args:
+            resource_client: Client of the resource type, e.g. oneview_client.server_profiles.
+            host (str): Appliance the resource belongs to.
+            uri (str): Indexed URI of the resource.
+            is_indexed (callable): Checks the resource got still has the value it was indexed by.
+
+        Returns:
+            dict: The resource, or None when it is not found or it changed since it was indexed.
+        """
+        try:
+            resource = resource_client.get(uri)
+        except HPOneViewException as exception:
+            if (exception.oneview_response or {}).get('errorCode') != 'RESOURCE_NOT_FOUND':
+                raise
+            self.forget(host, uri)
+            return None
+
+        if not isinstance(resource, dict) or not is_indexed(resource):
+            return None
+        return resource
+
+    def forget(self, host, uri):
+        """
+        Removes a resource from the index, with every key it is indexed by, e.g. when it is not found anymore.
+
+        Args:
+            host (str): Appliance the resource belonged to.
+            uri (str): Resource URI.
+        """
+        def update(entry):
+            for key in [key for key, indexed_uri in entry.items() if indexed_uri == uri]:
+                entry.pop(key)
+
+        self._update_entry(host, update)
+
+    def _get_entry(self, host):
+        try:
+            with open(self.path) as index_file:
+                return json.load(index_file).get(host, {})
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _update_entry(self, host, update):
+        # Changes the entry of the appliance under the lock, without failing the module when the index can not be used
+        try:
+            with _locked_json_file(self.path) as index:
+                update(index.setdefault(host, self._new_entry()))
+        except (IOError, OSError, ValueError):
+            logger.debug("Unable to use the {} at {}".format(self.DESCRIPTION, self.path))
+
+    def _new_entry(self):
+        return {}
+
+
+class ServerProfileIndex(_LocalResourceIndex):
+    """
+    Stores on local disk the URIs of the server profiles by serial number, server hardware URI and UUID, so the
+    profile of a host is found with a single request for the profile itself.
+
+    The index is refreshed incrementally: only the profiles modified since the newest modification already indexed
+    are got from the appliance, projected to the indexed fields.
+
+    To activate the index, setup the environment var ONEVIEW_SERVER_PROFILE_INDEX with the index file path.
+    e.g.: export ONEVIEW_SERVER_PROFILE_INDEX=~/.ansible/oneview_server_profiles.json
+    """
+    ENVIRONMENT_VAR = 'ONEVIEW_SERVER_PROFILE_INDEX'
+    DESCRIPTION = 'server profile index'
+    KEYS = ('serialNumber', 'serverHardwareUri', 'uuid')
+    FIELDS = 'uri,modified,serialNumber,serverHardwareUri,uuid'
+
+    def get_uri(self, host, key, value):
+        """
+        Gets the URI of the server profile indexed with the value of the key. The index is not refreshed.
+
+        Args:
+            host (str): Appliance the profile belongs to.
+            key (str): One of KEYS.
+            value (str): Value of the key.
+
+        Returns:
+            str: The server profile URI, or None when it is not indexed.
+        """
+        for uri, indexed in self._get_entry(host).get('profiles', {}).items():
+            if indexed.get(key) == value:
+                return uri
+        return None
+
+    def refresh(self, oneview_client):
+        """
+        Gets the profiles modified since the last refresh, or all of them on the first one, and indexes them.
+
+        Args:
+            oneview_client: OneViewClient instance.
+        """
+        def update(entry):
+            # Profiles modified at the same time as the newest one indexed may have been missed, so they are got again
+            filter_ = "modified>='{}'".format(entry['modified']) if entry['modified'] else ''
+            members = ResourceClient(oneview_client.connection, oneview_client.server_profiles.URI).get_all(
+                filter=filter_, fields=self.FIELDS)
+
+            for member in members:
+                entry['profiles'][member['uri']] = dict((key, member.get(key)) for key in self.KEYS)
+                if member.get('modified') and member['modified'] > (entry['modified'] or ''):
+                    entry['modified'] = member['modified']
+
+        self._update_entry(oneview_client.connection.get_host(), update)
+
+    def forget(self, host, uri):
+        """
+        Removes a server profile from the index, e.g. when it is not found anymore.
+
+        Args:
+            host (str): Appliance the profile belonged to.
+            uri (str): Server profile URI.
+        """
+        self._update_entry(host, lambda entry: entry['profiles'].pop(uri, None))
+
+    def _new_entry(self):
+        return dict(modified=None, profiles={})
+
+
+class ServerProfileLookup(object):
+    """
+    Finds server profiles by serial number, server hardware URI or UUID.
+
+    Without an index, the profile is searched with a single request filtering by the key on the appliance. With a
+    ServerProfileIndex, the indexed profile is got by its URI and checked against the key, and the index is only
+    refreshed when it misses.
+    """
+    MSG_INVALID_KEY = 'Server profiles can only be looked up by: {}'
+
+    def __init__(self, oneview_client, index=None):
+        """
+        ServerProfileLookup constructor.
+
+        Args:
+            oneview_client: OneViewClient instance.
+            index (ServerProfileIndex): Local index, if any.
+        """
+        self.oneview_client = oneview_client
+        self.index = index
+
+    def get(self, key, value):
+        """
+        Gets the server profile with the value of the key.
+
+        Args:
+            key (str): serialNumber, serverHardwareUri or uuid.
+            value (str): Value of the key.
+
+        Returns:
+            dict: The server profile, or None when it is not found.
+        """
+        if key not in ServerProfileIndex.KEYS:
+            raise HPOneViewValueError(self.MSG_INVALID_KEY.format(', '.join(ServerProfileIndex.KEYS)))
+
+        if not self.index:
+            server_profiles = self.oneview_client.server_profiles.get_all(
+                filter="{}='{}'".format(key, str(value).replace("'", "''")))
+            return next((profile for profile in server_profiles if profile.get(key) == value), None)
+
+        server_profile = self._get_indexed(key, value)
+        if server_profile is None:
+            self.index.refresh(self.oneview_client)
+            server_profile = self._get_indexed(key, value)
+        return server_profile
+
+    def _get_indexed(self, key, value):
+        host = self.oneview_client.connection.get_host()
+        uri = self.index.get_uri(host, key, value)
+        if not uri:
+            return None
+
+        # A profile changed since it was indexed is updated by the next refresh
+        return self.index.get_resource(self.oneview_client.server_profiles, host, uri,
+                                       lambda server_profile: server_profile.get(key) == value)
+
+
+class EnclosureHostnameIndex(_LocalResourceIndex):
+    """
+    Stores on local disk the URIs of the enclosures by the IP addresses of their Onboard Administrators, so plays that
+    add many enclosures find each one with a single request for the enclosure itself.
+
+    To activate the index, setup the environment var ONEVIEW_ENCLOSURE_INDEX with the index file path.
+    e.g.: export ONEVIEW_ENCLOSURE_INDEX=~/.ansible/oneview_enclosures.json
+    """
+    ENVIRONMENT_VAR = 'ONEVIEW_ENCLOSURE_INDEX'
+    DESCRIPTION = 'enclosure index'
+    HOSTNAME_FIELDS = ('activeOaPreferredIP', 'standbyOaPreferredIP')
+
+    def get_uri(self, host, hostname):
+        """
+        Gets the URI of the enclosure indexed with the hostname.
+
+        Args:
+            host (str): Appliance the enclosure belongs to.
+            hostname (str): IP address of the Onboard Administrator.
+
+        Returns:
+            str: The enclosure URI, or None when it is not indexed.
+        """
+        return self._get_entry(host).get(hostname)
+
+    def add(self, host, enclosure, hostnames=()):
+        """
+        Indexes the enclosure by the IP addresses of its Onboard Administrators and by the hostnames given.
+
+        Args:
+            host (str): Appliance the enclosure belongs to.
+            enclosure (dict): The enclosure.
+            hostnames (list): Other hostnames of the enclosure, e.g. the one it was added with.
+        """
+        hostnames = [enclosure.get(field) for field in self.HOSTNAME_FIELDS] + list(hostnames)
+        self._update_entry(host, lambda entry: entry.update((hostname, enclosure['uri'])
+                                                            for hostname in hostnames if hostname))
+
+    def forget_hostname(self, host, hostname):
+        """
+        Removes a hostname from the index, e.g. when the enclosure indexed with it does not have it anymore.
+
+        Args:
+            host (str): Appliance the enclosure belongs to.
+            hostname (str): IP address of the Onboard Administrator.
+        """
+        self._update_entry(host, lambda entry: entry.pop(hostname, None))
+
+
+def get_backoff_delay(attempt, base=1, cap=30):
+    """
+    Gets the time to wait before retrying an operation, growing exponentially with the attempts, with full jitter so
+    concurrent retries spread over time.
+
+    Args:
+        attempt (int): Number of the attempts already made.
+        base (int): Maximum time, in seconds, to wait after the first attempt.
+        cap (int): Maximum time, in seconds, to wait after any attempt.
+
+    Returns:
+        float: Time, in seconds, to wait.
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class _OneViewBrokerResponse(object):
+    def __init__(self, status, headers):
+        self.status = status
+        self._headers = dict((name.lower(), value) for name, value in headers)
+
+    def getheader(self, name, default=None):
+        return self._headers.get(name.lower(), default)
+
+
+class _OneViewBrokerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        broker = self.server.broker
+        broker._track_client(1)
+        try:
+            for line in iter(self.rfile.readline, b''):
+                response = broker.handle_request(json.loads(line.decode('utf-8')))
+                self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+                self.wfile.flush()
+        finally:
+            broker._track_client(-1)
+
+
+class OneViewConnectionBroker(object):
+    """
+    Local daemon that keeps pooled keep-alive HTTPS connections to the OneView appliances and Image Streamers.
+    The modules send their requests to the broker through a Unix socket, so the TCP connections and TLS sessions are
+    reused across the module invocations instead of being opened for every request.
+
+    To activate the broker, setup the environment var ONEVIEW_CONNECTION_BROKER_SOCKET with the socket path.
+    The broker is started by the first module that needs it, and it stops after ONEVIEW_CONNECTION_BROKER_IDLE_TIMEOUT
+    seconds without clients.
+    e.g.: export ONEVIEW_CONNECTION_BROKER_SOCKET=~/.ansible/oneview_broker.sock
+    """
+    DEFAULT_IDLE_TIMEOUT = 300
+    START_TIMEOUT = 5
+    MAX_IDLE_CONNECTIONS = 8
+    MSG_BROKER_UNAVAILABLE = 'OneView connection broker is unavailable.'
+
+    def __init__(self, socket_path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.socket_path = os.path.expanduser(socket_path)
+        self.idle_timeout = idle_timeout
+        self._local = threading.local()
+        self._server = None
+        self._pool = {}
+        self._lock = threading.Lock()
+        self._active_clients = 0
+        self._last_activity = time.time()
+        self._stopped = threading.Event()
+
+    @classmethod
+    def from_environment_variables(cls):
+        """
+        Builds the connection broker from the environment variables.
+
+        Returns:
+            OneViewConnectionBroker: The connection broker, or None when it is not activated.
+        """
+        socket_path = os.environ.get('ONEVIEW_CONNECTION_BROKER_SOCKET')
+        if not socket_path:
+            return None
+        idle_timeout = int(os.environ.get('ONEVIEW_CONNECTION_BROKER_IDLE_TIMEOUT', cls.DEFAULT_IDLE_TIMEOUT))
+        return cls(socket_path, idle_timeout)
+
+    def install(self, oneview_client):
+        """
+        Routes the requests of the OneView client, and of the Image Streamer clients created by it, through the
+        broker. The broker is started when it is not running yet.
+
+        Args:
+            oneview_client: OneViewClient instance.
+
+        Returns:
+            bool: True when the broker is in use, False when the client keeps its direct connections.
+        """
+        if not self.start():
+            logger.debug("Unable to start the connection broker. The direct connections will be used.")
+            return False
+
+        self._install_on_connection(oneview_client.connection)
+
+        create_image_streamer_client = oneview_client.create_image_streamer_client
+
+        def create_brokered_image_streamer_client():
+            image_streamer_client = create_image_streamer_client()
+            self._install_on_connection(image_streamer_client.connection)
+            return image_streamer_client
+
+        oneview_client.create_image_streamer_client = create_brokered_image_streamer_client
+        return True
+
+    def start(self):
+        """
+        Starts the broker as a detached daemon, unless it is already running.
+
+        Returns:
+            bool: True when the broker is running.
+        """
+        if self._is_running():
+            return True
+
+        socket_dir = os.path.dirname(self.socket_path)
+        if socket_dir:
+            _make_private_dir(socket_dir)
+
+        with open(self.socket_path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if not self._is_running():
+                self._spawn()
+
+            deadline = time.time() + self.START_TIMEOUT
+            while not self._is_running():
+                if time.time() > deadline:
+                    return False
+                time.sleep(0.05)
+        return True
+
+    def serve(self):
+        """
+        Runs the broker server until it is idle for longer than the idle timeout.
+        """
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        old_umask = os.umask(0o077)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, _OneViewBrokerRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+        self._server.broker = self
+        self._server.daemon_threads = True
+
+        watchdog = threading.Thread(target=self._stop_when_idle)
+        watchdog.daemon = True
+        watchdog.start()
+
+        try:
+            self._server.serve_forever(poll_interval=0.5)
+        finally:
+            self._stopped.set()
+            self._server.server_close()
+            self._close_pool()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def shutdown(self):
+        """
+        Stops the broker server.
+        """
+        if self._server:
+            self._server.shutdown()
+
+    def request(self, connection, method, path, body, custom_headers=None):
+        """
+        Sends a request through the broker. It has the same signature and return of the SDK connection do_http.
+
+        Returns:
+            tuple: The response and its body.
+        """
+        headers = connection._headers.copy()
+        if custom_headers:
+            headers.update(custom_headers)
+
+        proxy = [connection._proxyHost, connection._proxyPort] if connection._doProxy else None
+        ssl_bundle = None if connection._sslTrustAll else connection._sslTrustedBundle
+
+        response = self._send(dict(host=connection._host,
+                                   proxy=proxy,
+                                   ssl_bundle=ssl_bundle,
+                                   method=method,
+                                   path=path,
+                                   body=body,
+                                   headers=dict((name, str(value)) for name, value in headers.items())))
+        if 'error' in response:
+            raise HPOneViewException(response['error'])
+
+        body = response['body']
+        if response.get('encoding') == 'base64':
+            body = base64.b64decode(body)
+        elif body:
+            try:
+                body = json.loads(body)
+            except ValueError:
+                pass
+
+        return _OneViewBrokerResponse(response['status'], response['headers']), body
+
+    def handle_request(self, request):
+        """
+        Executes a request received from a module, using a pooled connection to the appliance.
+
+        Args:
+            request (dict): Request sent by the request method.
+
+        Returns:
+            dict: The response status, headers and body, or the error message.
+        """
+        self._last_activity = time.time()
+        key = json.dumps([request['host'], request.get('proxy'), request.get('ssl_bundle')])
+
+        conn, reused = self._acquire_connection(key, request)
+        try:
+            try:
+                resp, data = self._do_request(conn, request)
+            except (http.client.HTTPException, socket.error):
+                conn.close()
+                if not reused:
+                    raise
+                # The appliance closed the kept-alive connection, so it is retried with a new one
+                conn = self._create_connection(request['host'], request.get('proxy'), request.get('ssl_bundle'))
+                resp, data = self._do_request(conn, request)
+        except (http.client.HTTPException, socket.error, ssl.SSLError) as exception:
+            return dict(error=str(exception))
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release_connection(key, conn)
+
+        response = dict(status=resp.status, headers=resp.getheaders())
+        try:
+            response['body'] = data.decode('utf-8')
+        except UnicodeDecodeError:
+            response['body'] = base64.b64encode(data).decode('ascii')
+            response['encoding'] = 'base64'
+        return response
+
+    def _do_request(self, conn, request):
+        conn.request(request['method'], request['path'], request['body'], request['headers'])
+        resp = conn.getresponse()
+        return resp, resp.read()
+
+    def _acquire_connection(self, key, request):
+        with self._lock:
+            idle_connections = self._pool.get(key)
+            if idle_connections:
+                return idle_connections.pop(), True
+        return self._create_connection(request['host'], request.get('proxy'), request.get('ssl_bundle')), False
+
+    def _release_connection(self, key, conn):
+        with self._lock:
+            idle_connections = self._pool.setdefault(key, [])
+            if len(idle_connections) < self.MAX_IDLE_CONNECTIONS:
+                idle_connections.append(conn)
+                return
+        conn.close()
+
+    def _close_pool(self):
+        with self._lock:
+            for idle_connections in self._pool.values():
+                for conn in idle_connections:
+                    conn.close()
+            self._pool = {}
+
+    def _create_connection(self, host, proxy, ssl_bundle):
+        # Same connection settings used by the SDK connection
+        context = ssl.SSLContext(ssl.PROTOCOL_TLSv1_2)
+        if ssl_bundle:
+            context.verify_mode = ssl.CERT_REQUIRED
+            context.load_verify_locations(ssl_bundle)
+        else:
+            context.verify_mode = ssl.CERT_NONE
+
+        if not proxy:
+            return http.client.HTTPSConnection(host, context=context)
+
+        conn = http.client.HTTPSConnection(proxy[0], proxy[1], context=context)
+        conn.set_tunnel(host, 443)
+        return conn
+
+    def _install_on_connection(self, connection):
+        def do_http(method, path, body, custom_headers=None):
+            return self.request(connection, method, path, body, custom_headers)
+
+        connection.do_http = do_http
+
+    def _send(self, message):
+        data = json.dumps(message).encode('utf-8') + b'\n'
+        try:
+            self._get_client_socket().sendall(data)
+        except socket.error:
+            # The broker was restarted since the last request, nothing was sent yet
+            self._local.client_socket = None
+            if not self.start():
+                raise HPOneViewException(self.MSG_BROKER_UNAVAILABLE)
+            self._get_client_socket().sendall(data)
+
+        line = self._local.reader.readline()
+        if not line:
+            self._local.client_socket = None
+            raise HPOneViewException(self.MSG_BROKER_UNAVAILABLE)
+        return json.loads(line.decode('utf-8'))
+
+    def _get_client_socket(self):
+        if getattr(self._local, 'client_socket', None) is None:
+            client_socket = self._connect()
+            self._local.client_socket = client_socket
+            self._local.reader = client_socket.makefile('rb')
+        return self._local.client_socket
+
+    def _connect(self):
+        client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client_socket.connect(self.socket_path)
+        except socket.error:
+            client_socket.close()
+            raise
+        return client_socket
+
+    def _is_running(self):
+        try:
+            self._connect().close()
+            return True
+        except socket.error:
+            return False
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            os.waitpid(pid, 0)
+            return
+
+        # Double fork, so the daemon is detached from the module process and Ansible does not wait for it
+        try:
+            os.setsid()
+            if os.fork():
+                os._exit(0)
+            os.chdir('/')
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in range(3):
+                os.dup2(devnull, fd)
+            try:
+                max_fd = os.sysconf('SC_OPEN_MAX')
+            except (AttributeError, ValueError):
+                max_fd = 256
+            os.closerange(3, max_fd)
+            self.serve()
+        finally:
+            os._exit(0)
+
+    def _track_client(self, count):
+        with self._lock:
+            self._active_clients += count
+            self._last_activity = time.time()
+
+    def _stop_when_idle(self):
+        # The wait returns True once the server stopped, so the watchdog does not outlive it
+        while not self._stopped.wait(min(1, self.idle_timeout)):
+            if not self._active_clients and time.time() - self._last_activity > self.idle_timeout:
+                self._server.shutdown()
+                return
+
+
+class ResourceDigest(object):
+    """
+    Normalises dictionaries and lists to canonical forms that follow the equivalence rules of the ResourceComparator:
+    resources with the same canonical form, and so the same digest, are equivalent. The order of the list elements
+    does not change them.
+
+    The canonical forms and digests are memoised, so a subtree shared by many comparisons is normalised once.
+    The resources must not be changed while the instance is in use.
+    """
+    FALSY = ('f',)
+
+    def __init__(self):
+        self._canonical_forms = {}
+        self._digests = {}
+
+    def of(self, resource):
+        """
+        Gets the digest of a dictionary or list, which is stable across runs.
+
+        Args:
+            resource: dictionary or list
+
+        Returns:
+            str: The hexadecimal digest.
+        """
+        memoised = self._digests.get(id(resource))
+        if memoised is None:
+            canonical = json.dumps(self.canonical(resource), separators=(',', ':'))
+            memoised = (resource, hashlib.sha1(canonical.encode('utf-8')).hexdigest())
+            self._digests[id(resource)] = memoised
+        return memoised[1]
+
+    def canonical(self, resource):
+        """
+        Gets the canonical form of a dictionary or list.
+
+        Args:
+            resource: dictionary or list
+
+        Returns:
+            tuple: The canonical form, which is hashable and can be compared.
+        """
+        memoised = self._canonical_forms.get(id(resource))
+        if memoised is not None:
+            return memoised[1]
+
+        if isinstance(resource, dict):
+            # Inexistent key is equivalent to exist with value None
+            items = tuple(sorted((str(key), self._canonical_value(value))
+                                 for key, value in resource.items() if value is not None))
+            canonical = ('d', bool(resource), items)
+        else:
+            canonical = ('l', tuple(sorted(self.canonical_element(element) for element in resource)))
+
+        # The resource is kept, so its id is not reused while memoised
+        self._canonical_forms[id(resource)] = (resource, canonical)
+        return canonical
+
+    def canonical_element(self, element):
+        """
+        Gets the canonical form of a list element. Unlike dictionary values, the falsy list elements are compared by
+        value.
+
+        Args:
+            element: Any object type.
+
+        Returns:
+            tuple: The canonical form.
+        """
+        if isinstance(element, (dict, list)):
+            return self.canonical(element)
+        return ('s', ResourceComparator._standardize_value(element))
+
+    def _canonical_value(self, value):
+        # These values are considered equal: None, empty, False
+        if not value:
+            return self.FALSY
+        return self.canonical_element(value)
+
+
 class ResourceComparator():
     MSG_DIFF_AT_KEY = 'Difference found at key \'{0}\'. '
 
@@ -321,7 +1601,7 @@ class ResourceComparator():
         Particularities of the comparison:
             - Inexistent key = None
             - These values are considered equal: None, empty, False
-            - Lists are compared value by value after a sort, if they have same size.
+            - Lists are compared as multisets of their elements, matched by their canonical forms.
             - Each element is converted to str before the comparison.
         Args:
             first_resource: first dictionary
@@ -330,56 +1610,17 @@ class ResourceComparator():
         Returns:
             bool: True when equal, False when different.
         """
-        resource1 = deepcopy(first_resource)
-        resource2 = deepcopy(second_resource)
-
-        debug_resources = "\nresource1: \n{0} \nresource2: \n{1}".format(resource1, resource2)
-
-        # The first resource is True / Not Null and the second resource is False / Null
-        if resource1 and not resource2:
-            logger.debug("resource1 and not resource2. " + debug_resources)
-            return False
-
-        # Checks all keys in first dict against the second dict
-        for key in resource1.keys():
-            if key not in resource2:
-                if resource1[key] is not None:
-                    # Inexistent key is equivalent to exist with value None
-                    logger.debug(ResourceComparator.MSG_DIFF_AT_KEY.format(key) + debug_resources)
-                    return False
-            # If both values are null, empty or False it will be considered equal.
-            elif not resource1[key] and not resource2[key]:
-                continue
-            elif isinstance(resource1[key], dict):
-                # recursive call
-                if not ResourceComparator.compare(resource1[key], resource2[key]):
-                    logger.debug(ResourceComparator.MSG_DIFF_AT_KEY.format(key) + debug_resources)
-                    return False
-            elif isinstance(resource1[key], list):
-                # change comparison function to compare_list
-                if not ResourceComparator.compare_list(resource1[key], resource2[key]):
-                    logger.debug(ResourceComparator.MSG_DIFF_AT_KEY.format(key) + debug_resources)
-                    return False
-            elif ResourceComparator._standardize_value(resource1[key]) != ResourceComparator._standardize_value(
-                    resource2[key]):
-                logger.debug(ResourceComparator.MSG_DIFF_AT_KEY.format(key) + debug_resources)
-                return False
-
-        # Checks all keys in the second dict, looking for missing elements
-        for key in resource2.keys():
-            if key not in resource1:
-                if resource2[key] is not None:
-                    # Inexistent key is equivalent to exist with value None
-                    logger.debug(ResourceComparator.MSG_DIFF_AT_KEY.format(key) + debug_resources)
-                    return False
-
-        return True
+        digest = ResourceDigest()
+        if isinstance(first_resource, dict) and isinstance(second_resource, dict) and \
+                digest.canonical(first_resource) == digest.canonical(second_resource):
+            return True
+        return ResourceComparator.find_difference(first_resource, second_resource, digest) is None
 
     @staticmethod
     def compare_list(first_resource, second_resource):
         """
         Recursively compares lists contents equivalence, ignoring types and element orders.
-        Lists with same size are compared value by value after a sort,
+        Lists with same size are compared as multisets of their elements, matched by their canonical forms,
         each element is converted to str before the comparison.
         Args:
             first_resource: first list
@@ -387,43 +1628,190 @@ class ResourceComparator():
 
         Returns:
             True when equal;
-            False when different.
+            False when different, or when the second list is null or empty.
         """
+        if not second_resource:
+            return False
 
-        resource1 = deepcopy(first_resource)
-        resource2 = deepcopy(second_resource)
+        digest = ResourceDigest()
+        if isinstance(first_resource, list) and isinstance(second_resource, list) and \
+                digest.canonical(first_resource) == digest.canonical(second_resource):
+            return True
+        return ResourceComparator.find_difference(first_resource, second_resource, digest) is None
 
-        debug_resources = "resource1 = {0}, resource2 = {1}".format(resource1, resource2)
+    @staticmethod
+    def find_difference(first_resource, second_resource, digest=None):
+        """
+        Finds the first difference between two dictionaries or two lists, following the rules of compare and
+        compare_list. The resources are neither copied nor changed.
+
+        Args:
+            first_resource: first dictionary or list
+            second_resource: second dictionary or list
+            digest (ResourceDigest): Canonical forms of the resources already computed, if any.
+
+        Returns:
+            str: JSON pointer of the first difference found, e.g. '/connections/2/networkUri', where the list indexes
+            refer to the first resource. '' means the resources differ as a whole. None when they are equivalent.
+        """
+        digest = digest or ResourceDigest()
+        if isinstance(first_resource, list):
+            path = ResourceComparator._list_difference(first_resource, second_resource, (), digest)
+        else:
+            path = ResourceComparator._dict_difference(first_resource, second_resource, (), digest)
+
+        if path is None:
+            return None
+
+        pointer = ''.join('/' + str(key).replace('~', '~0').replace('/', '~1') for key in path)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            debug_resources = "\nresource1: \n{0} \nresource2: \n{1}".format(first_resource, second_resource)
+            logger.debug(ResourceComparator.MSG_DIFF_AT_KEY.format(pointer) + debug_resources)
+
+        return pointer
+
+    @staticmethod
+    def build_patch(first_resource, second_resource):
+        """
+        Builds the RFC 6902 JSON patch that turns the first resource into the second one, following the rules of
+        compare, so values considered equal produce no operation. Lists are replaced as a whole when they differ,
+        since the order of their elements is not relevant.
+
+        Args:
+            first_resource: first dictionary, usually the resource got from OneView
+            second_resource: second dictionary, usually the desired resource
+
+        Returns:
+            list: The patch operations, empty when the resources are equivalent.
+        """
+        patch = []
+        if isinstance(first_resource, dict) and isinstance(second_resource, dict) and \
+                (second_resource or not first_resource):
+            ResourceComparator._build_dict_patch(first_resource, second_resource, '', patch)
+        elif ResourceComparator.find_difference(first_resource, second_resource) is not None:
+            patch.append(dict(op='replace', path='', value=second_resource))
+        return patch
+
+    @staticmethod
+    def _build_dict_patch(resource1, resource2, pointer, patch):
+        for key, value1 in resource1.items():
+            path = pointer + '/' + str(key).replace('~', '~0').replace('/', '~1')
+            if key not in resource2:
+                if value1 is not None:
+                    # Inexistent key is equivalent to exist with value None
+                    patch.append(dict(op='remove', path=path))
+                continue
+
+            value2 = resource2[key]
+            if not value1 and not value2:
+                continue
+            elif isinstance(value1, dict) and isinstance(value2, dict) and value2:
+                ResourceComparator._build_dict_patch(value1, value2, path, patch)
+            elif isinstance(value1, dict) or isinstance(value1, list):
+                if ResourceComparator.find_difference(value1, value2) is not None:
+                    patch.append(dict(op='replace', path=path, value=value2))
+            elif ResourceComparator._standardize_value(value1) != ResourceComparator._standardize_value(value2):
+                patch.append(dict(op='replace', path=path, value=value2))
+
+        for key, value2 in resource2.items():
+            if key not in resource1 and value2 is not None:
+                path = pointer + '/' + str(key).replace('~', '~0').replace('/', '~1')
+                patch.append(dict(op='add', path=path, value=value2))
+
+    @staticmethod
+    def _dict_difference(resource1, resource2, path, digest):
+        # The first resource is True / Not Null and the second resource is False / Null
+        if resource1 and not resource2:
+            return path
+
+        resource1 = resource1 or {}
+        resource2 = resource2 or {}
+        if not isinstance(resource1, dict) or not isinstance(resource2, dict):
+            return path
+
+        # Checks all keys in first dict against the second dict
+        for key, value1 in resource1.items():
+            if key not in resource2:
+                if value1 is not None:
+                    # Inexistent key is equivalent to exist with value None
+                    return path + (key,)
+                continue
+
+            value2 = resource2[key]
+            # If both values are null, empty or False it will be considered equal.
+            if not value1 and not value2:
+                continue
+            elif isinstance(value1, dict):
+                difference = ResourceComparator._dict_difference(value1, value2, path + (key,), digest)
+            elif isinstance(value1, list):
+                difference = ResourceComparator._list_difference(value1, value2, path + (key,), digest)
+            elif ResourceComparator._standardize_value(value1) != ResourceComparator._standardize_value(value2):
+                return path + (key,)
+            else:
+                continue
+
+            if difference is not None:
+                return difference
+
+        # Checks all keys in the second dict, looking for missing elements
+        for key, value2 in resource2.items():
+            if key not in resource1 and value2 is not None:
+                # Inexistent key is equivalent to exist with value None
+                return path + (key,)
+
+        return None
+
+    @staticmethod
+    def _list_difference(resource1, resource2, path, digest):
+        if not resource1 and not resource2:
+            return None
 
         # The second list is null / empty  / False
         if not resource2:
-            logger.debug("resource 2 is null. " + debug_resources)
-            return False
+            return path
 
-        if len(resource1) != len(resource2):
-            logger.debug("resources have different length. " + debug_resources)
-            return False
+        if not isinstance(resource1, list) or not isinstance(resource2, list) or len(resource1) != len(resource2):
+            return path
 
-        resource1 = sorted(resource1, key=ResourceComparator._str_sorted)
-        resource2 = sorted(resource2, key=ResourceComparator._str_sorted)
+        # Equivalent elements are matched by their canonical forms, regardless of their positions
+        unmatched2 = {}
+        for value2 in resource2:
+            unmatched2.setdefault(digest.canonical_element(value2), []).append(value2)
 
-        for i, val in enumerate(resource1):
-            if isinstance(val, dict):
-                # change comparison function to compare dictionaries
-                if not ResourceComparator.compare(val, resource2[i]):
-                    logger.debug("resources are different. " + debug_resources)
-                    return False
-            elif isinstance(val, list):
-                # recursive call
-                if not ResourceComparator.compare_list(val, resource2[i]):
-                    logger.debug("lists are different. " + debug_resources)
-                    return False
-            elif ResourceComparator._standardize_value(val) != ResourceComparator._standardize_value(resource2[i]):
-                logger.debug("values are different. " + debug_resources)
-                return False
+        unmatched1 = []
+        for index, value1 in enumerate(resource1):
+            candidates = unmatched2.get(digest.canonical_element(value1))
+            if candidates:
+                candidates.pop()
+            else:
+                unmatched1.append(index)
+
+        if not unmatched1:
+            return None
+
+        # The elements left are compared value by value after a sort. The indexes of the first list are sorted
+        # instead of its values, so the path can refer to them
+        order1 = sorted(unmatched1, key=lambda index: ResourceComparator._str_sorted(resource1[index]))
+        sorted2 = sorted((value2 for values in unmatched2.values() for value2 in values),
+                         key=ResourceComparator._str_sorted)
+
+        for index, value2 in zip(order1, sorted2):
+            value1 = resource1[index]
+            if isinstance(value1, dict):
+                difference = ResourceComparator._dict_difference(value1, value2, path + (index,), digest)
+            elif isinstance(value1, list):
+                difference = ResourceComparator._list_difference(value1, value2, path + (index,), digest)
+            elif ResourceComparator._standardize_value(value1) != ResourceComparator._standardize_value(value2):
+                return path + (index,)
+            else:
+                continue
+
+            if difference is not None:
+                return difference
 
         # no differences found
-        return True
+        return None
 
     @staticmethod
     def _str_sorted(obj):
@@ -453,7 +1841,7 @@ class ResourceComparator():
 
 class ResourceMerger():
     @staticmethod
-    def merge_list_by_key(original_list, updated_list, key, ignore_when_null=[]):
+    def merge_list_by_key(original_list, updated_list, key, ignore_when_null=[], original_index=None):
         """
         Merge two lists by the key. It basically:
         1. Adds the items that are present on updated_list and are absent on original_list.
@@ -466,29 +1854,42 @@ class ResourceMerger():
             key: unique identifier.
             ignore_when_null: list with the keys from the updated items that should be ignored in the merge, if its
             values are null.
+            original_index: original_list already indexed by the key, as returned by index_by_key.
         Returns:
             list: Lists merged.
         """
         if not original_list:
             return updated_list
 
-        items_map = OrderedDict([(i[key], i.copy()) for i in original_list])
+        items_map = original_index if original_index is not None else ResourceMerger.index_by_key(original_list, key)
 
         merged_items = OrderedDict()
 
         for item in updated_list:
             item_key = item[key]
             if item_key in items_map:
-                for ignored_key in ignore_when_null:
-                    if ignored_key in item and not item[ignored_key]:
-                        item.pop(ignored_key)
+                # The ignored keys are left out of the merge, without removing them from the updated item
                 merged_items[item_key] = items_map[item_key].copy()
-                merged_items[item_key].update(item)
+                merged_items[item_key].update((field, value) for field, value in item.items()
+                                              if field not in ignore_when_null or value)
             else:
                 merged_items[item_key] = item.copy()
 
         return [val for (_, val) in merged_items.items()]
 
+    @staticmethod
+    def index_by_key(items, key):
+        """
+        Indexes the items of a list by the key, keeping their order. The items are not copied.
+
+        Args:
+            items: list of dicts.
+            key: unique identifier.
+        Returns:
+            OrderedDict: The items by the key.
+        """
+        return OrderedDict([(item[key], item) for item in items])
+
 
 class SPKeys(object):
     ID = 'id'
@@ -526,8 +1927,16 @@ class SPKeys(object):
 
 
 class ServerProfileMerger(object):
+    """
+    Merges the data informed for a Server Profile or Server Profile Template into the existing resource.
+
+    Each keyed list of the existing resource is indexed once, so the merge takes linear time on the number of
+    connections, volumes, controllers and drives. Neither the resource nor the data dicts are modified: the merged
+    data shares the subtrees that do not change and only copies the ones it changes.
+    """
+
     def merge_data(self, resource, data):
-        merged_data = deepcopy(resource)
+        merged_data = resource.copy()
         merged_data.update(data)
 
         merged_data = self._merge_bios_and_boot(merged_data, resource, data)
@@ -549,24 +1958,22 @@ class ServerProfileMerger(object):
 
     def _merge_connections(self, merged_data, resource, data):
         if self._should_merge(data, resource, key=SPKeys.CONNECTIONS):
-            existing_connections = resource[SPKeys.CONNECTIONS]
+            existing_connections = ResourceMerger.index_by_key(resource[SPKeys.CONNECTIONS], SPKeys.ID)
             params_connections = data[SPKeys.CONNECTIONS]
-            merged_data[SPKeys.CONNECTIONS] = ResourceMerger.merge_list_by_key(existing_connections,
+            merged_data[SPKeys.CONNECTIONS] = ResourceMerger.merge_list_by_key(resource[SPKeys.CONNECTIONS],
                                                                                params_connections,
-                                                                               key=SPKeys.ID)
+                                                                               key=SPKeys.ID,
+                                                                               original_index=existing_connections)
 
-            merged_data = self._merge_connections_boot(merged_data, resource)
+            merged_data = self._merge_connections_boot(merged_data, existing_connections)
         return merged_data
 
-    def _merge_connections_boot(self, merged_data, resource):
-        existing_connection_map = {x[SPKeys.ID]: x.copy() for x in resource[SPKeys.CONNECTIONS]}
+    def _merge_connections_boot(self, merged_data, existing_connections):
         for merged_connection in merged_data[SPKeys.CONNECTIONS]:
-            conn_id = merged_connection[SPKeys.ID]
-            existing_conn_has_boot = conn_id in existing_connection_map and SPKeys.BOOT in existing_connection_map[
-                conn_id]
-            if existing_conn_has_boot and SPKeys.BOOT in merged_connection:
-                current_connection = existing_connection_map[conn_id]
-                boot_settings_merged = deepcopy(current_connection[SPKeys.BOOT])
+            existing_connection = existing_connections.get(merged_connection[SPKeys.ID])
+            if existing_connection and SPKeys.BOOT in existing_connection and SPKeys.BOOT in merged_connection:
+                # The merged connections are copies, so only the boot settings are replaced
+                boot_settings_merged = existing_connection[SPKeys.BOOT].copy()
                 boot_settings_merged.update(merged_connection[SPKeys.BOOT])
                 merged_connection[SPKeys.BOOT] = boot_settings_merged
         return merged_data
@@ -582,31 +1989,25 @@ class ServerProfileMerger(object):
 
     def _merge_san_volumes(self, merged_data, resource, data):
         if self._should_merge(data[SPKeys.SAN], resource[SPKeys.SAN], key=SPKeys.VOLUMES):
-            existing_volumes = resource[SPKeys.SAN][SPKeys.VOLUMES]
+            existing_volumes = ResourceMerger.index_by_key(resource[SPKeys.SAN][SPKeys.VOLUMES], SPKeys.ID)
             params_volumes = data[SPKeys.SAN][SPKeys.VOLUMES]
-            merged_volumes = ResourceMerger.merge_list_by_key(existing_volumes, params_volumes, key=SPKeys.ID)
+            merged_volumes = ResourceMerger.merge_list_by_key(resource[SPKeys.SAN][SPKeys.VOLUMES], params_volumes,
+                                                              key=SPKeys.ID, original_index=existing_volumes)
             merged_data[SPKeys.SAN][SPKeys.VOLUMES] = merged_volumes
 
-            merged_data = self._merge_san_storage_paths(merged_data, resource)
+            merged_data = self._merge_san_storage_paths(merged_data, existing_volumes)
         return merged_data
 
-    def _merge_san_storage_paths(self, merged_data, resource):
-
-        existing_volumes_map = OrderedDict([(i[SPKeys.ID], i) for i in resource[SPKeys.SAN][SPKeys.VOLUMES]])
+    def _merge_san_storage_paths(self, merged_data, existing_volumes):
         merged_volumes = merged_data[SPKeys.SAN][SPKeys.VOLUMES]
         for merged_volume in merged_volumes:
-            volume_id = merged_volume[SPKeys.ID]
-            if volume_id in existing_volumes_map:
-                if SPKeys.PATHS in merged_volume and SPKeys.PATHS in existing_volumes_map[volume_id]:
-                    existent_paths = existing_volumes_map[volume_id][SPKeys.PATHS]
+            existing_volume = existing_volumes.get(merged_volume[SPKeys.ID])
+            if existing_volume and SPKeys.PATHS in merged_volume and SPKeys.PATHS in existing_volume:
+                merged_paths = ResourceMerger.merge_list_by_key(existing_volume[SPKeys.PATHS],
+                                                                merged_volume[SPKeys.PATHS],
+                                                                key=SPKeys.CONN_ID)
 
-                    paths_from_merged_volume = merged_volume[SPKeys.PATHS]
-
-                    merged_paths = ResourceMerger.merge_list_by_key(existent_paths,
-                                                                    paths_from_merged_volume,
-                                                                    key=SPKeys.CONN_ID)
-
-                    merged_volume[SPKeys.PATHS] = merged_paths
+                merged_volume[SPKeys.PATHS] = merged_paths
         return merged_data
 
     def _merge_os_deployment_settings(self, merged_data, resource, data):
@@ -631,12 +2032,18 @@ class ServerProfileMerger(object):
                 if ResourceComparator.compare_list(existing_attributes, params_attributes):
                     merged_os_deployment[SPKeys.ATTRIBUTES] = existing_attributes
 
+            # The attributes are normalized once merged, so they are copied from the resource or the data
+            if merged_os_deployment[SPKeys.ATTRIBUTES]:
+                merged_os_deployment[SPKeys.ATTRIBUTES] = [attribute.copy() for attribute in merged_os_deployment[SPKeys.ATTRIBUTES]]
+
         return merged_data
 
     def _merge_local_storage(self, merged_data, resource, data):
         if self._removed_data(data, resource, key=SPKeys.LOCAL_STORAGE):
             merged_data[SPKeys.LOCAL_STORAGE] = dict(sasLogicalJBODs=[], controllers=[])
         elif self._should_merge(data, resource, key=SPKeys.LOCAL_STORAGE):
+            # The local storage comes from the data, which is copied before its lists are replaced
+            merged_data[SPKeys.LOCAL_STORAGE] = merged_data[SPKeys.LOCAL_STORAGE].copy()
             merged_data = self._merge_sas_logical_jbods(merged_data, resource, data)
             merged_data = self._merge_controllers(merged_data, resource, data)
         return merged_data
@@ -655,29 +2062,29 @@ class ServerProfileMerger(object):
     def _merge_controllers(self, merged_data, resource, data):
         if self._should_merge(data[SPKeys.LOCAL_STORAGE], resource[SPKeys.LOCAL_STORAGE], key=SPKeys.CONTROLLERS):
             existing_items = resource[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS]
+            existing_controllers = ResourceMerger.index_by_key(existing_items, SPKeys.DEVICE_SLOT)
             provided_items = merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS]
             merged_controllers = ResourceMerger.merge_list_by_key(existing_items,
                                                                   provided_items,
-                                                                  key=SPKeys.DEVICE_SLOT)
+                                                                  key=SPKeys.DEVICE_SLOT,
+                                                                  original_index=existing_controllers)
             merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS] = merged_controllers
 
-            merged_data = self._merge_controller_drives(merged_data, resource)
+            merged_data = self._merge_controller_drives(merged_data, existing_controllers)
         return merged_data
 
-    def _merge_controller_drives(self, merged_data, resource):
-        for current_controller in merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS][:]:
-            for existing_controller in resource[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS][:]:
-                same_slot = current_controller.get(SPKeys.DEVICE_SLOT) == existing_controller.get(SPKeys.DEVICE_SLOT)
-                same_mode = existing_controller.get(SPKeys.MODE) == existing_controller.get(SPKeys.MODE)
-                if same_slot and same_mode and current_controller[SPKeys.LOGICAL_DRIVES]:
+    def _merge_controller_drives(self, merged_data, existing_controllers):
+        for current_controller in merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS]:
+            existing_controller = existing_controllers.get(current_controller.get(SPKeys.DEVICE_SLOT))
+            if existing_controller and current_controller.get(SPKeys.LOGICAL_DRIVES):
 
-                    key_merge = self._define_key_to_merge_drives(current_controller)
+                key_merge = self._define_key_to_merge_drives(current_controller)
 
-                    if key_merge:
-                        merged_drives = ResourceMerger.merge_list_by_key(existing_controller[SPKeys.LOGICAL_DRIVES],
-                                                                         current_controller[SPKeys.LOGICAL_DRIVES],
-                                                                         key=key_merge)
-                        current_controller[SPKeys.LOGICAL_DRIVES] = merged_drives
+                if key_merge:
+                    merged_drives = ResourceMerger.merge_list_by_key(existing_controller[SPKeys.LOGICAL_DRIVES],
+                                                                     current_controller[SPKeys.LOGICAL_DRIVES],
+                                                                     key=key_merge)
+                    current_controller[SPKeys.LOGICAL_DRIVES] = merged_drives
         return merged_data
 
     def _define_key_to_merge_drives(self, controller):
@@ -704,13 +2111,395 @@ class ServerProfileMerger(object):
         return data_has_value and existing_resource_has_value
 
     def _merge_dict(self, merged_data, resource, data, key):
-        if resource[key]:
-            merged_dict = deepcopy(resource[key])
-            merged_dict.update(deepcopy(data[key]))
+        # Only the merged dict is new, its values are shared with the resource and the data until replaced
+        merged_dict = resource[key].copy()
+        merged_dict.update(data[key])
         merged_data[key] = merged_dict
         return merged_data
 
 
+DEFAULT_PAGE_SIZE = 500
+
+
+def iterate_collection(connection, uri, page_size=DEFAULT_PAGE_SIZE, max_items=None, start=0, **query_params):
+    """
+    Iterates over the members of a resource collection, getting one page at a time by following the nextPageUri, so
+    only the current page is kept in memory.
+
+    Args:
+        connection: Connection to the appliance, e.g. oneview_client.connection.
+        uri (str): Collection URI, e.g. '/rest/alerts'.
+        page_size (int): Number of members requested per page.
+        max_items (int): Maximum number of members returned. When not informed, all of them are returned.
+        start (int): The first member to return, using 0-based indexing.
+        **query_params: Query parameters supported by the collection: filter, query, sort, view and fields.
+
+    Returns:
+        generator: The collection members.
+    """
+    returned = 0
+    count = page_size if max_items is None else min(page_size, max_items)
+    page_uri = ResourceClient(connection, uri).build_query_uri(start=start, count=count, **query_params)
+
+    while page_uri and (max_items is None or returned < max_items):
+        page = connection.get(page_uri)
+        members = page.get('members') or []
+
+        for member in members:
+            if max_items is not None and returned >= max_items:
+                return
+            returned += 1
+            yield member
+
+        next_page_uri = page.get('nextPageUri')
+        if not members or next_page_uri == page_uri:
+            return
+        page_uri = next_page_uri
+
+
+def run_concurrently(functions, max_workers=8):
+    """
+    Calls the functions concurrently, in a thread pool bounded by max_workers.
+
+    Args:
+        functions (list): Callables without arguments.
+        max_workers (int): Maximum number of calls running at the same time.
+
+    Returns:
+        list: The values returned by the functions, in the same order. When a call fails, its exception is raised.
+    """
+    functions = list(functions)
+    if len(functions) <= 1 or max_workers <= 1:
+        return [function() for function in functions]
+
+    pool = ThreadPool(min(max_workers, len(functions)))
+    try:
+        return pool.map(lambda function: function(), functions)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def submit_task(connection, uri, resource, default_values=None, method='post', custom_headers=None):
+    """
+    Requests an operation without waiting for the task it starts, so many operations can run on the appliance at once.
+
+    Args:
+        connection: OneView connection.
+        uri (str): URI the resource is sent to.
+        resource: Resource to send, or the list of operations when the method is 'patch'.
+        default_values (dict): Default values grouped by OneView API version, merged with the resource.
+        method (str): Connection method used to send the resource, 'post', 'put' or 'patch'.
+        custom_headers (dict): Additional headers of the 'patch' request, e.g. If-Match.
+
+    Returns:
+        tuple: The task resource, or None when the appliance did not start a task, and the response body.
+    """
+    if method == 'patch':
+        custom_headers = dict(custom_headers or {})
+        if connection._apiVersion >= 300:
+            custom_headers['Content-Type'] = 'application/json-patch+json'
+        return connection.patch(uri, resource, custom_headers=custom_headers)
+
+    resource = ResourceClient(connection, uri).merge_default_values(resource, default_values or {})
+    return getattr(connection, method)(uri, resource)
+
+
+TASK_POLLING_MAX_INTERVAL = 10
+
+
+def wait_for_tasks(connection, tasks, timeout=-1, max_workers=8, on_completed=None):
+    """
+    Waits for many tasks in a single polling loop, instead of blocking on each task in turn.
+
+    On each round, the running tasks are checked concurrently. The interval between rounds grows by one second, up
+    to TASK_POLLING_MAX_INTERVAL, while no task completes, and goes back to one second when any does.
+
+    Args:
+        connection: OneView connection.
+        tasks (list): Task resources, as returned when the operations were requested.
+        timeout (int): Time, in seconds, to wait for the tasks. -1 waits with no limit.
+        max_workers (int): Maximum number of tasks checked at the same time.
+        on_completed (function): Called with the index of each task once its outcome is known, e.g. to time it.
+
+    Returns:
+        list: Pairs with the resource associated with each task and the HPOneViewException raised for it, one of them
+        None, in the same order as the tasks.
+    """
+    task_monitor = TaskMonitor(connection)
+    start_time = time.time()
+    interval = 0
+    pending = [(index, task, dict(last_success=TaskMonitor.get_current_seconds())) for index, task in enumerate(tasks)]
+    outcomes = [None] * len(tasks)
+
+    def get_outcome(task):
+        try:
+            return task_monitor.wait_for_task(task), None
+        except HPOneViewException as exception:
+            return None, exception
+
+    while pending:
+        running = run_concurrently([
+            lambda task=task, control=control: task_monitor.is_task_running(task, control)
+            for _, task, control in pending], max_workers)
+
+        completed = [(index, task) for (index, task, _), is_running in zip(pending, running) if not is_running]
+        for (index, _), outcome in zip(completed, run_concurrently(
+                [lambda task=task: get_outcome(task) for _, task in completed], max_workers)):
+            outcomes[index] = outcome
+            if on_completed:
+                on_completed(index)
+
+        pending = [item for item, is_running in zip(pending, running) if is_running]
+        if not pending:
+            break
+
+        if timeout != -1 and time.time() - start_time > timeout:
+            for index, _, _ in pending:
+                outcomes[index] = (None, HPOneViewTimeout('Waited {} seconds for task to complete, aborting'.format(timeout)))
+                if on_completed:
+                    on_completed(index)
+            break
+
+        interval = 1 if completed else min(interval + 1, TASK_POLLING_MAX_INTERVAL)
+        time.sleep(interval)
+
+    return outcomes
+
+
+def run_operations(connection, operations, max_workers=8):
+    """
+    Runs many operations at once: they are requested concurrently, in a thread pool bounded by max_workers, and the
+    tasks they start are waited for in a single polling loop.
+
+    Args:
+        connection: OneView connection.
+        operations (list): Callables without arguments requesting an operation, e.g. with submit_task. They return
+            the task started, or None when the operation completed, or was not needed, without a task.
+        max_workers (int): Maximum number of operations requested, and of tasks checked, at the same time.
+
+    Returns:
+        list: The outcome of each operation, in the same order, with the keys task, the task started, resource, the
+        resource associated with it, error, the HPOneViewException raised by the operation or its task, and seconds,
+        the time from the request to the completion of the operation.
+    """
+    outcomes = [dict(task=None, resource=None, error=None, seconds=None) for _ in operations]
+    started = [None] * len(operations)
+
+    def complete(index):
+        outcomes[index]['seconds'] = round(time.time() - started[index], 3)
+
+    def request(index, operation):
+        started[index] = time.time()
+        try:
+            outcomes[index]['task'] = operation()
+        except HPOneViewException as exception:
+            outcomes[index]['error'] = exception
+        if not outcomes[index]['task']:
+            complete(index)
+
+    run_concurrently([lambda index=index, operation=operation: request(index, operation)
+                      for index, operation in enumerate(operations)], max_workers)
+
+    running = [index for index, outcome in enumerate(outcomes) if outcome['task']]
+    task_outcomes = wait_for_tasks(connection, [outcomes[index]['task'] for index in running], max_workers=max_workers,
+                                   on_completed=lambda position: complete(running[position]))
+    for index, (resource, error) in zip(running, task_outcomes):
+        outcomes[index].update(resource=resource, error=error)
+
+    return outcomes
+
+
+POWER_STATE_POLLING_MAX_INTERVAL = 10
+POWER_STATE_TIMEOUT = 300
+POWER_STATE_REQUEST_RETRIES = 5
+POWER_CONTROLS = dict(On='MomentaryPress', Off='PressAndHold')
+
+
+def set_server_hardware_power_state(oneview_client, hardware_uris, power_state, timeout=POWER_STATE_TIMEOUT,
+                                    max_workers=8, previous_states=None):
+    """
+    Sets the power state of many server hardware at once, instead of waiting for each power task in turn.
+
+    The server hardware already in the power state is skipped. The power requests are sent concurrently and retried
+    with a jittered backoff while the appliance rejects them, e.g. right after a failed server profile update. The
+    powerState of the server hardware is then polled, the interval doubling up to POWER_STATE_POLLING_MAX_INTERVAL,
+    until all of them reach the power state.
+
+    Args:
+        oneview_client: OneViewClient instance.
+        hardware_uris (list): Server hardware URIs. None values and repeated URIs are ignored.
+        power_state (str): 'On' or 'Off'.
+        timeout (int): Time, in seconds, to wait for the server hardware to reach the power state.
+        max_workers (int): Maximum number of server hardware handled at the same time.
+        previous_states (dict): Filled with the power state of each server hardware before the change, by URI, as
+            soon as they are got, so they can be restored even when the change fails.
+
+    Returns:
+        dict: The power state of each server hardware before the change, by URI, to restore it only where needed.
+    """
+    server_hardware = oneview_client.server_hardware
+    hardware_uris = list(OrderedDict.fromkeys(uri for uri in hardware_uris if uri))
+
+    def get_power_states(uris):
+        return run_concurrently([lambda uri=uri: server_hardware.get(uri).get('powerState') for uri in uris],
+                                max_workers)
+
+    def request_power_state(uri):
+        configuration = dict(powerState=power_state, powerControl=POWER_CONTROLS[power_state])
+        attempt = 1
+        while True:
+            try:
+                return submit_task(oneview_client.connection, uri + '/powerState', configuration, method='put')
+            except HPOneViewException:
+                if attempt >= POWER_STATE_REQUEST_RETRIES:
+                    raise
+                time.sleep(get_backoff_delay(attempt))
+                attempt += 1
+
+    if previous_states is None:
+        previous_states = {}
+    previous_states.update(zip(hardware_uris, get_power_states(hardware_uris)))
+    pending = [uri for uri in hardware_uris if previous_states[uri] != power_state]
+    run_concurrently([lambda uri=uri: request_power_state(uri) for uri in pending], max_workers)
+
+    start_time = time.time()
+    interval = 1
+    while pending:
+        pending = [uri for uri, state in zip(pending, get_power_states(pending)) if state != power_state]
+        if not pending:
+            break
+
+        if time.time() - start_time > timeout:
+            raise HPOneViewTimeout('Waited {} seconds for the server hardware to be powered {}: {}'.format(
+                timeout, power_state.lower(), ', '.join(pending)))
+
+        time.sleep(interval)
+        interval = min(interval * 2, POWER_STATE_POLLING_MAX_INTERVAL)
+
+    return previous_states
+
+
+class ResourceNameUriResolver(object):
+    """
+    Resolves resource names to URIs with a single request per resource type.
+
+    The first lookup of a resource type gets the whole collection, projected to the name and URI fields, and the
+    name to URI map built from it is reused by the next lookups of the module run.
+    """
+    FIELDS = 'name,uri'
+
+    def __init__(self, oneview_client):
+        """
+        ResourceNameUriResolver constructor.
+
+        Args:
+            oneview_client: OneViewClient instance.
+        """
+        self.oneview_client = oneview_client
+        self._indexes = {}
+
+    def prefetch(self, resource_types):
+        """
+        Gets, concurrently, the collections of the resource types not cached yet.
+
+        Args:
+            resource_types (list): Names of the OneViewClient attributes of the resources.
+        """
+        run_concurrently([lambda resource_type=resource_type: self._get_index(resource_type)
+                          for resource_type in resource_types if resource_type not in self._indexes])
+
+    def get_uri(self, resource_type, name):
+        """
+        Gets the URI of a resource by its name. The search is case-insensitive.
+
+        Args:
+            resource_type (str): Name of the OneViewClient attribute of the resource, e.g. 'enclosure_groups'.
+            name (str): Resource name.
+
+        Returns:
+            str: The resource URI, or None when it is not found.
+        """
+        return self._get_index(resource_type).get(str(name).lower())
+
+    def _get_index(self, resource_type):
+        if resource_type in self._indexes:
+            return self._indexes[resource_type]
+
+        resource = getattr(self.oneview_client, resource_type)
+        members = ResourceClient(self.oneview_client.connection, resource.URI).get_all(fields=self.FIELDS)
+
+        index = {}
+        for member in members:
+            # The first match is kept, as done by get_by
+            index.setdefault(str(member.get('name')).lower(), member.get('uri'))
+
+        self._indexes[resource_type] = index
+        return index
+
+
+class NetworkNameUriIndex(object):
+    """
+    Resolves network names to URIs looking up the Ethernet, FC and FCoE networks at once.
+
+    The network collections are got concurrently, with a single request per network type, so a whole list of names
+    is resolved with at most one request per network type.
+    """
+    NETWORK_TYPES = ('ethernet_networks', 'fc_networks', 'fcoe_networks')
+    MSG_NETWORK_NOT_FOUND = 'Network not found: '
+
+    def __init__(self, oneview_client, network_types=NETWORK_TYPES, resolver=None):
+        """
+        NetworkNameUriIndex constructor.
+
+        Args:
+            oneview_client: OneViewClient instance.
+            network_types (tuple): Network types looked up, in order of precedence when a name is used by more than
+                one network type.
+            resolver (ResourceNameUriResolver): Resolver used to get the network collections. When not informed, a
+                new one is created.
+        """
+        self.network_types = network_types
+        self.resolver = resolver or ResourceNameUriResolver(oneview_client)
+
+    def get_uri(self, name):
+        """
+        Gets the URI of a network by its name.
+
+        Args:
+            name (str): Network name.
+
+        Returns:
+            str: The network URI, or None when it is not found.
+        """
+        self.resolver.prefetch(self.network_types)
+        for network_type in self.network_types:
+            uri = self.resolver.get_uri(network_type, name)
+            if uri:
+                return uri
+        return None
+
+    def get_uris(self, names, message=MSG_NETWORK_NOT_FOUND):
+        """
+        Gets the URIs of a list of networks by their names.
+
+        Args:
+            names (list): Network names.
+            message (str): Message of the error raised when any network is not found, followed by the missing names.
+
+        Returns:
+            list: The network URIs, in the same order of the names.
+
+        Raises:
+            HPOneViewResourceNotFound: When any network is not found, listing all the missing names.
+        """
+        uris = [self.get_uri(name) for name in names]
+        missing = [str(name) for name, uri in zip(names, uris) if not uri]
+        if missing:
+            raise HPOneViewResourceNotFound(message + ', '.join(missing))
+        return uris
+
+
 class ServerProfileReplaceNamesByUris(object):
     SERVER_PROFILE_OS_DEPLOYMENT_NOT_FOUND = 'OS Deployment Plan not found: '
     SERVER_PROFILE_ENCLOSURE_GROUP_NOT_FOUND = 'Enclosure Group not found: '
@@ -723,9 +2512,24 @@ class ServerProfileReplaceNamesByUris(object):
     FIRMWARE_DRIVER_NOT_FOUND = 'Firmware Driver not found: '
     SAS_LOGICAL_JBOD_NOT_FOUND = 'SAS logical JBOD not found: '
     ENCLOSURE_NOT_FOUND = 'Enclosure not found: '
+    NETWORK_TYPES = ('fc_networks', 'ethernet_networks', 'fcoe_networks')
+    # Referenced once or twice per server profile, so a name filter is cheaper than getting their large collections
+    FILTERED_RESOURCE_TYPES = ('volumes', 'interconnects', 'enclosures')
+
+    def __init__(self, resolver=None):
+        """
+        ServerProfileReplaceNamesByUris constructor.
+
+        Args:
+            resolver (ResourceNameUriResolver): Resolver shared by the replacements of the module run. When not
+                informed, a new one is created on replace.
+        """
+        self.resolver = resolver
 
     def replace(self, oneview_client, data):
         self.oneview_client = oneview_client
+        if not self.resolver:
+            self.resolver = ResourceNameUriResolver(oneview_client)
         self._replace_os_deployment_name_by_uri(data)
         self._replace_enclosure_group_name_by_uri(data)
         self._replace_networks_name_by_uri(data)
@@ -736,80 +2540,78 @@ class ServerProfileReplaceNamesByUris(object):
         self._replace_firmware_baseline_name_by_uri(data)
         self._replace_sas_logical_jbod_name_by_uri(data)
 
-    def _replace_name_by_uri(self, data, attr_name, message, resource_client):
+    def _replace_name_by_uri(self, data, attr_name, message, resource_type):
         attr_uri = attr_name.replace("Name", "Uri")
         if attr_name in data:
             name = data.pop(attr_name)
-            resource_by_name = resource_client.get_by('name', name)
-            if not resource_by_name:
+            uri = self._get_uri(resource_type, name)
+            if not uri:
                 raise HPOneViewResourceNotFound(message + name)
-            data[attr_uri] = resource_by_name[0]['uri']
+            data[attr_uri] = uri
+
+    def _get_uri(self, resource_type, name):
+        if resource_type in self.FILTERED_RESOURCE_TYPES:
+            resource_by_name = getattr(self.oneview_client, resource_type).get_by('name', name)
+            return resource_by_name[0]['uri'] if resource_by_name else None
+        return self.resolver.get_uri(resource_type, name)
 
     def _replace_os_deployment_name_by_uri(self, data):
         if SPKeys.OS_DEPLOYMENT in data and data[SPKeys.OS_DEPLOYMENT]:
             self._replace_name_by_uri(data[SPKeys.OS_DEPLOYMENT], 'osDeploymentPlanName',
-                                      self.SERVER_PROFILE_OS_DEPLOYMENT_NOT_FOUND,
-                                      self.oneview_client.os_deployment_plans)
+                                      self.SERVER_PROFILE_OS_DEPLOYMENT_NOT_FOUND, 'os_deployment_plans')
 
     def _replace_enclosure_group_name_by_uri(self, data):
         self._replace_name_by_uri(data, 'enclosureGroupName', self.SERVER_PROFILE_ENCLOSURE_GROUP_NOT_FOUND,
-                                  self.oneview_client.enclosure_groups)
+                                  'enclosure_groups')
 
     def _replace_networks_name_by_uri(self, data):
         if SPKeys.CONNECTIONS in data and data[SPKeys.CONNECTIONS]:
-            for connection in data[SPKeys.CONNECTIONS]:
-                if 'networkName' in connection:
-                    name = connection.pop('networkName', None)
-                    connection['networkUri'] = self._get_network_by_name(name)['uri']
+            connections = [connection for connection in data[SPKeys.CONNECTIONS] if 'networkName' in connection]
+            network_index = NetworkNameUriIndex(self.oneview_client, self.NETWORK_TYPES, self.resolver)
+            uris = network_index.get_uris([connection['networkName'] for connection in connections],
+                                          self.SERVER_PROFILE_NETWORK_NOT_FOUND)
+            for connection, uri in zip(connections, uris):
+                connection.pop('networkName')
+                connection['networkUri'] = uri
 
     def _replace_server_hardware_type_name_by_uri(self, data):
         self._replace_name_by_uri(data, 'serverHardwareTypeName', self.SERVER_HARDWARE_TYPE_NOT_FOUND,
-                                  self.oneview_client.server_hardware_types)
+                                  'server_hardware_types')
 
     def _replace_volume_attachment_names_by_uri(self, data):
         volume_attachments = (data.get('sanStorage') or {}).get('volumeAttachments') or []
         if len(volume_attachments) > 0:
             for volume in volume_attachments:
                 if volume.get('volumeUri', 'Replace'):
-                    self._replace_name_by_uri(volume, 'volumeName', self.VOLUME_NOT_FOUND, self.oneview_client.volumes)
+                    self._replace_name_by_uri(volume, 'volumeName', self.VOLUME_NOT_FOUND, 'volumes')
                 else:
                     logger.debug("The volumeUri is null in the volumeAttachments list, it will be understood "
                                  "that the volume does not exist, so it will be created along with the server "
                                  "profile. Be warned that it will always trigger a new creation, so it will not "
                                  " be idempotent.")
                 self._replace_name_by_uri(volume, 'volumeStoragePoolName', self.STORAGE_POOL_NOT_FOUND,
-                                          self.oneview_client.storage_pools)
+                                          'storage_pools')
                 self._replace_name_by_uri(volume, 'volumeStorageSystemName', self.STORAGE_SYSTEM_NOT_FOUND,
-                                          self.oneview_client.storage_systems)
+                                          'storage_systems')
 
     def _replace_enclosure_name_by_uri(self, data):
-        self._replace_name_by_uri(data, 'enclosureName', self.ENCLOSURE_NOT_FOUND, self.oneview_client.enclosures)
+        self._replace_name_by_uri(data, 'enclosureName', self.ENCLOSURE_NOT_FOUND, 'enclosures')
 
     def _replace_interconnect_name_by_uri(self, data):
         connections = data.get('connections') or []
         if len(connections) > 0:
             for connection in connections:
                 self._replace_name_by_uri(connection, 'interconnectName', self.INTERCONNECT_NOT_FOUND,
-                                          self.oneview_client.interconnects)
+                                          'interconnects')
 
     def _replace_firmware_baseline_name_by_uri(self, data):
         firmware = data.get('firmware') or {}
         self._replace_name_by_uri(firmware, 'firmwareBaselineName', self.FIRMWARE_DRIVER_NOT_FOUND,
-                                  self.oneview_client.firmware_drivers)
+                                  'firmware_drivers')
 
     def _replace_sas_logical_jbod_name_by_uri(self, data):
         sas_logical_jbods = (data.get('localStorage') or {}).get('sasLogicalJBODs') or []
         if len(sas_logical_jbods) > 0:
             for jbod in sas_logical_jbods:
                 self._replace_name_by_uri(jbod, 'sasLogicalJBODName', self.SAS_LOGICAL_JBOD_NOT_FOUND,
-                                          self.oneview_client.sas_logical_jbods)
-
-    def _get_network_by_name(self, name):
-        fc_networks = self.oneview_client.fc_networks.get_by('name', name)
-        if fc_networks:
-            return fc_networks[0]
-
-        ethernet_networks = self.oneview_client.ethernet_networks.get_by('name', name)
-        if not ethernet_networks:
-            raise HPOneViewResourceNotFound(self.SERVER_PROFILE_NETWORK_NOT_FOUND + name)
-        return ethernet_networks[0]
+                                          'sas_logical_jbods')
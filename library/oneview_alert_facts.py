@@ -34,7 +34,10 @@ options:
     params:
       description:
         - "List with parameters to help filter the alerts.
-          Params allowed: C(count), C(fields), C(filter), C(query), C(sort), C(start), and C(view)."
+          Params allowed: C(count), C(fields), C(filter), C(query), C(sort), C(start), C(view), C(page_size),
+          and C(max_items)."
+        - "When C(page_size) or C(max_items) is informed, the alerts are retrieved page by page, with C(page_size)
+           alerts per request, and no more than C(max_items) alerts are returned."
       required: false
 
 extends_documentation_fragment:
@@ -66,6 +69,17 @@ EXAMPLES = '''
       count: 5
       filter: "urgency='High'"
 
+- debug: var=alerts
+
+- name: Gather the description and state of at most 1000 active alerts
+  oneview_alert_facts:
+    config: "{{ config_file_path }}"
+    params:
+      filter: "alertState='Active'"
+      fields: "description,alertState,uri"
+      page_size: 250
+      max_items: 1000
+
 - debug: var=alerts
 '''
 
@@ -88,7 +102,7 @@ class AlertFactsModule(OneViewModuleBase):
         super(AlertFactsModule, self).__init__(additional_arg_spec=argument_spec)
 
     def execute_module(self):
-        facts = self.oneview_client.alerts.get_all(**self.facts_params)
+        facts = self.get_all_facts(self.oneview_client.alerts)
 
         return dict(changed=False, ansible_facts=dict(alerts=facts))
 
@@ -26,6 +26,9 @@ module: oneview_enclosure
 short_description: Manage OneView Enclosure resources.
 description:
     - Provides an interface to manage Enclosure resources.
+    - When the data has a C(hostname), the enclosure is found with filtered queries by the IP addresses of its Onboard
+      Administrators. Plays that add many enclosures can also keep them in a local index, defined by the environment
+      variable ONEVIEW_ENCLOSURE_INDEX.
 version_added: "2.3"
 requirements:
     - "python >= 2.7.9"
@@ -59,23 +62,37 @@ options:
           C(interconnect_bays_ipv4_removed) will release the IPv4 address in the interconnect bay.
           C(support_data_collection_set) will set the support data collection state for the enclosure. The supported
           values for this state are C(PendingCollection), C(Completed), C(Error) and C(NotSupported)
+          C(patched) will apply many of the states above at once, listed in the C(patches) of the data, with a single
+          request.
       choices: [
         'present', 'absent', 'reconfigured', 'refreshed', 'appliance_bays_powered_on', 'uid_on', 'uid_off',
         'manager_bays_uid_on', 'manager_bays_uid_off', 'manager_bays_power_state_e_fuse',
         'manager_bays_power_state_reset', 'appliance_bays_power_state_e_fuse', 'device_bays_power_state_e_fuse',
         'device_bays_power_state_reset', 'interconnect_bays_power_state_e_fuse', 'manager_bays_role_active',
-        'device_bays_ipv4_removed', 'interconnect_bays_ipv4_removed', 'support_data_collection_set'
+        'device_bays_ipv4_removed', 'interconnect_bays_ipv4_removed', 'support_data_collection_set', 'patched'
         ]
     data:
       description:
         - List with the Enclosure properties.
+        - The states of the bays take the C(bayNumber) of a bay, or the C(bayNumbers) of many bays, which are checked
+          against the enclosure got once.
+        - The C(patched) state takes a list of C(patches), each one with a C(state) and its C(bayNumber) or
+          C(bayNumbers). The current values are checked against the enclosure got once, and only the operations that
+          change it are requested, one PATCH request per operation, as the appliance takes a single operation in each.
+        - To apply any state but C(present) and C(absent) to many enclosures at once, provide the C(names) of the
+          enclosures, or a C(filter) expression selecting them, instead of the C(name).
       required: true
+    parallelism:
+      description:
+        - Maximum number of enclosures whose operations are requested, and whose tasks are checked, at the same time,
+          when the data has C(names) or a C(filter).
+      default: 8
 notes:
     - "These states are only available on HPE Synergy: C(appliance_bays_powered_on), C(uid_on), C(uid_off),
       C(manager_bays_uid_on), C(manager_bays_uid_off), C(manager_bays_power_state_e_fuse),
       C(manager_bays_power_state_reset), C(appliance_bays_power_state_e_fuse), C(device_bays_power_state_e_fuse),
       C(device_bays_power_state_reset), C(interconnect_bays_power_state_e_fuse), C(manager_bays_role_active),
-      C(device_bays_ipv4_removed) and C(interconnect_bays_ipv4_removed)"
+      C(device_bays_ipv4_removed), C(interconnect_bays_ipv4_removed) and C(patched)"
 
 extends_documentation_fragment:
     - oneview
@@ -210,6 +227,47 @@ EXAMPLES = '''
       name: 'Test-Enclosure'
       bayNumber: 8
 
+- name: Reset the device bays 1 to 12
+  oneview_enclosure:
+    config: "{{ config_file_path }}"
+    state: device_bays_power_state_reset
+    data:
+      name: 'Test-Enclosure'
+      bayNumbers: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
+
+- name: Set the UID state of the enclosure and of its Frame Link Modules, and release IPv4 addresses
+  oneview_enclosure:
+    config: "{{ config_file_path }}"
+    state: patched
+    data:
+      name: 'Test-Enclosure'
+      patches:
+        - state: uid_off
+        - state: manager_bays_uid_on
+          bayNumbers: [1, 2]
+        - state: interconnect_bays_ipv4_removed
+          bayNumbers: [3, 6]
+
+- name: Refresh all the enclosures of a rack at once
+  oneview_enclosure:
+    config: "{{ config_file_path }}"
+    state: refreshed
+    parallelism: 16
+    data:
+      filter: "rackName='Rack-221'"
+      refreshState: Refreshing
+
+- name: Turn on the UID of many enclosures at once
+  oneview_enclosure:
+    config: "{{ config_file_path }}"
+    state: uid_on
+    data:
+      names:
+        - 'Test-Enclosure'
+        - 'Test-Enclosure-2'
+
+- debug: var=enclosure_results
+
 - name: E-Fuse the IC bay 3
   oneview_enclosure:
     config: "{{ config_file_path }}"
@@ -266,10 +324,25 @@ enclosure:
     description: Has all the facts about the enclosure.
     returned: On states 'present', 'reconfigured', and 'refreshed'. Can be null.
     type: complex
+
+enclosure_results:
+    description:
+        The outcome on each enclosure, when the data has C(names) or a C(filter), with the keys name, uri, changed,
+        msg, task_uri, the task started by the operation, seconds, the time from the request to the completion of the
+        operation, and error, the error message of the failed operations.
+    returned: When the data has names or a filter.
+    type: list
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from module_utils.oneview import OneViewModuleBase, HPOneViewResourceNotFound
+from module_utils.oneview import (OneViewModuleBase,
+                                  HPOneViewResourceNotFound,
+                                  HPOneViewValueError,
+                                  EnclosureHostnameIndex,
+                                  run_concurrently,
+                                  run_operations,
+                                  submit_task,
+                                  wait_for_tasks)
 
 
 class EnclosureModule(OneViewModuleBase):
@@ -298,6 +371,14 @@ class EnclosureModule(OneViewModuleBase):
     MSG_DEVICE_BAY_POWER_STATE_E_FUSED = 'E-Fuse the device bay in the path.'
     MSG_DEVICE_BAY_POWER_STATE_RESET = 'Reset the device bay in the path.'
     MSG_INTERCONNECT_BAY_POWER_STATE_E_FUSE = 'E-Fuse the IC bay in the path.'
+    MSG_PATCHED = 'Enclosure patched successfully.'
+    MSG_ALREADY_PATCHED = 'Enclosure is already in the requested states.'
+    MSG_PATCHES_REQUIRED = 'The state patched requires a list of patches in the data.'
+    MSG_INVALID_PATCH_STATE = 'The state {} cannot be patched.'
+    MSG_BAY_NUMBERS_NOT_SUPPORTED = 'The state {} does not apply to bays.'
+    MSG_FLEET_STATE_NOT_SUPPORTED = 'The state {} cannot be applied to many enclosures.'
+    MSG_FLEET_COMPLETED = 'Operation completed on {} enclosures.'
+    MSG_FLEET_FAILED = 'Operation failed on the enclosures: {}'
     MSG_MANAGER_BAY_ROLE_ACTIVE = 'Set the active Synergy Frame Link Module.'
     MSG_DEVICE_BAY_IPV4_SETTING_REMOVED = 'Release IPv4 address in the device bay.'
     MSG_INTERCONNECT_BAY_IPV4_SETTING_REMOVED = 'Release IPv4 address in the interconnect bay'
@@ -327,9 +408,11 @@ class EnclosureModule(OneViewModuleBase):
                 'device_bays_ipv4_removed',
                 'interconnect_bays_ipv4_removed',
                 'support_data_collection_set',
+                'patched',
             ]
         ),
-        data=dict(required=True, type='dict')
+        data=dict(required=True, type='dict'),
+        parallelism=dict(type='int', default=8)
     )
 
     patch_params = dict(
@@ -380,6 +463,9 @@ class EnclosureModule(OneViewModuleBase):
 
     def execute_module(self):
 
+        if 'names' in self.data or 'filter' in self.data:
+            return self.__execute_fleet()
+
         resource = self.__get_by_name(self.data)
 
         if self.state == 'present':
@@ -419,6 +505,7 @@ class EnclosureModule(OneViewModuleBase):
             resource = self.__get_by_hostname(data['hostname'])
             if not resource:
                 resource = self.oneview_client.enclosures.add(configuration_data)
+                self.__index_added(resource, data['hostname'])
                 message = self.MSG_CREATED
                 changed = True
         else:
@@ -448,6 +535,11 @@ class EnclosureModule(OneViewModuleBase):
 
         return changed, message, resource
 
+    def __index_added(self, resource, hostname):
+        index = EnclosureHostnameIndex.from_environment_variables()
+        if index and resource and resource.get('uri'):
+            index.add(self.oneview_client.connection.get_host(), resource, [hostname])
+
     def __reconfigure(self, resource):
         reconfigured_enclosure = self.oneview_client.enclosures.update_configuration(resource['uri'])
         return True, self.MSG_RECONFIGURED, reconfigured_enclosure
@@ -474,19 +566,137 @@ class EnclosureModule(OneViewModuleBase):
         return False, self.MSG_SUPPORT_DATA_COLLECTION_STATE_ALREADY_SET, resource
 
     def __patch(self, resource, data):
-        changed = False
         state_name = self.module.params['state']
-        state = self.patch_params[state_name].copy()
-
-        property_current_value = self.__get_current_property_value(state_name, state, resource, data)
+        operations = self.__get_state_operations(resource, state_name, data)
 
-        if self.__is_update_needed(state_name, state, property_current_value):
-            resource = self.oneview_client.enclosures.patch(resource['uri'], **state)
-            changed = True
+        # A PATCH request takes a single operation, so the operations are requested in turn
+        for operation in operations:
+            resource = self.oneview_client.enclosures.patch(resource['uri'], **operation)
+        changed = bool(operations)
 
-        msg = self.patch_messages[state_name]['changed'] if changed else self.patch_messages[state_name]['not_changed']
+        return changed, self.__get_patch_message(state_name, changed), resource
 
-        return changed, msg, resource
+    def __get_state_operations(self, resource, state_name, data):
+        if state_name == 'patched':
+            patches = data.get('patches')
+            if not patches:
+                raise HPOneViewValueError(self.MSG_PATCHES_REQUIRED)
+        else:
+            patches = [dict(data, state=state_name)]
+
+        # The current values are checked against the enclosure got once, and only the needed updates are requested
+        operations = []
+        for patch in patches:
+            operations.extend(self.__get_patch_operations(resource, patch))
+        return operations
+
+    def __get_patch_message(self, state_name, changed):
+        if state_name == 'patched':
+            return self.MSG_PATCHED if changed else self.MSG_ALREADY_PATCHED
+        return self.patch_messages[state_name]['changed'] if changed else self.patch_messages[state_name]['not_changed']
+
+    def __get_patch_operations(self, resource, patch):
+        state_name = patch.get('state')
+        if state_name not in self.patch_params:
+            raise HPOneViewValueError(self.MSG_INVALID_PATCH_STATE.format(state_name))
+
+        if 'bayNumbers' in patch:
+            if '{bayNumber}' not in self.patch_params[state_name]['path']:
+                raise HPOneViewValueError(self.MSG_BAY_NUMBERS_NOT_SUPPORTED.format(state_name))
+            bays_data = [dict(bayNumber=bay_number) for bay_number in patch['bayNumbers']]
+        else:
+            bays_data = [dict((key, value) for key, value in patch.items() if key not in ('name', 'state'))]
+
+        operations = []
+        for bay_data in bays_data:
+            state = self.patch_params[state_name].copy()
+            property_current_value = self.__get_current_property_value(state_name, state, resource, bay_data)
+            if self.__is_update_needed(state_name, state, property_current_value):
+                operations.append(state)
+        return operations
+
+    def __execute_fleet(self):
+        if self.state in ('present', 'absent'):
+            raise HPOneViewValueError(self.MSG_FLEET_STATE_NOT_SUPPORTED.format(self.state))
+
+        data = dict((key, value) for key, value in self.data.items() if key not in ('names', 'filter'))
+        connection = self.oneview_client.connection
+
+        enclosures = self.__get_fleet(self.data)
+        results = [dict(name=name, uri=enclosure and enclosure['uri'], changed=False, msg=None, task_uri=None,
+                        seconds=None, error=None if enclosure else self.MSG_ENCLOSURE_NOT_FOUND)
+                   for name, enclosure in enclosures]
+
+        def request(result, enclosure):
+            requests = self.__get_fleet_requests(enclosure, data)
+            result.update(changed=bool(requests), msg=self.__get_fleet_message(bool(requests)))
+            task = None
+            for method, uri, body, custom_headers in requests:
+                if task:
+                    # The operations on the same enclosure are requested in turn, only the last one is waited for
+                    # along with the other enclosures
+                    _, error = wait_for_tasks(connection, [task])[0]
+                    if error:
+                        raise error
+                task, _ = submit_task(connection, uri, body, None, method, custom_headers)
+            return task
+
+        found = [(result, enclosure) for result, (_, enclosure) in zip(results, enclosures) if enclosure]
+        outcomes = run_operations(connection, [lambda result=result, enclosure=enclosure: request(result, enclosure)
+                                               for result, enclosure in found], self.module.params['parallelism'])
+        for (result, _), outcome in zip(found, outcomes):
+            result.update(task_uri=outcome['task'] and outcome['task']['uri'], seconds=outcome['seconds'])
+            if outcome['error']:
+                result.update(changed=False, msg=None, error=outcome['error'].msg)
+
+        failures = [result['name'] for result in results if result['error']]
+        if failures:
+            self.module.fail_json(msg=self.MSG_FLEET_FAILED.format(', '.join(failures)),
+                                  ansible_facts=dict(enclosure_results=results))
+
+        return dict(changed=any(result['changed'] for result in results),
+                    msg=self.MSG_FLEET_COMPLETED.format(len(results)),
+                    ansible_facts=dict(enclosure_results=results))
+
+    def __get_fleet(self, data):
+        if 'names' in data:
+            enclosures_by_name = self.get_all_by_names(self.oneview_client.enclosures, data['names'])
+            return list(enclosures_by_name.items())
+
+        enclosures = self.oneview_client.enclosures.get_all(filter=data['filter'])
+        return [(enclosure['name'], enclosure) for enclosure in enclosures]
+
+    def __get_fleet_requests(self, enclosure, data):
+        if self.state == 'reconfigured':
+            return [('put', enclosure['uri'] + '/configuration', None, None)]
+
+        if self.state == 'refreshed':
+            refresh_config = data.copy()
+            refresh_config.pop('name', None)
+            return [('put', enclosure['uri'] + '/refreshState', refresh_config, None)]
+
+        if self.state == 'support_data_collection_set':
+            desired_value = data.get('supportDataCollectionState')
+            if enclosure.get('supportDataCollectionState') == desired_value:
+                return []
+            operations = [dict(operation='replace', path='/supportDataCollectionState', value=desired_value)]
+        else:
+            operations = self.__get_state_operations(enclosure, self.state, data)
+
+        # One operation per PATCH request, with the If-Match header the SDK sends on the enclosure patches
+        return [('patch', enclosure['uri'], [dict(op=operation['operation'], path=operation['path'],
+                                                  value=operation['value'])], {'If-Match': '*'})
+                for operation in operations]
+
+    def __get_fleet_message(self, changed):
+        if self.state == 'reconfigured':
+            return self.MSG_RECONFIGURED
+        if self.state == 'refreshed':
+            return self.MSG_REFRESHED
+        if self.state == 'support_data_collection_set':
+            return self.MSG_SUPPORT_DATA_COLLECTION_STATE_SET if changed \
+                else self.MSG_SUPPORT_DATA_COLLECTION_STATE_ALREADY_SET
+        return self.__get_patch_message(self.state, changed)
 
     def __is_update_needed(self, state_name, state, property_current_value):
         need_request_update = False
@@ -561,14 +771,45 @@ class EnclosureModule(OneViewModuleBase):
         return result[0] if result else None
 
     def __get_by_hostname(self, hostname):
-        def filter_by_hostname(hostname, enclosure):
-            is_primary_ip = ('activeOaPreferredIP' in enclosure and enclosure['activeOaPreferredIP'] == hostname)
-            is_standby_ip = ('standbyOaPreferredIP' in enclosure and enclosure['standbyOaPreferredIP'] == hostname)
-            return is_primary_ip or is_standby_ip
+        index = EnclosureHostnameIndex.from_environment_variables()
+        if index:
+            enclosure = self.__get_indexed(index, hostname)
+            if enclosure:
+                return enclosure
+
+        hostname_filter = "'{}'".format(str(hostname).replace("'", "''"))
+        results = run_concurrently(
+            [lambda field=field: self.oneview_client.enclosures.get_all(filter=field + '=' + hostname_filter)
+             for field in EnclosureHostnameIndex.HOSTNAME_FIELDS],
+            max_workers=len(EnclosureHostnameIndex.HOSTNAME_FIELDS))
+
+        enclosure = next((enclosure for enclosures in results for enclosure in enclosures
+                          if self.__has_hostname(enclosure, hostname)), None)
+        if enclosure and index:
+            index.add(self.oneview_client.connection.get_host(), enclosure)
+        return enclosure
+
+    def __get_indexed(self, index, hostname):
+        host = self.oneview_client.connection.get_host()
+        uri = index.get_uri(host, hostname)
+        if not uri:
+            return None
 
-        enclosures = self.oneview_client.enclosures.get_all()
-        result = [x for x in enclosures if filter_by_hostname(hostname, x)]
-        return result[0] if result else None
+        def is_indexed(enclosure):
+            # Enclosures without Onboard Administrators, like the Synergy frames, are indexed by the hostname they
+            # were added with
+            hostnames = [enclosure.get(field) for field in EnclosureHostnameIndex.HOSTNAME_FIELDS
+                         if enclosure.get(field)]
+            return not hostnames or hostname in hostnames
+
+        enclosure = index.get_resource(self.oneview_client.enclosures, host, uri, is_indexed)
+        if not enclosure:
+            # The hostname is not the one of the indexed enclosure anymore, e.g. it was readdressed
+            index.forget_hostname(host, hostname)
+        return enclosure
+
+    def __has_hostname(self, enclosure, hostname):
+        return any(enclosure.get(field) == hostname for field in EnclosureHostnameIndex.HOSTNAME_FIELDS)
 
 
 def main():
@@ -36,6 +36,11 @@ options:
       description:
         - Enclosure name.
       required: false
+    names:
+      description:
+        - List of Enclosure names. All of them are retrieved at once and the facts are also returned by name,
+          in C(enclosures_by_name). The C(options) are not gathered.
+      required: false
     options:
       description:
         - "List with options to gather additional facts about an Enclosure and related resources.
@@ -54,6 +59,14 @@ EXAMPLES = '''
     config: "{{ config_file_path }}"
 - debug: var=enclosures
 
+- name: Gather facts about a list of Enclosures by name
+  oneview_enclosure_facts:
+    config: "{{ config }}"
+    names:
+      - "Test-Enclosure"
+      - "Test-Enclosure-2"
+- debug: var=enclosures_by_name
+
 - name: Gather paginated, filtered and sorted facts about Enclosures
   oneview_enclosure_facts:
     config: "{{ config }}"
@@ -109,6 +122,11 @@ enclosures:
     returned: Always, but can be null.
     type: complex
 
+enclosures_by_name:
+    description: The Enclosures by name. The value is null for the names not found.
+    returned: When names is informed.
+    type: dict
+
 enclosure_script:
     description: Has all the OneView facts about the script of an Enclosure.
     returned: When requested, but can be null.
@@ -132,6 +150,7 @@ from module_utils.oneview import OneViewModuleBase
 class EnclosureFactsModule(OneViewModuleBase):
     argument_spec = dict(
         name=dict(required=False, type='str'),
+        names=dict(required=False, type='list'),
         options=dict(required=False, type='list'),
         params=dict(required=False, type='dict'),
     )
@@ -148,6 +167,10 @@ class EnclosureFactsModule(OneViewModuleBase):
 
             if self.options and enclosures:
                 ansible_facts = self.__gather_optional_facts(self.options, enclosures[0])
+        elif self.module.params.get('names'):
+            enclosures_by_name = self.get_all_by_names(self.oneview_client.enclosures, self.module.params['names'])
+            enclosures = [enclosure for enclosure in enclosures_by_name.values() if enclosure]
+            ansible_facts['enclosures_by_name'] = enclosures_by_name
         else:
             enclosures = self.oneview_client.enclosures.get_all(**self.facts_params)
 
@@ -159,17 +182,18 @@ class EnclosureFactsModule(OneViewModuleBase):
     def __gather_optional_facts(self, options, enclosure):
 
         enclosure_client = self.oneview_client.enclosures
-        ansible_facts = {}
+        fact_getters = []
 
         if options.get('script'):
-            ansible_facts['enclosure_script'] = enclosure_client.get_script(enclosure['uri'])
+            fact_getters.append(('enclosure_script', lambda: enclosure_client.get_script(enclosure['uri'])))
         if options.get('environmentalConfiguration'):
-            env_config = enclosure_client.get_environmental_configuration(enclosure['uri'])
-            ansible_facts['enclosure_environmental_configuration'] = env_config
+            fact_getters.append(('enclosure_environmental_configuration',
+                                 lambda: enclosure_client.get_environmental_configuration(enclosure['uri'])))
         if options.get('utilization'):
-            ansible_facts['enclosure_utilization'] = self.__get_utilization(enclosure, options['utilization'])
+            fact_getters.append(('enclosure_utilization',
+                                 lambda: self.__get_utilization(enclosure, options['utilization'])))
 
-        return ansible_facts
+        return self.gather_facts_concurrently(fact_getters)
 
     def __get_utilization(self, enclosure, params):
         fields = view = refresh = filter = ''
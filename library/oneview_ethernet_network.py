@@ -135,6 +135,8 @@ ethernet_network_connection_template:
     type: complex
 '''
 
+from copy import deepcopy
+
 from ansible.module_utils.basic import AnsibleModule
 from module_utils.oneview import OneViewModuleBase, ResourceComparator, HPOneViewResourceNotFound
 
@@ -172,14 +174,28 @@ class EthernetNetworkModule(OneViewModuleBase):
 
         changed, msg, ansible_facts, resource = False, '', {}, None
 
-        if self.data.get('name'):
+        # The bandwidth and the scopes are not part of the network, so its eTag does not tell whether they changed
+        desired = None
+        if self.state == 'present' and self.data.get('name') and not self.data.get('vlanIdRange') and not (
+                'bandwidth' in self.data or 'scopeUris' in self.data):
+            desired = deepcopy(self.data)
+            resource, converged = self.get_converged_resource(desired['name'], desired)
+            if converged:
+                return dict(changed=False, msg=self.MSG_ALREADY_PRESENT,
+                            ansible_facts={self.RESOURCE_FACT_NAME: resource})
+
+        if self.data.get('name') and not resource:
             resource = self.get_by_name(self.data['name'])
 
         if self.state == 'present':
             if self.data.get('vlanIdRange'):
                 changed, msg, ansible_facts = self.__bulk_present()
             else:
-                return self.__present(resource)
+                result = self.__present(resource)
+                if desired:
+                    self.set_converged_resource(desired['name'], desired,
+                                                result['ansible_facts'][self.RESOURCE_FACT_NAME])
+                return result
         elif self.state == 'absent':
             return self.resource_absent(resource)
         elif self.state == 'default_bandwidth_reset':
@@ -37,6 +37,10 @@ options:
       description:
         - Event name.
       required: false
+notes:
+    - "Besides the common params, C(params) accepts C(page_size) and C(max_items). When any of them is informed, the
+       events are retrieved page by page, with C(page_size) events per request, and no more than C(max_items) events
+       are returned."
 
 extends_documentation_fragment:
     - oneview
@@ -60,6 +64,16 @@ EXAMPLES = '''
       filter: 'eventTypeID=hp.justATest'
 - debug: var=events
 
+- name: Gather the description of the last 500 events, retrieved 100 by page
+  oneview_event_facts:
+    config: "{{ config }}"
+    params:
+      sort: 'created:descending'
+      fields: 'description,created'
+      page_size: 100
+      max_items: 500
+- debug: var=events
+
 '''
 
 RETURN = '''
@@ -85,7 +99,7 @@ class EventFactsModule(OneViewModuleBase):
 
     def execute_module(self):
 
-        events = self.oneview_client.events.get_all(**self.facts_params)
+        events = self.get_all_facts(self.oneview_client.events)
 
         return dict(changed=False, ansible_facts=dict(events=events))
 
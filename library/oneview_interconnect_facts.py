@@ -35,6 +35,11 @@ options:
       description:
         - Interconnect name.
       required: false
+    names:
+      description:
+        - List of Interconnect names. All of them are retrieved at once and the facts are also returned by name,
+          in C(interconnects_by_name). The C(options) are not gathered.
+      required: false
     options:
       description:
         - "List with options to gather additional facts about Interconnect.
@@ -153,6 +158,14 @@ EXAMPLES = '''
 - debug: var=interconnects
 - debug: var=interconnect_pluggable_module_information
 
+- name: Gather facts about a list of interconnects by name
+  oneview_interconnect_facts:
+    config: "{{ config }}"
+    names:
+      - "0000A66102, interconnect 2"
+      - "0000A66102, interconnect 5"
+
+- debug: var=interconnects_by_name
 '''
 
 RETURN = '''
@@ -161,6 +174,11 @@ interconnects:
     returned: Always, but can be null.
     type: list
 
+interconnects_by_name:
+    description: The interconnects by name. The value is null for the names not found.
+    returned: When names is informed.
+    type: dict
+
 interconnect_name_servers:
     description: The named servers for an interconnect.
     returned: When requested, but can be null.
@@ -206,6 +224,7 @@ class InterconnectFactsModule(OneViewModuleBase):
     def __init__(self):
         argument_spec = dict(
             name=dict(required=False, type='str'),
+            names=dict(required=False, type='list'),
             options=dict(required=False, type='list'),
             params=dict(required=False, type='dict'),
         )
@@ -221,6 +240,11 @@ class InterconnectFactsModule(OneViewModuleBase):
 
             if interconnects and self.module.params.get('options'):
                 self.__get_options(interconnects, facts)
+        elif self.module.params.get('names'):
+            interconnects_by_name = self.get_all_by_names(self.oneview_client.interconnects,
+                                                          self.module.params['names'])
+            facts['interconnects'] = [interconnect for interconnect in interconnects_by_name.values() if interconnect]
+            facts['interconnects_by_name'] = interconnects_by_name
         else:
             facts['interconnects'] = self.oneview_client.interconnects.get_all(**self.facts_params)
 
@@ -231,39 +255,41 @@ class InterconnectFactsModule(OneViewModuleBase):
 
     def __get_options(self, interconnects, facts):
         interconnect_uri = interconnects[0]['uri']
+        interconnects_client = self.oneview_client.interconnects
+        fact_getters = []
 
         if self.options.get('nameServers'):
-            name_servers = self.oneview_client.interconnects.get_name_servers(interconnect_uri)
-            facts['interconnect_name_servers'] = name_servers
+            fact_getters.append(('interconnect_name_servers',
+                                 lambda: interconnects_client.get_name_servers(interconnect_uri)))
 
         if self.options.get('statistics'):
-            facts['interconnect_statistics'] = self.oneview_client.interconnects.get_statistics(interconnect_uri)
+            fact_getters.append(('interconnect_statistics', lambda: interconnects_client.get_statistics(interconnect_uri)))
 
         if self.options.get('portStatistics'):
             port_name = self.options['portStatistics']
-            port_statistics = self.oneview_client.interconnects.get_statistics(interconnect_uri, port_name)
-            facts['interconnect_port_statistics'] = port_statistics
+            fact_getters.append(('interconnect_port_statistics',
+                                 lambda: interconnects_client.get_statistics(interconnect_uri, port_name)))
 
         if self.options.get('subPortStatistics'):
             facts['interconnect_subport_statistics'] = None
             sub_options = self.options['subPortStatistics']
             if isinstance(sub_options, dict) and sub_options.get('portName') and sub_options.get('subportNumber'):
-                facts['interconnect_subport_statistics'] = self.oneview_client.interconnects.get_subport_statistics(
-                    interconnect_uri, sub_options['portName'], sub_options['subportNumber'])
+                fact_getters.append(('interconnect_subport_statistics',
+                                     lambda: interconnects_client.get_subport_statistics(
+                                         interconnect_uri, sub_options['portName'], sub_options['subportNumber'])))
 
         if self.options.get('ports'):
-            ports = self.oneview_client.interconnects.get_ports(interconnect_uri)
-            facts['interconnect_ports'] = ports
+            fact_getters.append(('interconnect_ports', lambda: interconnects_client.get_ports(interconnect_uri)))
 
         if self.options.get('port'):
-            port_name = self.options.get('port')
-            port_id = "{}:{}".format(extract_id_from_uri(interconnect_uri), port_name)
-            port = self.oneview_client.interconnects.get_port(interconnect_uri, port_id)
-            facts['interconnect_port'] = port
+            port_id = "{}:{}".format(extract_id_from_uri(interconnect_uri), self.options.get('port'))
+            fact_getters.append(('interconnect_port', lambda: interconnects_client.get_port(interconnect_uri, port_id)))
 
         if self.options.get('pluggableModuleInformation'):
-            sfp_info = self.oneview_client.interconnects.get_pluggable_module_information(interconnect_uri)
-            facts['interconnect_pluggable_module_information'] = sfp_info
+            fact_getters.append(('interconnect_pluggable_module_information',
+                                 lambda: interconnects_client.get_pluggable_module_information(interconnect_uri)))
+
+        facts.update(self.gather_facts_concurrently(fact_getters))
 
 
 def main():
@@ -54,14 +54,28 @@ options:
               non-idempotent.
               C(telemetry_configuration_updated) updates the telemetry configuration of a logical interconnect.
               C(scopes_updated) updates the scopes associated with the logical interconnect.
+              C(converged) ensures the C(ethernetSettings), C(qosConfiguration), C(snmpConfiguration), C(portMonitor)
+              and C(telemetryConfiguration) provided together, getting the configurations not embedded in the logical
+              interconnect concurrently and updating only the ones that differ, in this order.
         choices: ['compliant', 'ethernet_settings_updated', 'internal_networks_updated', 'settings_updated',
                   'forwarding_information_base_generated', 'qos_aggregated_configuration_updated',
                   'snmp_configuration_updated', 'port_monitor_updated', 'configuration_updated', 'firmware_installed',
-                  'telemetry_configuration_updated']
+                  'telemetry_configuration_updated', 'scopes_updated', 'converged']
     data:
         description:
             - List with the options.
+            - To update the configuration of many logical interconnects at once, on the states
+              C(ethernet_settings_updated), C(qos_aggregated_configuration_updated), C(snmp_configuration_updated),
+              C(port_monitor_updated) and C(telemetry_configuration_updated), provide the C(names) of the logical
+              interconnects, or a C(filter) expression selecting them, instead of the C(name). They are got with a
+              single request, the configurations are merged locally and only the logical interconnects with changes
+              are updated.
         required: true
+    parallelism:
+        description:
+            - Maximum number of logical interconnects whose updates are requested, and whose tasks are checked, at the
+              same time, when the data has C(names) or a C(filter).
+        default: 8
 
 extends_documentation_fragment:
     - oneview
@@ -136,6 +150,36 @@ EXAMPLES = '''
     snmpConfiguration:
       enabled: True
 
+- name: Update the SNMP trap destinations of many logical interconnects at once
+  oneview_logical_interconnect:
+    config: "{{ config_file_path }}"
+    state: snmp_configuration_updated
+    parallelism: 10
+    data:
+      names: "{{ logical_interconnect_names }}"
+      snmpConfiguration:
+        trapDestinations:
+          - trapDestination: "172.18.6.16"
+            communityString: "public"
+            trapFormat: "SNMPv1"
+
+- debug: var=logical_interconnect_results
+
+- name: Converge the Ethernet settings, the SNMP and the port monitor configurations of the logical interconnect
+  oneview_logical_interconnect:
+    config: "{{ config_file_path }}"
+    state: converged
+    data:
+      name: "Name of the Logical Interconnect"
+      ethernetSettings:
+        macRefreshInterval: 10
+      snmpConfiguration:
+        enabled: True
+      portMonitor:
+        enablePortMonitor: False
+
+- debug: var=logical_interconnect_sections
+
 - name: Update the port monitor configuration of the logical interconnect
   oneview_logical_interconnect:
     config: "{{ config_file_path }}"
@@ -229,13 +273,33 @@ scope_uris:
     description: Has the scope URIs the specified logical interconnect is inserted into.
     returned: On 'scopes_updated' state, but can be null.
     type: complex
+
+logical_interconnect_sections:
+    description:
+        The outcome of each configuration of the converged state, in the order they are updated, with the keys
+        section, the option of the data, changed and changes, the JSON patch from the current configuration to the
+        updated one.
+    returned: On 'converged' state.
+    type: list
+
+logical_interconnect_results:
+    description:
+        The outcome on each logical interconnect, when the data has C(names) or a C(filter), with the keys name, uri,
+        changed, msg, changes, the JSON patch from the current configuration to the updated one, task_uri, seconds,
+        the time from the request to the completion of the update, and error, the error message of the failed updates.
+    returned: When the data has names or a filter.
+    type: list
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 from module_utils.oneview import (OneViewModuleBase,
                                   HPOneViewResourceNotFound,
                                   ResourceComparator,
-                                  HPOneViewValueError)
+                                  HPOneViewValueError,
+                                  run_concurrently,
+                                  run_operations,
+                                  submit_task,
+                                  wait_for_tasks)
 
 
 class LogicalInterconnectModule(OneViewModuleBase):
@@ -251,9 +315,34 @@ class LogicalInterconnectModule(OneViewModuleBase):
     MSG_TELEMETRY_CONFIGURATION_UPDATED = 'Telemetry configuration updated successfully.'
     MSG_FIRMWARE_INSTALLED = 'Firmware updated successfully.'
     MSG_NOT_FOUND = 'Logical Interconnect not found.'
+    MSG_CONFIGURATION_NOT_FOUND = 'The {} was not found on the Logical Interconnect.'
     MSG_ETH_NETWORK_NOT_FOUND = 'Ethernet network not found: '
     MSG_NO_CHANGES_PROVIDED = 'Nothing to do.'
     MSG_NO_OPTIONS_PROVIDED = 'No options provided.'
+    MSG_MANY_STATE_NOT_SUPPORTED = 'The state {} cannot be applied to many Logical Interconnects.'
+    MSG_MANY_COMPLETED = 'Operation completed on {} Logical Interconnects.'
+    MSG_MANY_FAILED = 'Operation failed on the Logical Interconnects: {}'
+
+    MSG_CONVERGED = 'Logical Interconnect converged, sections updated: {}'
+    MSG_ALREADY_CONVERGED = 'Logical Interconnect is already converged.'
+
+    # Configurations that can be updated on many logical interconnects at once, and converged together, by state: the
+    # option of the data, which is also the embedded configuration of the logical interconnect, the path of the
+    # configuration, the type sent when it is missing and the message of the update
+    CONFIGURATIONS = dict(
+        ethernet_settings_updated=('ethernetSettings', '/ethernetSettings', None, MSG_ETH_SETTINGS_UPDATED),
+        qos_aggregated_configuration_updated=('qosConfiguration', '/qos-aggregated-configuration', None,
+                                              MSG_QOS_UPDATED),
+        snmp_configuration_updated=('snmpConfiguration', '/snmp-configuration', 'snmp-configuration',
+                                    MSG_SNMP_UPDATED),
+        port_monitor_updated=('portMonitor', '/port-monitor', 'port-monitor', MSG_PORT_MONITOR_UPDATED),
+        telemetry_configuration_updated=('telemetryConfiguration', None, 'telemetry-configuration',
+                                         MSG_TELEMETRY_CONFIGURATION_UPDATED),
+    )
+
+    # Order in which the converged state updates the configurations, the Ethernet settings first
+    CONVERGED_STATES = ('ethernet_settings_updated', 'qos_aggregated_configuration_updated',
+                        'snmp_configuration_updated', 'port_monitor_updated', 'telemetry_configuration_updated')
 
     argument_spec = dict(
         state=dict(
@@ -261,9 +350,10 @@ class LogicalInterconnectModule(OneViewModuleBase):
             choices=['compliant', 'ethernet_settings_updated', 'internal_networks_updated', 'settings_updated',
                      'forwarding_information_base_generated', 'qos_aggregated_configuration_updated',
                      'snmp_configuration_updated', 'port_monitor_updated', 'configuration_updated',
-                     'firmware_installed', 'telemetry_configuration_updated', 'scopes_updated']
+                     'firmware_installed', 'telemetry_configuration_updated', 'scopes_updated', 'converged']
         ),
-        data=dict(required=True, type='dict')
+        data=dict(required=True, type='dict'),
+        parallelism=dict(type='int', default=8)
     )
 
     def __init__(self):
@@ -273,6 +363,9 @@ class LogicalInterconnectModule(OneViewModuleBase):
 
     def execute_module(self):
 
+        if 'names' in self.data or 'filter' in self.data:
+            return self.__update_many()
+
         resource = self.__get_by_name(self.data)
 
         if not resource:
@@ -305,6 +398,8 @@ class LogicalInterconnectModule(OneViewModuleBase):
             changed, msg, ansible_facts = self.__update_telemetry_configuration(resource, self.data)
         elif self.state == 'scopes_updated':
             changed, msg, ansible_facts = self.__update_scopes(resource, self.data)
+        elif self.state == 'converged':
+            changed, msg, ansible_facts = self.__converge(resource, self.data)
 
         if ansible_facts:
             result = dict(changed=changed, msg=msg, ansible_facts=ansible_facts)
@@ -453,6 +548,107 @@ class LogicalInterconnectModule(OneViewModuleBase):
 
         return result['changed'], result['msg'], result['ansible_facts']
 
+    def __update_many(self):
+        if self.state not in self.CONFIGURATIONS:
+            raise HPOneViewValueError(self.MSG_MANY_STATE_NOT_SUPPORTED.format(self.state))
+
+        option, _, _, msg_updated = self.CONFIGURATIONS[self.state]
+        self.__validate_options(option, self.data)
+        connection = self.oneview_client.connection
+
+        logical_interconnects = self.__get_many(self.data)
+        results = [dict(name=name, uri=li and li['uri'], changed=False, msg=None, changes=[], task_uri=None,
+                        seconds=None, error=None if li else self.MSG_NOT_FOUND)
+                   for name, li in logical_interconnects]
+
+        def update(result, li):
+            current_config = self.__get_configuration(self.state, li)
+            config_merged = self.__merge_options(self.data[option], current_config)
+            result['changes'] = ResourceComparator.build_patch(current_config, config_merged)
+            if not result['changes']:
+                result['msg'] = self.MSG_NO_CHANGES_PROVIDED
+                return None
+            result.update(changed=True, msg=msg_updated)
+            task, _ = submit_task(connection, self.__get_configuration_uri(self.state, li, current_config),
+                                  self.__with_type(self.state, config_merged), None, 'put')
+            return task
+
+        # The merges are computed from the logical interconnects got at once, and only the needed updates are requested
+        found = [(result, li) for result, (_, li) in zip(results, logical_interconnects) if li]
+        outcomes = run_operations(connection, [lambda result=result, li=li: update(result, li) for result, li in found],
+                                  self.module.params['parallelism'])
+        for (result, _), outcome in zip(found, outcomes):
+            result.update(task_uri=outcome['task'] and outcome['task']['uri'], seconds=outcome['seconds'])
+            if outcome['error']:
+                result.update(changed=False, msg=None, error=outcome['error'].msg)
+
+        failures = [result['name'] for result in results if result['error']]
+        if failures:
+            self.module.fail_json(msg=self.MSG_MANY_FAILED.format(', '.join(failures)),
+                                  ansible_facts=dict(logical_interconnect_results=results))
+
+        return dict(changed=any(result['changed'] for result in results),
+                    msg=self.MSG_MANY_COMPLETED.format(len(results)),
+                    ansible_facts=dict(logical_interconnect_results=results))
+
+    def __get_many(self, data):
+        if 'names' in data:
+            lis_by_name = self.get_all_by_names(self.oneview_client.logical_interconnects, data['names'])
+            return list(lis_by_name.items())
+
+        lis = self.oneview_client.logical_interconnects.get_all(filter=data['filter'])
+        return [(li['name'], li) for li in lis]
+
+    def __converge(self, resource, data):
+        states = [state for state in self.CONVERGED_STATES if self.CONFIGURATIONS[state][0] in data]
+        if not states:
+            raise HPOneViewValueError(self.MSG_NO_OPTIONS_PROVIDED)
+
+        current_configs = run_concurrently([lambda state=state: self.__get_configuration(state, resource)
+                                            for state in states], len(states))
+
+        sections = []
+        for state, current_config in zip(states, current_configs):
+            option = self.CONFIGURATIONS[state][0]
+            config_merged = self.__merge_options(data[option], current_config)
+            changes = ResourceComparator.build_patch(current_config, config_merged)
+            if changes:
+                self.__update_configuration_section(self.__get_configuration_uri(state, resource, current_config),
+                                                    self.__with_type(state, config_merged))
+            sections.append(dict(section=option, changed=bool(changes), changes=changes))
+
+        updated_sections = [section['section'] for section in sections if section['changed']]
+        if not updated_sections:
+            return False, self.MSG_ALREADY_CONVERGED, dict(logical_interconnect_sections=sections)
+        return True, self.MSG_CONVERGED.format(', '.join(updated_sections)), dict(
+            logical_interconnect_sections=sections)
+
+    def __update_configuration_section(self, uri, config):
+        task, _ = submit_task(self.oneview_client.connection, uri, config, None, 'put')
+        if task:
+            _, error = wait_for_tasks(self.oneview_client.connection, [task])[0]
+            if error:
+                raise error
+
+    def __get_configuration(self, state, li):
+        option, path, _, _ = self.CONFIGURATIONS[state]
+        if path and li.get(option) is None:
+            # Only got from the appliance when the logical interconnect does not embed it
+            return self.oneview_client.connection.get(li['uri'] + path)
+        if li.get(option) is None:
+            raise HPOneViewResourceNotFound(self.MSG_CONFIGURATION_NOT_FOUND.format(option))
+        return li[option]
+
+    def __get_configuration_uri(self, state, li, config):
+        path = self.CONFIGURATIONS[state][1]
+        return li['uri'] + path if path else config['uri']
+
+    def __with_type(self, state, config):
+        type_ = self.CONFIGURATIONS[state][2]
+        if type_ and 'type' not in config:
+            return dict(config, type=type_)
+        return config
+
     def __get_by_name(self, data):
         return self.oneview_client.logical_interconnects.get_by_name(data['name'])
 
@@ -224,17 +224,18 @@ class LogicalInterconnectFactsModule(OneViewModuleBase):
         return facts
 
     def __get_options(self, logical_interconnect, options):
-        facts = dict()
         uri = logical_interconnect["uri"]
+        fact_getters = []
 
         for option in options:
             if option == 'telemetry_configuration':
                 telemetry_configuration_uri = logical_interconnect["telemetryConfiguration"]["uri"]
-                facts[option] = self.options[option](telemetry_configuration_uri=telemetry_configuration_uri)
+                fact_getters.append((option, lambda option=option: self.options[option](
+                    telemetry_configuration_uri=telemetry_configuration_uri)))
             else:
-                facts[option] = self.options[option](id_or_uri=uri)
+                fact_getters.append((option, lambda option=option: self.options[option](id_or_uri=uri)))
 
-        return facts
+        return self.gather_facts_concurrently(fact_getters)
 
 
 def main():
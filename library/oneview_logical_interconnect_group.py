@@ -101,6 +101,8 @@ logical_interconnect_group:
     type: complex
 '''
 
+from copy import deepcopy
+
 from ansible.module_utils.basic import AnsibleModule
 from module_utils.oneview import OneViewModuleBase, HPOneViewResourceNotFound
 
@@ -126,10 +128,22 @@ class LogicalInterconnectGroupModule(OneViewModuleBase):
         self.resource_client = self.oneview_client.logical_interconnect_groups
 
     def execute_module(self):
-        resource = self.get_by_name(self.data['name'])
+        # The scopes are not part of the group, so its eTag does not tell whether they changed
+        desired, resource = None, None
+        if self.state == 'present' and 'scopeUris' not in self.data:
+            desired = deepcopy(self.data)
+            resource, converged = self.get_converged_resource(desired['name'], desired)
+            if converged:
+                return dict(changed=False, msg=self.MSG_ALREADY_PRESENT,
+                            ansible_facts={self.RESOURCE_FACT_NAME: resource})
+
+        resource = resource or self.get_by_name(self.data['name'])
 
         if self.state == 'present':
-            return self.__present(resource)
+            result = self.__present(resource)
+            if desired:
+                self.set_converged_resource(desired['name'], desired, result['ansible_facts'][self.RESOURCE_FACT_NAME])
+            return result
         elif self.state == 'absent':
             return self.resource_absent(resource)
 
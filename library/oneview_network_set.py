@@ -96,7 +96,7 @@ network_set:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from module_utils.oneview import OneViewModuleBase, HPOneViewResourceNotFound
+from module_utils.oneview import OneViewModuleBase, NetworkNameUriIndex
 
 
 class NetworkSetModule(OneViewModuleBase):
@@ -136,23 +136,14 @@ class NetworkSetModule(OneViewModuleBase):
             result = self.resource_scopes_set(result, self.RESOURCE_FACT_NAME, scope_uris)
         return result
 
-    def __get_ethernet_network_by_name(self, name):
-        result = self.oneview_client.ethernet_networks.get_by('name', name)
-        return result[0] if result else None
-
-    def __get_network_uri(self, network_name_or_uri):
-        if network_name_or_uri.startswith('/rest/ethernet-networks'):
-            return network_name_or_uri
-        else:
-            enet_network = self.__get_ethernet_network_by_name(network_name_or_uri)
-            if enet_network:
-                return enet_network['uri']
-            else:
-                raise HPOneViewResourceNotFound(self.MSG_ETHERNET_NETWORK_NOT_FOUND + network_name_or_uri)
-
     def __replace_network_name_by_uri(self, data):
         if 'networkUris' in data:
-            data['networkUris'] = [self.__get_network_uri(x) for x in data['networkUris']]
+            names = [x for x in data['networkUris'] if not x.startswith('/rest/ethernet-networks')]
+            if names:
+                # Network sets only hold Ethernet networks
+                network_index = NetworkNameUriIndex(self.oneview_client, network_types=('ethernet_networks',))
+                uris = dict(zip(names, network_index.get_uris(names, self.MSG_ETHERNET_NETWORK_NOT_FOUND)))
+                data['networkUris'] = [uris.get(x, x) for x in data['networkUris']]
 
 
 def main():
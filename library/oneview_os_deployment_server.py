@@ -89,7 +89,8 @@ os_deployment_server:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from module_utils.oneview import OneViewModuleBase, HPOneViewResourceNotFound, ResourceComparator
+from module_utils.oneview import OneViewModuleBase, HPOneViewResourceNotFound, ResourceComparator, \
+    NetworkNameUriIndex
 
 
 class OsDeploymentServerModule(OneViewModuleBase):
@@ -164,19 +165,10 @@ class OsDeploymentServerModule(OneViewModuleBase):
             data['applianceUri'] = self.__get_appliance_by_name(appliance_name)
 
     def __get_network_uri_by_name(self, name):
-        ethernet_networks = self.oneview_client.ethernet_networks.get_by('name', name)
-        if ethernet_networks:
-            return ethernet_networks[0]['uri']
-
-        fc_networks = self.oneview_client.fc_networks.get_by('name', name)
-        if fc_networks:
-            return fc_networks[0]['uri']
-
-        fcoe_networks = self.oneview_client.fcoe_networks.get_by('name', name)
-        if not fcoe_networks:
+        network_uri = NetworkNameUriIndex(self.oneview_client).get_uri(name)
+        if not network_uri:
             raise HPOneViewResourceNotFound(self.MSG_NETWORK_NOT_FOUND.format(name))
-
-        return fcoe_networks[0]['uri']
+        return network_uri
 
     def __get_appliance_by_name(self, name):
         appliance = self.oneview_client.os_deployment_servers.get_appliance_by_name(name)
@@ -36,6 +36,11 @@ options:
       description:
         - Server Hardware name.
       required: false
+    names:
+      description:
+        - List of Server Hardware names. All of them are retrieved at once and the facts are also returned by name,
+          in C(server_hardwares_by_name). The C(options) related to a single Server Hardware are not gathered.
+      required: false
     options:
       description:
         - "List with options to gather additional facts about Server Hardware related resources.
@@ -45,6 +50,9 @@ options:
 notes:
     - The options C(firmware) and C(firmwares) are only available for API version 300 or later.
     - The option C(physicalServerHardware) is only available for API version 500 or later on SDX enclosures.
+    - "Besides the common params, C(params) accepts C(page_size) and C(max_items). When any of them is informed, the
+       Server Hardwares are retrieved page by page, with C(page_size) Server Hardwares per request, and no more than
+       C(max_items) Server Hardwares are returned."
 extends_documentation_fragment:
     - oneview
     - oneview.factsparams
@@ -59,6 +67,17 @@ EXAMPLES = '''
 - debug: var=server_hardwares
 
 
+- name: Gather facts about a list of Server Hardwares by name
+  oneview_server_hardware_facts:
+    config: "{{ config }}"
+    names:
+      - "172.18.6.15"
+      - "172.18.6.16"
+  delegate_to: localhost
+
+- debug: var=server_hardwares_by_name
+
+
 - name: Gather paginated, filtered and sorted facts about Server Hardware
   oneview_server_hardware_facts:
     config: "{{ config }}"
@@ -72,6 +91,17 @@ EXAMPLES = '''
 - debug: msg="{{server_hardwares | map(attribute='name') | list }}"
 
 
+- name: Gather the names and URIs of the Server Hardware, retrieved 200 by page
+  oneview_server_hardware_facts:
+    config: "{{ config }}"
+    params:
+      fields: name,uri
+      page_size: 200
+  delegate_to: localhost
+
+- debug: msg="{{server_hardwares | map(attribute='name') | list }}"
+
+
 - name: Gather facts about a Server Hardware by name
   oneview_server_hardware_facts:
     config: "{{ config }}"
@@ -138,6 +168,11 @@ server_hardwares:
     returned: Always, but can be null.
     type: complex
 
+server_hardwares_by_name:
+    description: The Server Hardwares by name. The value is null for the names not found.
+    returned: When names is informed.
+    type: dict
+
 server_hardware_bios:
     description: Has all the facts about the Server Hardware BIOS.
     returned: When requested, but can be null.
@@ -192,6 +227,7 @@ class ServerHardwareFactsModule(OneViewModuleBase):
     def __init__(self):
         argument_spec = dict(
             name=dict(required=False, type='str'),
+            names=dict(required=False, type='list'),
             options=dict(required=False, type='list'),
             params=dict(required=False, type='dict')
         )
@@ -207,8 +243,14 @@ class ServerHardwareFactsModule(OneViewModuleBase):
             if self.options and server_hardwares:
                 ansible_facts = self.gather_option_facts(self.options, server_hardwares[0])
 
+        elif self.module.params.get('names'):
+            server_hardwares_by_name = self.get_all_by_names(self.oneview_client.server_hardware,
+                                                             self.module.params['names'])
+            server_hardwares = [sh for sh in server_hardwares_by_name.values() if sh]
+            ansible_facts['server_hardwares_by_name'] = server_hardwares_by_name
+
         else:
-            server_hardwares = self.oneview_client.server_hardware.get_all(**self.facts_params)
+            server_hardwares = self.get_all_facts(self.oneview_client.server_hardware)
 
         if self.options and self.options.get('firmwares'):
             ansible_facts['server_hardware_firmwares'] = self.get_all_firmwares(self.options)
@@ -219,31 +261,32 @@ class ServerHardwareFactsModule(OneViewModuleBase):
 
     def gather_option_facts(self, options, server_hardware):
         srv_hw_client = self.oneview_client.server_hardware
-        ansible_facts = {}
+        uri = server_hardware['uri']
+        fact_getters = []
 
         if options.get('bios'):
-            ansible_facts['server_hardware_bios'] = srv_hw_client.get_bios(server_hardware['uri'])
+            fact_getters.append(('server_hardware_bios', lambda: srv_hw_client.get_bios(uri)))
         if options.get('environmentalConfig'):
-            ansible_facts['server_hardware_env_config'] = srv_hw_client.get_environmental_configuration(
-                server_hardware['uri'])
+            fact_getters.append(('server_hardware_env_config',
+                                 lambda: srv_hw_client.get_environmental_configuration(uri)))
         if options.get('javaRemoteConsoleUrl'):
-            ansible_facts['server_hardware_java_remote_console_url'] = srv_hw_client.get_java_remote_console_url(
-                server_hardware['uri'])
+            fact_getters.append(('server_hardware_java_remote_console_url',
+                                 lambda: srv_hw_client.get_java_remote_console_url(uri)))
         if options.get('iloSsoUrl'):
-            ansible_facts['server_hardware_ilo_sso_url'] = srv_hw_client.get_ilo_sso_url(server_hardware['uri'])
+            fact_getters.append(('server_hardware_ilo_sso_url', lambda: srv_hw_client.get_ilo_sso_url(uri)))
         if options.get('physicalServerHardware'):
-            ansible_facts['server_hardware_physical_server_hardware'] = srv_hw_client.get_physical_server_hardware(
-                server_hardware['uri'])
+            fact_getters.append(('server_hardware_physical_server_hardware',
+                                 lambda: srv_hw_client.get_physical_server_hardware(uri)))
         if options.get('remoteConsoleUrl'):
-            ansible_facts['server_hardware_remote_console_url'] = srv_hw_client.get_remote_console_url(
-                server_hardware['uri'])
+            fact_getters.append(('server_hardware_remote_console_url',
+                                 lambda: srv_hw_client.get_remote_console_url(uri)))
         if options.get('utilization'):
-            ansible_facts['server_hardware_utilization'] = self.get_utilization(server_hardware,
-                                                                                options['utilization'])
+            fact_getters.append(('server_hardware_utilization',
+                                 lambda: self.get_utilization(server_hardware, options['utilization'])))
         if options.get('firmware'):
-            ansible_facts['server_hardware_firmware'] = srv_hw_client.get_firmware(server_hardware["uri"])
+            fact_getters.append(('server_hardware_firmware', lambda: srv_hw_client.get_firmware(uri)))
 
-        return ansible_facts
+        return self.gather_facts_concurrently(fact_getters)
 
     def get_all_firmwares(self, options):
         if isinstance(options['firmwares'], bool):
@@ -29,6 +29,10 @@ short_description: Manage OneView Server Profile resources
 description:
     - Manage the servers lifecycle with OneView Server Profiles. On C(present) state, it selects a server hardware
       automatically based on the server profile configuration if no server hardware was provided.
+    - Supports check mode, in which the names are resolved and the data is merged and compared with the existing
+      profiles as usual, but only reads are issued. The planned action, the field-level changes and whether the
+      Server Hardware would be power cycled are returned in C(server_profile_plans). The power cycle of an update
+      is predicted from the compliance preview C(isOnlineUpdate) and from moves between Server Hardware.
 version_added: "2.5"
 requirements:
     - hpOneView >= 4.0.0
@@ -46,12 +50,63 @@ options:
         C(compliant) will make the server profile compliant with its server profile template, when this option was
         specified. If there are Offline updates, the Server Hardware is turned off before remediate compliance issues
         and turned on after that.
+        When C(data) has only C(serverProfileTemplateName), all the non-compliant profiles derived from that template
+        are remediated in waves of C(wave_size) profiles, the online updates first.
     default: present
     choices: ['present', 'absent', 'compliant']
   data:
     description:
       - List with Server Profile properties.
-    required: true
+      - Required unless C(profiles) is informed.
+  profiles:
+    description:
+      - List of Server Profiles, each one with the same properties as C(data), to be ensured present at once.
+      - The Server Profile Templates and the new profile data from each template are retrieved once for all the
+        profiles, the automatically selected Server Hardware are distinct targets from a single list of available
+        targets, and the profiles are created concurrently, waiting for all their tasks together.
+      - Only supported on C(present) state.
+    version_added: "2.5"
+  parallelism:
+    description:
+      - Maximum number of Server Profiles created at the same time when C(profiles) is informed.
+    default: 8
+  async_tasks:
+    description:
+      - When true, the creations, updates and compliance remediations are requested without waiting for their tasks,
+        and the task URIs are returned in C(task_uris), to be waited for with the C(oneview_task_wait) module.
+      - The updates of Server Profiles assigned, or being assigned, to a Server Hardware are still waited for, as
+        they may fail while the Server Hardware is powered on and are then retried after powering it off. The
+        compliance remediations that require powering off the Server Hardware are also waited for, so the Server
+        Hardware can be powered on again, and the creations are not retried when the Server Hardware is assigned to
+        another profile in the meantime.
+    default: False
+    choices: [True, False]
+  facts_level:
+    description:
+      - Facts gathered about the Server Profile on states C(present) and C(compliant).
+        C(minimal) returns only the Server Profile, C(standard) adds the Server Hardware, and C(full) also adds the
+        compliance preview, an expensive computation on the appliance.
+      - The compliance preview is reused while the Server Profile eTag does not change when a local cache directory is
+        defined with the environment variable ONEVIEW_ETAG_CACHE_DIR.
+    default: full
+    choices: ['minimal', 'standard', 'full']
+  wave_size:
+    description:
+      - Maximum number of Server Profiles remediated at the same time when making all the profiles of a template
+        compliant. Each wave completes, and its offline Server Hardware is powered on again, before the next one.
+    default: 8
+  max_failures:
+    description:
+      - Number of failed remediations tolerated when making all the profiles of a template compliant. Once it is
+        exceeded, the remaining waves are skipped and the module fails.
+    default: 0
+  lookup_key:
+    description:
+      - Property of C(data) used to find the existing Server Profile. The serial number, the Server Hardware URI and
+        the UUID are searched with a filter on the appliance, or with the local index defined by the environment
+        variable ONEVIEW_SERVER_PROFILE_INDEX, which is refreshed incrementally from the profiles modified since.
+    default: name
+    choices: ['name', 'serialNumber', 'serverHardwareUri', 'uuid']
   auto_assign_server_hardware:
     description:
       - Bool indicating whether or not a Server Hardware should be automatically retrieved and assigned to the Server Profile.
@@ -74,6 +129,8 @@ notes:
        is executed it will always be understood that a new volume needs to be created, so this will not be idempotent.
        It is strongly recommended to ensure volumes with Ansible and then assign them to the desired server profile.
        does not exists, so it will be created along with the server profile"
+    - "To make the Server Profiles created at the same time, e.g. with forks, select distinct Server Hardware, define
+       a local allocation ledger file with the environment variable ONEVIEW_ALLOCATION_LEDGER."
 
 extends_documentation_fragment:
     - oneview
@@ -156,6 +213,38 @@ EXAMPLES = '''
       serverHardwareName:
   delegate_to: localhost
 
+- name: Create many Server Profiles from a Server Profile Template, each one with a distinct Server Hardware
+  oneview_server_profile:
+    config: /etc/oneview/oneview_config.json
+    state: present
+    parallelism: 16
+    profiles:
+      - name: Web-Server-L2-01
+        serverProfileTemplateName: Compute-node-template
+      - name: Web-Server-L2-02
+        serverProfileTemplateName: Compute-node-template
+      - name: Web-Server-L2-03
+        serverProfileTemplateName: Compute-node-template
+        serverHardwareName: Encl1, bay 3
+  delegate_to: localhost
+- debug: var=server_profiles
+
+- name: Request the creation of a Server Profile without waiting for it
+  oneview_server_profile:
+    config: /etc/oneview/oneview_config.json
+    async_tasks: True
+    data:
+        name: Web-Server-L2
+        server_template: Compute-node-template
+  delegate_to: localhost
+  register: server_profile_request
+
+- name: Wait for the Server Profile tasks
+  oneview_task_wait:
+    config: /etc/oneview/oneview_config.json
+    task_uris: "{{ task_uris }}"
+  delegate_to: localhost
+
 - name : Remediate compliance issues
   oneview_server_profile:
     config: /etc/oneview/oneview_config.json
@@ -164,6 +253,45 @@ EXAMPLES = '''
         name: Web-Server-L2
   delegate_to: localhost
 
+- name: Ensure the Server Profile assigned to a Server Hardware is absent
+  oneview_server_profile:
+    config: /etc/oneview/oneview_config.json
+    state: absent
+    lookup_key: serverHardwareUri
+    data:
+        serverHardwareUri: /rest/server-hardware/30303437-3034-4D32-3230-313130304752
+  delegate_to: localhost
+
+- name: Remediate the compliance issues of all the profiles of a template, four at a time
+  oneview_server_profile:
+    config: /etc/oneview/oneview_config.json
+    state: compliant
+    wave_size: 4
+    max_failures: 1
+    data:
+        serverProfileTemplateName: Compute-node-template
+  delegate_to: localhost
+
+- name: Report the changes and the power cycles the remediation of a template would cause, without changing anything
+  oneview_server_profile:
+    config: /etc/oneview/oneview_config.json
+    state: compliant
+    data:
+        serverProfileTemplateName: Compute-node-template
+  check_mode: yes
+  delegate_to: localhost
+
+- debug: var=server_profile_plans
+
+- name: Ensure the Server Profile is present, returning only the Server Profile facts
+  oneview_server_profile:
+    config: /etc/oneview/oneview_config.json
+    facts_level: minimal
+    data:
+        name: Web-Server-L2
+        server_template: Compute-node-template
+  delegate_to: localhost
+
 - name : Remove the server profile
   oneview_server_profile:
     config: /etc/oneview/oneview_config.json
@@ -183,27 +311,56 @@ serial_number:
     returned: On states 'present' and 'compliant'.
     type: dict
 server_hardware:
-    description: Has the OneView facts about the Server Hardware.
+    description: Has the OneView facts about the Server Hardware. None when C(facts_level) is minimal.
     returned: On states 'present' and 'compliant'.
     type: dict
 compliance_preview:
     description:
         Has the OneView facts about the manual and automatic updates required to make the server profile
-        consistent with its template.
+        consistent with its template. None when C(facts_level) is not full.
     returned: On states 'present' and 'compliant'.
     type: dict
 created:
     description: Indicates if the Server Profile was created.
     returned: On states 'present' and 'compliant'.
     type: bool
+server_profiles:
+    description:
+        The result for each Server Profile informed in C(profiles), with the keys name, created, changed, msg,
+        server_profile and task_uri. On state C(compliant), the result for each non-compliant Server Profile of the
+        template, with the keys name, changed, msg, online_update and server_profile.
+    returned: On state 'present', when C(profiles) is informed, and on state 'compliant', when only
+        C(serverProfileTemplateName) is informed.
+    type: list
+task_uris:
+    description: The URIs of the tasks requested and not waited for.
+    returned: On states 'present' and 'compliant', when C(async_tasks) is true.
+    type: list
+server_profile_plans:
+    description:
+        The plan for each Server Profile, with the keys name, action (create, update, delete, remediate or None),
+        changes, the JSON patch operations from the existing profile to the desired one, server_hardware_uri and
+        power_cycle, whether powered on Server Hardware would be powered off.
+    returned: In check mode.
+    type: list
 '''
 
 import time
 
+from collections import OrderedDict
 from copy import deepcopy
 
 from ansible.module_utils.basic import AnsibleModule
 from module_utils.oneview import (OneViewModuleBase,
+                                  ResourceNameUriResolver,
+                                  ServerHardwareAllocationLedger,
+                                  ServerProfileIndex,
+                                  ServerProfileLookup,
+                                  get_backoff_delay,
+                                  run_concurrently,
+                                  set_server_hardware_power_state,
+                                  submit_task,
+                                  wait_for_tasks,
                                   ServerProfileReplaceNamesByUris,
                                   HPOneViewValueError,
                                   ServerProfileMerger,
@@ -235,29 +392,79 @@ class ServerProfileModule(OneViewModuleBase):
     MSG_ERROR_ALLOCATE_SERVER_HARDWARE = 'Could not allocate server hardware'
     MSG_MAKE_COMPLIANT_NOT_SUPPORTED = "Update from template is not supported for server profile '{}' because it is" \
                                        " not associated with a server profile template."
+    MSG_DATA_REQUIRED = "Server Profile data is required for this operation."
+    MSG_PROFILES_STATE_NOT_SUPPORTED = "The profiles option is only supported on present state."
+    MSG_PROFILES_NAMES_REQUIRED = "Each Server Profile informed in profiles must have a distinct name."
+    MSG_PROFILES_PRESENT = "Server Profiles created: {}, updated: {}, already present: {}."
+    MSG_PROFILES_NOT_CREATED = "Failed to create Server Profiles: {}"
+    MSG_TASKS_REQUESTED = "Server Profile tasks requested: {}"
+    MSG_PROFILES_REMEDIATED = "Server Profiles remediated: {}, failed: {}, skipped: {}."
+    MSG_PROFILES_NOT_REMEDIATED = "Failed to remediate Server Profiles: {}"
+    MSG_REMEDIATION_SKIPPED = "Skipped, as the remediation failures exceeded max_failures."
+    MSG_LOOKUP_KEY_REQUIRED = "Server Profile {} is required in data to look the Server Profile up by it."
+    MSG_CHECK_MODE = "Check mode, nothing was changed. Server Profiles to create: {}, update: {}, delete: {}, " \
+                     "remediate: {}, with a power cycle: {}."
 
     CONCURRENCY_FAILOVER_RETRIES = 25
 
     argument_spec = dict(
         state=dict(choices=['present', 'absent', 'compliant'], default='present'),
-        data=dict(type='dict', required=True),
+        data=dict(type='dict'),
+        profiles=dict(type='list'),
+        parallelism=dict(type='int', default=8),
+        async_tasks=dict(type='bool', default=False),
+        facts_level=dict(choices=['minimal', 'standard', 'full'], default='full'),
+        wave_size=dict(type='int', default=8),
+        max_failures=dict(type='int', default=0),
+        lookup_key=dict(choices=['name', 'serialNumber', 'serverHardwareUri', 'uuid'], default='name'),
         auto_assign_server_hardware=dict(type='bool', default=True)
     )
 
     def __init__(self):
         super(ServerProfileModule, self).__init__(additional_arg_spec=self.argument_spec,
-                                                  validate_etag_support=True)
+                                                  validate_etag_support=True,
+                                                  supports_check_mode=True)
+        self.name_uri_resolver = ResourceNameUriResolver(self.oneview_client)
+        self.allocation_ledger = ServerHardwareAllocationLedger.from_environment_variables()
 
     def execute_module(self):
         self.auto_assign_server_hardware = self.module.params.get('auto_assign_server_hardware')
+        self.async_tasks = self.module.params.get('async_tasks')
+        self.task_uris = []
+
+        if self.module.params.get('profiles'):
+            if self.state != 'present':
+                raise HPOneViewValueError(self.MSG_PROFILES_STATE_NOT_SUPPORTED)
+            return self.__present_many(self.module.params['profiles'])
 
-        data = deepcopy(self.data)
-        server_profile_name = data.get('name')
+        if not self.data:
+            raise HPOneViewValueError(self.MSG_DATA_REQUIRED)
 
-        server_profile = self.oneview_client.server_profiles.get_by_name(server_profile_name)
+        if self.state == 'compliant' and not self.data.get('name') and self.data.get('serverProfileTemplateName'):
+            return self.__make_compliant_many(self.data['serverProfileTemplateName'])
+
+        server_profile_name = self.data.get('name')
+        server_profiles_uri = self.oneview_client.server_profiles.URI
+
+        desired, server_profile = None, None
+        if self.state == 'present' and self.module.params.get('lookup_key', 'name') == 'name':
+            desired = dict(data=self.data, auto_assign_server_hardware=self.auto_assign_server_hardware)
+            server_profile, converged = self.get_converged_resource(server_profile_name, desired, server_profiles_uri)
+            if converged:
+                return dict(changed=False, msg=self.MSG_ALREADY_PRESENT, ansible_facts=self.__gather_facts(server_profile))
+
+        server_profile = server_profile or self.__get_server_profile(self.data)
+
+        if self.module.check_mode:
+            return self.__check([(self.data, server_profile)])
 
         if self.state == 'present':
-            created, changed, msg, server_profile = self.__present(data, server_profile)
+            created, changed, msg, server_profile = self.__present(self.data, server_profile)
+            if self.task_uris:
+                return self.__tasks_requested()
+            # A profile left without server hardware is checked on the next executions, to auto assign one
+            if server_profile.get('serverHardwareUri') or not self.auto_assign_server_hardware:
+                self.set_converged_resource(server_profile_name, desired, server_profile, server_profiles_uri)
             facts = self.__gather_facts(server_profile)
             facts['created'] = created
             return dict(
@@ -270,33 +477,56 @@ class ServerProfileModule(OneViewModuleBase):
             )
         elif self.state == "compliant":
             changed, msg, server_profile = self.__make_compliant(server_profile)
+            if self.task_uris:
+                return self.__tasks_requested()
             return dict(
                 changed=changed, msg=msg, ansible_facts=self.__gather_facts(server_profile)
             )
 
-    def __present(self, data, resource):
+    def __get_server_profile(self, data):
+        lookup_key = self.module.params.get('lookup_key') or 'name'
+        if lookup_key == 'name':
+            return self.oneview_client.server_profiles.get_by_name(data.get('name'))
+
+        if not data.get(lookup_key):
+            raise HPOneViewValueError(self.MSG_LOOKUP_KEY_REQUIRED.format(lookup_key))
+        server_profile_lookup = ServerProfileLookup(self.oneview_client, ServerProfileIndex.from_environment_variables())
+        return server_profile_lookup.get(lookup_key, data[lookup_key])
+
+    def __tasks_requested(self):
+        return dict(changed=True, msg=self.MSG_TASKS_REQUESTED.format(', '.join(self.task_uris)),
+                    ansible_facts=dict(task_uris=self.task_uris))
+
+    def __request(self, method, uri, resource, default_values=None):
+        task, resource = submit_task(self.oneview_client.connection, uri, resource, default_values, method)
+        if task:
+            # The resource is only known once the task completes
+            self.task_uris.append(task['uri'])
+            return None
+        return resource
 
-        server_template_name = data.pop('serverProfileTemplateName', '')
-        server_hardware_name = data.pop('serverHardwareName', '')
-        server_template = None
-        changed = False
-        created = False
+    def __request_create(self, server_profile):
+        if not self.async_tasks:
+            return self.oneview_client.server_profiles.create(server_profile)
+        return self.__request('post', self.oneview_client.server_profiles.URI, server_profile,
+                              self.oneview_client.server_profiles.DEFAULT_VALUES)
 
-        ServerProfileReplaceNamesByUris().replace(self.oneview_client, data)
+    def __request_update(self, server_profile, wait=False):
+        if wait or not self.async_tasks:
+            return self.oneview_client.server_profiles.update(server_profile, server_profile['uri'])
 
-        if server_hardware_name:
-            selected_server_hardware = self.__get_server_hardware_by_name(server_hardware_name)
-            if not selected_server_hardware:
-                raise HPOneViewValueError(self.MSG_HARDWARE_NOT_FOUND.format(server_hardware_name))
-            data['serverHardwareUri'] = selected_server_hardware['uri']
+        # Removes related fields to serverHardware in case of unassign, as the SDK update does
+        if server_profile.get('serverHardwareUri') is None:
+            server_profile.pop('enclosureBay', None)
+            server_profile.pop('enclosureUri', None)
+        return self.__request('put', server_profile['uri'], server_profile,
+                              self.oneview_client.server_profiles.DEFAULT_VALUES)
 
-        if server_template_name:
-            server_template = self.oneview_client.server_profile_templates.get_by_name(server_template_name)
-            if not server_template:
-                raise HPOneViewValueError(self.MSG_TEMPLATE_NOT_FOUND.format(server_template_name))
-            data['serverProfileTemplateUri'] = server_template['uri']
-        elif data.get('serverProfileTemplateUri'):
-            server_template = self.oneview_client.server_profile_templates.get(data['serverProfileTemplateUri'])
+    def __present(self, original_data, resource):
+
+        data, server_template = self.__resolve_data(original_data)
+        changed = False
+        created = False
 
         if not resource:
             resource = self.__create_profile(data, server_template)
@@ -304,30 +534,131 @@ class ServerProfileModule(OneViewModuleBase):
             created = True
             msg = self.MSG_CREATED
         else:
-            # This allows unassigning a profile if a SH key is specifically passed in as None
-            if not self.auto_assign_server_hardware:
-                server_hardware_uri_exists = False
-                if 'serverHardwareUri' in self.module.params['data'].keys() or 'serverHardwareName' in self.module.params['data'].keys():
-                    server_hardware_uri_exists = True
-                if data.get('serverHardwareUri') is None and server_hardware_uri_exists:
-                    data['serverHardwareUri'] = None
+            self.__unassign_server_hardware_if_requested(original_data, data)
 
             # Auto assigns a Server Hardware to Server Profile if auto_assign_server_hardware is True and no SH uris exist
+            reserved_server_hardware_uri = None
             if not resource.get('serverHardwareUri') and not data.get('serverHardwareUri') and self.auto_assign_server_hardware:
                 data['serverHardwareUri'] = self._auto_assign_server_profile(data, server_template)
+                reserved_server_hardware_uri = data['serverHardwareUri']
+
+            try:
+                merged_data = self.__merge_data(resource, data)
+
+                if not ResourceComparator.compare(resource, merged_data):
+                    resource = self.__update_server_profile(merged_data, resource, original_data)
+                    changed = True
+                    msg = self.MSG_UPDATED
+                else:
+                    msg = self.MSG_ALREADY_PRESENT
+            finally:
+                self.__release_server_hardware(reserved_server_hardware_uri, data.get('name'))
+
+        return created, changed, msg, resource
 
-            merged_data = ServerProfileMerger().merge_data(resource, data)
+    def __merge_data(self, resource, data):
+        # Merges the data into the profile, normalizing the OS custom attributes of both before they are compared
+        merged_data = ServerProfileMerger().merge_data(resource, data)
+        self.__validations_for_os_custom_attributes(data, merged_data, resource)
+        return merged_data
 
-            self.__validations_for_os_custom_attributes(data, merged_data, resource)
+    def __resolve_data(self, original_data, templates=None):
+        data = deepcopy(original_data)
+        server_template_name = data.pop('serverProfileTemplateName', '')
+        server_hardware_name = data.pop('serverHardwareName', '')
 
-            if not ResourceComparator.compare(resource, merged_data):
-                resource = self.__update_server_profile(merged_data, resource)
-                changed = True
-                msg = self.MSG_UPDATED
+        ServerProfileReplaceNamesByUris(self.name_uri_resolver).replace(self.oneview_client, data)
+
+        if server_hardware_name:
+            selected_server_hardware = self.__get_server_hardware_by_name(server_hardware_name)
+            if not selected_server_hardware:
+                raise HPOneViewValueError(self.MSG_HARDWARE_NOT_FOUND.format(server_hardware_name))
+            data['serverHardwareUri'] = selected_server_hardware['uri']
+
+        server_template = self.__get_server_template(data, server_template_name, templates)
+
+        return data, server_template
+
+    def __unassign_server_hardware_if_requested(self, original_data, data):
+        # This allows unassigning a profile if a SH key is specifically passed in as None
+        if not self.auto_assign_server_hardware:
+            server_hardware_uri_exists = False
+            if 'serverHardwareUri' in original_data.keys() or 'serverHardwareName' in original_data.keys():
+                server_hardware_uri_exists = True
+            if data.get('serverHardwareUri') is None and server_hardware_uri_exists:
+                data['serverHardwareUri'] = None
+
+    def __check(self, profiles):
+        templates = {}
+        plans = run_concurrently([lambda data=data, server_profile=server_profile:
+                                  self.__plan(data, server_profile, templates)
+                                  for data, server_profile in profiles], self.module.params.get('parallelism'))
+
+        def count(action):
+            return len([plan for plan in plans if plan['action'] == action])
+
+        msg = self.MSG_CHECK_MODE.format(count('create'), count('update'), count('delete'), count('remediate'),
+                                         len([plan for plan in plans if plan['power_cycle']]))
+        return dict(changed=any(plan['action'] for plan in plans), msg=msg,
+                    ansible_facts=dict(server_profile_plans=plans))
+
+    def __plan(self, original_data, server_profile, templates):
+        # Follows the same steps of the state issuing only reads, so nothing is changed in check mode
+        action, changes, powered_off_uris = None, [], []
+        server_hardware_uri = server_profile.get('serverHardwareUri') if server_profile else None
+
+        if self.state == 'present':
+            data, server_template = self.__resolve_data(original_data, templates)
+            if server_profile:
+                self.__unassign_server_hardware_if_requested(original_data, data)
+            if not server_hardware_uri and not data.get('serverHardwareUri') and self.auto_assign_server_hardware:
+                # The first candidate is the one reserved when no other creation runs at the same time
+                candidates = self.__get_available_server_hardware_candidates(data, server_template)
+                data['serverHardwareUri'] = candidates[0] if candidates else None
+
+            if not server_profile:
+                action, changes = 'create', ResourceComparator.build_patch({}, data)
+                server_hardware_uri = data.get('serverHardwareUri')
+                powered_off_uris = [server_hardware_uri]
             else:
-                msg = self.MSG_ALREADY_PRESENT
+                # The merge may change the profile got from OneView, so it works on a copy
+                server_profile = deepcopy(server_profile)
+                merged_data = self.__merge_data(server_profile, data)
+                changes = ResourceComparator.build_patch(server_profile, merged_data)
+                if changes:
+                    action = 'update'
+                    server_hardware_uri = merged_data.get('serverHardwareUri')
+                    if server_hardware_uri != server_profile.get('serverHardwareUri'):
+                        # The profile is only moved between Server Hardware powered off
+                        powered_off_uris = [server_profile.get('serverHardwareUri'), server_hardware_uri]
+                    elif server_profile.get('serverProfileTemplateUri') and \
+                            self.__get_compliance_preview(server_profile).get('isOnlineUpdate') is False:
+                        powered_off_uris = [server_hardware_uri]
 
-        return created, changed, msg, resource
+        elif self.state == 'absent':
+            if server_profile:
+                action = 'delete'
+                powered_off_uris = [server_hardware_uri]
+
+        elif self.state == 'compliant':
+            if not server_profile:
+                raise HPOneViewValueError(self.MSG_NOT_FOUND)
+            if not server_profile.get('serverProfileTemplateUri'):
+                raise HPOneViewValueError(self.MSG_MAKE_COMPLIANT_NOT_SUPPORTED.format(server_profile['name']))
+            if server_profile['templateCompliance'] != 'Compliant':
+                action = 'remediate'
+                changes = [dict(op='replace', path='/templateCompliance', value='Compliant')]
+                if self.__get_compliance_preview(server_profile).get('isOnlineUpdate') is False:
+                    powered_off_uris = [server_hardware_uri]
+
+        return dict(name=original_data.get('name'), action=action, changes=changes,
+                    server_hardware_uri=server_hardware_uri,
+                    power_cycle=self.__is_any_powered_on(powered_off_uris))
+
+    def __is_any_powered_on(self, server_hardware_uris):
+        power_states = [self.oneview_client.server_hardware.get(uri).get('powerState')
+                        for uri in set(server_hardware_uris) if uri]
+        return 'On' in power_states
 
     # Removes .mac entries from resource os_custom_attributes if no .mac passed into data params.
     # Swaps True values for 'true' string, and False values for 'false' string to avoid common user errors.
@@ -369,37 +700,42 @@ class ServerProfileModule(OneViewModuleBase):
                 matches.append(position)
         return matches
 
-    def __update_server_profile(self, profile_with_updates, original_profile):
+    def __update_server_profile(self, profile_with_updates, original_profile, original_data):
         logger.debug(msg="Updating Server Profile")
 
         # These removes are necessary in case SH associated to the SP is being changed
-        if self.data.get('enclosureUri') is None:
+        if original_data.get('enclosureUri') is None:
             profile_with_updates.pop('enclosureUri', None)
-        if self.data.get('enclosureBay') is None:
+        if original_data.get('enclosureBay') is None:
             profile_with_updates.pop('enclosureBay', None)
 
         # Some specific SP operations require the SH to be powered off. This method attempts
         # the update, and in case of failure mentioning powering off the SH, a Power off on
         # the SH is attempted, followed by the update operation again and a Power On.
+        # The failure is only known from the task, so the updates involving a SH are waited for even with async_tasks.
+        server_hardware_uris = [original_profile.get('serverHardwareUri'), profile_with_updates.get('serverHardwareUri')]
         try:
-            resource = self.oneview_client.server_profiles.update(profile_with_updates, profile_with_updates['uri'])
+            resource = self.__request_update(profile_with_updates, wait=any(server_hardware_uris))
         except HPOneViewException as exception:
             error_msg = '; '.join(str(e) for e in exception.args)
             power_on_msg = 'Some server profile attributes cannot be changed while the server hardware is powered on.'
             if power_on_msg in error_msg:
                 logger.debug("Update failed due to powered on Server Hardware. Powering off before retrying.")
-                time.sleep(10)  # sleep timer to avoid timing issues after update operation failed
 
                 # When reassigning Server Hardwares, both the original and the new SH should be set to OFF
-                self.__set_server_hardware_power_state(original_profile['serverHardwareUri'], 'Off')
-                self.__set_server_hardware_power_state(profile_with_updates['serverHardwareUri'], 'Off')
+                previous_power_states = set_server_hardware_power_state(
+                    self.oneview_client,
+                    [original_profile.get('serverHardwareUri'), profile_with_updates.get('serverHardwareUri')], 'Off')
 
                 logger.debug("Retrying update operation after server power off")
                 resource = self.oneview_client.server_profiles.update(profile_with_updates,
                                                                       profile_with_updates['uri'])
 
-                logger.debug("Powering on the server hardware after update")
-                self.__set_server_hardware_power_state(profile_with_updates['serverHardwareUri'], 'On')
+                # The SH is only powered on again when it was running before the update
+                if 'On' in previous_power_states.values():
+                    logger.debug("Powering on the server hardware after update")
+                    set_server_hardware_power_state(
+                        self.oneview_client, [profile_with_updates.get('serverHardwareUri')], 'On')
             else:
                 raise HPOneViewException(error_msg)
         return resource
@@ -409,6 +745,7 @@ class ServerProfileModule(OneViewModuleBase):
         self.__remove_inconsistent_data(data)
 
         while tries < self.CONCURRENCY_FAILOVER_RETRIES:
+            server_hardware_uri = None
             try:
                 tries += 1
 
@@ -422,29 +759,248 @@ class ServerProfileModule(OneViewModuleBase):
                 server_profile = self.__build_new_profile_data(data, server_profile_template, server_hardware_uri)
 
                 logger.debug(msg="Request Server Profile creation")
-                return self.oneview_client.server_profiles.create(server_profile)
+                created_profile = self.__request_create(server_profile)
+
+                if self.async_tasks:
+                    # The server hardware is still being assigned, so the reservation is kept until its lease expires
+                    server_hardware_uri = data.get('serverHardwareUri')
+
+                return created_profile
 
             except HPOneViewTaskError as task_error:
                 logger.exception("Error code: {} Message: {}".format(str(task_error.error_code), str(task_error.msg)))
                 if task_error.error_code in self.ASSIGN_HARDWARE_ERROR_CODES:
                     # if this is because the server is already assigned, someone grabbed it before we assigned,
                     # ignore and try again
-                    # This waiting time was chosen empirically and it could differ according to the hardware.
-                    time.sleep(10)
+                    time.sleep(get_backoff_delay(tries))
                 else:
                     raise task_error
+            finally:
+                if server_hardware_uri != data.get('serverHardwareUri'):
+                    self.__release_server_hardware(server_hardware_uri, data.get('name'))
 
         raise HPOneViewException(self.MSG_ERROR_ALLOCATE_SERVER_HARDWARE)
 
-    def __build_new_profile_data(self, data, server_template, server_hardware_uri):
+    def __present_many(self, profiles):
+        names = [data.get('name') for data in profiles]
+        if not all(names) or len(set(names)) != len(names):
+            raise HPOneViewValueError(self.MSG_PROFILES_NAMES_REQUIRED)
+
+        server_profiles = self.get_all_by_names(self.oneview_client.server_profiles, names)
+
+        if self.module.check_mode:
+            return self.__check([(data, server_profiles[data['name']]) for data in profiles])
+
+        results = OrderedDict()
+        profiles_to_create = []
+        for data in profiles:
+            server_profile = server_profiles[data['name']]
+            if server_profile:
+                # The profiles already present are updated as in the single profile mode
+                requested_tasks = len(self.task_uris)
+                created, changed, msg, server_profile = self.__present(data, server_profile)
+                task_uri = self.task_uris[-1] if len(self.task_uris) > requested_tasks else None
+                results[data['name']] = dict(name=data['name'], created=False, changed=changed, msg=msg,
+                                             server_profile=server_profile, task_uri=task_uri)
+            else:
+                results[data['name']] = None
+                profiles_to_create.append(deepcopy(data))
+
+        if profiles_to_create:
+            results.update(self.__create_profiles(profiles_to_create))
+
+        results = list(results.values())
+        created = len([result for result in results if result['created']])
+        updated = len([result for result in results if result['changed']]) - created
+
+        facts = dict(server_profiles=results)
+        if self.async_tasks:
+            facts['task_uris'] = self.task_uris
+
+        return dict(changed=any(result['changed'] for result in results),
+                    msg=self.MSG_PROFILES_PRESENT.format(created, updated, len(results) - created - updated),
+                    ansible_facts=facts)
+
+    def __create_profiles(self, profiles):
+        parallelism = self.module.params.get('parallelism')
+        server_hardware_names = [data['serverHardwareName'] for data in profiles if data.get('serverHardwareName')]
+        server_hardware = self.get_all_by_names(self.oneview_client.server_hardware, server_hardware_names)
+
+        templates = {}
+        pending = []
+        for data in profiles:
+            server_template_name = data.pop('serverProfileTemplateName', '')
+            server_hardware_name = data.pop('serverHardwareName', '')
+
+            ServerProfileReplaceNamesByUris(self.name_uri_resolver).replace(self.oneview_client, data)
+
+            if server_hardware_name:
+                if not server_hardware[server_hardware_name]:
+                    raise HPOneViewValueError(self.MSG_HARDWARE_NOT_FOUND.format(server_hardware_name))
+                data['serverHardwareUri'] = server_hardware[server_hardware_name]['uri']
+
+            server_template = self.__get_server_template(data, server_template_name, templates)
+            self.__remove_inconsistent_data(data)
+            pending.append((data, server_template))
+
+        # The new profile data is got once for each template, instead of once for each profile
+        template_uris = list(set(template['uri'] for _, template in pending if template))
+        new_profiles = dict(zip(template_uris, run_concurrently(
+            [lambda uri=uri: self.oneview_client.server_profile_templates.get_new_profile(uri) for uri in template_uris],
+            parallelism)))
+
+        results = {}
+        errors = []
+        tries = 0
+        while pending:
+            tries += 1
+            server_hardware_uris = self.__claim_server_hardware(pending)
+
+            outcomes, task_uris = self.__submit_profiles(
+                [(data, server_template, server_hardware_uri, new_profiles.get((server_template or {}).get('uri')))
+                 for (data, server_template), server_hardware_uri in zip(pending, server_hardware_uris)])
+
+            retries = []
+            for index, (data, server_template) in enumerate(pending):
+                server_profile, error = outcomes[index]
+                # The server hardware of the tasks not waited for is still being assigned
+                if server_hardware_uris[index] != data.get('serverHardwareUri') and not task_uris[index]:
+                    self.__release_server_hardware(server_hardware_uris[index], data['name'])
+
+                if not error:
+                    results[data['name']] = dict(name=data['name'], created=True, changed=True, msg=self.MSG_CREATED,
+                                                 server_profile=server_profile, task_uri=task_uris[index])
+                elif getattr(error, 'error_code', None) in self.ASSIGN_HARDWARE_ERROR_CODES and \
+                        tries < self.CONCURRENCY_FAILOVER_RETRIES:
+                    # Another profile got the server hardware first, so a new one is claimed on the next try
+                    retries.append((data, server_template))
+                elif getattr(error, 'error_code', None) in self.ASSIGN_HARDWARE_ERROR_CODES:
+                    errors.append("{}: {}".format(data['name'], self.MSG_ERROR_ALLOCATE_SERVER_HARDWARE))
+                else:
+                    errors.append("{}: {}".format(data['name'], error.msg))
+
+            pending = retries
+            if pending:
+                time.sleep(get_backoff_delay(tries))
+
+        if errors:
+            raise HPOneViewException(self.MSG_PROFILES_NOT_CREATED.format('; '.join(errors)))
+
+        return results
+
+    def __claim_server_hardware(self, profiles):
+        claimed = set(data['serverHardwareUri'] for data, _ in profiles if data.get('serverHardwareUri'))
+
+        # Profiles with the same enclosure group and server hardware type share the list of available targets
+        groups = OrderedDict()
+        for index, (data, server_template) in enumerate(profiles):
+            if not data.get('serverHardwareUri') and self.auto_assign_server_hardware:
+                source = server_template or data
+                key = (source.get('enclosureGroupUri', ''), source.get('serverHardwareTypeUri', ''))
+                groups.setdefault(key, []).append(index)
+
+        logger.debug(msg="Finding the available server hardware for {} profiles".format(len(profiles)))
+        available_targets = run_concurrently(
+            [lambda key=key: self.oneview_client.server_profiles.get_available_targets(
+                enclosureGroupUri=key[0], serverHardwareTypeUri=key[1]) for key in groups],
+            self.module.params.get('parallelism'))
+
+        server_hardware_uris = [data.get('serverHardwareUri') for data, _ in profiles]
+        for indexes, targets in zip(groups.values(), available_targets):
+            # targets will list empty bays and the server hardware claimed by the other profiles
+            candidates = [target['serverHardwareUri'] for target in targets['targets']
+                          if target['serverHardwareUri'] and target['serverHardwareUri'] not in claimed]
+            for index in indexes:
+                if not candidates:
+                    break
+                server_hardware_uri = self.__reserve_server_hardware(candidates, profiles[index][0]['name'])
+                candidates.remove(server_hardware_uri)
+                server_hardware_uris[index] = server_hardware_uri
+
+        return server_hardware_uris
+
+    def __reserve_server_hardware(self, candidates, server_profile_name):
+        server_hardware_uri = None
+        if self.allocation_ledger:
+            # Concurrent creations reserve different server hardware, falling back to the first one when all of them
+            # are reserved
+            server_hardware_uri = self.allocation_ledger.reserve(candidates, server_profile_name)
+        return server_hardware_uri or candidates[0]
+
+    def __release_server_hardware(self, server_hardware_uri, server_profile_name):
+        if self.allocation_ledger and server_hardware_uri:
+            self.allocation_ledger.release(server_hardware_uri, server_profile_name)
+
+    def __submit_profiles(self, profiles):
+        server_profiles = self.oneview_client.server_profiles
+
+        def submit(data, server_template, server_hardware_uri, new_profile):
+            try:
+                if server_hardware_uri:
+                    logger.debug(msg="Power off the Server Hardware before create the Server Profile")
+                    self.__set_server_hardware_power_state(server_hardware_uri, 'Off')
+
+                server_profile = self.__build_new_profile_data(data, server_template, server_hardware_uri, new_profile)
+
+                logger.debug(msg="Request Server Profile creation")
+                task, server_profile = submit_task(self.oneview_client.connection, server_profiles.URI,
+                                                   server_profile, server_profiles.DEFAULT_VALUES)
+                return task, (server_profile, None)
+            except HPOneViewException as exception:
+                return None, (None, exception)
+
+        submitted = run_concurrently([lambda profile=profile: submit(*profile) for profile in profiles],
+                                     self.module.params.get('parallelism'))
+
+        outcomes = [outcome for _, outcome in submitted]
+        tasks = [(index, task) for index, (task, _) in enumerate(submitted) if task]
+        task_uris = [None] * len(profiles)
+
+        if self.async_tasks:
+            for index, task in tasks:
+                task_uris[index] = task['uri']
+                self.task_uris.append(task['uri'])
+            return outcomes, task_uris
+
+        task_outcomes = wait_for_tasks(self.oneview_client.connection, [task for _, task in tasks],
+                                       max_workers=self.module.params.get('parallelism'))
+        for (index, _), outcome in zip(tasks, task_outcomes):
+            outcomes[index] = outcome
+
+        return outcomes, task_uris
+
+    def __get_server_template(self, data, server_template_name, templates=None):
+        templates = {} if templates is None else templates
+
+        if server_template_name:
+            if server_template_name not in templates:
+                templates[server_template_name] = self.oneview_client.server_profile_templates.get_by_name(
+                    server_template_name)
+            server_template = templates[server_template_name]
+            if not server_template:
+                raise HPOneViewValueError(self.MSG_TEMPLATE_NOT_FOUND.format(server_template_name))
+            data['serverProfileTemplateUri'] = server_template['uri']
+            return server_template
+        elif data.get('serverProfileTemplateUri'):
+            if data['serverProfileTemplateUri'] not in templates:
+                templates[data['serverProfileTemplateUri']] = self.oneview_client.server_profile_templates.get(
+                    data['serverProfileTemplateUri'])
+            return templates[data['serverProfileTemplateUri']]
+
+        return None
+
+    def __build_new_profile_data(self, data, server_template, server_hardware_uri, new_profile=None):
 
         server_profile_data = deepcopy(data)
 
         if server_template:
-            logger.debug(msg="Get new Profile from template")
+            if new_profile:
+                server_profile_template = deepcopy(new_profile)
+            else:
+                logger.debug(msg="Get new Profile from template")
 
-            server_profile_template = self.oneview_client.server_profile_templates.get_new_profile(
-                server_template['uri'])
+                server_profile_template = self.oneview_client.server_profile_templates.get_new_profile(
+                    server_template['uri'])
 
             server_profile_template.update(server_profile_data)
             server_profile_data = server_profile_template
@@ -491,7 +1047,15 @@ class ServerProfileModule(OneViewModuleBase):
                         volume.pop(SPKeys.LUN, None)
 
     def __get_available_server_hardware_uri(self, server_profile, server_template):
+        candidates = self.__get_available_server_hardware_candidates(server_profile, server_template)
+        server_hardware_uri = None
+        if candidates:
+            server_hardware_uri = self.__reserve_server_hardware(candidates, server_profile.get('name'))
+
+        logger.debug(msg="Found available server hardware: '{}'".format(server_hardware_uri))
+        return server_hardware_uri
 
+    def __get_available_server_hardware_candidates(self, server_profile, server_template):
         if server_template:
             enclosure_group = server_template.get('enclosureGroupUri', '')
             server_hardware_type = server_template.get('serverHardwareTypeUri', '')
@@ -505,14 +1069,8 @@ class ServerProfileModule(OneViewModuleBase):
             serverHardwareTypeUri=server_hardware_type)
 
         # targets will list empty bays. We need to pick one that has a server
-        index = 0
-        server_hardware_uri = None
-        while not server_hardware_uri and index < len(available_server_hardware['targets']):
-            server_hardware_uri = available_server_hardware['targets'][index]['serverHardwareUri']
-            index = index + 1
-
-        logger.debug(msg="Found available server hardware: '{}'".format(server_hardware_uri))
-        return server_hardware_uri
+        return [target['serverHardwareUri'] for target in available_server_hardware['targets']
+                if target['serverHardwareUri']]
 
     def __delete_profile(self, server_profile):
         if not server_profile:
@@ -537,39 +1095,151 @@ class ServerProfileModule(OneViewModuleBase):
             logger.debug(
                 "Get the preview of manual and automatic updates required to make the server profile consistent "
                 "with its template.")
-            compliance_preview = self.oneview_client.server_profiles.get_compliance_preview(server_profile['uri'])
+            compliance_preview = self.__get_compliance_preview(server_profile)
 
             logger.debug(str(compliance_preview))
 
             is_offline_update = compliance_preview.get('isOnlineUpdate') is False
 
+            previous_power_states = {}
             if is_offline_update:
                 logger.debug(msg="Power off the server hardware before update from template")
-                self.__set_server_hardware_power_state(server_profile['serverHardwareUri'], 'Off')
+                previous_power_states = set_server_hardware_power_state(
+                    self.oneview_client, [server_profile['serverHardwareUri']], 'Off')
 
             logger.debug(msg="Updating from template")
 
-            server_profile = self.oneview_client.server_profiles.patch(
-                server_profile['uri'], 'replace', '/templateCompliance', 'Compliant')
+            if self.async_tasks and not is_offline_update:
+                server_profile = self.__request('patch', server_profile['uri'], [
+                    dict(op='replace', path='/templateCompliance', value='Compliant')]) or server_profile
+            else:
+                server_profile = self.oneview_client.server_profiles.patch(
+                    server_profile['uri'], 'replace', '/templateCompliance', 'Compliant')
 
-            if is_offline_update:
+            if previous_power_states.get(server_profile['serverHardwareUri']) == 'On':
                 logger.debug(msg="Power on the server hardware after update from template")
-                self.__set_server_hardware_power_state(server_profile['serverHardwareUri'], 'On')
+                set_server_hardware_power_state(self.oneview_client, [server_profile['serverHardwareUri']], 'On')
 
             changed = True
             msg = self.MSG_REMEDIATED_COMPLIANCE
 
         return changed, msg, server_profile
 
+    def __make_compliant_many(self, server_template_name):
+        server_template = self.__get_server_template({}, server_template_name)
+        parallelism = self.module.params.get('parallelism')
+        wave_size = max(1, self.module.params.get('wave_size') or 1)
+        max_failures = self.module.params.get('max_failures') or 0
+
+        # A single request gets all the profiles derived from the template that are not compliant with it
+        server_profiles = self.oneview_client.server_profiles.get_all(filter=[
+            "serverProfileTemplateUri='{}'".format(server_template['uri']), "templateCompliance='NonCompliant'"])
+
+        if self.module.check_mode:
+            return self.__check([(dict(name=server_profile['name']), server_profile)
+                                 for server_profile in server_profiles])
+
+        compliance_previews = run_concurrently(
+            [lambda server_profile=server_profile: self.__get_compliance_preview(server_profile, server_template)
+             for server_profile in server_profiles], parallelism)
+
+        # The online updates go first, as they do not interrupt the workloads
+        online_updates, offline_updates = [], []
+        for server_profile, compliance_preview in zip(server_profiles, compliance_previews):
+            if compliance_preview.get('isOnlineUpdate') is False:
+                offline_updates.append(server_profile)
+            else:
+                online_updates.append(server_profile)
+        waves = [(online_updates[index:index + wave_size], True) for index in range(0, len(online_updates), wave_size)]
+        waves += [(offline_updates[index:index + wave_size], False)
+                  for index in range(0, len(offline_updates), wave_size)]
+
+        results = OrderedDict((server_profile['name'], None) for server_profile in server_profiles)
+        failures = []
+        for wave, is_online_update in waves:
+            if len(failures) > max_failures:
+                outcomes = [(None, None)] * len(wave)
+            else:
+                outcomes = self.__remediate_wave(wave, is_online_update)
+
+            for server_profile, (resource, exception) in zip(wave, outcomes):
+                if exception:
+                    failures.append("{}: {}".format(server_profile['name'], exception.msg))
+                    msg = exception.msg
+                else:
+                    msg = self.MSG_REMEDIATED_COMPLIANCE if resource else self.MSG_REMEDIATION_SKIPPED
+                results[server_profile['name']] = dict(name=server_profile['name'], changed=bool(resource), msg=msg,
+                                                       online_update=is_online_update,
+                                                       server_profile=resource or server_profile)
+
+        results = list(results.values())
+        remediated = len([result for result in results if result['changed']])
+        skipped = len([result for result in results if result['msg'] == self.MSG_REMEDIATION_SKIPPED])
+        facts = dict(server_profiles=results)
+
+        if len(failures) > max_failures:
+            self.module.fail_json(msg=self.MSG_PROFILES_NOT_REMEDIATED.format('; '.join(failures)),
+                                  ansible_facts=facts)
+
+        return dict(changed=remediated > 0,
+                    msg=self.MSG_PROFILES_REMEDIATED.format(remediated, len(failures), skipped),
+                    ansible_facts=facts)
+
+    def __remediate_wave(self, server_profiles, is_online_update):
+        parallelism = self.module.params.get('parallelism')
+        hardware_uris = [server_profile.get('serverHardwareUri') for server_profile in server_profiles]
+
+        def submit(server_profile):
+            try:
+                task, resource = submit_task(self.oneview_client.connection, server_profile['uri'],
+                                             [dict(op='replace', path='/templateCompliance', value='Compliant')],
+                                             None, 'patch')
+                return task, (resource, None)
+            except HPOneViewException as exception:
+                return None, (None, exception)
+
+        # The failures are reported on the profiles of the wave, so the other waves are still remediated
+        previous_power_states, outcomes = {}, []
+        try:
+            if not is_online_update:
+                logger.debug(msg="Power off the server hardware before update from template")
+                set_server_hardware_power_state(self.oneview_client, hardware_uris, 'Off', max_workers=parallelism,
+                                                previous_states=previous_power_states)
+
+            logger.debug(msg="Updating from template")
+            submitted = run_concurrently([lambda server_profile=server_profile: submit(server_profile)
+                                          for server_profile in server_profiles], parallelism)
+
+            outcomes = [outcome for _, outcome in submitted]
+            tasks = [(index, task) for index, (task, _) in enumerate(submitted) if task]
+            task_outcomes = wait_for_tasks(self.oneview_client.connection, [task for _, task in tasks],
+                                           max_workers=parallelism)
+            for (index, _), outcome in zip(tasks, task_outcomes):
+                outcomes[index] = outcome
+        except HPOneViewException as exception:
+            outcomes = [(None, exception)] * len(server_profiles)
+        finally:
+            powered_on = [uri for uri in hardware_uris if previous_power_states.get(uri) == 'On']
+            if powered_on:
+                logger.debug(msg="Power on the server hardware after update from template")
+                try:
+                    set_server_hardware_power_state(self.oneview_client, powered_on, 'On', max_workers=parallelism)
+                except HPOneViewException as exception:
+                    outcomes = [(resource, exception) if previous_power_states.get(uri) == 'On' else (resource, error)
+                                for uri, (resource, error) in zip(hardware_uris, outcomes)]
+
+        return outcomes
+
     def __gather_facts(self, server_profile):
+        facts_level = self.module.params.get('facts_level') or 'full'
 
         server_hardware = None
-        if server_profile.get('serverHardwareUri'):
+        if facts_level != 'minimal' and server_profile.get('serverHardwareUri'):
             server_hardware = self.oneview_client.server_hardware.get(server_profile['serverHardwareUri'])
 
         compliance_preview = None
-        if server_profile.get('serverProfileTemplateUri'):
-            compliance_preview = self.oneview_client.server_profiles.get_compliance_preview(server_profile.get('uri'))
+        if facts_level == 'full' and server_profile.get('serverProfileTemplateUri'):
+            compliance_preview = self.__get_compliance_preview(server_profile)
 
         facts = {
             'serial_number': server_profile.get('serialNumber'),
@@ -581,6 +1251,29 @@ class ServerProfileModule(OneViewModuleBase):
 
         return facts
 
+    def __get_compliance_preview(self, server_profile, server_template=None):
+        # The compliance preview changes along with the profile and with its template, so it is reused while the eTags
+        # of both are the same. It is not cached when the template eTag can not be checked.
+        cache_key, etag = None, None
+        if self.etag_cache and server_profile.get('eTag'):
+            template_uri = server_profile.get('serverProfileTemplateUri')
+            if not server_template or server_template.get('uri') != template_uri:
+                try:
+                    server_template = self.oneview_client.server_profile_templates.get(template_uri)
+                except HPOneViewException:
+                    server_template = None
+            if server_template and server_template.get('eTag'):
+                cache_key = 'compliance-preview:{}:{}'.format(server_profile['uri'], template_uri)
+                etag = '{}:{}'.format(server_profile['eTag'], server_template['eTag'])
+
+        compliance_preview = self.etag_cache.get(cache_key, etag) if etag else None
+        if compliance_preview is None:
+            compliance_preview = self.oneview_client.server_profiles.get_compliance_preview(server_profile['uri'])
+            if etag:
+                self.etag_cache.set(cache_key, etag, compliance_preview)
+
+        return compliance_preview
+
     def __get_server_hardware_by_name(self, server_hardware_name):
         server_hardwares = self.oneview_client.server_hardware.get_by('name', server_hardware_name)
         return server_hardwares[0] if server_hardwares else None
@@ -36,6 +36,25 @@ options:
       description:
         - Server Profile name.
       required: false
+    names:
+      description:
+        - List of Server Profile names. All of them are retrieved at once and the facts are also returned by name,
+          in C(server_profiles_by_name). The C(options) that require a Server Profile name are ignored.
+      required: false
+    serial_number:
+      description:
+        - Serial number of the Server Profile. The profile is searched with a filter on the appliance, or with the
+          local index defined by the environment variable ONEVIEW_SERVER_PROFILE_INDEX. It can replace C(name) in
+          the C(options) that require a Server Profile.
+      required: false
+    server_hardware_uri:
+      description:
+        - URI of the Server Hardware the Server Profile is assigned to, searched as C(serial_number).
+      required: false
+    uuid:
+      description:
+        - UUID of the Server Profile, searched as C(serial_number).
+      required: false
     options:
       description:
         - "List with options to gather additional facts about Server Profile related resources.
@@ -43,7 +62,8 @@ options:
           C(available_networks), C(available_servers), C(available_storage_system), C(available_storage_systems),
           C(available_targets), C(newProfileTemplate),"
         - "To gather facts about C(compliancePreview), C(messages), C(newProfileTemplate) and C(transformation)
-           a Server Profile name is required. Otherwise, these options will be ignored."
+           a Server Profile name, serial number, server hardware URI or UUID is required. Otherwise, these options
+           will be ignored."
       required: false
 
 extends_documentation_fragment:
@@ -59,6 +79,26 @@ EXAMPLES = '''
 
 - debug: var=server_profiles
 
+- name: Gather facts about a list of Server Profiles by name
+  oneview_server_profile_facts:
+    config: "{{ config }}"
+    names:
+      - "Encl1, bay 1"
+      - "Encl1, bay 2"
+  delegate_to: localhost
+
+- debug: var=server_profiles_by_name
+
+- name: Gather facts about the Server Profile of a host by its serial number
+  oneview_server_profile_facts:
+    config: "{{ config }}"
+    serial_number: "VCGE9KB041"
+    options:
+      - compliancePreview
+  delegate_to: localhost
+
+- debug: var=server_profiles
+
 - name: Gather paginated, filtered and sorted facts about Server Profiles
   oneview_server_profile_facts:
     config: "{{ config }}"
@@ -143,6 +183,11 @@ server_profiles:
     returned: Always, but can be null.
     type: complex
 
+server_profiles_by_name:
+    description: The Server Profiles by name. The value is null for the names not found.
+    returned: When names is informed.
+    type: dict
+
 server_profile_schema:
     description: Has the facts about the Server Profile schema.
     returned: When requested, but can be null.
@@ -213,16 +258,22 @@ server_profile_available_targets:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from module_utils.oneview import OneViewModuleBase
+from module_utils.oneview import OneViewModuleBase, ServerProfileIndex, ServerProfileLookup
 
 
 class ServerProfileFactsModule(OneViewModuleBase):
     argument_spec = dict(
         name=dict(required=False, type='str'),
+        names=dict(required=False, type='list'),
+        serial_number=dict(required=False, type='str'),
+        server_hardware_uri=dict(required=False, type='str'),
+        uuid=dict(required=False, type='str'),
         options=dict(required=False, type='list'),
         params=dict(required=False, type='dict')
     )
 
+    LOOKUP_KEYS = (('serial_number', 'serialNumber'), ('server_hardware_uri', 'serverHardwareUri'), ('uuid', 'uuid'))
+
     def __init__(self):
         super(ServerProfileFactsModule, self).__init__(additional_arg_spec=self.argument_spec)
 
@@ -230,11 +281,25 @@ class ServerProfileFactsModule(OneViewModuleBase):
 
         ansible_facts = {}
         server_profile_uri = None
+        server_profiles_by_name = None
+        lookup = [(key, self.module.params[param]) for param, key in self.LOOKUP_KEYS if self.module.params.get(param)]
 
         if self.module.params.get('name'):
             server_profiles = self.oneview_client.server_profiles.get_by("name", self.module.params['name'])
             if len(server_profiles) > 0:
                 server_profile_uri = server_profiles[0]['uri']
+        elif self.module.params.get('names'):
+            server_profiles_by_name = self.get_all_by_names(self.oneview_client.server_profiles,
+                                                            self.module.params['names'])
+            server_profiles = [profile for profile in server_profiles_by_name.values() if profile]
+        elif lookup:
+            key, value = lookup[0]
+            server_profile_lookup = ServerProfileLookup(self.oneview_client,
+                                                        ServerProfileIndex.from_environment_variables())
+            server_profile = server_profile_lookup.get(key, value)
+            server_profiles = [server_profile] if server_profile else []
+            if server_profile:
+                server_profile_uri = server_profile['uri']
         else:
             server_profiles = self.oneview_client.server_profiles.get_all(**self.facts_params)
 
@@ -242,6 +307,8 @@ class ServerProfileFactsModule(OneViewModuleBase):
             ansible_facts = self.__gather_option_facts(self.options, server_profile_uri)
 
         ansible_facts["server_profiles"] = server_profiles
+        if server_profiles_by_name is not None:
+            ansible_facts["server_profiles_by_name"] = server_profiles_by_name
 
         return dict(changed=False,
                     ansible_facts=ansible_facts)
@@ -249,50 +316,53 @@ class ServerProfileFactsModule(OneViewModuleBase):
     def __gather_option_facts(self, options, profile_uri):
 
         client = self.oneview_client.server_profiles
-        facts = {}
+        fact_getters = []
 
         if profile_uri:
             if options.get('messages'):
-                facts['server_profile_messages'] = client.get_messages(profile_uri)
+                fact_getters.append(('server_profile_messages', lambda: client.get_messages(profile_uri)))
 
             if options.get('transformation'):
-                transform_options = self.__get_sub_options(options['transformation'])
-                facts['server_profile_transformation'] = client.get_transformation(profile_uri, **transform_options)
+                fact_getters.append(('server_profile_transformation', lambda: client.get_transformation(
+                    profile_uri, **self.__get_sub_options(options['transformation']))))
 
             if options.get('compliancePreview'):
-                facts['server_profile_compliance_preview'] = client.get_compliance_preview(profile_uri)
+                fact_getters.append(('server_profile_compliance_preview',
+                                     lambda: client.get_compliance_preview(profile_uri)))
 
             if options.get('newProfileTemplate'):
-                facts['server_profile_new_profile_template'] = client.get_new_profile_template(profile_uri)
+                fact_getters.append(('server_profile_new_profile_template',
+                                     lambda: client.get_new_profile_template(profile_uri)))
 
         if options.get('schema'):
-            facts['server_profile_schema'] = client.get_schema()
+            fact_getters.append(('server_profile_schema', client.get_schema))
 
         if options.get('profilePorts'):
-            ports_options = self.__get_sub_options(options['profilePorts'])
-            facts['server_profile_profile_ports'] = client.get_profile_ports(**ports_options)
+            fact_getters.append(('server_profile_profile_ports', lambda: client.get_profile_ports(
+                **self.__get_sub_options(options['profilePorts']))))
 
         if options.get('availableNetworks'):
-            enets_options = self.__get_sub_options(options['availableNetworks'])
-            facts['server_profile_available_networks'] = client.get_available_networks(**enets_options)
+            fact_getters.append(('server_profile_available_networks', lambda: client.get_available_networks(
+                **self.__get_sub_options(options['availableNetworks']))))
 
         if options.get('availableServers'):
-            servers_options = self.__get_sub_options(options['availableServers'])
-            facts['server_profile_available_servers'] = client.get_available_servers(**servers_options)
+            fact_getters.append(('server_profile_available_servers', lambda: client.get_available_servers(
+                **self.__get_sub_options(options['availableServers']))))
 
         if options.get('availableStorageSystem'):
-            storage_options = self.__get_sub_options(options['availableStorageSystem'])
-            facts['server_profile_available_storage_system'] = client.get_available_storage_system(**storage_options)
+            fact_getters.append(('server_profile_available_storage_system', lambda: client.get_available_storage_system(
+                **self.__get_sub_options(options['availableStorageSystem']))))
 
         if options.get('availableStorageSystems'):
-            storage_options = self.__get_sub_options(options['availableStorageSystems'])
-            facts['server_profile_available_storage_systems'] = client.get_available_storage_systems(**storage_options)
+            fact_getters.append(('server_profile_available_storage_systems',
+                                 lambda: client.get_available_storage_systems(
+                                     **self.__get_sub_options(options['availableStorageSystems']))))
 
         if options.get('availableTargets'):
-            target_options = self.__get_sub_options(options['availableTargets'])
-            facts['server_profile_available_targets'] = client.get_available_targets(**target_options)
+            fact_getters.append(('server_profile_available_targets', lambda: client.get_available_targets(
+                **self.__get_sub_options(options['availableTargets']))))
 
-        return facts
+        return self.gather_facts_concurrently(fact_getters)
 
     def __get_sub_options(self, option):
         return option if isinstance(option, dict) else {}
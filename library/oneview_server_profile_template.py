@@ -42,6 +42,12 @@ options:
         description:
             - Dict with Server Profile Template properties.
         required: true
+    async_tasks:
+        description:
+            - When true, the creation or update is requested without waiting for its task, and the task URI is
+              returned in C(task_uris), to be waited for with the C(oneview_task_wait) module.
+        default: False
+        choices: [True, False]
 notes:
     - "For the following data, you can provide either a name  or a URI: enclosureGroupName or enclosureGroupUri,
        osDeploymentPlanName or osDeploymentPlanUri (on the osDeploymentSettings), networkName or networkUri (on the
@@ -82,6 +88,16 @@ EXAMPLES = '''
       enclosureGroupName: "EGSAS_3"
   delegate_to: localhost
 
+- name: Request the update of a Server Profile Template without waiting for it
+  oneview_server_profile_template:
+    config: "{{ config }}"
+    state: present
+    async_tasks: True
+    data:
+      name: "ProfileTemplate102"
+      description: "Updated asynchronously"
+  delegate_to: localhost
+
 - name: Delete the Server Profile Template
   oneview_server_profile_template:
     config: "{{ config }}"
@@ -96,10 +112,18 @@ server_profile_template:
     description: Has the OneView facts about the Server Profile Template.
     returned: On state 'present'. Can be null.
     type: complex
+task_uris:
+    description: The URIs of the tasks requested and not waited for.
+    returned: On state 'present', when C(async_tasks) is true.
+    type: list
 '''
 
+from copy import deepcopy
+
 from ansible.module_utils.basic import AnsibleModule
 from module_utils.oneview import (OneViewModuleBase,
+                                  ResourceNameUriResolver,
+                                  submit_task,
                                   ServerProfileReplaceNamesByUris,
                                   ServerProfileMerger,
                                   ResourceComparator)
@@ -117,13 +141,15 @@ class ServerProfileTemplateModule(OneViewModuleBase):
     MSG_ALREADY_ABSENT = 'Server Profile Template is already absent.'
     MSG_SRV_HW_TYPE_NOT_FOUND = 'Server Hardware Type not found: '
     MSG_ENCLOSURE_GROUP_NOT_FOUND = 'Enclosure Group not found: '
+    MSG_TASK_REQUESTED = 'Server Profile Template task requested: {}'
 
     argument_spec = dict(
         state=dict(
             required=True,
             choices=['present', 'absent']
         ),
-        data=dict(required=True, type='dict')
+        data=dict(required=True, type='dict'),
+        async_tasks=dict(type='bool', default=False)
     )
 
     def __init__(self):
@@ -132,13 +158,27 @@ class ServerProfileTemplateModule(OneViewModuleBase):
                                                           validate_etag_support=True)
 
         self.resource_client = self.oneview_client.server_profile_templates
+        self.name_uri_resolver = ResourceNameUriResolver(self.oneview_client)
+        self.task_uri = None
 
     def execute_module(self):
 
-        template = self.resource_client.get_by_name(self.data["name"])
+        # A template built from a server profile depends on the profile, so its eTag does not tell whether it changed
+        desired, template = None, None
+        if self.state == 'present' and not self.data.get('serverProfileName'):
+            desired = deepcopy(self.data)
+            template, converged = self.get_converged_resource(desired['name'], desired)
+            if converged:
+                return dict(changed=False, msg=self.MSG_ALREADY_PRESENT,
+                            ansible_facts=dict(server_profile_template=template))
+
+        template = template or self.resource_client.get_by_name(self.data["name"])
 
         if self.state == 'present':
             result = self.__present(self.data, template)
+            if desired:
+                self.set_converged_resource(desired['name'], desired,
+                                            result['ansible_facts'].get('server_profile_template'))
         else:
             result = self.__absent(template)
 
@@ -146,7 +186,7 @@ class ServerProfileTemplateModule(OneViewModuleBase):
 
     def __present(self, data, template):
 
-        ServerProfileReplaceNamesByUris().replace(self.oneview_client, data)
+        ServerProfileReplaceNamesByUris(self.name_uri_resolver).replace(self.oneview_client, data)
 
         data = self.__spt_from_sp(data) or data
 
@@ -155,6 +195,10 @@ class ServerProfileTemplateModule(OneViewModuleBase):
         else:
             changed, msg, resource = self.__update(data, template)
 
+        if self.task_uri:
+            return dict(changed=True, msg=self.MSG_TASK_REQUESTED.format(self.task_uri),
+                        ansible_facts=dict(task_uris=[self.task_uri]))
+
         return dict(
             changed=changed,
             msg=msg,
@@ -173,8 +217,20 @@ class ServerProfileTemplateModule(OneViewModuleBase):
                 spt_from_sp.update(data)
                 return spt_from_sp
 
+    def __request(self, method, uri, data):
+        task, resource = submit_task(self.oneview_client.connection, uri, data, self.resource_client.DEFAULT_VALUES,
+                                     method)
+        if task:
+            # The resource is only known once the task completes
+            self.task_uri = task['uri']
+            return None
+        return resource
+
     def __create(self, data):
-        resource = self.resource_client.create(data)
+        if self.module.params.get('async_tasks'):
+            resource = self.__request('post', self.resource_client.URI, data)
+        else:
+            resource = self.resource_client.create(data)
         return True, self.MSG_CREATED, resource
 
     def __update(self, data, template):
@@ -187,7 +243,10 @@ class ServerProfileTemplateModule(OneViewModuleBase):
         if equal:
             msg = self.MSG_ALREADY_PRESENT
         else:
-            resource = self.resource_client.update(resource=merged_data, id_or_uri=merged_data["uri"])
+            if self.module.params.get('async_tasks'):
+                resource = self.__request('put', merged_data["uri"], merged_data)
+            else:
+                resource = self.resource_client.update(resource=merged_data, id_or_uri=merged_data["uri"])
             msg = self.MSG_UPDATED
 
         changed = not equal
@@ -33,7 +33,10 @@ options:
     params:
       description:
         - "List with parameters to help filter the tasks.
-          Params allowed: C(count), C(fields), C(filter), C(query), C(sort), C(start), and C(view)."
+          Params allowed: C(count), C(fields), C(filter), C(query), C(sort), C(start), C(view), C(page_size),
+          and C(max_items)."
+        - "When C(page_size) or C(max_items) is informed, the tasks are retrieved page by page, with C(page_size)
+           tasks per request, and no more than C(max_items) tasks are returned."
       required: false
 
 extends_documentation_fragment:
@@ -80,7 +83,7 @@ class TaskFactsModule(OneViewModuleBase):
         self.resource_client = self.oneview_client.tasks
 
     def execute_module(self):
-        facts = self.resource_client.get_all(**self.facts_params)
+        facts = self.get_all_facts(self.resource_client)
 
         return dict(changed=False, ansible_facts=dict(tasks=facts))
 
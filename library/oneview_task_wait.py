@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+###
+# Copyright (2017) Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: oneview_task_wait
+short_description: Wait for OneView Tasks.
+description:
+    - Waits for many OneView Tasks at once, such as the ones requested by the modules with the C(async_tasks) option,
+      and reports the outcome of each one.
+    - The running tasks are checked together on each polling round, and the interval between rounds grows while no
+      task completes.
+version_added: "2.5"
+requirements:
+    - "python >= 2.7.9"
+    - "hpOneView >= 4.0.0"
+author: "Hewlett Packard Enterprise"
+options:
+    task_uris:
+      description:
+        - List with the URIs of the tasks to wait for.
+      required: true
+    timeout:
+      description:
+        - Time, in seconds, to wait for the tasks. The tasks still running after it are reported as failed.
+          -1 waits with no limit.
+      default: -1
+    parallelism:
+      description:
+        - Maximum number of tasks checked at the same time.
+      default: 8
+    fail_on_error:
+      description:
+        - Whether the module fails when any task fails. The outcome of each task is returned anyway.
+      default: True
+      choices: [True, False]
+
+extends_documentation_fragment:
+    - oneview
+'''
+
+EXAMPLES = '''
+- name: Request the creation of the Server Profiles without waiting for them
+  oneview_server_profile:
+    config: "{{ config }}"
+    async_tasks: True
+    data:
+      name: "{{ item }}"
+      serverProfileTemplateName: "ProfileTemplate101"
+  with_items: "{{ server_profile_names }}"
+  delegate_to: localhost
+  register: server_profile_requests
+
+- name: Wait for all the Server Profile tasks
+  oneview_task_wait:
+    config: "{{ config }}"
+    task_uris: "{{ server_profile_requests.results | map(attribute='ansible_facts.task_uris') | sum(start=[]) }}"
+    timeout: 3600
+  delegate_to: localhost
+
+- debug: var=task_results
+'''
+
+RETURN = '''
+task_results:
+    description:
+        The outcome of each task, in the same order as C(task_uris), with the keys task_uri, succeeded, resource, the
+        resource associated with the task, and error, the error message of the failed tasks.
+    returned: Always.
+    type: list
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from module_utils.oneview import OneViewModuleBase, wait_for_tasks
+
+
+class TaskWaitModule(OneViewModuleBase):
+    MSG_COMPLETED = 'Tasks completed.'
+    MSG_FAILED = 'Tasks failed: {}'
+
+    argument_spec = dict(
+        task_uris=dict(required=True, type='list'),
+        timeout=dict(type='int', default=-1),
+        parallelism=dict(type='int', default=8),
+        fail_on_error=dict(type='bool', default=True)
+    )
+
+    def __init__(self):
+        super(TaskWaitModule, self).__init__(additional_arg_spec=self.argument_spec)
+
+    def execute_module(self):
+        task_uris = self.module.params['task_uris']
+
+        outcomes = wait_for_tasks(self.oneview_client.connection, [dict(uri=task_uri) for task_uri in task_uris],
+                                  timeout=self.module.params['timeout'],
+                                  max_workers=self.module.params['parallelism'])
+
+        task_results = []
+        for task_uri, (resource, error) in zip(task_uris, outcomes):
+            task_results.append(dict(task_uri=task_uri,
+                                     succeeded=error is None,
+                                     resource=resource,
+                                     error=error.msg if error else None))
+
+        failures = ["{}: {}".format(result['task_uri'], result['error'])
+                    for result in task_results if not result['succeeded']]
+
+        if failures and self.module.params['fail_on_error']:
+            self.module.fail_json(msg=self.MSG_FAILED.format('; '.join(failures)),
+                                  ansible_facts=dict(task_results=task_results))
+
+        msg = self.MSG_FAILED.format('; '.join(failures)) if failures else self.MSG_COMPLETED
+        return dict(changed=False, msg=msg, ansible_facts=dict(task_results=task_results))
+
+
+def main():
+    TaskWaitModule().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+###
+# Copyright (2017) Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+"""
+Compares the time spent by the ResourceComparator with the one of the previous implementation, which deep copied
+both resources and formatted them for the debug log at every level.
+
+Usage, from the repository root:
+    PYTHONPATH=library python test/benchmarks/benchmark_resource_comparator.py
+"""
+
+import json
+import timeit
+from copy import deepcopy
+
+from module_utils.oneview import ResourceComparator
+from profile_fixtures import build_server_profile, shuffle_lists
+
+REPETITIONS = 20
+
+
+class PreviousResourceComparator():
+    """
+    Implementation of the comparator before the removal of the copies, kept as the benchmark baseline.
+    """
+
+    @staticmethod
+    def compare(first_resource, second_resource):
+        resource1 = deepcopy(first_resource)
+        resource2 = deepcopy(second_resource)
+
+        debug_resources = "\nresource1: \n{0} \nresource2: \n{1}".format(resource1, resource2)
+
+        if resource1 and not resource2:
+            return False
+
+        for key in resource1.keys():
+            if key not in resource2:
+                if resource1[key] is not None:
+                    return False
+            elif not resource1[key] and not resource2[key]:
+                continue
+            elif isinstance(resource1[key], dict):
+                if not PreviousResourceComparator.compare(resource1[key], resource2[key]):
+                    return False
+            elif isinstance(resource1[key], list):
+                if not PreviousResourceComparator.compare_list(resource1[key], resource2[key]):
+                    return False
+            elif PreviousResourceComparator._standardize_value(resource1[key]) != \
+                    PreviousResourceComparator._standardize_value(resource2[key]):
+                return False
+
+        for key in resource2.keys():
+            if key not in resource1:
+                if resource2[key] is not None:
+                    return False
+
+        return bool(debug_resources)
+
+    @staticmethod
+    def compare_list(first_resource, second_resource):
+        resource1 = deepcopy(first_resource)
+        resource2 = deepcopy(second_resource)
+
+        debug_resources = "resource1 = {0}, resource2 = {1}".format(resource1, resource2)
+
+        if not resource2:
+            return False
+
+        if len(resource1) != len(resource2):
+            return False
+
+        resource1 = sorted(resource1, key=PreviousResourceComparator._str_sorted)
+        resource2 = sorted(resource2, key=PreviousResourceComparator._str_sorted)
+
+        for i, val in enumerate(resource1):
+            if isinstance(val, dict):
+                if not PreviousResourceComparator.compare(val, resource2[i]):
+                    return False
+            elif isinstance(val, list):
+                if not PreviousResourceComparator.compare_list(val, resource2[i]):
+                    return False
+            elif PreviousResourceComparator._standardize_value(val) != \
+                    PreviousResourceComparator._standardize_value(resource2[i]):
+                return False
+
+        return bool(debug_resources)
+
+    @staticmethod
+    def _str_sorted(obj):
+        if isinstance(obj, dict):
+            return json.dumps(obj, sort_keys=True)
+        else:
+            return str(obj)
+
+    @staticmethod
+    def _standardize_value(value):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+
+        return str(value)
+
+
+def measure(comparator, first_resource, second_resource):
+    return min(timeit.repeat(lambda: comparator.compare(first_resource, second_resource),
+                             number=REPETITIONS, repeat=3)) / REPETITIONS
+
+
+def main():
+    scenarios = []
+    for connections, volumes, drives in ((8, 4, 2), (64, 32, 24), (256, 128, 64)):
+        profile = build_server_profile(connections=connections, volumes=volumes, drives=drives)
+        changed = shuffle_lists(profile)
+        changed['localStorage']['controllers'][0]['logicalDrives'][-1]['raidLevel'] = 'RAID5'
+        label = "{} connections, {} volumes, {} drives".format(connections, volumes, drives)
+        scenarios.append((label + " - equal", profile, shuffle_lists(profile)))
+        scenarios.append((label + " - changed", profile, changed))
+
+    print("{:<55} {:>12} {:>12} {:>8}".format("Scenario", "Previous", "Current", "Speedup"))
+    for label, first_resource, second_resource in scenarios:
+        expected = PreviousResourceComparator.compare(first_resource, second_resource)
+        assert ResourceComparator.compare(first_resource, second_resource) == expected
+
+        previous = measure(PreviousResourceComparator, first_resource, second_resource)
+        current = measure(ResourceComparator, first_resource, second_resource)
+        print("{:<55} {:>10.2f}ms {:>10.2f}ms {:>7.1f}x".format(
+            label, previous * 1000, current * 1000, previous / current))
+
+
+if __name__ == '__main__':
+    main()
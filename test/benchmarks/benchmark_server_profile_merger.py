@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+###
+# Copyright (2017) Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+"""
+Compares the time spent by the ServerProfileMerger with the one of the previous implementation, which deep copied
+the resource and every merged dict, rebuilt the maps of the existing items on each merge and compared every merged
+controller with every existing one.
+
+Usage, from the repository root:
+    PYTHONPATH=library python test/benchmarks/benchmark_server_profile_merger.py
+"""
+
+import timeit
+from collections import OrderedDict
+from copy import deepcopy
+
+from module_utils.oneview import ResourceComparator, ServerProfileMerger, SPKeys
+from profile_fixtures import build_server_profile, shuffle_lists
+
+REPETITIONS = 20
+
+
+def previous_merge_list_by_key(original_list, updated_list, key, ignore_when_null=[]):
+    if not original_list:
+        return updated_list
+
+    items_map = OrderedDict([(i[key], i.copy()) for i in original_list])
+
+    merged_items = OrderedDict()
+
+    for item in updated_list:
+        item_key = item[key]
+        if item_key in items_map:
+            for ignored_key in ignore_when_null:
+                if ignored_key in item and not item[ignored_key]:
+                    item.pop(ignored_key)
+            merged_items[item_key] = items_map[item_key].copy()
+            merged_items[item_key].update(item)
+        else:
+            merged_items[item_key] = item.copy()
+
+    return [val for (_, val) in merged_items.items()]
+
+
+class PreviousServerProfileMerger(ServerProfileMerger):
+    """
+    Implementation of the merger before the indexes and the copies on write, kept as the benchmark baseline.
+    """
+
+    def merge_data(self, resource, data):
+        merged_data = deepcopy(resource)
+        merged_data.update(data)
+
+        merged_data = self._merge_bios_and_boot(merged_data, resource, data)
+        merged_data = self._merge_connections(merged_data, resource, data)
+        merged_data = self._merge_san_storage(merged_data, data, resource)
+        merged_data = self._merge_os_deployment_settings(merged_data, resource, data)
+        merged_data = self._merge_local_storage(merged_data, resource, data)
+
+        return merged_data
+
+    def _merge_connections(self, merged_data, resource, data):
+        if self._should_merge(data, resource, key=SPKeys.CONNECTIONS):
+            merged_data[SPKeys.CONNECTIONS] = previous_merge_list_by_key(resource[SPKeys.CONNECTIONS],
+                                                                         data[SPKeys.CONNECTIONS],
+                                                                         key=SPKeys.ID)
+
+            existing_connection_map = {x[SPKeys.ID]: x.copy() for x in resource[SPKeys.CONNECTIONS]}
+            for merged_connection in merged_data[SPKeys.CONNECTIONS]:
+                conn_id = merged_connection[SPKeys.ID]
+                existing_conn_has_boot = conn_id in existing_connection_map and \
+                    SPKeys.BOOT in existing_connection_map[conn_id]
+                if existing_conn_has_boot and SPKeys.BOOT in merged_connection:
+                    boot_settings_merged = deepcopy(existing_connection_map[conn_id][SPKeys.BOOT])
+                    boot_settings_merged.update(merged_connection[SPKeys.BOOT])
+                    merged_connection[SPKeys.BOOT] = boot_settings_merged
+        return merged_data
+
+    def _merge_san_volumes(self, merged_data, resource, data):
+        if self._should_merge(data[SPKeys.SAN], resource[SPKeys.SAN], key=SPKeys.VOLUMES):
+            merged_data[SPKeys.SAN][SPKeys.VOLUMES] = previous_merge_list_by_key(
+                resource[SPKeys.SAN][SPKeys.VOLUMES], data[SPKeys.SAN][SPKeys.VOLUMES], key=SPKeys.ID)
+
+            existing_volumes_map = OrderedDict([(i[SPKeys.ID], i) for i in resource[SPKeys.SAN][SPKeys.VOLUMES]])
+            for merged_volume in merged_data[SPKeys.SAN][SPKeys.VOLUMES]:
+                volume_id = merged_volume[SPKeys.ID]
+                if volume_id in existing_volumes_map:
+                    if SPKeys.PATHS in merged_volume and SPKeys.PATHS in existing_volumes_map[volume_id]:
+                        merged_volume[SPKeys.PATHS] = previous_merge_list_by_key(
+                            existing_volumes_map[volume_id][SPKeys.PATHS], merged_volume[SPKeys.PATHS],
+                            key=SPKeys.CONN_ID)
+        return merged_data
+
+    def _merge_local_storage(self, merged_data, resource, data):
+        if self._removed_data(data, resource, key=SPKeys.LOCAL_STORAGE):
+            merged_data[SPKeys.LOCAL_STORAGE] = dict(sasLogicalJBODs=[], controllers=[])
+        elif self._should_merge(data, resource, key=SPKeys.LOCAL_STORAGE):
+            merged_data = self._merge_sas_logical_jbods(merged_data, resource, data)
+            merged_data = self._merge_controllers(merged_data, resource, data)
+        return merged_data
+
+    def _merge_sas_logical_jbods(self, merged_data, resource, data):
+        if self._should_merge(data[SPKeys.LOCAL_STORAGE], resource[SPKeys.LOCAL_STORAGE], key=SPKeys.SAS_LOGICAL_JBODS):
+            merged_data[SPKeys.LOCAL_STORAGE][SPKeys.SAS_LOGICAL_JBODS] = previous_merge_list_by_key(
+                resource[SPKeys.LOCAL_STORAGE][SPKeys.SAS_LOGICAL_JBODS],
+                merged_data[SPKeys.LOCAL_STORAGE][SPKeys.SAS_LOGICAL_JBODS],
+                key=SPKeys.ID, ignore_when_null=[SPKeys.SAS_LOGICAL_JBOD_URI])
+        return merged_data
+
+    def _merge_controllers(self, merged_data, resource, data):
+        if self._should_merge(data[SPKeys.LOCAL_STORAGE], resource[SPKeys.LOCAL_STORAGE], key=SPKeys.CONTROLLERS):
+            merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS] = previous_merge_list_by_key(
+                resource[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS],
+                merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS],
+                key=SPKeys.DEVICE_SLOT)
+
+            for current_controller in merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS][:]:
+                for existing_controller in resource[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS][:]:
+                    same_slot = current_controller.get(SPKeys.DEVICE_SLOT) == existing_controller.get(SPKeys.DEVICE_SLOT)
+                    if same_slot and current_controller[SPKeys.LOGICAL_DRIVES]:
+                        key_merge = self._define_key_to_merge_drives(current_controller)
+                        if key_merge:
+                            current_controller[SPKeys.LOGICAL_DRIVES] = previous_merge_list_by_key(
+                                existing_controller[SPKeys.LOGICAL_DRIVES], current_controller[SPKeys.LOGICAL_DRIVES],
+                                key=key_merge)
+        return merged_data
+
+    def _merge_dict(self, merged_data, resource, data, key):
+        merged_dict = deepcopy(resource[key])
+        merged_dict.update(deepcopy(data[key]))
+        merged_data[key] = merged_dict
+        return merged_data
+
+
+def build_data(profile):
+    """
+    Builds the data of a playbook that changes one connection, one volume and one drive of the profile.
+    """
+    data = shuffle_lists(profile)
+    data['connections'][0]['requestedMbps'] = '5000'
+    data['sanStorage']['volumeAttachments'][-1]['lun'] = '999'
+    data['localStorage']['controllers'][-1]['logicalDrives'][0]['raidLevel'] = 'RAID5'
+    return data
+
+
+def measure(merger, resource, data):
+    return min(timeit.repeat(lambda: merger.merge_data(resource, data), number=REPETITIONS, repeat=3)) / REPETITIONS
+
+
+def main():
+    scenarios = []
+    for connections, volumes, drives, controllers in ((8, 4, 2, 1), (64, 32, 24, 2), (256, 128, 64, 4),
+                                                      (512, 256, 128, 8)):
+        profile = build_server_profile(connections=connections, volumes=volumes, drives=drives,
+                                       controllers=controllers)
+        label = "{} connections, {} volumes, {} controllers".format(connections, volumes, controllers)
+        scenarios.append((label, profile, build_data(profile)))
+
+    print("{:<55} {:>12} {:>12} {:>8}".format("Scenario", "Previous", "Current", "Speedup"))
+    for label, resource, data in scenarios:
+        expected = PreviousServerProfileMerger().merge_data(resource, deepcopy(data))
+        assert ResourceComparator.compare(ServerProfileMerger().merge_data(resource, data), expected)
+
+        previous = measure(PreviousServerProfileMerger(), resource, data)
+        current = measure(ServerProfileMerger(), resource, data)
+        print("{:<55} {:>10.2f}ms {:>10.2f}ms {:>7.1f}x".format(
+            label, previous * 1000, current * 1000, previous / current))
+
+
+if __name__ == '__main__':
+    main()
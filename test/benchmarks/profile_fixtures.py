@@ -0,0 +1,154 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+###
+# Copyright (2017) Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+"""
+Server profiles with the size of the ones found in large Synergy frames, used by the benchmarks.
+"""
+
+import random
+
+
+def build_server_profile(connections=64, volumes=32, drives=24, jbods=8, controllers=1):
+    """
+    Builds a server profile as returned by the appliance.
+
+    Args:
+        connections (int): Number of connections.
+        volumes (int): Number of SAN volume attachments, each one with two storage paths.
+        drives (int): Number of logical drives of each local storage controller.
+        jbods (int): Number of SAS logical JBODs.
+        controllers (int): Number of local storage controllers, the first one embedded and the others on mezzanines.
+
+    Returns:
+        dict: The server profile.
+    """
+    return {
+        "type": "ServerProfileV8",
+        "name": "Profile with a large configuration",
+        "uri": "/rest/server-profiles/7f2cd1f5-1b8a-4c6e-9d0a-6c1f2d3e4b5a",
+        "eTag": "1504280938026/6",
+        "serverHardwareUri": "/rest/server-hardware/30303437-3034-4D32-3230-313130304752",
+        "serverHardwareTypeUri": "/rest/server-hardware-types/94B55683-173F-4B36-8FA6-EC250BA2328B",
+        "enclosureGroupUri": "/rest/enclosure-groups/ad5e9e88-b858-4935-ba58-017d60a17c89",
+        "enclosureUri": "/rest/enclosures/09SGH100X6J1",
+        "enclosureBay": 3,
+        "affinity": "Bay",
+        "hideUnusedFlexNics": True,
+        "iscsiInitiatorNameType": "AutoGenerated",
+        "macType": "Virtual",
+        "wwnType": "Virtual",
+        "serialNumberType": "Virtual",
+        "serialNumber": "VCGE9KB041",
+        "bios": {
+            "manageBios": True,
+            "overriddenSettings": [{"id": "setting{}".format(index), "value": "value{}".format(index)}
+                                   for index in range(40)]
+        },
+        "boot": {"manageBoot": True, "order": ["CD", "Floppy", "USB", "HardDisk", "PXE"]},
+        "bootMode": {"manageMode": True, "mode": "UEFIOptimized", "pxeBootPolicy": "Auto"},
+        "firmware": {"manageFirmware": False, "forceInstallFirmware": False},
+        "connections": [{
+            "id": index + 1,
+            "name": "connection{}".format(index + 1),
+            "functionType": "FibreChannel" if index % 4 == 3 else "Ethernet",
+            "networkUri": "/rest/ethernet-networks/{:08x}-5c5b-4e1d-9f0a-2c1b3d4e5f60".format(index),
+            "portId": "Mezz 3:{}-{}".format(index // 8 + 1, "abcd"[index % 4]),
+            "requestedVFs": "0",
+            "requestedMbps": "2500",
+            "allocatedMbps": 2500,
+            "maximumMbps": 20000,
+            "macType": "Virtual",
+            "mac": "56:12:9F:50:{:02X}:{:02X}".format(index // 256, index % 256),
+            "wwpnType": "Virtual",
+            "boot": {"priority": "NotBootable", "targets": []},
+            "ipv4": {}
+        } for index in range(connections)],
+        "sanStorage": {
+            "manageSanStorage": True,
+            "hostOSType": "VMware (ESXi)",
+            "volumeAttachments": [{
+                "id": index + 1,
+                "lun": str(index),
+                "lunType": "Manual",
+                "volumeUri": "/rest/storage-volumes/{:08X}-1D4B-4B05-8D6C-0B8C0F2F8E71".format(index),
+                "volumeStoragePoolUri": "/rest/storage-pools/5F9CA89B-C632-4F09-BC55-A8AA00DA5C4A",
+                "volumeStorageSystemUri": "/rest/storage-systems/TXQ1000307",
+                "state": "Attached",
+                "status": "OK",
+                "storagePaths": [{
+                    "connectionId": path,
+                    "isEnabled": True,
+                    "targetSelector": "Auto",
+                    "targets": [{"ipAddress": None, "name": None, "storageTargetType": "FcTarget",
+                                 "tcpPort": "0", "wwpn": "21:21:00:02:AC:00:{:02X}:{:02X}".format(index, path)}]
+                } for path in (4, 8)]
+            } for index in range(volumes)]
+        },
+        "localStorage": {
+            "sasLogicalJBODs": [{
+                "id": index + 1,
+                "deviceSlot": "Mezz 1",
+                "name": "jbod{}".format(index + 1),
+                "numPhysicalDrives": 2,
+                "driveMinSizeGB": 100,
+                "driveMaxSizeGB": 900,
+                "driveTechnology": "SasHdd",
+                "sasLogicalJBODUri": "/rest/sas-logical-jbods/{:08x}-6f3b-4a36-a8f8-5e6f7a8b9c0d".format(index),
+                "status": "OK"
+            } for index in range(jbods)],
+            "controllers": [{
+                "deviceSlot": "Mezz {}".format(controller) if controller else "Embedded",
+                "mode": "RAID",
+                "initialize": False,
+                "importConfiguration": False,
+                "logicalDrives": [{
+                    "name": "drive{}".format(index + 1),
+                    "raidLevel": "RAID1",
+                    "bootable": index == 0,
+                    "numPhysicalDrives": 2,
+                    "driveTechnology": "SasHdd",
+                    "sasLogicalJBODId": None,
+                    "driveNumber": index + 1
+                } for index in range(drives)]
+            } for controller in range(controllers)]
+        },
+        "osDeploymentSettings": {
+            "osDeploymentPlanUri": "/rest/os-deployment-plans/81decf85-0dff-4a5e-8a95-52994eeb6493",
+            "osCustomAttributes": [{"name": "attribute{}".format(index), "value": str(index)}
+                                   for index in range(16)]
+        }
+    }
+
+
+def shuffle_lists(resource, seed=0):
+    """
+    Returns a copy of the resource with the elements of every list in a different order, as the appliance does not
+    keep the order of some lists.
+    """
+    generator = random.Random(seed)
+
+    def shuffle(value):
+        if isinstance(value, dict):
+            return dict((key, shuffle(item)) for key, item in value.items())
+        elif isinstance(value, list):
+            items = [shuffle(item) for item in value]
+            generator.shuffle(items)
+            return items
+        return value
+
+    return shuffle(resource)
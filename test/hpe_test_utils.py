@@ -19,7 +19,7 @@
 import importlib
 import yaml
 from mock import Mock, patch
-from oneview_module_loader import ONEVIEW_MODULE_UTILS_PATH
+from oneview_module_loader import ONEVIEW_MODULE_UTILS_PATH, HPOneViewTaskError
 from hpOneView.oneview_client import OneViewClient
 
 
@@ -53,10 +53,60 @@ class OneViewBaseTestCase(object):
         test_case.addCleanup(patcher_ansible.stop)
         mock_ansible_module = patcher_ansible.start()
         self.mock_ansible_module = Mock()
+        self.mock_ansible_module.check_mode = False
         mock_ansible_module.return_value = self.mock_ansible_module
 
+        # Define ResourceClient Mock, used to get whole resource collections
+        patcher_resource_client = patch(ONEVIEW_MODULE_UTILS_PATH + '.ResourceClient')
+        test_case.addCleanup(patcher_resource_client.stop)
+        self.mock_resource_client = patcher_resource_client.start()
+        self.resource_collections = {}
+        self.mock_resource_client.side_effect = lambda connection, uri: Mock(
+            get_all=Mock(return_value=self.resource_collections.get(uri, [])))
+
         self.__set_module_examples()
 
+    def configure_task_mocks(self, test_case):
+        """
+        Mocks the tasks of the operations run at once: each request submitted by the module being tested starts a task
+        named after its URI, and the tasks are completed in a single wait, failing with the messages in task_errors.
+        Must be called after configure_mocks.
+        Args:
+            test_case (object): class instance (self) that are inheriting from OneViewBaseTestCase
+        """
+        patcher_submit_task = patch(self.testing_class.__module__ + '.submit_task')
+        test_case.addCleanup(patcher_submit_task.stop)
+        self.mock_submit_task = patcher_submit_task.start()
+        self.mock_submit_task.side_effect = lambda connection, uri, *args: (dict(uri='/rest/tasks' + uri), None)
+
+        patcher_wait_for_tasks = patch(ONEVIEW_MODULE_UTILS_PATH + '.wait_for_tasks')
+        test_case.addCleanup(patcher_wait_for_tasks.stop)
+        self.mock_wait_for_tasks = patcher_wait_for_tasks.start()
+        self.mock_wait_for_tasks.side_effect = self.__wait_for_tasks
+        self.task_errors = {}
+
+        # The operations are timed without waiting
+        patcher_time = patch(ONEVIEW_MODULE_UTILS_PATH + '.time')
+        test_case.addCleanup(patcher_time.stop)
+        patcher_time.start().time.return_value = 100
+
+    def __wait_for_tasks(self, connection, tasks, max_workers, on_completed):
+        outcomes = []
+        for index, task in enumerate(tasks):
+            error = self.task_errors.get(task['uri'])
+            outcomes.append((None, HPOneViewTaskError(error)) if error else ({}, None))
+            on_completed(index)
+        return outcomes
+
+    def mock_collection(self, resource_type, members):
+        """
+        Defines the members returned when getting a whole resource collection through the ResourceClient.
+        Args:
+            resource_type (str): OneViewClient attribute of the resource, e.g. 'enclosure_groups'
+            members (list): Resources of the collection
+        """
+        self.resource_collections[getattr(self.mock_ov_client, resource_type).URI] = members
+
     def test_main_function_should_call_run_method(self):
         self.mock_ansible_module.params = {'config': 'config.json'}
 
@@ -134,6 +134,7 @@ from oneview_switch import SwitchModule
 from oneview_switch_facts import SwitchFactsModule
 from oneview_switch_type_facts import SwitchTypeFactsModule
 from oneview_task_facts import TaskFactsModule
+from oneview_task_wait import TaskWaitModule
 from oneview_unmanaged_device import UnmanagedDeviceModule
 from oneview_unmanaged_device_facts import UnmanagedDeviceFactsModule
 from oneview_uplink_set import UplinkSetModule
@@ -15,13 +15,36 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 ###
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 import mock
 from copy import deepcopy
 
 from module_utils.oneview import (OneViewModuleBase,
+                                  OneViewConnectionBroker,
+                                  OneViewSessionCache,
+                                  OneViewETagCache,
+                                  ServerHardwareAllocationLedger,
+                                  EnclosureHostnameIndex,
+                                  ServerProfileIndex,
+                                  ServerProfileLookup,
+                                  get_backoff_delay,
                                   ResourceComparator,
+                                  ResourceDigest,
+                                  ResourceNameUriResolver,
                                   ResourceMerger,
+                                  NetworkNameUriIndex,
+                                  run_concurrently,
+                                  run_operations,
+                                  set_server_hardware_power_state,
+                                  submit_task,
+                                  wait_for_tasks,
+                                  iterate_collection,
                                   OneViewClient,
                                   HPOneViewException,
                                   HPOneViewValueError,
@@ -29,6 +52,8 @@ from module_utils.oneview import (OneViewModuleBase,
                                   SPKeys,
                                   ServerProfileMerger,
                                   HPOneViewResourceNotFound)
+import http.client
+import http.server
 
 MSG_GENERIC_ERROR = 'Generic error message'
 MSG_GENERIC = "Generic message"
@@ -138,11 +163,19 @@ class OneViewModuleBaseSpec(unittest.TestCase):
     def test_should_load_config_from_environment(self):
 
         self.mock_ansible_module.params = {'config': None}
+        environment = {'ONEVIEWSDK_IP': '172.16.1.1', 'ONEVIEWSDK_USERNAME': 'admin', 'ONEVIEWSDK_PASSWORD': 'mypass',
+                       'ONEVIEWSDK_SSL_CERTIFICATE': '/etc/ssl/oneview.crt', 'ONEVIEWSDK_CONNECTION_TIMEOUT': '30'}
 
-        OneViewModuleBase()
+        with mock.patch.dict(os.environ, environment, clear=True):
+            with mock.patch(OneViewModuleBase.__module__ + '.OneViewClient') as mock_ov_client_class:
+                OneViewModuleBase()
 
-        self.mock_ov_client_from_env_vars.assert_called_once()
-        self.mock_ov_client_from_json_file.not_been_called()
+        config = mock_ov_client_class.call_args[0][0]
+        self.assertEqual(config['ip'], '172.16.1.1')
+        self.assertEqual(config['credentials']['userName'], 'admin')
+        self.assertEqual(config['ssl_certificate'], '/etc/ssl/oneview.crt')
+        self.assertEqual(config['timeout'], '30')
+        mock_ov_client_class.from_json_file.assert_not_called()
 
     def test_should_load_config_from_parameters(self):
 
@@ -319,6 +352,88 @@ class OneViewModuleBaseSpec(unittest.TestCase):
                              ansible_facts=dict(resource={'return': 'value'}))
                          )
 
+    def test_resource_present_should_show_patch_when_running_with_diff(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        self.mock_ansible_module._diff = True
+
+        ov_base = OneViewModuleBase()
+        ov_base.resource_client = mock.Mock()
+        ov_base.resource_client.update.return_value = {'return': 'value'}
+        ov_base.data = {'newName': 'Resource Name New'}
+
+        facts = ov_base.resource_present(self.RESOURCE_COMMON, 'resource')
+
+        self.assertEqual(json.loads(facts['diff']['prepared']),
+                         [dict(op='replace', path='/name', value='Resource Name New')])
+
+    def build_base_with_etag_cache(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        self.mock_ov_client.connection.get_host.return_value = '10.0.0.1'
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+
+        ov_base = OneViewModuleBase()
+        ov_base.resource_client = mock.Mock(URI='/rest/resource')
+        ov_base.etag_cache = OneViewETagCache(cache_dir)
+        return ov_base
+
+    def test_get_converged_resource_should_check_the_resource_with_a_conditional_get(self):
+        ov_base = self.build_base_with_etag_cache()
+        resource = dict(self.RESOURCE_COMMON, eTag='1')
+        ov_base.set_converged_resource('Resource Name', {'name': 'Resource Name'}, resource)
+        self.mock_ov_client.connection.do_http.return_value = (mock.Mock(status=304), '')
+
+        self.assertEqual(ov_base.get_converged_resource('Resource Name', {'name': 'Resource Name'}), (resource, True))
+        self.mock_ov_client.connection.do_http.assert_called_once_with('GET', '/rest/resource/id', '',
+                                                                       custom_headers={'If-None-Match': '1'})
+
+    def test_get_converged_resource_should_compare_the_etag_when_the_get_is_not_conditional(self):
+        ov_base = self.build_base_with_etag_cache()
+        resource = dict(self.RESOURCE_COMMON, eTag='1')
+        ov_base.set_converged_resource('Resource Name', {'name': 'Resource Name'}, resource)
+        self.mock_ov_client.connection.do_http.return_value = (mock.Mock(status=200), resource)
+
+        self.assertEqual(ov_base.get_converged_resource('Resource Name', {'name': 'Resource Name'}), (resource, True))
+
+    def test_get_converged_resource_should_return_the_resource_changed_since(self):
+        ov_base = self.build_base_with_etag_cache()
+        ov_base.set_converged_resource('Resource Name', {'name': 'Resource Name'}, dict(self.RESOURCE_COMMON, eTag='1'))
+        changed = dict(self.RESOURCE_COMMON, eTag='2', description='changed')
+        self.mock_ov_client.connection.do_http.return_value = (mock.Mock(status=200), changed)
+
+        self.assertEqual(ov_base.get_converged_resource('Resource Name', {'name': 'Resource Name'}), (changed, False))
+
+    def test_get_converged_resource_should_not_return_a_removed_or_renamed_resource(self):
+        ov_base = self.build_base_with_etag_cache()
+        ov_base.set_converged_resource('Resource Name', {'name': 'Resource Name'}, dict(self.RESOURCE_COMMON, eTag='1'))
+
+        self.mock_ov_client.connection.do_http.return_value = (mock.Mock(status=404), {'errorCode': 'NOT_FOUND'})
+        self.assertEqual(ov_base.get_converged_resource('Resource Name', {'name': 'Resource Name'}), (None, False))
+
+        self.mock_ov_client.connection.do_http.return_value = (mock.Mock(status=200),
+                                                               dict(self.RESOURCE_COMMON, name='Other', eTag='2'))
+        self.assertEqual(ov_base.get_converged_resource('Resource Name', {'name': 'Resource Name'}), (None, False))
+
+    def test_get_converged_resource_should_not_check_the_resource_when_the_desired_state_changed(self):
+        ov_base = self.build_base_with_etag_cache()
+        ov_base.set_converged_resource('Resource Name', {'name': 'Resource Name'}, dict(self.RESOURCE_COMMON, eTag='1'))
+
+        self.assertEqual(ov_base.get_converged_resource('Resource Name', {'name': 'Resource Name', 'vlanId': 2}),
+                         (None, False))
+        self.assertEqual(ov_base.get_converged_resource('Other Name', {'name': 'Resource Name'}), (None, False))
+        self.mock_ov_client.connection.do_http.assert_not_called()
+
+    def test_get_converged_resource_should_not_check_the_resource_without_etag_cache(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+
+        ov_base = OneViewModuleBase()
+        ov_base.set_converged_resource('Resource Name', {'name': 'Resource Name'}, dict(self.RESOURCE_COMMON, eTag='1'))
+
+        self.assertIsNone(ov_base.etag_cache)
+        self.assertEqual(ov_base.get_converged_resource('Resource Name', {'name': 'Resource Name'}), (None, False))
+        self.mock_ov_client.connection.do_http.assert_not_called()
+
     def test_resource_absent_should_remove(self):
         self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
 
@@ -456,27 +571,770 @@ class OneViewModuleBaseSpec(unittest.TestCase):
 
         res = ov_base.get_by_name('name')
 
-        ov_base.resource_client.get_by.assert_called_once_with('name', 'name')
+        ov_base.resource_client.get_by.assert_called_once_with('name', 'name')
+
+        self.assertIsNone(res)
+
+    def test_transform_list_to_dict(self):
+        list_ = ['one', 'two', {'tree': 3}, 'four', 5]
+
+        dict_transformed = OneViewModuleBase.transform_list_to_dict(list_=list_)
+
+        self.assertEqual(dict_transformed,
+                         {'5': True,
+                          'four': True,
+                          'one': True,
+                          'tree': 3,
+                          'two': True})
+
+    def test_transform_list_to_dict_with_none(self):
+
+        dict_transformed = OneViewModuleBase.transform_list_to_dict(None)
+
+        self.assertEqual(dict_transformed, {})
+
+    def test_get_all_by_names_with_a_single_filter(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        ov_base = OneViewModuleBase()
+        resource_client = mock.Mock()
+        resource_client.get_all.return_value = [{'name': 'B'}, {'name': "O'Neil"}, {'name': 'B'}]
+
+        resources = ov_base.get_all_by_names(resource_client, ['A', 'B', "O'Neil", 'A'])
+
+        resource_client.get_all.assert_called_once_with(filter="name='A' OR name='B' OR name='O''Neil'")
+        self.assertEqual(list(resources.items()), [('A', None), ('B', {'name': 'B'}), ("O'Neil", {'name': "O'Neil"})])
+
+    def test_get_all_by_names_should_ignore_case_and_keep_the_names_informed(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        ov_base = OneViewModuleBase()
+        resource_client = mock.Mock()
+        resource_client.get_all.return_value = [{'name': 'enclosure-1'}, {'name': '2'}]
+
+        resources = ov_base.get_all_by_names(resource_client, ['Enclosure-1', 2, 'ENCLOSURE-1'])
+
+        resource_client.get_all.assert_called_once_with(filter="name='Enclosure-1' OR name='2'")
+        self.assertEqual(list(resources.items()), [('Enclosure-1', {'name': 'enclosure-1'}), (2, {'name': '2'}),
+                                                   ('ENCLOSURE-1', {'name': 'enclosure-1'})])
+
+    def test_get_all_by_names_should_split_long_filters_into_batches(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        ov_base = OneViewModuleBase()
+        ov_base.MAX_NAMES_FILTER_LENGTH = 30
+        resource_client = mock.Mock()
+        resource_client.get_all.side_effect = lambda filter: [{'name': filter.split("'")[1]}]
+
+        resources = ov_base.get_all_by_names(resource_client, ['name-1', 'name-2', 'name-3'])
+
+        self.assertEqual(sorted(call[1]['filter'] for call in resource_client.get_all.call_args_list),
+                         ["name='name-1' OR name='name-2'", "name='name-3'"])
+        self.assertEqual(resources, {'name-1': {'name': 'name-1'}, 'name-2': None, 'name-3': {'name': 'name-3'}})
+
+    def test_get_all_facts_should_use_get_all_when_not_paging(self):
+        self.mock_ansible_module.params = dict(config='config.json', params=dict(count=3, fields='name'))
+        ov_base = OneViewModuleBase()
+        resource_client = mock.Mock()
+
+        facts = ov_base.get_all_facts(resource_client)
+
+        resource_client.get_all.assert_called_once_with(count=3, fields='name')
+        self.assertEqual(facts, resource_client.get_all.return_value)
+
+    def test_get_all_facts_page_by_page(self):
+        self.mock_ansible_module.params = dict(config='config.json',
+                                               params=dict(count=3, max_items=5, page_size=2, sort='name:ascending'))
+        ov_base = OneViewModuleBase()
+        resource_client = mock.Mock(URI='/rest/alerts')
+
+        with mock.patch(OneViewModuleBase.__module__ + '.iterate_collection') as mock_iterate_collection:
+            mock_iterate_collection.return_value = iter([{'uri': '/rest/alerts/1'}])
+            facts = ov_base.get_all_facts(resource_client)
+
+        mock_iterate_collection.assert_called_once_with(self.mock_ov_client.connection, '/rest/alerts', page_size=2,
+                                                        max_items=3, sort='name:ascending')
+        resource_client.get_all.assert_not_called()
+        self.assertEqual(facts, [{'uri': '/rest/alerts/1'}])
+
+    def test_gather_facts_concurrently(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        ov_base = OneViewModuleBase()
+
+        facts = ov_base.gather_facts_concurrently([('fact_1', lambda: 1), ('fact_2', lambda: [2])])
+
+        self.assertEqual(facts, {'fact_1': 1, 'fact_2': [2]})
+
+    def test_gather_facts_concurrently_should_run_getters_at_the_same_time(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        ov_base = OneViewModuleBase()
+        started = [threading.Event(), threading.Event()]
+
+        def getter(index):
+            started[index].set()
+            return started[1 - index].wait(5)
+
+        facts = ov_base.gather_facts_concurrently([('fact_1', lambda: getter(0)), ('fact_2', lambda: getter(1))])
+
+        self.assertEqual(facts, {'fact_1': True, 'fact_2': True})
+
+    def test_gather_facts_concurrently_should_respect_max_workers_from_env(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        ov_base = OneViewModuleBase()
+
+        with mock.patch(OneViewModuleBase.__module__ + '.run_concurrently') as mock_run_concurrently:
+            mock_run_concurrently.return_value = [(1, None)]
+            with mock.patch.dict(os.environ, {'ONEVIEW_FACTS_MAX_WORKERS': '2'}):
+                ov_base.gather_facts_concurrently([('fact_1', lambda: 1)])
+
+        self.assertEqual(mock_run_concurrently.call_args[0][1], 2)
+
+    def test_gather_facts_concurrently_should_report_each_failed_fact(self):
+        self.mock_ansible_module.params = self.PARAMS_FOR_PRESENT
+        ov_base = OneViewModuleBase()
+        gathered = []
+
+        def fail(message):
+            raise HPOneViewException(message)
+
+        try:
+            ov_base.gather_facts_concurrently([('fact_1', lambda: fail('error 1')),
+                                               ('fact_2', lambda: gathered.append(2)),
+                                               ('fact_3', lambda: fail('error 3'))])
+        except HPOneViewException as exception:
+            self.assertEqual(exception.msg, 'Failed to gather fact_1: error 1; Failed to gather fact_3: error 3')
+        else:
+            self.fail(msg="Expected Exception was not raised")
+
+        self.assertEqual(gathered, [2])
+
+    def test_should_not_use_session_cache_when_not_configured(self):
+        self.mock_ansible_module.params = {'config': 'config.json'}
+
+        with mock.patch.dict(os.environ, {}, clear=True):
+            OneViewModuleBase()
+
+        self.mock_ov_client_from_json_file.assert_called_once_with('config.json')
+
+
+class OneViewModuleBaseSessionCacheSpec(unittest.TestCase):
+    PARAMS_WITH_CREDENTIALS = {'hostname': '172.16.1.1',
+                               'username': 'admin',
+                               'password': 'mypass',
+                               'api_version': 500,
+                               'image_streamer_hostname': None}
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+        patcher_env = mock.patch.dict(os.environ, {'ONEVIEW_SESSION_CACHE_DIR': self.cache_dir})
+        self.addCleanup(patcher_env.stop)
+        patcher_env.start()
+
+        patcher_client = mock.patch(OneViewModuleBase.__module__ + '.OneViewClient')
+        self.addCleanup(patcher_client.stop)
+        self.mock_ov_client_class = patcher_client.start()
+        self.mock_ov_client_class.return_value.connection.get_session_id.return_value = 'new-session'
+
+        patcher_ansible = mock.patch(OneViewModuleBase.__module__ + '.AnsibleModule')
+        self.addCleanup(patcher_ansible.stop)
+        self.mock_ansible_module = patcher_ansible.start().return_value
+        self.mock_ansible_module.params = self.PARAMS_WITH_CREDENTIALS
+
+        self.session_cache = OneViewSessionCache(self.cache_dir)
+        self.cache_key = OneViewSessionCache.build_key('172.16.1.1', 'admin', 500)
+
+    def test_should_login_and_store_session_when_cache_is_empty(self):
+        OneViewModuleBase()
+
+        config = self.mock_ov_client_class.call_args[0][0]
+        self.assertNotIn('sessionID', config['credentials'])
+        self.assertEqual(self.session_cache.get(self.cache_key), 'new-session')
+
+    def test_should_reuse_cached_session(self):
+        self.session_cache.set(self.cache_key, 'cached-session')
+        self.mock_ov_client_class.return_value.connection.get_session_id.return_value = 'cached-session'
+
+        OneViewModuleBase()
+
+        self.mock_ov_client_class.assert_called_once()
+        config = self.mock_ov_client_class.call_args[0][0]
+        self.assertEqual(config['credentials']['sessionID'], 'cached-session')
+
+    def test_should_login_again_when_cached_session_is_rejected(self):
+        self.session_cache.set(self.cache_key, 'expired-session')
+        valid_client = mock.Mock()
+        valid_client.connection.get_session_id.return_value = 'new-session'
+        self.mock_ov_client_class.side_effect = [HPOneViewException('Invalid session'), valid_client]
+
+        base_mod = OneViewModuleBase()
+
+        self.assertEqual(base_mod.oneview_client, valid_client)
+        config = self.mock_ov_client_class.call_args[0][0]
+        self.assertNotIn('sessionID', config['credentials'])
+        self.assertEqual(self.session_cache.get(self.cache_key), 'new-session')
+
+    def test_should_not_reuse_session_cached_with_other_api_version(self):
+        self.session_cache.set(OneViewSessionCache.build_key('172.16.1.1', 'admin', 300), 'cached-session')
+
+        OneViewModuleBase()
+
+        config = self.mock_ov_client_class.call_args[0][0]
+        self.assertNotIn('sessionID', config['credentials'])
+
+    def test_should_keep_the_certificate_and_timeout_of_the_environment(self):
+        self.mock_ansible_module.params = {'config': None}
+        environment = {'ONEVIEWSDK_IP': '172.16.1.1', 'ONEVIEWSDK_USERNAME': 'admin', 'ONEVIEWSDK_PASSWORD': 'mypass',
+                       'ONEVIEWSDK_API_VERSION': '500', 'ONEVIEWSDK_SSL_CERTIFICATE': '/etc/ssl/oneview.crt',
+                       'ONEVIEWSDK_CONNECTION_TIMEOUT': '30'}
+
+        with mock.patch.dict(os.environ, environment):
+            OneViewModuleBase()
+
+        config = self.mock_ov_client_class.call_args[0][0]
+        self.assertEqual(config['ssl_certificate'], '/etc/ssl/oneview.crt')
+        self.assertEqual(config['timeout'], '30')
+        self.assertEqual(self.session_cache.get(self.cache_key), 'new-session')
+
+    def test_should_not_reuse_expired_session(self):
+        self.session_cache.set(self.cache_key, 'cached-session')
+
+        with mock.patch.dict(os.environ, {'ONEVIEW_SESSION_CACHE_TTL': '-1'}):
+            OneViewModuleBase()
+
+        config = self.mock_ov_client_class.call_args[0][0]
+        self.assertNotIn('sessionID', config['credentials'])
+
+
+class OneViewSessionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = os.path.join(tempfile.mkdtemp(), 'sessions')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.cache_dir))
+        self.session_cache = OneViewSessionCache(self.cache_dir, ttl=60)
+
+    def test_from_environment_variables_should_return_none_when_not_configured(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(OneViewSessionCache.from_environment_variables())
+
+    def test_from_environment_variables(self):
+        with mock.patch.dict(os.environ, {'ONEVIEW_SESSION_CACHE_DIR': self.cache_dir,
+                                          'ONEVIEW_SESSION_CACHE_TTL': '120'}):
+            session_cache = OneViewSessionCache.from_environment_variables()
+
+        self.assertEqual(session_cache.cache_dir, self.cache_dir)
+        self.assertEqual(session_cache.ttl, 120)
+
+    def test_build_key_should_differ_by_user(self):
+        self.assertNotEqual(OneViewSessionCache.build_key('host', 'admin', 500),
+                            OneViewSessionCache.build_key('host', 'operator', 500))
+
+    def test_get_should_return_none_when_not_cached(self):
+        self.assertIsNone(self.session_cache.get('key'))
+
+    def test_set_and_get(self):
+        self.session_cache.set('key', 'session')
+
+        self.assertEqual(self.session_cache.get('key'), 'session')
+
+    def test_set_should_create_the_file_readable_only_by_the_owner(self):
+        self.session_cache.set('key', 'session')
+
+        mode = os.stat(os.path.join(self.cache_dir, 'key.json')).st_mode
+        self.assertEqual(mode & 0o077, 0)
+
+    def test_get_should_remove_expired_session(self):
+        self.session_cache.set('key', 'session')
+
+        with mock.patch(OneViewModuleBase.__module__ + '.time.time', return_value=10 ** 12):
+            self.assertIsNone(self.session_cache.get('key'))
+
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, 'key.json')))
+
+    def test_remove(self):
+        self.session_cache.set('key', 'session')
+        self.session_cache.remove('key')
+
+        self.assertIsNone(self.session_cache.get('key'))
+
+
+class OneViewETagCacheTest(unittest.TestCase):
+    KEY = 'compliance-preview:/rest/server-profiles/1'
+
+    def setUp(self):
+        self.cache_dir = os.path.join(tempfile.mkdtemp(), 'etags')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.cache_dir))
+        self.etag_cache = OneViewETagCache(self.cache_dir, ttl=60)
+
+    def test_from_environment_variables_should_return_none_when_not_configured(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(OneViewETagCache.from_environment_variables())
+
+    def test_from_environment_variables(self):
+        with mock.patch.dict(os.environ, {'ONEVIEW_ETAG_CACHE_DIR': self.cache_dir,
+                                          'ONEVIEW_ETAG_CACHE_TTL': '120'}):
+            etag_cache = OneViewETagCache.from_environment_variables()
+
+        self.assertEqual(etag_cache.cache_dir, self.cache_dir)
+        self.assertEqual(etag_cache.ttl, 120)
+
+    def test_get_should_return_none_when_not_cached(self):
+        self.assertIsNone(self.etag_cache.get(self.KEY, '1'))
+
+    def test_set_and_get(self):
+        self.etag_cache.set(self.KEY, '1', {'isOnlineUpdate': True})
+
+        self.assertEqual(self.etag_cache.get(self.KEY, '1'), {'isOnlineUpdate': True})
+
+    def test_get_should_return_none_when_the_etag_changed(self):
+        self.etag_cache.set(self.KEY, '1', {'isOnlineUpdate': True})
+
+        self.assertIsNone(self.etag_cache.get(self.KEY, '2'))
+
+    def test_set_should_replace_the_value_of_a_previous_etag(self):
+        self.etag_cache.set(self.KEY, '1', {'isOnlineUpdate': True})
+        self.etag_cache.set(self.KEY, '2', {'isOnlineUpdate': False})
+
+        self.assertIsNone(self.etag_cache.get(self.KEY, '1'))
+        self.assertEqual(self.etag_cache.get(self.KEY, '2'), {'isOnlineUpdate': False})
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_should_not_cache_without_etag(self):
+        self.etag_cache.set(self.KEY, None, {'isOnlineUpdate': True})
+
+        self.assertFalse(os.path.exists(self.cache_dir))
+        self.assertIsNone(self.etag_cache.get(self.KEY, None))
+
+    def test_get_entry(self):
+        self.etag_cache.set(self.KEY, '1', {'isOnlineUpdate': True})
+
+        self.assertEqual(self.etag_cache.get_entry(self.KEY), dict(eTag='1', value={'isOnlineUpdate': True}))
+        self.assertIsNone(self.etag_cache.get_entry('compliance-preview:/rest/server-profiles/2'))
+
+    def test_get_should_return_none_when_expired(self):
+        self.etag_cache.set(self.KEY, '1', {'isOnlineUpdate': True})
+
+        with mock.patch(OneViewModuleBase.__module__ + '.time.time', return_value=10 ** 12):
+            self.assertIsNone(self.etag_cache.get(self.KEY, '1'))
+
+
+class ServerHardwareAllocationLedgerTest(unittest.TestCase):
+    CANDIDATES = ['/rest/server-hardware/1', '/rest/server-hardware/2', '/rest/server-hardware/3']
+
+    def setUp(self):
+        self.ledger_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.ledger_dir)
+        self.ledger = ServerHardwareAllocationLedger(os.path.join(self.ledger_dir, 'ledger', 'allocations.json'),
+                                                     lease=60)
+
+    def test_from_environment_variables_should_return_none_when_not_configured(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(ServerHardwareAllocationLedger.from_environment_variables())
+
+    def test_from_environment_variables(self):
+        with mock.patch.dict(os.environ, {'ONEVIEW_ALLOCATION_LEDGER': self.ledger.path,
+                                          'ONEVIEW_ALLOCATION_LEASE': '120'}):
+            ledger = ServerHardwareAllocationLedger.from_environment_variables()
+
+        self.assertEqual(ledger.path, self.ledger.path)
+        self.assertEqual(ledger.lease, 120)
+
+    def test_reserve_should_give_distinct_candidates_to_each_owner(self):
+        self.assertEqual(self.ledger.reserve(self.CANDIDATES, 'profile-1'), self.CANDIDATES[0])
+        self.assertEqual(self.ledger.reserve(self.CANDIDATES, 'profile-2'), self.CANDIDATES[1])
+        self.assertEqual(self.ledger.reserve(self.CANDIDATES, 'profile-3'), self.CANDIDATES[2])
+        self.assertIsNone(self.ledger.reserve(self.CANDIDATES, 'profile-4'))
+
+    def test_reserve_should_give_distinct_candidates_to_concurrent_owners(self):
+        ledgers = [ServerHardwareAllocationLedger(self.ledger.path) for _ in self.CANDIDATES]
+
+        reserved = run_concurrently([lambda ledger=ledger, owner=owner: ledger.reserve(self.CANDIDATES, owner)
+                                     for owner, ledger in enumerate(ledgers)])
+
+        self.assertEqual(sorted(reserved), self.CANDIDATES)
+
+    def test_reserve_should_replace_the_previous_reservation_of_the_owner(self):
+        self.ledger.reserve(self.CANDIDATES, 'profile-1')
+
+        self.assertEqual(self.ledger.reserve(self.CANDIDATES[1:], 'profile-1'), self.CANDIDATES[1])
+        self.assertEqual(self.ledger.reserve(self.CANDIDATES, 'profile-2'), self.CANDIDATES[0])
+
+    def test_reserve_should_ignore_expired_reservations(self):
+        self.ledger.reserve(self.CANDIDATES, 'profile-1')
+
+        with mock.patch(OneViewModuleBase.__module__ + '.time.time', return_value=10 ** 12):
+            self.assertEqual(self.ledger.reserve(self.CANDIDATES, 'profile-2'), self.CANDIDATES[0])
+
+    def test_release_should_only_remove_the_reservation_of_the_owner(self):
+        self.ledger.reserve(self.CANDIDATES, 'profile-1')
+
+        self.ledger.release(self.CANDIDATES[0], 'profile-2')
+        self.assertEqual(self.ledger.reserve(self.CANDIDATES, 'profile-2'), self.CANDIDATES[1])
+
+        self.ledger.release(self.CANDIDATES[0], 'profile-1')
+        self.assertEqual(self.ledger.reserve(self.CANDIDATES, 'profile-3'), self.CANDIDATES[0])
+
+    def test_reserve_should_return_the_first_candidate_when_the_ledger_is_unavailable(self):
+        ledger_path = os.path.join(self.ledger_dir, 'file')
+        open(ledger_path, 'w').close()
+        ledger = ServerHardwareAllocationLedger(os.path.join(ledger_path, 'allocations.json'))
+
+        self.assertEqual(ledger.reserve(self.CANDIDATES, 'profile-1'), self.CANDIDATES[0])
+        ledger.release(self.CANDIDATES[0], 'profile-1')
+
+
+class ServerProfileIndexTest(unittest.TestCase):
+    HOST = '10.0.0.1'
+    PROFILES = [dict(uri='/rest/server-profiles/1', modified='2017-10-01T10:00:00.000Z', serialNumber='SN1',
+                     serverHardwareUri='/rest/server-hardware/1', uuid='UUID1'),
+                dict(uri='/rest/server-profiles/2', modified='2017-10-02T10:00:00.000Z', serialNumber='SN2',
+                     serverHardwareUri=None, uuid='UUID2')]
+
+    def setUp(self):
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        self.index = ServerProfileIndex(os.path.join(index_dir, 'index', 'server_profiles.json'))
+
+        self.mock_oneview_client = mock.Mock()
+        self.mock_oneview_client.connection.get_host.return_value = self.HOST
+
+        patcher_resource_client = mock.patch(OneViewModuleBase.__module__ + '.ResourceClient')
+        self.addCleanup(patcher_resource_client.stop)
+        self.mock_resource_client = patcher_resource_client.start().return_value
+        self.mock_resource_client.get_all.return_value = deepcopy(self.PROFILES)
+
+    def test_from_environment_variables_should_return_none_when_not_configured(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(ServerProfileIndex.from_environment_variables())
+
+    def test_from_environment_variables(self):
+        with mock.patch.dict(os.environ, {'ONEVIEW_SERVER_PROFILE_INDEX': self.index.path}):
+            self.assertEqual(ServerProfileIndex.from_environment_variables().path, self.index.path)
+
+    def test_get_uri_should_return_none_when_not_refreshed(self):
+        self.assertIsNone(self.index.get_uri(self.HOST, 'serialNumber', 'SN1'))
+
+    def test_first_refresh_should_index_all_the_profiles(self):
+        self.index.refresh(self.mock_oneview_client)
+
+        self.mock_resource_client.get_all.assert_called_once_with(filter='', fields=ServerProfileIndex.FIELDS)
+        self.assertEqual(self.index.get_uri(self.HOST, 'serialNumber', 'SN2'), '/rest/server-profiles/2')
+        self.assertEqual(self.index.get_uri(self.HOST, 'serverHardwareUri', '/rest/server-hardware/1'),
+                         '/rest/server-profiles/1')
+        self.assertEqual(self.index.get_uri(self.HOST, 'uuid', 'UUID1'), '/rest/server-profiles/1')
+        self.assertIsNone(self.index.get_uri('10.0.0.2', 'uuid', 'UUID1'))
+
+    def test_refresh_should_only_get_the_profiles_modified_since_the_newest_one_indexed(self):
+        self.index.refresh(self.mock_oneview_client)
+        self.mock_resource_client.get_all.return_value = [
+            dict(self.PROFILES[0], modified='2017-10-03T10:00:00.000Z', serverHardwareUri='/rest/server-hardware/2')]
+
+        self.index.refresh(self.mock_oneview_client)
+
+        self.mock_resource_client.get_all.assert_called_with(filter="modified>='2017-10-02T10:00:00.000Z'",
+                                                             fields=ServerProfileIndex.FIELDS)
+        self.assertEqual(self.index.get_uri(self.HOST, 'serverHardwareUri', '/rest/server-hardware/2'),
+                         '/rest/server-profiles/1')
+        self.assertIsNone(self.index.get_uri(self.HOST, 'serverHardwareUri', '/rest/server-hardware/1'))
+
+    def test_forget(self):
+        self.index.refresh(self.mock_oneview_client)
+
+        self.index.forget(self.HOST, '/rest/server-profiles/1')
+
+        self.assertIsNone(self.index.get_uri(self.HOST, 'serialNumber', 'SN1'))
+        self.assertEqual(self.index.get_uri(self.HOST, 'serialNumber', 'SN2'), '/rest/server-profiles/2')
+
+
+class EnclosureHostnameIndexTest(unittest.TestCase):
+    HOST = '10.0.0.1'
+    ENCLOSURE = dict(uri='/rest/enclosures/1', activeOaPreferredIP='172.18.1.13', standbyOaPreferredIP='172.18.1.14')
+
+    def setUp(self):
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        self.index = EnclosureHostnameIndex(os.path.join(index_dir, 'index', 'enclosures.json'))
+
+    def test_from_environment_variables_should_return_none_when_not_configured(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(EnclosureHostnameIndex.from_environment_variables())
+
+    def test_from_environment_variables(self):
+        with mock.patch.dict(os.environ, {'ONEVIEW_ENCLOSURE_INDEX': self.index.path}):
+            self.assertEqual(EnclosureHostnameIndex.from_environment_variables().path, self.index.path)
+
+    def test_get_uri_should_return_none_when_not_indexed(self):
+        self.assertIsNone(self.index.get_uri(self.HOST, '172.18.1.13'))
+
+    def test_add_should_index_the_ips_of_both_onboard_administrators(self):
+        self.index.add(self.HOST, self.ENCLOSURE)
+
+        self.assertEqual(self.index.get_uri(self.HOST, '172.18.1.13'), '/rest/enclosures/1')
+        self.assertEqual(self.index.get_uri(self.HOST, '172.18.1.14'), '/rest/enclosures/1')
+        self.assertIsNone(self.index.get_uri('10.0.0.2', '172.18.1.13'))
+
+    def test_add_should_index_the_hostnames_given(self):
+        self.index.add(self.HOST, dict(uri='/rest/enclosures/2', activeOaPreferredIP=None), ['fe80::1'])
+
+        self.assertEqual(self.index.get_uri(self.HOST, 'fe80::1'), '/rest/enclosures/2')
+        self.assertIsNone(self.index.get_uri(self.HOST, None))
+
+    def test_forget_should_remove_every_hostname_of_the_enclosure(self):
+        self.index.add(self.HOST, self.ENCLOSURE)
+        self.index.add(self.HOST, dict(uri='/rest/enclosures/2', activeOaPreferredIP='172.18.1.15'))
+
+        self.index.forget(self.HOST, '/rest/enclosures/1')
+
+        self.assertIsNone(self.index.get_uri(self.HOST, '172.18.1.13'))
+        self.assertIsNone(self.index.get_uri(self.HOST, '172.18.1.14'))
+        self.assertEqual(self.index.get_uri(self.HOST, '172.18.1.15'), '/rest/enclosures/2')
+
+    def test_forget_hostname_should_only_remove_the_hostname(self):
+        self.index.add(self.HOST, self.ENCLOSURE)
+
+        self.index.forget_hostname(self.HOST, '172.18.1.13')
+
+        self.assertIsNone(self.index.get_uri(self.HOST, '172.18.1.13'))
+        self.assertEqual(self.index.get_uri(self.HOST, '172.18.1.14'), '/rest/enclosures/1')
+
+    def test_get_resource_should_forget_the_resource_not_found(self):
+        self.index.add(self.HOST, self.ENCLOSURE)
+        mock_enclosures = mock.Mock()
+        mock_enclosures.get.side_effect = HPOneViewException(dict(errorCode='RESOURCE_NOT_FOUND', message='Not found'))
+
+        self.assertIsNone(self.index.get_resource(mock_enclosures, self.HOST, '/rest/enclosures/1', lambda _: True))
+        self.assertIsNone(self.index.get_uri(self.HOST, '172.18.1.13'))
+
+    def test_get_resource_should_raise_the_other_errors(self):
+        self.index.add(self.HOST, self.ENCLOSURE)
+        mock_enclosures = mock.Mock()
+        mock_enclosures.get.side_effect = HPOneViewException(dict(errorCode='AUTHORIZATION', message='Unauthorized'))
+
+        with self.assertRaises(HPOneViewException):
+            self.index.get_resource(mock_enclosures, self.HOST, '/rest/enclosures/1', lambda _: True)
+        self.assertEqual(self.index.get_uri(self.HOST, '172.18.1.13'), '/rest/enclosures/1')
+
+    def test_get_resource_should_return_none_when_the_resource_changed(self):
+        mock_enclosures = mock.Mock()
+        mock_enclosures.get.return_value = self.ENCLOSURE
+
+        self.assertEqual(self.index.get_resource(mock_enclosures, self.HOST, '/rest/enclosures/1', lambda _: True),
+                         self.ENCLOSURE)
+        self.assertIsNone(self.index.get_resource(mock_enclosures, self.HOST, '/rest/enclosures/1', lambda _: False))
+
+
+class ServerProfileLookupTest(unittest.TestCase):
+    SERVER_PROFILE = dict(uri='/rest/server-profiles/1', name='Profile101', serialNumber='SN1')
+
+    def setUp(self):
+        self.mock_oneview_client = mock.Mock()
+        self.mock_oneview_client.connection.get_host.return_value = '10.0.0.1'
+        # The index checks the profiles it gets, only its local storage is mocked
+        self.mock_index = ServerProfileIndex('server_profiles.json')
+        self.mock_index.get_uri = mock.Mock()
+        self.mock_index.refresh = mock.Mock()
+        self.mock_index.forget = mock.Mock()
+
+    def test_should_search_with_a_filter_when_there_is_no_index(self):
+        self.mock_oneview_client.server_profiles.get_all.return_value = [self.SERVER_PROFILE]
+
+        server_profile = ServerProfileLookup(self.mock_oneview_client).get('serialNumber', "SN'1")
+
+        self.mock_oneview_client.server_profiles.get_all.assert_called_once_with(filter="serialNumber='SN''1'")
+        self.assertIsNone(server_profile)
+
+    def test_should_return_the_profile_found_with_the_filter(self):
+        self.mock_oneview_client.server_profiles.get_all.return_value = [self.SERVER_PROFILE]
+
+        self.assertEqual(ServerProfileLookup(self.mock_oneview_client).get('serialNumber', 'SN1'), self.SERVER_PROFILE)
+
+    def test_should_raise_exception_when_the_key_is_not_supported(self):
+        with self.assertRaises(HPOneViewValueError):
+            ServerProfileLookup(self.mock_oneview_client).get('macType', 'Virtual')
+
+    def test_should_get_the_indexed_profile_with_a_single_request(self):
+        self.mock_index.get_uri.return_value = self.SERVER_PROFILE['uri']
+        self.mock_oneview_client.server_profiles.get.return_value = self.SERVER_PROFILE
+
+        server_profile = ServerProfileLookup(self.mock_oneview_client, self.mock_index).get('serialNumber', 'SN1')
+
+        self.assertEqual(server_profile, self.SERVER_PROFILE)
+        self.mock_oneview_client.server_profiles.get.assert_called_once_with(self.SERVER_PROFILE['uri'])
+        self.mock_index.refresh.assert_not_called()
+        self.mock_oneview_client.server_profiles.get_all.assert_not_called()
+
+    def test_should_refresh_the_index_when_it_misses(self):
+        self.mock_index.get_uri.side_effect = [None, self.SERVER_PROFILE['uri']]
+        self.mock_oneview_client.server_profiles.get.return_value = self.SERVER_PROFILE
+
+        server_profile = ServerProfileLookup(self.mock_oneview_client, self.mock_index).get('serialNumber', 'SN1')
+
+        self.assertEqual(server_profile, self.SERVER_PROFILE)
+        self.mock_index.refresh.assert_called_once_with(self.mock_oneview_client)
+
+    def test_should_refresh_the_index_when_the_indexed_profile_changed(self):
+        self.mock_index.get_uri.return_value = self.SERVER_PROFILE['uri']
+        self.mock_oneview_client.server_profiles.get.return_value = dict(self.SERVER_PROFILE, serialNumber='SN2')
+
+        server_profile = ServerProfileLookup(self.mock_oneview_client, self.mock_index).get('serialNumber', 'SN1')
+
+        self.assertIsNone(server_profile)
+        self.mock_index.refresh.assert_called_once_with(self.mock_oneview_client)
+
+    def test_should_forget_the_indexed_profile_not_found(self):
+        self.mock_index.get_uri.side_effect = [self.SERVER_PROFILE['uri'], None]
+        self.mock_oneview_client.server_profiles.get.side_effect = HPOneViewException(
+            dict(errorCode='RESOURCE_NOT_FOUND', message='Not found'))
+
+        server_profile = ServerProfileLookup(self.mock_oneview_client, self.mock_index).get('serialNumber', 'SN1')
+
+        self.assertIsNone(server_profile)
+        self.mock_index.forget.assert_called_once_with('10.0.0.1', self.SERVER_PROFILE['uri'])
+
+    def test_should_raise_exception_when_the_indexed_profile_can_not_be_got(self):
+        self.mock_index.get_uri.return_value = self.SERVER_PROFILE['uri']
+        self.mock_oneview_client.server_profiles.get.side_effect = HPOneViewException(
+            dict(errorCode='AUTHORIZATION', message='Unauthorized'))
+
+        with self.assertRaises(HPOneViewException):
+            ServerProfileLookup(self.mock_oneview_client, self.mock_index).get('serialNumber', 'SN1')
+
+        self.mock_index.forget.assert_not_called()
+        self.mock_index.refresh.assert_not_called()
+
+
+class GetBackoffDelayTest(unittest.TestCase):
+    def test_should_grow_exponentially_up_to_the_cap(self):
+        with mock.patch(OneViewModuleBase.__module__ + '.random.uniform', side_effect=lambda low, high: high):
+            self.assertEqual([get_backoff_delay(attempt, base=1, cap=30) for attempt in range(1, 8)],
+                             [1, 2, 4, 8, 16, 30, 30])
+
+    def test_should_have_jitter(self):
+        delays = [get_backoff_delay(3) for _ in range(20)]
+
+        self.assertTrue(all(0 <= delay <= 4 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+class _StubApplianceHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        http.server.BaseHTTPRequestHandler.setup(self)
+        self.server.connections_count += 1
+
+    def do_GET(self):
+        body = json.dumps(dict(path=self.path, auth=self.headers.get('auth'))).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class OneViewConnectionBrokerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+
+        self.appliance = http.server.HTTPServer(('127.0.0.1', 0), _StubApplianceHandler)
+        self.appliance.connections_count = 0
+        self.addCleanup(self.appliance.server_close)
+        appliance_thread = threading.Thread(target=self.appliance.serve_forever)
+        appliance_thread.daemon = True
+        appliance_thread.start()
+        self.addCleanup(self.appliance.shutdown)
+
+        self.broker = OneViewConnectionBroker(os.path.join(self.tmp_dir, 'broker.sock'), idle_timeout=60)
+        patcher_connection = mock.patch.object(self.broker, '_create_connection',
+                                               side_effect=lambda host, proxy, ssl_bundle:
+                                               http.client.HTTPConnection(*self.appliance.server_address))
+        self.addCleanup(patcher_connection.stop)
+        patcher_connection.start()
+
+        broker_thread = threading.Thread(target=self.broker.serve)
+        broker_thread.daemon = True
+        broker_thread.start()
+        self.addCleanup(self.broker.shutdown)
+        while not self.broker._is_running():
+            time.sleep(0.01)
+
+        self.connection = mock.Mock(_host='appliance', _headers={'auth': 'session', 'X-API-Version': 500},
+                                    _doProxy=False, _sslTrustAll=True)
+
+    def test_from_environment_variables_should_return_none_when_not_configured(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(OneViewConnectionBroker.from_environment_variables())
+
+    def test_from_environment_variables(self):
+        with mock.patch.dict(os.environ, {'ONEVIEW_CONNECTION_BROKER_SOCKET': '/tmp/broker.sock',
+                                          'ONEVIEW_CONNECTION_BROKER_IDLE_TIMEOUT': '10'}):
+            broker = OneViewConnectionBroker.from_environment_variables()
+
+        self.assertEqual(broker.socket_path, '/tmp/broker.sock')
+        self.assertEqual(broker.idle_timeout, 10)
+
+    def test_request_should_return_response_and_parsed_body(self):
+        resp, body = self.broker.request(self.connection, 'GET', '/rest/version', '')
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.getheader('content-type'), 'application/json')
+        self.assertEqual(body, dict(path='/rest/version', auth='session'))
+
+    def test_request_should_reuse_the_appliance_connection(self):
+        for _ in range(5):
+            self.broker.request(self.connection, 'GET', '/rest/server-profiles', '')
+
+        self.assertEqual(self.appliance.connections_count, 1)
+
+    def test_request_should_share_connections_across_clients(self):
+        other_client = OneViewConnectionBroker(self.broker.socket_path)
+
+        self.broker.request(self.connection, 'GET', '/rest/server-profiles', '')
+        other_client.request(self.connection, 'GET', '/rest/server-profiles', '')
+
+        self.assertEqual(self.appliance.connections_count, 1)
+
+    def test_start_should_not_spawn_when_running(self):
+        with mock.patch.object(self.broker, '_spawn') as mock_spawn:
+            self.assertTrue(self.broker.start())
+
+        mock_spawn.assert_not_called()
+
+    def test_install_should_route_requests_through_the_broker(self):
+        oneview_client = mock.Mock()
+        oneview_client.connection = self.connection
+
+        self.assertTrue(self.broker.install(oneview_client))
+        resp, body = oneview_client.connection.do_http('GET', '/rest/enclosures', '')
+
+        self.assertEqual(body['path'], '/rest/enclosures')
+
+    def test_install_should_route_image_streamer_requests_through_the_broker(self):
+        oneview_client = mock.Mock()
+        image_streamer_client = oneview_client.create_image_streamer_client.return_value
+        image_streamer_client.connection = mock.Mock(_host='i3s', _headers={'auth': 'session'}, _doProxy=False,
+                                                     _sslTrustAll=True)
 
-        self.assertIsNone(res)
+        self.broker.install(oneview_client)
+        resp, body = oneview_client.create_image_streamer_client().connection.do_http('GET', '/rest/plan-scripts', '')
 
-    def test_transform_list_to_dict(self):
-        list_ = ['one', 'two', {'tree': 3}, 'four', 5]
+        self.assertEqual(body['path'], '/rest/plan-scripts')
 
-        dict_transformed = OneViewModuleBase.transform_list_to_dict(list_=list_)
+    def test_install_should_keep_direct_connections_when_broker_does_not_start(self):
+        oneview_client = mock.Mock()
+        do_http = oneview_client.connection.do_http
 
-        self.assertEqual(dict_transformed,
-                         {'5': True,
-                          'four': True,
-                          'one': True,
-                          'tree': 3,
-                          'two': True})
+        with mock.patch.object(OneViewConnectionBroker, 'start', return_value=False):
+            self.assertFalse(self.broker.install(oneview_client))
 
-    def test_transform_list_to_dict_with_none(self):
+        self.assertEqual(oneview_client.connection.do_http, do_http)
 
-        dict_transformed = OneViewModuleBase.transform_list_to_dict(None)
+    def test_should_return_error_when_appliance_is_unreachable(self):
+        self.broker._create_connection.side_effect = lambda host, proxy, ssl_bundle: \
+            http.client.HTTPConnection('127.0.0.1', 1)
 
-        self.assertEqual(dict_transformed, {})
+        self.assertRaises(HPOneViewException, self.broker.request, self.connection, 'GET', '/rest/version', '')
 
 
 class ResourceComparatorTest(unittest.TestCase):
@@ -1124,8 +1982,168 @@ class ResourceComparatorTest(unittest.TestCase):
         }
         self.assertFalse(ResourceComparator.compare(dict1, dict2))
 
+    def test_find_difference_should_return_none_when_equivalent(self):
+        dict1 = {"name": "name", "connections": [{"id": 2, "portId": None}, {"id": 1, "boot": {}}], "value": 1.0}
+        dict2 = {"connections": [{"id": 1, "boot": None}, {"id": 2}], "name": "name", "value": 1, "description": None}
+
+        self.assertIsNone(ResourceComparator.find_difference(dict1, dict2))
+
+    def test_find_difference_should_return_path_of_first_difference(self):
+        dict1 = {"name": "name", "connections": [{"id": 2, "networkUri": "/rest/2"}, {"id": 1, "networkUri": "/rest/1"}]}
+        dict2 = {"name": "name", "connections": [{"id": 1, "networkUri": "/rest/1"}, {"id": 2, "networkUri": "/rest/3"}]}
+
+        self.assertEqual(ResourceComparator.find_difference(dict1, dict2), '/connections/0/networkUri')
+
+    def test_find_difference_should_return_path_of_missing_key(self):
+        self.assertEqual(ResourceComparator.find_difference({"a": {"b": 1}}, {"a": {"b": 1, "c/d": 2}}), '/a/c~1d')
+
+    def test_find_difference_should_return_empty_path_when_resources_differ_as_whole(self):
+        self.assertEqual(ResourceComparator.find_difference({"a": 1}, None), '')
+        self.assertEqual(ResourceComparator.find_difference([1, 2], [1]), '')
+
+    def test_find_difference_should_not_change_resources(self):
+        dict1 = {"name": "name", "values": [3, 1, 2], "nested": [{"b": [2, 1]}, {"a": 1}]}
+        dict2 = {"name": "name", "values": [2, 3, 1], "nested": [{"a": 1}, {"b": [1, 2]}]}
+        expected1 = deepcopy(dict1)
+        expected2 = deepcopy(dict2)
+
+        self.assertTrue(ResourceComparator.compare(dict1, dict2))
+        self.assertEqual(dict1, expected1)
+        self.assertEqual(dict2, expected2)
+
+    def test_build_patch_should_be_empty_when_equivalent(self):
+        dict1 = {"name": "name", "values": [3, 1.0], "empty": [], "enabled": False, "connections": [{"id": 1}]}
+        dict2 = {"name": "name", "values": [1, 3], "empty": None, "enabled": None, "connections": [{"id": 1.0}],
+                 "description": None}
+
+        self.assertEqual(ResourceComparator.build_patch(dict1, dict2), [])
+
+    def test_build_patch_should_replace_changed_values(self):
+        dict1 = {"name": "name", "bios": {"manageBios": True, "overriddenSettings": [{"id": 1}]}, "count": 1}
+        dict2 = {"name": "new name", "bios": {"manageBios": True, "overriddenSettings": [{"id": 2}]}, "count": 1.0}
+
+        self.assertEqual(ResourceComparator.build_patch(dict1, dict2), [
+            dict(op='replace', path='/name', value='new name'),
+            dict(op='replace', path='/bios/overriddenSettings', value=[{"id": 2}])])
+
+    def test_build_patch_should_add_and_remove_keys(self):
+        dict1 = {"name": "name", "description": "old", "a/b": {"c~d": None}}
+        dict2 = {"name": "name", "a/b": {"c~d": 1}, "uuid": "123", "other": None}
+
+        patch = ResourceComparator.build_patch(dict1, dict2)
+
+        self.assertEqual(sorted(patch, key=lambda operation: operation['path']), [
+            dict(op='replace', path='/a~1b/c~0d', value=1),
+            dict(op='remove', path='/description'),
+            dict(op='add', path='/uuid', value='123')])
+
+    def test_build_patch_should_replace_value_of_different_type(self):
+        self.assertEqual(ResourceComparator.build_patch({"boot": {"manageBoot": True}}, {"boot": None}),
+                         [dict(op='replace', path='/boot', value=None)])
+
+    def test_build_patch_should_agree_with_compare(self):
+        resources = [{}, {"a": None}, {"a": 1}, {"a": "1"}, {"a": 1.0}, {"a": False}, {"a": []}, {"a": [1, 2]},
+                     {"a": [2, 1]}, {"a": {}}, {"a": {"b": None}}, {"a": {"b": 1}}, {"b": 1}]
+
+        for first in resources:
+            for second in resources:
+                self.assertEqual(ResourceComparator.build_patch(first, second) == [],
+                                 ResourceComparator.compare(first, second), msg="{} {}".format(first, second))
+
+    def test_should_not_log_difference_when_debug_is_disabled(self):
+        with mock.patch(OneViewModuleBase.__module__ + '.logger') as mock_logger:
+            mock_logger.isEnabledFor.return_value = False
+            self.assertFalse(ResourceComparator.compare({"a": 1}, {"a": 2}))
+
+        mock_logger.debug.assert_not_called()
+
+    def test_should_log_difference_when_debug_is_enabled(self):
+        with mock.patch(OneViewModuleBase.__module__ + '.logger') as mock_logger:
+            mock_logger.isEnabledFor.return_value = True
+            ResourceComparator.compare({"a": 1}, {"a": 2})
+
+        self.assertIn("Difference found at key '/a'", mock_logger.debug.call_args[0][0])
+
+    def test_comparing_nested_empty_lists_should_be_equal(self):
+        self.assertTrue(ResourceComparator.compare({"a": [[], [1]]}, {"a": [[1], []]}))
+
+    def test_should_match_list_elements_regardless_of_positions(self):
+        dict1 = {"connections": [{"id": i, "boot": {"priority": "NotBootable"}} for i in range(50)]}
+        dict2 = {"connections": [{"id": i, "boot": {"priority": "NotBootable"}} for i in reversed(range(50))]}
+
+        self.assertTrue(ResourceComparator.compare(dict1, dict2))
+
+        dict2["connections"][10]["boot"]["priority"] = "Primary"
+        self.assertFalse(ResourceComparator.compare(dict1, dict2))
+
+
+class ResourceDigestTest(unittest.TestCase):
+    def test_digest_should_not_depend_on_the_order_of_keys_and_list_elements(self):
+        dict1 = {"name": "name", "values": [3, 1, 2], "nested": [{"b": [2, 1]}, {"a": 1}]}
+        dict2 = {"nested": [{"a": 1}, {"b": [1, 2]}], "values": [2, 3, 1], "name": "name"}
+
+        self.assertEqual(ResourceDigest().of(dict1), ResourceDigest().of(dict2))
+
+    def test_digest_should_follow_the_comparator_equivalence_rules(self):
+        dict1 = {"name": "name", "value": 1.0, "enabled": False, "empty": [], "boot": {}, "description": None}
+        dict2 = {"name": "name", "value": 1, "enabled": "", "empty": {}, "boot": []}
+
+        self.assertEqual(ResourceDigest().of(dict1), ResourceDigest().of(dict2))
+
+    def test_digest_should_differ_when_only_the_comparator_finds_equivalence(self):
+        # An empty value is equivalent to None, but not to an inexistent key: the comparison walks these resources
+        dict1 = {"name": "name", "empty": []}
+        dict2 = {"name": "name", "empty": None}
+
+        self.assertNotEqual(ResourceDigest().of(dict1), ResourceDigest().of(dict2))
+        self.assertTrue(ResourceComparator.compare(dict1, dict2))
+
+    def test_digest_should_differ_when_resources_are_not_equivalent(self):
+        digest = ResourceDigest()
+        resources = [{}, {"a": 1}, {"a": 2}, {"b": 1}, {"a": [1]}, {"a": [1, 1]}, {"a": [0]}, {"a": [""]},
+                     {"a": {"b": 1}}, {"a": [{"b": 1}]}, [], [{}], [1]]
+
+        digests = [digest.of(resource) for resource in resources]
+
+        self.assertEqual(len(set(digests)), len(resources))
+
+    def test_digest_should_be_stable_across_instances(self):
+        resource = {"name": "name", "connections": [{"id": 1, "networkUri": "/rest/1"}]}
+
+        self.assertEqual(ResourceDigest().of(resource), ResourceDigest().of(deepcopy(resource)))
+        self.assertEqual(len(ResourceDigest().of(resource)), 40)
+
+    def test_canonical_form_should_be_memoised(self):
+        digest = ResourceDigest()
+        shared = {"id": 1, "boot": {"priority": "Primary"}}
+
+        first = digest.canonical({"connections": [shared]})
+        with mock.patch.object(ResourceComparator, '_standardize_value') as mock_standardize:
+            second = digest.canonical({"other": [shared]})
+
+        mock_standardize.assert_not_called()
+        self.assertEqual(first[2][0][1], second[2][0][1])
+
 
 class ResourceMergerTest(unittest.TestCase):
+    def test_index_by_key(self):
+        items = [dict(id=2, value="2"), dict(id=1, value="1")]
+
+        index = ResourceMerger.index_by_key(items, key="id")
+
+        self.assertEqual(list(index.keys()), [2, 1])
+        self.assertIs(index[1], items[1])
+
+    def test_merge_list_by_key_with_original_index(self):
+        original_list = [dict(id=1, value="1", mac="E2:4B:0D:30:00:09"), dict(id=2, value="2")]
+        list_with_changes = [dict(id=1, value="one"), dict(id=3, value="3")]
+
+        merged_list = ResourceMerger.merge_list_by_key(original_list, list_with_changes, key="id",
+                                                       original_index=ResourceMerger.index_by_key(original_list, "id"))
+
+        self.assertEqual(merged_list, [dict(id=1, value="one", mac="E2:4B:0D:30:00:09"), dict(id=3, value="3")])
+        self.assertEqual(original_list[0], dict(id=1, value="1", mac="E2:4B:0D:30:00:09"))
+
     def test_merge_list_by_key_when_original_list_is_empty(self):
         original_list = []
         list_with_changes = [dict(id=1, value="123")]
@@ -1240,13 +2258,23 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         self.addCleanup(patcher_json_file.stop)
         self.mock_ov_client = patcher_json_file.start()
 
+        patcher_resource_client = mock.patch(OneViewModuleBase.__module__ + '.ResourceClient')
+        self.addCleanup(patcher_resource_client.stop)
+        self.mock_resource_client = patcher_resource_client.start()
+        self.collections = {}
+        self.mock_resource_client.side_effect = lambda connection, uri: mock.Mock(
+            get_all=mock.Mock(return_value=self.collections.get(uri, [])))
+
+    def mock_collection(self, resource_type, members):
+        self.collections[getattr(self.mock_ov_client, resource_type).URI] = members
+
     def test_should_replace_os_deployment_name_by_uri(self):
         uri = '/rest/os-deployment-plans/81decf85-0dff-4a5e-8a95-52994eeb6493'
 
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data[SPKeys.OS_DEPLOYMENT] = dict(osDeploymentPlanName="Deployment Plan Name")
 
-        self.mock_ov_client.os_deployment_plans.get_by.return_value = [dict(uri=uri)]
+        self.mock_collection('os_deployment_plans', [dict(name="Deployment Plan Name", uri=uri)])
 
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
@@ -1256,7 +2284,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data[SPKeys.OS_DEPLOYMENT] = dict(osDeploymentPlanName="Deployment Plan Name")
 
-        self.mock_ov_client.os_deployment_plans.get_by.return_value = []
+        self.mock_collection('os_deployment_plans', [])
 
         expected_error = ServerProfileReplaceNamesByUris.SERVER_PROFILE_OS_DEPLOYMENT_NOT_FOUND + "Deployment Plan Name"
 
@@ -1273,7 +2301,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data['enclosureGroupName'] = "Enclosure Group Name"
 
-        self.mock_ov_client.enclosure_groups.get_by.return_value = [dict(uri=uri)]
+        self.mock_collection('enclosure_groups', [dict(name="Enclosure Group Name", uri=uri)])
 
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
@@ -1284,7 +2312,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data['enclosureGroupName'] = "Enclosure Group Name"
 
-        self.mock_ov_client.enclosure_groups.get_by.return_value = []
+        self.mock_collection('enclosure_groups', [])
 
         message = ServerProfileReplaceNamesByUris.SERVER_PROFILE_ENCLOSURE_GROUP_NOT_FOUND + "Enclosure Group Name"
 
@@ -1303,8 +2331,8 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data[SPKeys.CONNECTIONS] = [conn_1, conn_2, conn_3]
 
-        self.mock_ov_client.fc_networks.get_by.side_effect = [[dict(uri='/rest/fc-networks/14')], []]
-        self.mock_ov_client.ethernet_networks.get_by.return_value = [dict(uri='/rest/ethernet-networks/18')]
+        self.mock_collection('fc_networks', [dict(name='FC Network', uri='/rest/fc-networks/14')])
+        self.mock_collection('ethernet_networks', [dict(name='Ethernet Network', uri='/rest/ethernet-networks/18')])
 
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
@@ -1320,8 +2348,8 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data[SPKeys.CONNECTIONS] = [conn]
 
-        self.mock_ov_client.fc_networks.get_by.return_value = []
-        self.mock_ov_client.ethernet_networks.get_by.return_value = []
+        self.mock_collection('fc_networks', [])
+        self.mock_collection('ethernet_networks', [])
 
         expected_error = ServerProfileReplaceNamesByUris.SERVER_PROFILE_NETWORK_NOT_FOUND + "FC Network"
 
@@ -1332,13 +2360,41 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         else:
             self.fail(msg="Expected Exception was not raised")
 
+    def test_should_report_all_networks_not_found_at_once(self):
+        sp_data = deepcopy(self.BASIC_PROFILE)
+        sp_data[SPKeys.CONNECTIONS] = [dict(name="connection-1", networkName='FC Network'),
+                                       dict(name="connection-2", networkName='Ethernet Network'),
+                                       dict(name="connection-3", networkName='FCoE Network')]
+
+        self.mock_collection('ethernet_networks', [dict(name='Ethernet Network', uri='/rest/ethernet-networks/18')])
+
+        expected_error = ServerProfileReplaceNamesByUris.SERVER_PROFILE_NETWORK_NOT_FOUND + \
+            "FC Network, FCoE Network"
+
+        try:
+            ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
+        except HPOneViewResourceNotFound as e:
+            self.assertEqual(e.msg, expected_error)
+        else:
+            self.fail(msg="Expected Exception was not raised")
+
+    def test_should_replace_fcoe_network_name_by_uri(self):
+        sp_data = deepcopy(self.BASIC_PROFILE)
+        sp_data[SPKeys.CONNECTIONS] = [dict(name="connection-1", networkName='FCoE Network')]
+
+        self.mock_collection('fcoe_networks', [dict(name='FCoE Network', uri='/rest/fcoe-networks/7')])
+
+        ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
+
+        self.assertEqual(sp_data[SPKeys.CONNECTIONS], [dict(name="connection-1", networkUri='/rest/fcoe-networks/7')])
+
     def test_should_replace_server_hardware_type_name_by_uri(self):
         sht_uri = "/rest/server-hardware-types/BCAB376E-DA2E-450D-B053-0A9AE7E5114C"
         sht = {"name": "SY 480 Gen9 1", "uri": sht_uri}
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data['serverHardwareTypeName'] = "SY 480 Gen9 1"
 
-        self.mock_ov_client.server_hardware_types.get_by.return_value = [sht]
+        self.mock_collection('server_hardware_types', [sht])
 
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
@@ -1349,7 +2405,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data['serverHardwareTypeName'] = "SY 480 Gen9 1"
 
-        self.mock_ov_client.server_hardware_types.get_by.return_value = []
+        self.mock_collection('server_hardware_types', [])
 
         expected_error = ServerProfileReplaceNamesByUris.SERVER_HARDWARE_TYPE_NOT_FOUND + "SY 480 Gen9 1"
 
@@ -1412,7 +2468,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.volumes.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_volume_name_when_volume_attachments_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1424,7 +2480,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.volumes.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_volume_name_when_san_storage_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1434,7 +2490,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.volumes.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_volume_name_not_found(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1467,7 +2523,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         expected_dict['sanStorage']['volumeAttachments'][0] = {"id": 1, "volumeStoragePoolUri": "/rest/storage-pools/1"}
         expected_dict['sanStorage']['volumeAttachments'][1] = {"id": 2, "volumeStoragePoolUri": "/rest/storage-pools/2"}
 
-        self.mock_ov_client.storage_pools.get_by.side_effect = [[pool1], [pool2]]
+        self.mock_collection('storage_pools', [pool1, pool2])
 
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
@@ -1486,7 +2542,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.storage_pools.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_storage_pool_name_when_volume_attachments_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1498,7 +2554,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.storage_pools.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_storage_pool_name_when_san_storage_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1508,7 +2564,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.storage_pools.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_storage_pool_name_not_found(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1518,7 +2574,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
             ]
         }
 
-        self.mock_ov_client.storage_pools.get_by.return_value = []
+        self.mock_collection('storage_pools', [])
 
         expected_error = ServerProfileReplaceNamesByUris.STORAGE_POOL_NOT_FOUND + "pool1"
 
@@ -1543,7 +2599,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         expected['sanStorage']['volumeAttachments'][0] = {"id": 1, "volumeStorageSystemUri": "/rest/storage-systems/1"}
         expected['sanStorage']['volumeAttachments'][1] = {"id": 2, "volumeStorageSystemUri": "/rest/storage-systems/2"}
 
-        self.mock_ov_client.storage_systems.get_by.side_effect = [[storage_system1], [storage_system2]]
+        self.mock_collection('storage_systems', [storage_system1, storage_system2])
 
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
@@ -1562,7 +2618,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.storage_systems.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_storage_system_name_when_volume_attachments_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1574,7 +2630,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.storage_systems.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_storage_system_name_when_san_storage_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1584,7 +2640,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.storage_systems.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_storage_system_name_not_found(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1594,7 +2650,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
             ]
         }
 
-        self.mock_ov_client.storage_systems.get_by.return_value = []
+        self.mock_collection('storage_systems', [])
 
         expected_error = ServerProfileReplaceNamesByUris.STORAGE_SYSTEM_NOT_FOUND + "system1"
 
@@ -1664,7 +2720,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.interconnects.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_interconnect_name_when_connections_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1674,7 +2730,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.interconnects.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_interconnect_name_not_found(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1698,7 +2754,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         expected = deepcopy(sp_data)
         expected['firmware'] = {"firmwareBaselineUri": "/rest/firmware-drivers/1"}
 
-        self.mock_ov_client.firmware_drivers.get_by.return_value = [firmware_driver]
+        self.mock_collection('firmware_drivers', [firmware_driver])
 
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
@@ -1713,7 +2769,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.firmware_drivers.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_firmware_baseline_name_when_firmware_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1723,13 +2779,13 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.firmware_drivers.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_firmware_baseline_name_not_found(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
         sp_data['firmware'] = {"firmwareBaselineName": "firmwareName001"}
 
-        self.mock_ov_client.firmware_drivers.get_by.return_value = None
+        self.mock_collection('firmware_drivers', [])
 
         expected_error = ServerProfileReplaceNamesByUris.FIRMWARE_DRIVER_NOT_FOUND + "firmwareName001"
 
@@ -1754,7 +2810,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         expected['localStorage']['sasLogicalJBODs'][0] = {"id": 1, "sasLogicalJBODUri": "/rest/sas-logical-jbods/1"}
         expected['localStorage']['sasLogicalJBODs'][1] = {"id": 2, "sasLogicalJBODUri": "/rest/sas-logical-jbods/2"}
 
-        self.mock_ov_client.sas_logical_jbods.get_by.side_effect = [[sas_logical_jbod1], [sas_logical_jbod2]]
+        self.mock_collection('sas_logical_jbods', [sas_logical_jbod1, sas_logical_jbod2])
 
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
@@ -1773,7 +2829,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.sas_logical_jbods.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_sas_logical_jbod_names_when_jbod_list_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1785,7 +2841,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.sas_logical_jbods.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_sas_logical_jbod_names_when_local_storage_is_none(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1795,7 +2851,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
 
         self.assertEqual(sp_data, expected_dict)
-        self.mock_ov_client.sas_logical_jbods.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_sas_logical_jbod_name_not_found(self):
         sp_data = deepcopy(self.BASIC_PROFILE)
@@ -1805,7 +2861,7 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
             ]
         }
 
-        self.mock_ov_client.sas_logical_jbods.get_by.return_value = []
+        self.mock_collection('sas_logical_jbods', [])
 
         expected_error = ServerProfileReplaceNamesByUris.SAS_LOGICAL_JBOD_NOT_FOUND + "jbod1"
 
@@ -1816,6 +2872,485 @@ class ServerProfileReplaceNamesByUrisTest(unittest.TestCase):
         else:
             self.fail(msg="Expected Exception was not raised")
 
+    def test_should_get_each_network_collection_once_and_filter_volumes_by_name(self):
+        volume1 = {"name": "volume1", "uri": "/rest/storage-volumes/1"}
+        volume2 = {"name": "volume2", "uri": "/rest/storage-volumes/2"}
+        sp_data = deepcopy(self.BASIC_PROFILE)
+        sp_data['connections'] = [dict(id=1, networkName='Ethernet Network'),
+                                  dict(id=2, networkName='FC Network'),
+                                  dict(id=3, networkName='Ethernet Network')]
+        sp_data['sanStorage'] = {
+            "volumeAttachments": [
+                {"id": 1, "volumeName": "volume1"},
+                {"id": 2, "volumeName": "volume2"}
+            ]
+        }
+        self.mock_ov_client.volumes.get_by.side_effect = [[volume1], [volume2]]
+        self.mock_collection('fc_networks', [dict(name='FC Network', uri='/rest/fc-networks/14')])
+        self.mock_collection('ethernet_networks', [dict(name='Ethernet Network', uri='/rest/ethernet-networks/18')])
+
+        ServerProfileReplaceNamesByUris().replace(self.mock_ov_client, sp_data)
+
+        self.assertEqual(self.mock_resource_client.call_count, 3)
+        self.assertEqual([c['networkUri'] for c in sp_data['connections']],
+                         ['/rest/ethernet-networks/18', '/rest/fc-networks/14', '/rest/ethernet-networks/18'])
+        self.mock_ov_client.volumes.get_by.assert_has_calls([mock.call('name', 'volume1'), mock.call('name', 'volume2')])
+
+    def test_should_reuse_resolver_informed(self):
+        resolver = ResourceNameUriResolver(self.mock_ov_client)
+        self.mock_collection('enclosure_groups', [dict(name="Enclosure Group Name", uri=self.ENCLOSURE_GROUP_URI)])
+
+        for _ in range(2):
+            sp_data = deepcopy(self.BASIC_PROFILE)
+            sp_data['enclosureGroupName'] = "Enclosure Group Name"
+            ServerProfileReplaceNamesByUris(resolver).replace(self.mock_ov_client, sp_data)
+
+        self.mock_resource_client.assert_called_once_with(self.mock_ov_client.connection,
+                                                          self.mock_ov_client.enclosure_groups.URI)
+
+
+class ResourceNameUriResolverTest(unittest.TestCase):
+    ENCLOSURE_GROUPS = [dict(name='EG-1', uri='/rest/enclosure-groups/1'),
+                        dict(name='EG-2', uri='/rest/enclosure-groups/2'),
+                        dict(name='eg-1', uri='/rest/enclosure-groups/3')]
+
+    def setUp(self):
+        self.mock_ov_client = mock.Mock()
+        self.mock_ov_client.enclosure_groups.URI = '/rest/enclosure-groups'
+
+        patcher_resource_client = mock.patch(OneViewModuleBase.__module__ + '.ResourceClient')
+        self.addCleanup(patcher_resource_client.stop)
+        self.mock_resource_client = patcher_resource_client.start()
+        self.mock_get_all = self.mock_resource_client.return_value.get_all
+        self.mock_get_all.return_value = self.ENCLOSURE_GROUPS
+
+        self.resolver = ResourceNameUriResolver(self.mock_ov_client)
+
+    def test_should_get_collection_projected_to_name_and_uri(self):
+        self.resolver.get_uri('enclosure_groups', 'EG-1')
+
+        self.mock_resource_client.assert_called_once_with(self.mock_ov_client.connection, '/rest/enclosure-groups')
+        self.mock_get_all.assert_called_once_with(fields='name,uri')
+
+    def test_should_resolve_names_with_a_single_request(self):
+        self.assertEqual(self.resolver.get_uri('enclosure_groups', 'EG-1'), '/rest/enclosure-groups/1')
+        self.assertEqual(self.resolver.get_uri('enclosure_groups', 'EG-2'), '/rest/enclosure-groups/2')
+
+        self.mock_get_all.assert_called_once()
+
+    def test_should_ignore_case_keeping_the_first_match(self):
+        self.assertEqual(self.resolver.get_uri('enclosure_groups', 'Eg-1'), '/rest/enclosure-groups/1')
+
+    def test_should_return_none_when_not_found(self):
+        self.assertIsNone(self.resolver.get_uri('enclosure_groups', 'EG-3'))
+
+
+class NetworkNameUriIndexTest(unittest.TestCase):
+    COLLECTIONS = {
+        '/rest/ethernet-networks': [dict(name='Net', uri='/rest/ethernet-networks/1'),
+                                    dict(name='Ethernet', uri='/rest/ethernet-networks/2')],
+        '/rest/fc-networks': [dict(name='Net', uri='/rest/fc-networks/1'),
+                              dict(name='FC', uri='/rest/fc-networks/2')],
+        '/rest/fcoe-networks': [dict(name='FCoE', uri='/rest/fcoe-networks/1')]
+    }
+
+    def setUp(self):
+        self.mock_ov_client = mock.Mock()
+        self.mock_ov_client.ethernet_networks.URI = '/rest/ethernet-networks'
+        self.mock_ov_client.fc_networks.URI = '/rest/fc-networks'
+        self.mock_ov_client.fcoe_networks.URI = '/rest/fcoe-networks'
+
+        patcher_resource_client = mock.patch(OneViewModuleBase.__module__ + '.ResourceClient')
+        self.addCleanup(patcher_resource_client.stop)
+        self.mock_resource_client = patcher_resource_client.start()
+        self.mock_resource_client.side_effect = lambda connection, uri: mock.Mock(
+            get_all=mock.Mock(return_value=self.COLLECTIONS[uri]))
+
+        self.index = NetworkNameUriIndex(self.mock_ov_client)
+
+    def test_should_resolve_names_of_all_network_types(self):
+        uris = self.index.get_uris(['Ethernet', 'FC', 'FCoE'])
+
+        self.assertEqual(uris, ['/rest/ethernet-networks/2', '/rest/fc-networks/2', '/rest/fcoe-networks/1'])
+
+    def test_should_get_each_network_collection_once(self):
+        self.index.get_uris(['Ethernet', 'FC'])
+        self.index.get_uri('FCoE')
+
+        self.assertEqual(sorted(c[0][1] for c in self.mock_resource_client.call_args_list),
+                         ['/rest/ethernet-networks', '/rest/fc-networks', '/rest/fcoe-networks'])
+
+    def test_should_follow_the_network_types_precedence(self):
+        self.assertEqual(self.index.get_uri('Net'), '/rest/ethernet-networks/1')
+
+        index = NetworkNameUriIndex(self.mock_ov_client, network_types=('fc_networks', 'ethernet_networks'))
+        self.assertEqual(index.get_uri('Net'), '/rest/fc-networks/1')
+
+    def test_should_only_get_the_network_types_informed(self):
+        index = NetworkNameUriIndex(self.mock_ov_client, network_types=('ethernet_networks',))
+
+        self.assertIsNone(index.get_uri('FC'))
+        self.mock_resource_client.assert_called_once_with(self.mock_ov_client.connection, '/rest/ethernet-networks')
+
+    def test_should_return_none_when_not_found(self):
+        self.assertIsNone(self.index.get_uri('Unknown'))
+
+    def test_should_report_all_missing_names_at_once(self):
+        try:
+            self.index.get_uris(['Unknown 1', 'Ethernet', 'Unknown 2'], 'Not found: ')
+        except HPOneViewResourceNotFound as e:
+            self.assertEqual(e.msg, 'Not found: Unknown 1, Unknown 2')
+        else:
+            self.fail(msg="Expected Exception was not raised")
+
+
+class IterateCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = mock.Mock()
+        self.pages = {
+            '/rest/alerts?start=0&count=2&fields=uri':
+                dict(members=[{'id': 1}, {'id': 2}], nextPageUri='/rest/alerts?start=2&count=2&fields=uri'),
+            '/rest/alerts?start=2&count=2&fields=uri':
+                dict(members=[{'id': 3}, {'id': 4}], nextPageUri='/rest/alerts?start=4&count=2&fields=uri'),
+            '/rest/alerts?start=4&count=2&fields=uri':
+                dict(members=[{'id': 5}], nextPageUri=None)
+        }
+        self.connection.get.side_effect = lambda uri: self.pages[uri]
+
+    def test_should_follow_next_page_uri(self):
+        members = list(iterate_collection(self.connection, '/rest/alerts', page_size=2, fields='uri'))
+
+        self.assertEqual(members, [{'id': 1}, {'id': 2}, {'id': 3}, {'id': 4}, {'id': 5}])
+        self.assertEqual(self.connection.get.call_count, 3)
+
+    def test_should_get_pages_only_while_iterating(self):
+        members = iterate_collection(self.connection, '/rest/alerts', page_size=2, fields='uri')
+
+        self.assertEqual(next(members), {'id': 1})
+        self.assertEqual(self.connection.get.call_count, 1)
+
+    def test_should_stop_at_max_items(self):
+        members = list(iterate_collection(self.connection, '/rest/alerts', page_size=2, max_items=4, fields='uri'))
+
+        self.assertEqual(members, [{'id': 1}, {'id': 2}, {'id': 3}, {'id': 4}])
+        self.assertEqual(self.connection.get.call_count, 2)
+
+    def test_should_request_no_more_than_max_items_per_page(self):
+        self.connection.get.side_effect = None
+        self.connection.get.return_value = dict(members=[{'id': 1}], nextPageUri='/rest/alerts?start=1&count=1')
+
+        members = list(iterate_collection(self.connection, '/rest/alerts', page_size=100, max_items=1))
+
+        self.connection.get.assert_called_once_with('/rest/alerts?start=0&count=1')
+        self.assertEqual(members, [{'id': 1}])
+
+    def test_should_stop_on_empty_page(self):
+        self.connection.get.side_effect = None
+        self.connection.get.return_value = dict(members=[], nextPageUri='/rest/alerts?start=0&count=2')
+
+        self.assertEqual(list(iterate_collection(self.connection, '/rest/alerts', page_size=2)), [])
+        self.connection.get.assert_called_once_with('/rest/alerts?start=0&count=2')
+
+
+class RunConcurrentlyTest(unittest.TestCase):
+    def test_should_return_results_in_order(self):
+        functions = [lambda value=value: value * 2 for value in range(10)]
+
+        self.assertEqual(run_concurrently(functions, max_workers=3), [value * 2 for value in range(10)])
+
+    def test_should_run_calls_at_the_same_time(self):
+        barrier = threading.Event()
+        arrivals = []
+
+        def wait():
+            arrivals.append(1)
+            if len(arrivals) == 2:
+                barrier.set()
+            return barrier.wait(5)
+
+        self.assertEqual(run_concurrently([wait, wait]), [True, True])
+
+    def test_should_raise_the_exception_of_a_failed_call(self):
+        def fail():
+            raise HPOneViewException('error')
+
+        self.assertRaises(HPOneViewException, run_concurrently, [lambda: 1, fail])
+
+    def test_should_return_empty_list_when_no_functions(self):
+        self.assertEqual(run_concurrently([]), [])
+
+
+class SubmitTaskTest(unittest.TestCase):
+    def test_should_post_resource_with_default_values_without_waiting_for_the_task(self):
+        connection = mock.Mock(_apiVersion=500)
+        connection.post.return_value = ({'uri': '/rest/tasks/1'}, None)
+
+        result = submit_task(connection, '/rest/server-profiles', {'name': 'Profile'},
+                             {'500': {'type': 'ServerProfileV7'}})
+
+        self.assertEqual(result, ({'uri': '/rest/tasks/1'}, None))
+        connection.post.assert_called_once_with('/rest/server-profiles', {'name': 'Profile', 'type': 'ServerProfileV7'})
+        connection.get.assert_not_called()
+
+    def test_should_put_resource(self):
+        connection = mock.Mock(_apiVersion=500)
+        connection.put.return_value = (None, {'name': 'Profile'})
+
+        self.assertEqual(submit_task(connection, '/rest/server-profiles/1', {'name': 'Profile'}, method='put'),
+                         (None, {'name': 'Profile'}))
+
+    def test_should_patch_resource_with_json_patch_content_type(self):
+        connection = mock.Mock(_apiVersion=500)
+        connection.patch.return_value = ({'uri': '/rest/tasks/1'}, None)
+        operations = [{'op': 'replace', 'path': '/templateCompliance', 'value': 'Compliant'}]
+
+        submit_task(connection, '/rest/server-profiles/1', operations, method='patch')
+
+        connection.patch.assert_called_once_with('/rest/server-profiles/1', operations,
+                                                 custom_headers={'Content-Type': 'application/json-patch+json'})
+
+    def test_should_patch_resource_with_the_custom_headers(self):
+        connection = mock.Mock(_apiVersion=500)
+        connection.patch.return_value = ({'uri': '/rest/tasks/1'}, None)
+
+        submit_task(connection, '/rest/enclosures/1', [], method='patch', custom_headers={'If-Match': '*'})
+
+        connection.patch.assert_called_once_with(
+            '/rest/enclosures/1', [], custom_headers={'If-Match': '*', 'Content-Type': 'application/json-patch+json'})
+
+    def test_should_patch_resource_without_custom_headers_on_api_200(self):
+        connection = mock.Mock(_apiVersion=200)
+        connection.patch.return_value = ({'uri': '/rest/tasks/1'}, None)
+
+        submit_task(connection, '/rest/server-profiles/1', [], method='patch')
+
+        connection.patch.assert_called_once_with('/rest/server-profiles/1', [], custom_headers={})
+
+
+class WaitForTasksTest(unittest.TestCase):
+    def setUp(self):
+        self.time_patch = mock.patch(OneViewModuleBase.__module__ + '.time')
+        self.mock_time = self.time_patch.start()
+        self.mock_time.time.return_value = 0
+        self.mock_sleep = self.mock_time.sleep
+
+    def tearDown(self):
+        self.time_patch.stop()
+
+    @staticmethod
+    def build_task(uri, state, resource_uri=None, error=None):
+        task = dict(uri=uri, category='tasks', type='TaskResourceV2', taskState=state,
+                    associatedResource=dict(resourceUri=resource_uri))
+        if error:
+            task['taskErrors'] = [dict(message=error, errorCode='Error')]
+        return task
+
+    def build_connection(self, task_states):
+        resources = {'/rest/resources/1': {'name': 'resource 1'}, '/rest/resources/2': {'name': 'resource 2'}}
+
+        def get(uri):
+            if uri in resources:
+                return resources[uri]
+            states = task_states[uri]
+            state = states.pop(0) if len(states) > 1 else states[0]
+            return self.build_task(uri, state, uri.replace('tasks', 'resources'), error='Failed' if state == 'Error' else None)
+
+        connection = mock.Mock()
+        connection.get.side_effect = get
+        return connection
+
+    def test_should_wait_for_all_tasks_in_a_single_loop(self):
+        connection = self.build_connection({'/rest/tasks/1': ['Running', 'Running', 'Completed'],
+                                            '/rest/tasks/2': ['Running', 'Completed']})
+        tasks = [dict(uri='/rest/tasks/1'), dict(uri='/rest/tasks/2')]
+
+        outcomes = wait_for_tasks(connection, tasks)
+
+        self.assertEqual(outcomes, [({'name': 'resource 1'}, None), ({'name': 'resource 2'}, None)])
+        self.assertEqual([call[0][0] for call in self.mock_sleep.call_args_list], [1, 1])
+
+    def test_should_report_the_error_of_each_failed_task(self):
+        connection = self.build_connection({'/rest/tasks/1': ['Error'], '/rest/tasks/2': ['Completed']})
+
+        outcomes = wait_for_tasks(connection, [dict(uri='/rest/tasks/1'), dict(uri='/rest/tasks/2')])
+
+        self.assertIsNone(outcomes[0][0])
+        self.assertEqual(outcomes[0][1].msg, 'Failed')
+        self.assertEqual(outcomes[1], ({'name': 'resource 2'}, None))
+        self.mock_sleep.assert_not_called()
+
+    def test_should_increase_the_polling_interval_while_no_task_completes(self):
+        connection = self.build_connection({'/rest/tasks/1': ['Running'] * 13 + ['Completed']})
+
+        wait_for_tasks(connection, [dict(uri='/rest/tasks/1')])
+
+        self.assertEqual([call[0][0] for call in self.mock_sleep.call_args_list],
+                         [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10])
+
+    def test_should_notify_each_task_completed_in_the_order_they_complete(self):
+        connection = self.build_connection({'/rest/tasks/1': ['Running', 'Running', 'Completed'],
+                                            '/rest/tasks/2': ['Completed']})
+        completed = []
+
+        wait_for_tasks(connection, [dict(uri='/rest/tasks/1'), dict(uri='/rest/tasks/2')], on_completed=completed.append)
+
+        self.assertEqual(completed, [1, 0])
+
+    def test_should_report_timeout_for_tasks_still_running(self):
+        connection = self.build_connection({'/rest/tasks/1': ['Running'], '/rest/tasks/2': ['Completed']})
+
+        self.mock_time.time.side_effect = [0, 100]
+
+        outcomes = wait_for_tasks(connection, [dict(uri='/rest/tasks/1'), dict(uri='/rest/tasks/2')], timeout=60)
+
+        self.assertIsNone(outcomes[0][0])
+        self.assertIn('60 seconds', outcomes[0][1].msg)
+        self.assertEqual(outcomes[1], ({'name': 'resource 2'}, None))
+
+    def test_should_return_empty_list_when_no_tasks(self):
+        self.assertEqual(wait_for_tasks(mock.Mock(), []), [])
+
+
+class RunOperationsTest(unittest.TestCase):
+    def setUp(self):
+        patcher_wait_for_tasks = mock.patch(OneViewModuleBase.__module__ + '.wait_for_tasks')
+        self.addCleanup(patcher_wait_for_tasks.stop)
+        self.mock_wait_for_tasks = patcher_wait_for_tasks.start()
+
+        patcher_time = mock.patch(OneViewModuleBase.__module__ + '.time')
+        self.addCleanup(patcher_time.stop)
+        self.mock_time = patcher_time.start()
+        self.mock_time.time.side_effect = [10, 11, 12, 20]
+
+    def test_should_wait_for_the_tasks_started_in_a_single_loop(self):
+        error = HPOneViewException('Failed')
+
+        def wait_for_tasks(connection, tasks, max_workers, on_completed):
+            on_completed(0)
+            on_completed(1)
+            return [({'name': 'resource 1'}, None), (None, error)]
+
+        self.mock_wait_for_tasks.side_effect = wait_for_tasks
+        connection = mock.Mock()
+
+        outcomes = run_operations(connection, [lambda: {'uri': '/rest/tasks/1'}, lambda: {'uri': '/rest/tasks/2'}],
+                                  max_workers=1)
+
+        self.mock_wait_for_tasks.assert_called_once_with(connection, [{'uri': '/rest/tasks/1'}, {'uri': '/rest/tasks/2'}],
+                                                         max_workers=1, on_completed=mock.ANY)
+        self.assertEqual(outcomes, [
+            dict(task={'uri': '/rest/tasks/1'}, resource={'name': 'resource 1'}, error=None, seconds=2),
+            dict(task={'uri': '/rest/tasks/2'}, resource=None, error=error, seconds=9)])
+
+    def test_should_report_the_operations_without_task_and_the_failed_requests(self):
+        self.mock_wait_for_tasks.return_value = []
+        error = HPOneViewException('Failed')
+
+        def fail():
+            raise error
+
+        outcomes = run_operations(mock.Mock(), [lambda: None, fail], max_workers=1)
+
+        self.assertEqual(outcomes, [dict(task=None, resource=None, error=None, seconds=1),
+                                    dict(task=None, resource=None, error=error, seconds=8)])
+        self.mock_wait_for_tasks.assert_called_once_with(mock.ANY, [], max_workers=1, on_completed=mock.ANY)
+
+
+class SetServerHardwarePowerStateTest(unittest.TestCase):
+    def setUp(self):
+        self.time_patch = mock.patch(OneViewModuleBase.__module__ + '.time')
+        self.mock_time = self.time_patch.start()
+        self.mock_time.time.return_value = 0
+        self.mock_sleep = self.mock_time.sleep
+
+    def tearDown(self):
+        self.time_patch.stop()
+
+    @staticmethod
+    def build_client(power_states):
+        """Builds a client whose server hardware goes through the given power states, one per request."""
+        oneview_client = mock.Mock()
+        oneview_client.connection._apiVersion = 500
+        oneview_client.connection.put.return_value = ({'uri': '/rest/tasks/1'}, None)
+
+        def get(uri):
+            states = power_states[uri]
+            return {'uri': uri, 'powerState': states.pop(0) if len(states) > 1 else states[0]}
+
+        oneview_client.server_hardware.get.side_effect = get
+        return oneview_client
+
+    def test_should_power_off_concurrently_and_poll_until_powered_off(self):
+        oneview_client = self.build_client({'/rest/server-hardware/1': ['On', 'PoweringOff', 'PoweringOff', 'Off'],
+                                            '/rest/server-hardware/2': ['On', 'Off']})
+
+        previous_states = set_server_hardware_power_state(
+            oneview_client, ['/rest/server-hardware/1', '/rest/server-hardware/2'], 'Off')
+
+        self.assertEqual(previous_states, {'/rest/server-hardware/1': 'On', '/rest/server-hardware/2': 'On'})
+        self.assertEqual(sorted(call[0] for call in oneview_client.connection.put.call_args_list), [
+            ('/rest/server-hardware/1/powerState', {'powerState': 'Off', 'powerControl': 'PressAndHold'}),
+            ('/rest/server-hardware/2/powerState', {'powerState': 'Off', 'powerControl': 'PressAndHold'})])
+        self.assertEqual([call[0][0] for call in self.mock_sleep.call_args_list], [1, 2])
+
+    def test_should_skip_hardware_already_in_the_power_state(self):
+        oneview_client = self.build_client({'/rest/server-hardware/1': ['Off', 'On'],
+                                            '/rest/server-hardware/2': ['Off', 'On']})
+
+        previous_states = set_server_hardware_power_state(
+            oneview_client, ['/rest/server-hardware/1', None, '/rest/server-hardware/2', '/rest/server-hardware/1'],
+            'On')
+
+        self.assertEqual(previous_states, {'/rest/server-hardware/1': 'Off', '/rest/server-hardware/2': 'Off'})
+        self.assertEqual(oneview_client.connection.put.call_count, 2)
+
+        oneview_client = self.build_client({'/rest/server-hardware/1': ['On']})
+
+        self.assertEqual(set_server_hardware_power_state(oneview_client, ['/rest/server-hardware/1'], 'On'),
+                         {'/rest/server-hardware/1': 'On'})
+        oneview_client.connection.put.assert_not_called()
+        self.mock_sleep.assert_not_called()
+
+    def test_should_retry_power_requests_rejected_by_the_appliance(self):
+        oneview_client = self.build_client({'/rest/server-hardware/1': ['On', 'Off']})
+        oneview_client.connection.put.side_effect = [HPOneViewException('Server hardware is busy'),
+                                                     ({'uri': '/rest/tasks/1'}, None)]
+
+        with mock.patch(OneViewModuleBase.__module__ + '.get_backoff_delay', return_value=0.5):
+            set_server_hardware_power_state(oneview_client, ['/rest/server-hardware/1'], 'Off')
+
+        self.assertEqual(oneview_client.connection.put.call_count, 2)
+        self.mock_sleep.assert_called_once_with(0.5)
+
+    def test_should_raise_exception_when_power_requests_are_always_rejected(self):
+        oneview_client = self.build_client({'/rest/server-hardware/1': ['On']})
+        oneview_client.connection.put.side_effect = HPOneViewException('Server hardware is busy')
+
+        self.assertRaises(HPOneViewException, set_server_hardware_power_state,
+                          oneview_client, ['/rest/server-hardware/1'], 'Off')
+        self.assertEqual(oneview_client.connection.put.call_count, 5)
+
+    def test_should_fill_the_previous_states_even_when_the_power_requests_fail(self):
+        oneview_client = self.build_client({'/rest/server-hardware/1': ['On']})
+        oneview_client.connection.put.side_effect = HPOneViewException('Server hardware is busy')
+        previous_states = {}
+
+        self.assertRaises(HPOneViewException, set_server_hardware_power_state,
+                          oneview_client, ['/rest/server-hardware/1'], 'Off', previous_states=previous_states)
+        self.assertEqual(previous_states, {'/rest/server-hardware/1': 'On'})
+
+    def test_should_raise_timeout_when_the_power_state_is_not_reached(self):
+        oneview_client = self.build_client({'/rest/server-hardware/1': ['On', 'PoweringOff']})
+        self.mock_time.time.side_effect = [0, 10, 400]
+
+        try:
+            set_server_hardware_power_state(oneview_client, ['/rest/server-hardware/1'], 'Off')
+        except HPOneViewException as exception:
+            self.assertIn('300 seconds', exception.msg)
+            self.assertIn('/rest/server-hardware/1', exception.msg)
+        else:
+            self.fail('Expected timeout exception was not raised')
+
 
 class ServerProfileMergerTest(unittest.TestCase):
     SERVER_PROFILE_NAME = "Profile101"
@@ -2625,6 +4160,55 @@ class ServerProfileMergerTest(unittest.TestCase):
 
         self.assertFalse(merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS][self.INDEX_MEZZ][SPKeys.LOGICAL_DRIVES])
 
+    def test_merge_should_not_modify_the_resource_nor_the_data(self):
+        controller_mezz = deepcopy(self.CONTROLLER_MEZZ_1)
+        controller_mezz[SPKeys.LOGICAL_DRIVES][0]['raidLevel'] = 'RAID0'
+        volume = deepcopy(self.SAN_STORAGE[SPKeys.VOLUMES][0])
+        volume[SPKeys.PATHS] = [dict(connectionId=1, isEnabled=False)]
+        data = dict(name="Profile101",
+                    connections=[self.CONN_1_NO_MAC_BASIC_BOOT.copy(), dict(id=2, boot=dict(priority="Primary"))],
+                    sanStorage=dict(volumeAttachments=[volume]),
+                    localStorage=dict(controllers=[controller_mezz, deepcopy(self.CONTROLLER_EMBEDDED)]))
+        resource = deepcopy(self.profile_with_san_storage)
+        resource[SPKeys.LOCAL_STORAGE] = deepcopy(self.profile_with_local_storage[SPKeys.LOCAL_STORAGE])
+        original_data, original_resource = deepcopy(data), deepcopy(resource)
+
+        merged_data = ServerProfileMerger().merge_data(resource, data)
+
+        self.assertEqual(data, original_data)
+        self.assertEqual(resource, original_resource)
+        self.assertEqual(merged_data[SPKeys.CONNECTIONS][1][SPKeys.BOOT], dict(self.BOOT_CONN, priority="Primary"))
+        self.assertEqual(merged_data[SPKeys.LOCAL_STORAGE][SPKeys.CONTROLLERS][self.INDEX_MEZZ][SPKeys.LOGICAL_DRIVES][0]['raidLevel'],
+                         'RAID0')
+
+    def test_merge_should_not_modify_the_jbods_nor_the_custom_attributes_of_the_inputs(self):
+        data = dict(name="Profile101",
+                    osDeploymentSettings=deepcopy(self.OS_DEPLOYMENT_SETTINGS),
+                    localStorage=dict(sasLogicalJBODs=[dict(id=1, sasLogicalJBODUri=None)]))
+        resource = deepcopy(self.profile_with_os_deployment)
+        resource[SPKeys.LOCAL_STORAGE] = deepcopy(self.profile_with_local_storage[SPKeys.LOCAL_STORAGE])
+        original_data = deepcopy(data)
+
+        merged_data = ServerProfileMerger().merge_data(resource, data)
+
+        self.assertEqual(data, original_data)
+        self.assertEqual(merged_data[SPKeys.LOCAL_STORAGE][SPKeys.SAS_LOGICAL_JBODS][0][SPKeys.SAS_LOGICAL_JBOD_URI],
+                         self.SAS_LOGICAL_JBOD_1[SPKeys.SAS_LOGICAL_JBOD_URI])
+        self.assertIsNot(merged_data[SPKeys.OS_DEPLOYMENT][SPKeys.ATTRIBUTES],
+                         resource[SPKeys.OS_DEPLOYMENT][SPKeys.ATTRIBUTES])
+        self.assertIsNot(merged_data[SPKeys.OS_DEPLOYMENT][SPKeys.ATTRIBUTES][0],
+                         resource[SPKeys.OS_DEPLOYMENT][SPKeys.ATTRIBUTES][0])
+
+    def test_merge_should_share_the_unchanged_subtrees_with_the_resource(self):
+        data = dict(name="Profile101", sanStorage=dict(manageSanStorage=True))
+        resource = deepcopy(self.profile_with_san_storage)
+
+        merged_data = ServerProfileMerger().merge_data(resource, data)
+
+        self.assertIs(merged_data[SPKeys.CONNECTIONS], resource[SPKeys.CONNECTIONS])
+        self.assertIs(merged_data[SPKeys.SAN][SPKeys.VOLUMES], resource[SPKeys.SAN][SPKeys.VOLUMES])
+        self.assertIsNot(merged_data[SPKeys.SAN], resource[SPKeys.SAN])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -57,6 +57,27 @@ class TaskFactsSpec(unittest.TestCase,
             ansible_facts=dict(alerts=ALL_ALERTS)
         )
 
+    def test_get_all_page_by_page_up_to_max_items(self):
+        alerts = [dict(uri='/rest/alerts/{}'.format(index)) for index in range(5)]
+        self.mock_resource_client.side_effect = None
+        self.mock_resource_client.return_value.build_query_uri.return_value = '/rest/alerts?start=0&count=2'
+        self.mock_ov_client.connection.get.side_effect = [
+            dict(members=alerts[0:2], nextPageUri='/rest/alerts?start=2&count=2'),
+            dict(members=alerts[2:4], nextPageUri='/rest/alerts?start=4&count=2'),
+            dict(members=alerts[4:5], nextPageUri=None)]
+        self.mock_ansible_module.params = dict(config='config.json',
+                                               params=dict(fields='uri', page_size=2, max_items=3))
+
+        AlertFactsModule().run()
+
+        self.mock_resource_client.return_value.build_query_uri.assert_called_once_with(start=0, count=2, fields='uri')
+        self.assertEqual(self.mock_ov_client.connection.get.call_count, 2)
+        self.resource.get_all.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            ansible_facts=dict(alerts=alerts[0:3])
+        )
+
     def test_get_all_with_filter(self):
         self.resource.get_all.return_value = ALL_ALERTS
         self.mock_ansible_module.params = copy.deepcopy(PARAMS_GET_ALL)
@@ -15,11 +15,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 ###
+import os
+import shutil
+import tempfile
 import unittest
+import mock
 import yaml
 
 from copy import deepcopy
-from oneview_module_loader import EnclosureModule
+from module_utils.oneview import EnclosureHostnameIndex
+from oneview_module_loader import EnclosureModule, HPOneViewException, HPOneViewTaskError
 from hpe_test_utils import OneViewBaseTestCase
 
 FAKE_MSG_ERROR = 'Fake message error'
@@ -1117,5 +1122,377 @@ class EnclosureSpec(unittest.TestCase, OneViewBaseTestCase):
         )
 
 
+class EnclosureHostnameLookupSpec(unittest.TestCase, OneViewBaseTestCase):
+    HOST = '10.0.0.1'
+
+    def setUp(self):
+        self.configure_mocks(self, EnclosureModule)
+        self.enclosures = self.mock_ov_client.enclosures
+        self.enclosures.get_by.return_value = [ENCLOSURE_FROM_ONEVIEW]
+        self.mock_ov_client.connection.get_host.return_value = self.HOST
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        self.index = EnclosureHostnameIndex(os.path.join(index_dir, 'enclosures.json'))
+
+    def __by_filter(self, **enclosures_by_filter):
+        return lambda filter: enclosures_by_filter.get(filter.split('=')[0], [])
+
+    def test_should_query_both_ip_fields_on_the_appliance(self):
+        self.enclosures.get_all.side_effect = self.__by_filter(standbyOaPreferredIP=[ENCLOSURE_FROM_ONEVIEW])
+        self.mock_ansible_module.params['data']['hostname'] = STANDBY_IP_ADDRESS
+
+        EnclosureModule().run()
+
+        self.assertEqual(sorted(c[1]['filter'] for c in self.enclosures.get_all.call_args_list),
+                         ["activeOaPreferredIP='{}'".format(STANDBY_IP_ADDRESS),
+                          "standbyOaPreferredIP='{}'".format(STANDBY_IP_ADDRESS)])
+        self.enclosures.add.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=EnclosureModule.MSG_ALREADY_PRESENT,
+            ansible_facts=dict(enclosure=ENCLOSURE_FROM_ONEVIEW)
+        )
+
+    def test_should_ignore_the_enclosures_returned_without_the_hostname(self):
+        self.enclosures.get_all.side_effect = self.__by_filter(activeOaPreferredIP=ALL_ENCLOSURES[:2])
+        self.enclosures.add.return_value = ENCLOSURE_FROM_ONEVIEW
+
+        EnclosureModule().run()
+
+        self.enclosures.add.assert_called_once()
+
+    def test_should_index_the_enclosure_found(self):
+        self.enclosures.get_all.side_effect = self.__by_filter(activeOaPreferredIP=[ENCLOSURE_FROM_ONEVIEW])
+
+        with mock.patch.dict(os.environ, {'ONEVIEW_ENCLOSURE_INDEX': self.index.path}):
+            EnclosureModule().run()
+
+        self.assertEqual(self.index.get_uri(self.HOST, PRIMARY_IP_ADDRESS), ENCLOSURE_FROM_ONEVIEW['uri'])
+        self.assertEqual(self.index.get_uri(self.HOST, STANDBY_IP_ADDRESS), ENCLOSURE_FROM_ONEVIEW['uri'])
+
+    def test_should_index_the_enclosure_added_by_its_hostname(self):
+        added_enclosure = dict(name='Encl1', uri='/a/path')
+        self.enclosures.get_all.return_value = []
+        self.enclosures.add.return_value = added_enclosure
+
+        with mock.patch.dict(os.environ, {'ONEVIEW_ENCLOSURE_INDEX': self.index.path}):
+            EnclosureModule().run()
+
+        self.assertEqual(self.index.get_uri(self.HOST, PRIMARY_IP_ADDRESS), '/a/path')
+
+    def test_should_get_the_indexed_enclosure_without_querying(self):
+        self.index.add(self.HOST, ENCLOSURE_FROM_ONEVIEW)
+        self.enclosures.get.return_value = ENCLOSURE_FROM_ONEVIEW
+
+        with mock.patch.dict(os.environ, {'ONEVIEW_ENCLOSURE_INDEX': self.index.path}):
+            EnclosureModule().run()
+
+        self.enclosures.get.assert_called_once_with('/a/path')
+        self.enclosures.get_all.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=EnclosureModule.MSG_ALREADY_PRESENT,
+            ansible_facts=dict(enclosure=ENCLOSURE_FROM_ONEVIEW)
+        )
+
+    def test_should_forget_the_indexed_enclosure_when_not_found(self):
+        self.index.add(self.HOST, ENCLOSURE_FROM_ONEVIEW)
+        self.enclosures.get.side_effect = HPOneViewException(dict(errorCode='RESOURCE_NOT_FOUND', message='Not found'))
+        self.enclosures.get_all.return_value = []
+        self.enclosures.add.return_value = dict(ENCLOSURE_FROM_ONEVIEW, uri='/a/new-path')
+
+        with mock.patch.dict(os.environ, {'ONEVIEW_ENCLOSURE_INDEX': self.index.path}):
+            EnclosureModule().run()
+
+        self.enclosures.add.assert_called_once()
+        self.assertEqual(self.index.get_uri(self.HOST, STANDBY_IP_ADDRESS), '/a/new-path')
+
+    def test_should_query_when_the_indexed_enclosure_has_other_ips(self):
+        self.index.add(self.HOST, dict(ENCLOSURE_FROM_ONEVIEW, uri='/a/readdressed-path'))
+        self.enclosures.get.return_value = ALL_ENCLOSURES[0]
+        self.enclosures.get_all.side_effect = self.__by_filter(activeOaPreferredIP=[ENCLOSURE_FROM_ONEVIEW])
+
+        with mock.patch.dict(os.environ, {'ONEVIEW_ENCLOSURE_INDEX': self.index.path}):
+            EnclosureModule().run()
+
+        self.assertEqual(self.enclosures.get_all.call_count, 2)
+        self.enclosures.add.assert_not_called()
+        # The stale entry is replaced by the enclosure found
+        self.assertEqual(self.index.get_uri(self.HOST, PRIMARY_IP_ADDRESS), ENCLOSURE_FROM_ONEVIEW['uri'])
+
+    def test_should_forget_the_hostname_the_indexed_enclosure_does_not_have_anymore(self):
+        self.index.add(self.HOST, ENCLOSURE_FROM_ONEVIEW)
+        self.enclosures.get.return_value = dict(ENCLOSURE_FROM_ONEVIEW, activeOaPreferredIP='172.18.1.99')
+        self.enclosures.get_all.return_value = []
+        self.enclosures.add.side_effect = HPOneViewException(dict(message='Failed'))
+
+        with mock.patch.dict(os.environ, {'ONEVIEW_ENCLOSURE_INDEX': self.index.path}):
+            EnclosureModule().run()
+
+        self.assertIsNone(self.index.get_uri(self.HOST, PRIMARY_IP_ADDRESS))
+        self.assertEqual(self.index.get_uri(self.HOST, STANDBY_IP_ADDRESS), ENCLOSURE_FROM_ONEVIEW['uri'])
+
+
+class EnclosurePatchedSpec(unittest.TestCase, OneViewBaseTestCase):
+    def setUp(self):
+        self.configure_mocks(self, EnclosureModule)
+        self.enclosures = self.mock_ov_client.enclosures
+        self.enclosures.get_by.return_value = [ENCLOSURE_FROM_ONEVIEW]
+        self.enclosures.patch.return_value = ENCLOSURE_FROM_ONEVIEW
+
+    def test_should_reset_many_device_bays_one_operation_per_request(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='device_bays_power_state_reset',
+                                               data=dict(name='Encl1', bayNumbers=[1, 2]))
+
+        EnclosureModule().run()
+
+        self.enclosures.get_by.assert_called_once_with('name', 'Encl1')
+        self.assertEqual(self.enclosures.patch.call_args_list, [
+            mock.call('/a/path', operation='replace', path='/deviceBays/1/bayPowerState', value='Reset'),
+            mock.call('/a/path', operation='replace', path='/deviceBays/2/bayPowerState', value='Reset')])
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=EnclosureModule.MSG_DEVICE_BAY_POWER_STATE_RESET,
+            ansible_facts=dict(enclosure=ENCLOSURE_FROM_ONEVIEW)
+        )
+
+    def test_should_only_patch_the_bays_not_in_the_state(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='manager_bays_uid_on',
+                                               data=dict(name='Encl1', bayNumbers=[1, 2]))
+
+        EnclosureModule().run()
+
+        self.enclosures.patch.assert_called_once_with('/a/path', operation='replace', path='/managerBays/2/uidState',
+                                                      value='On')
+
+    def test_should_not_patch_when_all_the_bays_are_in_the_state(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='manager_bays_uid_off',
+                                               data=dict(name='Encl1', bayNumbers=[2]))
+
+        EnclosureModule().run()
+
+        self.enclosures.patch.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=EnclosureModule.MSG_MANAGER_BAY_UID_ALREADY_OFF,
+            ansible_facts=dict(enclosure=ENCLOSURE_FROM_ONEVIEW)
+        )
+
+    def test_should_fail_when_any_bay_is_not_found(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='device_bays_power_state_reset',
+                                               data=dict(name='Encl1', bayNumbers=[1, 3]))
+
+        EnclosureModule().run()
+
+        self.enclosures.patch.assert_not_called()
+        self.mock_ansible_module.fail_json.assert_called_once_with(msg=EnclosureModule.MSG_BAY_NOT_FOUND)
+
+    def test_should_fail_when_the_state_does_not_apply_to_bays(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='uid_on',
+                                               data=dict(name='Encl1', bayNumbers=[1]))
+
+        EnclosureModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=EnclosureModule.MSG_BAY_NUMBERS_NOT_SUPPORTED.format('uid_on'))
+
+    def test_should_apply_many_states_checked_against_a_single_get(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='patched', data=dict(
+            name='Encl1',
+            patches=[dict(state='uid_on'),
+                     dict(state='manager_bays_uid_on', bayNumbers=[1, 2]),
+                     dict(state='interconnect_bays_ipv4_removed', bayNumber=2)]))
+
+        EnclosureModule().run()
+
+        self.enclosures.get_by.assert_called_once_with('name', 'Encl1')
+        self.assertEqual(self.enclosures.patch.call_args_list, [
+            mock.call('/a/path', operation='replace', path='/uidState', value='On'),
+            mock.call('/a/path', operation='replace', path='/managerBays/2/uidState', value='On'),
+            mock.call('/a/path', operation='remove', path='/interconnectBays/2/ipv4Setting', value='')])
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=EnclosureModule.MSG_PATCHED,
+            ansible_facts=dict(enclosure=ENCLOSURE_FROM_ONEVIEW)
+        )
+
+    def test_should_not_patch_when_the_enclosure_is_in_all_the_states(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='patched', data=dict(
+            name='Encl1', patches=[dict(state='uid_off'), dict(state='manager_bays_uid_on', bayNumbers=[1])]))
+
+        EnclosureModule().run()
+
+        self.enclosures.patch.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=EnclosureModule.MSG_ALREADY_PATCHED,
+            ansible_facts=dict(enclosure=ENCLOSURE_FROM_ONEVIEW)
+        )
+
+    def test_should_stop_when_an_operation_fails(self):
+        self.enclosures.patch.side_effect = HPOneViewTaskError(FAKE_MSG_ERROR)
+        self.mock_ansible_module.params = dict(config='config.json', state='device_bays_power_state_reset',
+                                               data=dict(name='Encl1', bayNumbers=[1, 2]))
+
+        EnclosureModule().run()
+
+        self.enclosures.patch.assert_called_once()
+        self.mock_ansible_module.fail_json.assert_called_once_with(msg=FAKE_MSG_ERROR)
+
+    def test_should_fail_when_patched_has_no_patches(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='patched', data=dict(name='Encl1'))
+
+        EnclosureModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(msg=EnclosureModule.MSG_PATCHES_REQUIRED)
+
+    def test_should_fail_when_a_patch_has_an_invalid_state(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='patched',
+                                               data=dict(name='Encl1', patches=[dict(state='refreshed')]))
+
+        EnclosureModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=EnclosureModule.MSG_INVALID_PATCH_STATE.format('refreshed'))
+
+
+class EnclosureFleetSpec(unittest.TestCase, OneViewBaseTestCase):
+    ENCLOSURE_2 = dict(ENCLOSURE_FROM_ONEVIEW, name='Encl2', uri='/a/path2', uidState='On',
+                       supportDataCollectionState='PendingCollection')
+
+    def setUp(self):
+        self.configure_mocks(self, EnclosureModule)
+        self.enclosures = self.mock_ov_client.enclosures
+        self.enclosures.get_all.return_value = [ENCLOSURE_FROM_ONEVIEW, self.ENCLOSURE_2]
+        self.configure_task_mocks(self)
+
+        patcher_wait_for_enclosure_task = mock.patch('oneview_enclosure.wait_for_tasks')
+        self.addCleanup(patcher_wait_for_enclosure_task.stop)
+        self.mock_wait_for_enclosure_task = patcher_wait_for_enclosure_task.start()
+        self.mock_wait_for_enclosure_task.return_value = [({}, None)]
+
+    def __params(self, state, **data):
+        return dict(config='config.json', state=state, parallelism=4, data=data)
+
+    def test_should_refresh_the_enclosures_by_name_concurrently(self):
+        self.mock_ansible_module.params = self.__params('refreshed', names=['Encl1', 'Encl2'],
+                                                        refreshState='Refreshing')
+
+        EnclosureModule().run()
+
+        self.enclosures.get_all.assert_called_once_with(filter="name='Encl1' OR name='Encl2'")
+        self.mock_submit_task.assert_has_calls([
+            mock.call(self.mock_ov_client.connection, '/a/path/refreshState', dict(refreshState='Refreshing'), None,
+                      'put', None),
+            mock.call(self.mock_ov_client.connection, '/a/path2/refreshState', dict(refreshState='Refreshing'), None,
+                      'put', None)], any_order=True)
+        self.mock_wait_for_tasks.assert_called_once_with(
+            self.mock_ov_client.connection, [dict(uri='/rest/tasks/a/path/refreshState'),
+                                             dict(uri='/rest/tasks/a/path2/refreshState')],
+            max_workers=4, on_completed=mock.ANY)
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=EnclosureModule.MSG_FLEET_COMPLETED.format(2),
+            ansible_facts=dict(enclosure_results=[
+                dict(name='Encl1', uri='/a/path', changed=True, msg=EnclosureModule.MSG_REFRESHED,
+                     task_uri='/rest/tasks/a/path/refreshState', seconds=0, error=None),
+                dict(name='Encl2', uri='/a/path2', changed=True, msg=EnclosureModule.MSG_REFRESHED,
+                     task_uri='/rest/tasks/a/path2/refreshState', seconds=0, error=None)])
+        )
+
+    def test_should_reconfigure_the_enclosures_selected_by_the_filter(self):
+        self.mock_ansible_module.params = self.__params('reconfigured', filter="rackName='Rack-221'")
+
+        EnclosureModule().run()
+
+        self.enclosures.get_all.assert_called_once_with(filter="rackName='Rack-221'")
+        self.mock_submit_task.assert_any_call(self.mock_ov_client.connection, '/a/path2/configuration', None, None,
+                                              'put', None)
+        self.assertEqual(self.mock_submit_task.call_count, 2)
+
+    def test_should_only_request_the_enclosures_not_in_the_state(self):
+        self.mock_ansible_module.params = self.__params('uid_on', names=['Encl1', 'Encl2'])
+
+        EnclosureModule().run()
+
+        self.mock_submit_task.assert_called_once_with(
+            self.mock_ov_client.connection, '/a/path', [dict(op='replace', path='/uidState', value='On')], None,
+            'patch', {'If-Match': '*'})
+        results = self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']['enclosure_results']
+        self.assertEqual([(result['changed'], result['msg'], result['task_uri']) for result in results],
+                         [(True, EnclosureModule.MSG_UID_POWERED_ON, '/rest/tasks/a/path'),
+                          (False, EnclosureModule.MSG_UID_ALREADY_POWERED_ON, None)])
+
+    def test_should_set_the_support_data_collection_state_of_the_enclosures(self):
+        self.mock_ansible_module.params = self.__params('support_data_collection_set', names=['Encl1', 'Encl2'],
+                                                        supportDataCollectionState='PendingCollection')
+
+        EnclosureModule().run()
+
+        self.mock_submit_task.assert_called_once_with(
+            self.mock_ov_client.connection, '/a/path',
+            [dict(op='replace', path='/supportDataCollectionState', value='PendingCollection')], None, 'patch',
+            {'If-Match': '*'})
+
+    def test_should_patch_the_bays_of_the_enclosures(self):
+        self.mock_ansible_module.params = self.__params('device_bays_power_state_reset', names=['Encl1', 'Encl2'],
+                                                        bayNumbers=[1, 2])
+
+        EnclosureModule().run()
+
+        self.mock_submit_task.assert_has_calls([
+            mock.call(self.mock_ov_client.connection, uri,
+                      [dict(op='replace', path='/deviceBays/{}/bayPowerState'.format(bay_number), value='Reset')],
+                      None, 'patch', {'If-Match': '*'})
+            for uri in ('/a/path', '/a/path2') for bay_number in (1, 2)], any_order=True)
+        # The first operation on each enclosure is waited for before the second one is requested
+        self.assertEqual(self.mock_wait_for_enclosure_task.call_count, 2)
+        self.mock_wait_for_tasks.assert_called_once_with(
+            self.mock_ov_client.connection, mock.ANY, max_workers=4, on_completed=mock.ANY)
+        results = self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']['enclosure_results']
+        self.assertEqual([result['changed'] for result in results], [True, True])
+
+    def test_should_not_request_the_next_operations_when_one_fails(self):
+        self.mock_wait_for_enclosure_task.return_value = [(None, HPOneViewTaskError(FAKE_MSG_ERROR))]
+        self.mock_ansible_module.params = self.__params('device_bays_power_state_reset', names=['Encl1'],
+                                                        bayNumbers=[1, 2])
+
+        EnclosureModule().run()
+
+        self.mock_submit_task.assert_called_once()
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=EnclosureModule.MSG_FLEET_FAILED.format('Encl1'), ansible_facts=mock.ANY)
+
+    def test_should_report_the_failures_of_each_enclosure(self):
+        self.enclosures.get_all.return_value = [ENCLOSURE_FROM_ONEVIEW, dict(self.ENCLOSURE_2, deviceBays=[])]
+        self.task_errors['/rest/tasks/a/path'] = FAKE_MSG_ERROR
+        self.mock_ansible_module.params = self.__params('device_bays_power_state_reset',
+                                                        names=['Encl1', 'Encl2', 'Encl3'], bayNumber=1)
+
+        EnclosureModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=EnclosureModule.MSG_FLEET_FAILED.format('Encl1, Encl2, Encl3'),
+            ansible_facts=dict(enclosure_results=[
+                dict(name='Encl1', uri='/a/path', changed=False, msg=None, task_uri='/rest/tasks/a/path', seconds=0,
+                     error=FAKE_MSG_ERROR),
+                dict(name='Encl2', uri='/a/path2', changed=False, msg=None, task_uri=None, seconds=0,
+                     error=EnclosureModule.MSG_BAY_NOT_FOUND),
+                dict(name='Encl3', uri=None, changed=False, msg=None, task_uri=None, seconds=None,
+                     error=EnclosureModule.MSG_ENCLOSURE_NOT_FOUND)])
+        )
+
+    def test_should_fail_when_the_state_cannot_be_applied_to_many_enclosures(self):
+        self.mock_ansible_module.params = self.__params('absent', names=['Encl1'])
+
+        EnclosureModule().run()
+
+        self.enclosures.remove.assert_not_called()
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=EnclosureModule.MSG_FLEET_STATE_NOT_SUPPORTED.format('absent'))
+
+
 if __name__ == '__main__':
     unittest.main()
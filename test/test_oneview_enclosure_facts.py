@@ -84,6 +84,22 @@ class EnclosureFactsSpec(unittest.TestCase,
             ansible_facts=dict(enclosures=(PRESENT_ENCLOSURES))
         )
 
+    def test_should_get_enclosures_by_names(self):
+        self.enclosures.get_all.return_value = PRESENT_ENCLOSURES
+        self.mock_ansible_module.params = dict(config='config.json', name=None,
+                                               names=["Test-Enclosure", "Missing-Enclosure"])
+
+        EnclosureFactsModule().run()
+
+        self.enclosures.get_all.assert_called_once_with(
+            filter="name='Test-Enclosure' OR name='Missing-Enclosure'")
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            ansible_facts=dict(enclosures=PRESENT_ENCLOSURES,
+                               enclosures_by_name={"Test-Enclosure": PRESENT_ENCLOSURES[0],
+                                                   "Missing-Enclosure": None})
+        )
+
     def test_should_get_enclosure_by_name(self):
         self.enclosures.get_by.return_value = PRESENT_ENCLOSURES
         self.mock_ansible_module.params = PARAMS_GET_BY_NAME
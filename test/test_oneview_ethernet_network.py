@@ -15,6 +15,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 ###
+import mock
 import unittest
 import yaml
 
@@ -133,6 +134,44 @@ class EthernetNetworkModuleSpec(unittest.TestCase,
             ansible_facts=dict(ethernet_network=DEFAULT_ENET_TEMPLATE)
         )
 
+    def test_should_not_get_the_network_by_name_when_it_is_still_converged(self):
+        self.mock_ansible_module.params = PARAMS_FOR_PRESENT
+
+        with mock.patch.object(EthernetNetworkModule, 'get_converged_resource',
+                               return_value=(DEFAULT_ENET_TEMPLATE, True)) as mock_get_converged_resource:
+            EthernetNetworkModule().run()
+
+        mock_get_converged_resource.assert_called_once_with(DEFAULT_ETHERNET_NAME, PARAMS_FOR_PRESENT['data'])
+        self.resource.get_by.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=EthernetNetworkModule.MSG_ALREADY_PRESENT,
+            ansible_facts=dict(ethernet_network=DEFAULT_ENET_TEMPLATE)
+        )
+
+    def test_should_store_the_converged_network(self):
+        self.resource.get_by.return_value = [DEFAULT_ENET_TEMPLATE]
+        self.mock_ansible_module.params = PARAMS_FOR_PRESENT
+
+        with mock.patch.object(EthernetNetworkModule, 'get_converged_resource', return_value=(None, False)), \
+                mock.patch.object(EthernetNetworkModule, 'set_converged_resource') as mock_set_converged_resource:
+            EthernetNetworkModule().run()
+
+        self.resource.get_by.assert_called_once_with('name', DEFAULT_ETHERNET_NAME)
+        mock_set_converged_resource.assert_called_once_with(DEFAULT_ETHERNET_NAME, PARAMS_FOR_PRESENT['data'],
+                                                            DEFAULT_ENET_TEMPLATE)
+
+    def test_should_not_skip_the_convergence_when_bandwidth_is_informed(self):
+        self.resource.get_by.return_value = [DEFAULT_ENET_TEMPLATE]
+        self.resource.update.return_value = DEFAULT_ENET_TEMPLATE
+        self.mock_ov_client.connection_templates.get.return_value = {"uri": "uri"}
+        self.mock_ansible_module.params = yaml.load(YAML_PARAMS_WITH_CHANGES)
+
+        with mock.patch.object(EthernetNetworkModule, 'get_converged_resource') as mock_get_converged_resource:
+            EthernetNetworkModule().run()
+
+        mock_get_converged_resource.assert_not_called()
+
     def test_update_when_data_has_modified_attributes(self):
         data_merged = DEFAULT_ENET_TEMPLATE.copy()
         data_merged['purpose'] = 'Management'
@@ -85,6 +85,23 @@ class InterconnectFactsSpec(unittest.TestCase,
         self.PARAMS_GET_ALL_PORTS = self.EXAMPLES[18]['oneview_interconnect_facts']
         self.PARAMS_GET_PORT = self.EXAMPLES[21]['oneview_interconnect_facts']
 
+    def test_should_get_interconnects_by_names(self):
+        fake_interconnects = [dict(name=self.INTERCONNECT_NAME)]
+        self.interconnects.get_all.return_value = fake_interconnects
+
+        self.mock_ansible_module.params = dict(name=None, **self.EXAMPLES[-2]['oneview_interconnect_facts'])
+
+        InterconnectFactsModule().run()
+
+        self.interconnects.get_all.assert_called_once_with(
+            filter="name='0000A66102, interconnect 2' OR name='0000A66102, interconnect 5'")
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            ansible_facts=dict(interconnects=fake_interconnects,
+                               interconnects_by_name={'0000A66102, interconnect 2': fake_interconnects[0],
+                                                      '0000A66102, interconnect 5': None})
+        )
+
     def test_should_get_all_interconnects(self):
         fake_interconnects = [dict(uidState='On', name=self.INTERCONNECT_NAME)]
         self.interconnects.get_all.return_value = fake_interconnects
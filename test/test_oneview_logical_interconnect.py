@@ -19,7 +19,7 @@ import unittest
 import mock
 
 from hpe_test_utils import OneViewBaseTestCase
-from oneview_module_loader import LogicalInterconnectModule
+from oneview_module_loader import LogicalInterconnectModule, HPOneViewTaskError
 
 FAKE_MSG_ERROR = 'Fake message error'
 
@@ -628,5 +628,228 @@ class LogicalInterconnectModuleSpec(unittest.TestCase,
         )
 
 
+class LogicalInterconnectManySpec(unittest.TestCase,
+                                  OneViewBaseTestCase):
+    SNMP_CONFIGURATION = dict(type='snmp-configuration', enabled=True, trapDestinations=[])
+    LI_1 = dict(LOGICAL_INTERCONNECT, name='LI-1', uri='/rest/logical-interconnects/1',
+                snmpConfiguration=SNMP_CONFIGURATION)
+    LI_2 = dict(LOGICAL_INTERCONNECT, name='LI-2', uri='/rest/logical-interconnects/2',
+                snmpConfiguration=dict(SNMP_CONFIGURATION, enabled=False))
+
+    def setUp(self):
+        self.configure_mocks(self, LogicalInterconnectModule)
+        self.resource = self.mock_ov_client.logical_interconnects
+        self.resource.get_all.return_value = [self.LI_1, self.LI_2]
+        self.configure_task_mocks(self)
+
+    def __params(self, state, **data):
+        return dict(config='config.json', state=state, parallelism=4, data=data)
+
+    def test_should_only_update_the_logical_interconnects_with_changes(self):
+        self.mock_ansible_module.params = self.__params('snmp_configuration_updated', names=['LI-1', 'LI-2'],
+                                                        snmpConfiguration=dict(enabled=True))
+
+        LogicalInterconnectModule().run()
+
+        self.resource.get_all.assert_called_once_with(filter="name='LI-1' OR name='LI-2'")
+        self.resource.get_snmp_configuration.assert_not_called()
+        self.mock_submit_task.assert_called_once_with(
+            self.mock_ov_client.connection, '/rest/logical-interconnects/2/snmp-configuration',
+            dict(self.SNMP_CONFIGURATION, enabled=True), None, 'put')
+        self.mock_wait_for_tasks.assert_called_once_with(
+            self.mock_ov_client.connection, [dict(uri='/rest/tasks/rest/logical-interconnects/2/snmp-configuration')],
+            max_workers=4, on_completed=mock.ANY)
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=LogicalInterconnectModule.MSG_MANY_COMPLETED.format(2),
+            ansible_facts=dict(logical_interconnect_results=[
+                dict(name='LI-1', uri='/rest/logical-interconnects/1', changed=False,
+                     msg=LogicalInterconnectModule.MSG_NO_CHANGES_PROVIDED, changes=[], task_uri=None, seconds=0,
+                     error=None),
+                dict(name='LI-2', uri='/rest/logical-interconnects/2', changed=True,
+                     msg=LogicalInterconnectModule.MSG_SNMP_UPDATED,
+                     changes=[dict(op='replace', path='/enabled', value=True)],
+                     task_uri='/rest/tasks/rest/logical-interconnects/2/snmp-configuration', seconds=0, error=None)])
+        )
+
+    def test_should_update_the_logical_interconnects_selected_by_the_filter(self):
+        self.mock_ansible_module.params = self.__params('ethernet_settings_updated',
+                                                        filter="enclosureUris='/rest/enclosures/1'",
+                                                        ethernetSettings=dict(macRefreshInterval=12))
+
+        LogicalInterconnectModule().run()
+
+        self.resource.get_all.assert_called_once_with(filter="enclosureUris='/rest/enclosures/1'")
+        self.mock_submit_task.assert_has_calls([
+            mock.call(self.mock_ov_client.connection, '/rest/logical-interconnects/1/ethernetSettings',
+                      dict(enableIgmpSnooping=True, macRefreshInterval=12), None, 'put'),
+            mock.call(self.mock_ov_client.connection, '/rest/logical-interconnects/2/ethernetSettings',
+                      dict(enableIgmpSnooping=True, macRefreshInterval=12), None, 'put')], any_order=True)
+
+    def test_should_update_the_telemetry_configurations_with_their_uri(self):
+        self.mock_ansible_module.params = self.__params('telemetry_configuration_updated', names=['LI-1'],
+                                                        telemetryConfiguration=dict(sampleCount=12))
+
+        LogicalInterconnectModule().run()
+
+        self.mock_submit_task.assert_called_once_with(
+            self.mock_ov_client.connection, '/rest/logical-interconnects/123/telemetry-configurations/abc',
+            dict(LOGICAL_INTERCONNECT['telemetryConfiguration'], sampleCount=12, type='telemetry-configuration'),
+            None, 'put')
+
+    def test_should_get_the_configuration_not_embedded_in_the_logical_interconnect(self):
+        self.mock_ov_client.connection.get.return_value = dict(type='port-monitor', enablePortMonitor=True)
+        self.mock_ansible_module.params = self.__params('port_monitor_updated', names=['LI-1'],
+                                                        portMonitor=dict(enablePortMonitor=False))
+
+        LogicalInterconnectModule().run()
+
+        self.mock_ov_client.connection.get.assert_called_once_with('/rest/logical-interconnects/1/port-monitor')
+        self.mock_submit_task.assert_called_once_with(
+            self.mock_ov_client.connection, '/rest/logical-interconnects/1/port-monitor',
+            dict(type='port-monitor', enablePortMonitor=False), None, 'put')
+
+    def test_should_report_the_failures_of_each_logical_interconnect(self):
+        self.task_errors['/rest/tasks/rest/logical-interconnects/1/snmp-configuration'] = FAKE_MSG_ERROR
+        self.mock_ansible_module.params = self.__params('snmp_configuration_updated',
+                                                        names=['LI-1', 'LI-2', 'LI-3'],
+                                                        snmpConfiguration=dict(readCommunity='private'))
+
+        LogicalInterconnectModule().run()
+
+        results = self.mock_ansible_module.fail_json.call_args[1]['ansible_facts']['logical_interconnect_results']
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=LogicalInterconnectModule.MSG_MANY_FAILED.format('LI-1, LI-3'), ansible_facts=mock.ANY)
+        self.assertEqual([(result['changed'], result['error']) for result in results],
+                         [(False, FAKE_MSG_ERROR), (True, None), (False, LogicalInterconnectModule.MSG_NOT_FOUND)])
+
+    def test_should_report_the_logical_interconnects_without_the_embedded_configuration(self):
+        li_without_telemetry = dict(self.LI_2)
+        li_without_telemetry.pop('telemetryConfiguration')
+        self.resource.get_all.return_value = [self.LI_1, li_without_telemetry]
+        self.mock_ansible_module.params = self.__params('telemetry_configuration_updated', names=['LI-1', 'LI-2'],
+                                                        telemetryConfiguration=dict(sampleCount=12))
+
+        LogicalInterconnectModule().run()
+
+        self.mock_submit_task.assert_called_once()
+        results = self.mock_ansible_module.fail_json.call_args[1]['ansible_facts']['logical_interconnect_results']
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=LogicalInterconnectModule.MSG_MANY_FAILED.format('LI-2'), ansible_facts=mock.ANY)
+        self.assertEqual([(result['name'], result['changed'], result['error']) for result in results],
+                         [('LI-1', True, None),
+                          ('LI-2', False, LogicalInterconnectModule.MSG_CONFIGURATION_NOT_FOUND.format(
+                              'telemetryConfiguration'))])
+
+    def test_should_fail_when_the_state_cannot_be_applied_to_many_logical_interconnects(self):
+        self.mock_ansible_module.params = self.__params('compliant', names=['LI-1'])
+
+        LogicalInterconnectModule().run()
+
+        self.resource.update_compliance.assert_not_called()
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=LogicalInterconnectModule.MSG_MANY_STATE_NOT_SUPPORTED.format('compliant'))
+
+    def test_should_fail_when_the_options_are_not_provided(self):
+        self.mock_ansible_module.params = self.__params('snmp_configuration_updated', names=['LI-1'])
+
+        LogicalInterconnectModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=LogicalInterconnectModule.MSG_NO_OPTIONS_PROVIDED)
+
+
+class LogicalInterconnectConvergedSpec(unittest.TestCase,
+                                       OneViewBaseTestCase):
+    LI = dict(LOGICAL_INTERCONNECT, name='LI-1', snmpConfiguration=dict(type='snmp-configuration', enabled=True))
+    PORT_MONITOR = dict(type='port-monitor', enablePortMonitor=True)
+
+    def setUp(self):
+        self.configure_mocks(self, LogicalInterconnectModule)
+        self.resource = self.mock_ov_client.logical_interconnects
+        self.resource.get_by_name.return_value = self.LI
+        self.mock_ov_client.connection.get.return_value = self.PORT_MONITOR
+        self.configure_task_mocks(self)
+
+        # The sections are updated in turn, each one waiting for its own task
+        patcher_wait_for_section_task = mock.patch('oneview_logical_interconnect.wait_for_tasks')
+        self.addCleanup(patcher_wait_for_section_task.stop)
+        self.mock_wait_for_tasks = patcher_wait_for_section_task.start()
+        self.mock_wait_for_tasks.return_value = [({}, None)]
+
+    def __params(self, **data):
+        return dict(config='config.json', state='converged', data=dict(data, name='LI-1'))
+
+    def test_should_only_update_the_sections_that_differ_in_order(self):
+        self.mock_ansible_module.params = self.__params(portMonitor=dict(enablePortMonitor=False),
+                                                        snmpConfiguration=dict(enabled=True),
+                                                        ethernetSettings=dict(macRefreshInterval=12))
+
+        LogicalInterconnectModule().run()
+
+        self.resource.get_by_name.assert_called_once_with('LI-1')
+        self.mock_ov_client.connection.get.assert_called_once_with('/rest/logical-interconnects/id/port-monitor')
+        self.assertEqual(self.mock_submit_task.call_args_list, [
+            mock.call(self.mock_ov_client.connection, '/rest/logical-interconnects/id/ethernetSettings',
+                      dict(enableIgmpSnooping=True, macRefreshInterval=12), None, 'put'),
+            mock.call(self.mock_ov_client.connection, '/rest/logical-interconnects/id/port-monitor',
+                      dict(type='port-monitor', enablePortMonitor=False), None, 'put')])
+        self.assertEqual(self.mock_wait_for_tasks.call_count, 2)
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=LogicalInterconnectModule.MSG_CONVERGED.format('ethernetSettings, portMonitor'),
+            ansible_facts=dict(logical_interconnect_sections=[
+                dict(section='ethernetSettings', changed=True,
+                     changes=[dict(op='replace', path='/macRefreshInterval', value=12)]),
+                dict(section='snmpConfiguration', changed=False, changes=[]),
+                dict(section='portMonitor', changed=True,
+                     changes=[dict(op='replace', path='/enablePortMonitor', value=False)])])
+        )
+
+    def test_should_update_the_telemetry_configuration_with_its_uri(self):
+        self.mock_ansible_module.params = self.__params(telemetryConfiguration=dict(sampleCount=12))
+
+        LogicalInterconnectModule().run()
+
+        self.mock_submit_task.assert_called_once_with(
+            self.mock_ov_client.connection, LOGICAL_INTERCONNECT['telemetryConfiguration']['uri'],
+            dict(LOGICAL_INTERCONNECT['telemetryConfiguration'], sampleCount=12, type='telemetry-configuration'),
+            None, 'put')
+
+    def test_should_not_update_when_all_the_sections_are_converged(self):
+        self.mock_ansible_module.params = self.__params(snmpConfiguration=dict(enabled=True),
+                                                        ethernetSettings=dict(macRefreshInterval=10))
+
+        LogicalInterconnectModule().run()
+
+        self.mock_submit_task.assert_not_called()
+        self.mock_ov_client.connection.get.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=LogicalInterconnectModule.MSG_ALREADY_CONVERGED,
+            ansible_facts=dict(logical_interconnect_sections=[
+                dict(section='ethernetSettings', changed=False, changes=[]),
+                dict(section='snmpConfiguration', changed=False, changes=[])])
+        )
+
+    def test_should_stop_when_an_update_fails(self):
+        self.mock_wait_for_tasks.return_value = [(None, HPOneViewTaskError(FAKE_MSG_ERROR))]
+        self.mock_ansible_module.params = self.__params(ethernetSettings=dict(macRefreshInterval=12),
+                                                        portMonitor=dict(enablePortMonitor=False))
+
+        LogicalInterconnectModule().run()
+
+        self.mock_submit_task.assert_called_once()
+        self.mock_ansible_module.fail_json.assert_called_once_with(msg=FAKE_MSG_ERROR)
+
+    def test_should_fail_when_no_section_is_provided(self):
+        self.mock_ansible_module.params = self.__params()
+
+        LogicalInterconnectModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=LogicalInterconnectModule.MSG_NO_OPTIONS_PROVIDED)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -19,6 +19,7 @@
 import unittest
 
 from oneview_module_loader import LogicalInterconnectFactsModule
+from hpOneView.exceptions import HPOneViewException
 from hpe_test_utils import FactsParamsTestCase
 
 ERROR_MSG = 'Fake message error'
@@ -350,6 +351,23 @@ class LogicalInterconnectFactsSpec(unittest.TestCase,
             )
         )
 
+    def test_should_report_each_option_that_failed(self):
+        params = create_params(['qos_aggregated_configuration', 'snmp_configuration', 'port_monitor'])
+
+        self.logical_interconnects.get_by_name.return_value = LOGICAL_INTERCONNECT
+        self.logical_interconnects.get_qos_aggregated_configuration.side_effect = HPOneViewException('QoS error')
+        self.logical_interconnects.get_snmp_configuration.return_value = SNMP_CONFIGURATION
+        self.logical_interconnects.get_port_monitor.side_effect = HPOneViewException('Port monitor error')
+        self.mock_ansible_module.params = params
+
+        LogicalInterconnectFactsModule().run()
+
+        self.logical_interconnects.get_snmp_configuration.assert_called_once_with(id_or_uri=LOGICAL_INTERCONNECT_URI)
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg='Failed to gather qos_aggregated_configuration: QoS error; '
+                'Failed to gather port_monitor: Port monitor error'
+        )
+
     def test_should_fail_when_logical_interconnect_not_exist(self):
         params = create_params(['unassigned_uplink_ports'])
 
@@ -15,6 +15,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 ###
+import mock
 import unittest
 from copy import deepcopy
 
@@ -137,6 +138,37 @@ class LogicalInterconnectGroupGeneralSpec(unittest.TestCase,
         self.mock_ansible_module.fail_json.assert_called_once_with(
             msg=LogicalInterconnectGroupModule.MSG_INTERCONNECT_TYPE_NOT_FOUND)
 
+    def test_should_not_resolve_names_when_the_lig_is_still_converged(self):
+        self.mock_ansible_module.params = deepcopy(PARAMS_LIG_TEMPLATE_WITH_MAP)
+
+        with mock.patch.object(LogicalInterconnectGroupModule, 'get_converged_resource',
+                               return_value=(DEFAULT_LIG_TEMPLATE, True)) as mock_get_converged_resource:
+            LogicalInterconnectGroupModule().run()
+
+        mock_get_converged_resource.assert_called_once_with(DEFAULT_LIG_NAME, PARAMS_LIG_TEMPLATE_WITH_MAP['data'])
+        self.resource.get_by.assert_not_called()
+        self.mock_ov_client.interconnect_types.get_by.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=LogicalInterconnectGroupModule.MSG_ALREADY_PRESENT,
+            ansible_facts=dict(logical_interconnect_group=DEFAULT_LIG_TEMPLATE)
+        )
+
+    def test_should_store_the_lig_converged_to_the_data_informed(self):
+        self.resource.get_by.return_value = []
+        self.resource.create.return_value = DEFAULT_LIG_TEMPLATE
+        self.mock_ov_client.interconnect_types.get_by.return_value = [dict(uri='/rest/interconnect-types/1')]
+        self.mock_ansible_module.params = deepcopy(PARAMS_LIG_TEMPLATE_WITH_MAP)
+
+        with mock.patch.object(LogicalInterconnectGroupModule, 'get_converged_resource', return_value=(None, False)), \
+                mock.patch.object(LogicalInterconnectGroupModule,
+                                  'set_converged_resource') as mock_set_converged_resource:
+            LogicalInterconnectGroupModule().run()
+
+        # The data informed is stored, before the names are replaced by URIs
+        mock_set_converged_resource.assert_called_once_with(DEFAULT_LIG_NAME, PARAMS_LIG_TEMPLATE_WITH_MAP['data'],
+                                                            DEFAULT_LIG_TEMPLATE)
+
     def test_should_not_update_when_data_is_equals(self):
         self.resource.get_by.return_value = [DEFAULT_LIG_TEMPLATE]
 
@@ -16,6 +16,7 @@
 # limitations under the License.
 ###
 import unittest
+from copy import deepcopy
 
 from oneview_module_loader import NetworkSetModule
 from hpe_test_utils import OneViewBaseTestCase
@@ -98,7 +99,8 @@ class NetworkSetModuleSpec(unittest.TestCase,
 
         self.resource.get_by.side_effect = [NETWORK_SET], []
         self.resource.update.return_value = data_merged
-        self.ethernet_network_client.get_by.return_value = [{'uri': '/rest/ethernet-networks/ddd-eee-fff'}]
+        self.mock_collection('ethernet_networks', [{'name': 'Name of a Network',
+                                                    'uri': '/rest/ethernet-networks/ddd-eee-fff'}])
 
         self.mock_ansible_module.params = PARAMS_WITH_CHANGES
 
@@ -112,7 +114,6 @@ class NetworkSetModuleSpec(unittest.TestCase,
 
     def test_should_raise_exception_when_ethernet_network_not_found(self):
         self.resource.get_by.side_effect = [NETWORK_SET], []
-        self.ethernet_network_client.get_by.return_value = []
 
         self.mock_ansible_module.params = PARAMS_WITH_CHANGES
 
@@ -122,6 +123,22 @@ class NetworkSetModuleSpec(unittest.TestCase,
             msg=NetworkSetModule.MSG_ETHERNET_NETWORK_NOT_FOUND + "Name of a Network"
         )
 
+    def test_should_report_all_ethernet_networks_not_found_at_once(self):
+        self.resource.get_by.side_effect = [NETWORK_SET], []
+        self.mock_collection('ethernet_networks', [{'name': 'Network 2', 'uri': '/rest/ethernet-networks/2'}])
+
+        params = deepcopy(PARAMS_WITH_CHANGES)
+        params['data']['networkUris'] = ['Network 1', 'Network 2', 'Network 3']
+        self.mock_ansible_module.params = params
+
+        NetworkSetModule().run()
+
+        self.mock_resource_client.assert_called_once_with(self.mock_ov_client.connection,
+                                                          self.mock_ov_client.ethernet_networks.URI)
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=NetworkSetModule.MSG_ETHERNET_NETWORK_NOT_FOUND + "Network 1, Network 3"
+        )
+
     def test_should_remove_network(self):
         self.resource.get_by.return_value = [NETWORK_SET]
 
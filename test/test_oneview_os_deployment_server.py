@@ -73,8 +73,8 @@ class OsDeploymentServerkModuleSpec(unittest.TestCase,
     def test_should_replace_names_by_uris_before_add(self):
         self.os_deployment_plans.get_by.return_value = []
         self.os_deployment_plans.add.return_value = {"name": "name"}
-        self.mock_ov_client.ethernet_networks.get_by.return_value = [
-            {"name": "Deployment", "uri": "/rest/ethernet-networks/1b96d2b3-bc12-4757-ac72-e4cd0ef20535"}]
+        self.mock_collection('ethernet_networks', [
+            {"name": "Deployment", "uri": "/rest/ethernet-networks/1b96d2b3-bc12-4757-ac72-e4cd0ef20535"}])
         self.mock_ov_client.os_deployment_servers.get_appliance_by_name.return_value = {
             "name": "0000A66103, appliance 2",
             "uri": "/rest/deployment-servers/image-streamer-appliances/aca554e2-09c2-4b14-891d-e51c0058efab"}
@@ -99,9 +99,8 @@ class OsDeploymentServerkModuleSpec(unittest.TestCase,
         self.os_deployment_plans.get_by.return_value = []
         self.os_deployment_plans.add.return_value = {"name": "name"}
 
-        self.mock_ov_client.ethernet_networks.get_by.return_value = []
-        self.mock_ov_client.fc_networks.get_by.return_value = [
-            {"name": "Deployment", "uri": "/rest/fc-networks/1b96d2b3-bc12-4757-ac72-e4cd0ef20535"}]
+        self.mock_collection('fc_networks', [
+            {"name": "Deployment", "uri": "/rest/fc-networks/1b96d2b3-bc12-4757-ac72-e4cd0ef20535"}])
         self.mock_ov_client.os_deployment_servers.get_appliance_by_name.return_value = {
             "name": "0000A66103, appliance 2",
             "uri": "/rest/deployment-servers/image-streamer-appliances/aca554e2-09c2-4b14-891d-e51c0058efab"}
@@ -126,10 +125,8 @@ class OsDeploymentServerkModuleSpec(unittest.TestCase,
         self.os_deployment_plans.get_by.return_value = []
         self.os_deployment_plans.add.return_value = {"name": "name"}
 
-        self.mock_ov_client.ethernet_networks.get_by.return_value = []
-        self.mock_ov_client.fc_networks.get_by.return_value = []
-        self.mock_ov_client.fcoe_networks.get_by.return_value = [
-            {"name": "Deployment", "uri": "/rest/fcoe-networks/1b96d2b3-bc12-4757-ac72-e4cd0ef20535"}]
+        self.mock_collection('fcoe_networks', [
+            {"name": "Deployment", "uri": "/rest/fcoe-networks/1b96d2b3-bc12-4757-ac72-e4cd0ef20535"}])
         self.mock_ov_client.os_deployment_servers.get_appliance_by_name.return_value = {
             "name": "0000A66103, appliance 2",
             "uri": "/rest/deployment-servers/image-streamer-appliances/aca554e2-09c2-4b14-891d-e51c0058efab"}
@@ -153,7 +150,7 @@ class OsDeploymentServerkModuleSpec(unittest.TestCase,
     def test_should_fail_when_appliance_name_not_found(self):
         self.os_deployment_plans.get_by.return_value = []
         self.os_deployment_plans.add.return_value = {"name": "name"}
-        self.mock_ov_client.ethernet_networks.get_by.return_value = [{"uri": "/rest/ethernet-networks/123"}]
+        self.mock_collection('ethernet_networks', [{"name": "Deployment", "uri": "/rest/ethernet-networks/123"}])
         self.mock_ov_client.os_deployment_servers.get_appliance_by_name.return_value = None
 
         self.mock_ansible_module.params = self.DEPLOYMENT_SERVER_CREATE_WITH_NAMES
@@ -167,9 +164,6 @@ class OsDeploymentServerkModuleSpec(unittest.TestCase,
     def test_should_fail_when_network_name_not_found(self):
         self.os_deployment_plans.get_by.return_value = []
         self.os_deployment_plans.add.return_value = {"name": "name"}
-        self.mock_ov_client.ethernet_networks.get_by.return_value = []
-        self.mock_ov_client.fc_networks.get_by.return_value = []
-        self.mock_ov_client.fcoe_networks.get_by.return_value = []
         self.mock_ov_client.os_deployment_servers.get_appliances.return_value = [
             {"name": "0000A66103, appliance 2",
              "uri": "/rest/deployment-servers/image-streamer-appliances/123"}]
@@ -185,8 +179,8 @@ class OsDeploymentServerkModuleSpec(unittest.TestCase,
     def test_should_replace_names_by_uris_before_update(self):
         self.os_deployment_plans.get_by.return_value = [{"name": "name"}]
         self.os_deployment_plans.update.return_value = {"name": "name"}
-        self.mock_ov_client.ethernet_networks.get_by.return_value = [
-            {"name": "Deployment", "uri": "/rest/ethernet-networks/1b96d2b3-bc12-4757-ac72-e4cd0ef20535"}]
+        self.mock_collection('ethernet_networks', [
+            {"name": "Deployment", "uri": "/rest/ethernet-networks/1b96d2b3-bc12-4757-ac72-e4cd0ef20535"}])
         self.mock_ov_client.os_deployment_servers.get_appliance_by_name.return_value = {
             "name": "0000A66103, appliance 2",
             "uri": "/rest/deployment-servers/image-streamer-appliances/aca554e2-09c2-4b14-891d-e51c0058efab"}
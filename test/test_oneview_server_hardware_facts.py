@@ -76,6 +76,22 @@ class ServerHardwareFactsSpec(unittest.TestCase, FactsParamsTestCase):
             ansible_facts=dict(server_hardwares=({"name": "Server Hardware Name"}))
         )
 
+    def test_should_get_server_hardware_by_names(self):
+        server_hardwares = [{"name": "Server Hardware 2"}, {"name": "Server Hardware 1"}]
+        self.server_hardware.get_all.return_value = server_hardwares
+        self.mock_ansible_module.params = dict(config='config.json', names=["Server Hardware 1", "Server Hardware 2"])
+
+        ServerHardwareFactsModule().run()
+
+        self.server_hardware.get_all.assert_called_once_with(
+            filter="name='Server Hardware 1' OR name='Server Hardware 2'")
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            ansible_facts=dict(server_hardwares=[server_hardwares[1], server_hardwares[0]],
+                               server_hardwares_by_name={"Server Hardware 1": server_hardwares[1],
+                                                         "Server Hardware 2": server_hardwares[0]})
+        )
+
     def test_should_get_server_hardware_by_name(self):
         self.server_hardware.get_by.return_value = {"name": "Server Hardware Name"}
         self.mock_ansible_module.params = PARAMS_GET_BY_NAME
@@ -39,6 +39,7 @@ FAKE_SERVER_HARDWARE = {'uri': '/rest/server-hardware/31393736-3831-4753-567h-30
 
 MESSAGE_COMPLIANT_ERROR = ServerProfileModule.MSG_MAKE_COMPLIANT_NOT_SUPPORTED.format(SERVER_PROFILE_NAME)
 FAKE_MSG_ERROR = 'Fake message error'
+TASK_URI = '/rest/tasks/D2B856D2-5939-421B-BDCA-FBF7D8961A89'
 
 TASK_ERROR = HPOneViewTaskError(msg=FAKE_MSG_ERROR, error_code='AssignProfileToDeviceBayError')
 
@@ -240,6 +241,132 @@ class ServerProfileModuleSpec(unittest.TestCase,
         fake_logger.addHandler.assert_called_once_with(logging.NullHandler())
         mock_logging_config.not_been_called()
 
+    def test_should_not_gather_server_hardware_nor_compliance_preview_on_minimal_facts_level(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(CREATED_BASIC_PROFILE)
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_COMPLIANT), facts_level='minimal')
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_hardware.get.assert_not_called()
+        self.mock_ov_client.server_profiles.get_compliance_preview.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False, msg=ServerProfileModule.MSG_ALREADY_COMPLIANT,
+            ansible_facts=dict(serial_number=CREATED_BASIC_PROFILE.get('serialNumber'),
+                               server_profile=CREATED_BASIC_PROFILE, server_hardware=None,
+                               compliance_preview=None, created=False))
+
+    def test_should_not_gather_compliance_preview_on_standard_facts_level(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(CREATED_BASIC_PROFILE)
+        self.mock_ov_client.server_hardware.get.return_value = FAKE_SERVER_HARDWARE
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_COMPLIANT), facts_level='standard')
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_hardware.get.assert_called_once_with(CREATED_BASIC_PROFILE['serverHardwareUri'])
+        self.mock_ov_client.server_profiles.get_compliance_preview.assert_not_called()
+        facts = self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']
+        self.assertEqual(facts['server_hardware'], FAKE_SERVER_HARDWARE)
+        self.assertIsNone(facts['compliance_preview'])
+
+    @mock.patch(OneViewModuleBase.__module__ + '.OneViewETagCache')
+    def test_should_reuse_the_compliance_preview_cached_for_the_profile_and_template_etags(self,
+                                                                                           mock_etag_cache_class):
+        mock_etag_cache = mock_etag_cache_class.from_environment_variables.return_value
+        mock_etag_cache.get.return_value = dict(isOnlineUpdate=True)
+        fake_server = dict(deepcopy(CREATED_BASIC_PROFILE), eTag='2017-01-01T00:00:00.000Z')
+        fake_template = dict(deepcopy(BASIC_TEMPLATE), eTag='2017-02-02T00:00:00.000Z')
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = fake_server
+        self.mock_ov_client.server_profile_templates.get.return_value = fake_template
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_COMPLIANT)
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profile_templates.get.assert_called_once_with(
+            fake_server['serverProfileTemplateUri'])
+        mock_etag_cache.get.assert_called_once_with(
+            'compliance-preview:' + fake_server['uri'] + ':' + fake_template['uri'],
+            fake_server['eTag'] + ':' + fake_template['eTag'])
+        self.mock_ov_client.server_profiles.get_compliance_preview.assert_not_called()
+        self.assertEqual(self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']['compliance_preview'],
+                         dict(isOnlineUpdate=True))
+
+    @mock.patch(OneViewModuleBase.__module__ + '.OneViewETagCache')
+    def test_should_cache_the_compliance_preview_for_the_profile_and_template_etags(self, mock_etag_cache_class):
+        mock_etag_cache = mock_etag_cache_class.from_environment_variables.return_value
+        mock_etag_cache.get.return_value = None
+        fake_server = dict(deepcopy(CREATED_BASIC_PROFILE), eTag='2017-01-01T00:00:00.000Z')
+        fake_template = dict(deepcopy(BASIC_TEMPLATE), eTag='2017-02-02T00:00:00.000Z')
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = fake_server
+        self.mock_ov_client.server_profile_templates.get.return_value = fake_template
+        self.mock_ov_client.server_profiles.get_compliance_preview.return_value = dict(isOnlineUpdate=True)
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_COMPLIANT)
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profiles.get_compliance_preview.assert_called_once_with(fake_server['uri'])
+        mock_etag_cache.set.assert_called_once_with(
+            'compliance-preview:' + fake_server['uri'] + ':' + fake_template['uri'],
+            fake_server['eTag'] + ':' + fake_template['eTag'], dict(isOnlineUpdate=True))
+
+    @mock.patch(OneViewModuleBase.__module__ + '.OneViewETagCache')
+    def test_should_not_cache_the_compliance_preview_when_the_template_etag_is_unknown(self, mock_etag_cache_class):
+        mock_etag_cache = mock_etag_cache_class.from_environment_variables.return_value
+        fake_server = dict(deepcopy(CREATED_BASIC_PROFILE), eTag='2017-01-01T00:00:00.000Z')
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = fake_server
+        self.mock_ov_client.server_profile_templates.get.side_effect = HPOneViewException(dict(message='Not found'))
+        self.mock_ov_client.server_profiles.get_compliance_preview.return_value = dict(isOnlineUpdate=True)
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_COMPLIANT)
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profiles.get_compliance_preview.assert_called_once_with(fake_server['uri'])
+        mock_etag_cache.get.assert_not_called()
+        mock_etag_cache.set.assert_not_called()
+
+    def test_should_not_get_the_profile_by_name_when_it_is_still_converged(self):
+        mock_facts = gather_facts(self.mock_ov_client)
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+
+        with mock.patch.object(ServerProfileModule, 'get_converged_resource',
+                               return_value=(CREATED_BASIC_PROFILE, True)) as mock_get_converged_resource:
+            ServerProfileModule().run()
+
+        mock_get_converged_resource.assert_called_once_with(
+            SERVER_PROFILE_NAME, dict(data=PARAMS_FOR_PRESENT['data'], auto_assign_server_hardware=True),
+            self.mock_ov_client.server_profiles.URI)
+        self.mock_ov_client.server_profiles.get_by_name.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False, msg=ServerProfileModule.MSG_ALREADY_PRESENT, ansible_facts=mock_facts)
+
+    @mock.patch.object(ResourceComparator, 'compare', return_value=True)
+    def test_should_store_the_converged_profile(self, mock_resource_compare):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(CREATED_BASIC_PROFILE)
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+        gather_facts(self.mock_ov_client)
+
+        with mock.patch.object(ServerProfileModule, 'set_converged_resource') as mock_set_converged_resource:
+            ServerProfileModule().run()
+
+        mock_set_converged_resource.assert_called_once_with(
+            SERVER_PROFILE_NAME, dict(data=PARAMS_FOR_PRESENT['data'], auto_assign_server_hardware=True),
+            CREATED_BASIC_PROFILE, self.mock_ov_client.server_profiles.URI)
+
+    @mock.patch.object(ResourceComparator, 'compare', return_value=True)
+    def test_should_not_store_the_profile_left_without_hardware_to_auto_assign(self, mock_resource_compare):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = dict(CREATED_BASIC_PROFILE,
+                                                                            serverHardwareUri=None)
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = dict(targets=[])
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+        gather_facts(self.mock_ov_client)
+
+        with mock.patch.object(ServerProfileModule, 'set_converged_resource') as mock_set_converged_resource:
+            ServerProfileModule().run()
+
+        mock_set_converged_resource.assert_not_called()
+
     def test_should_fail_when_server_not_associated_with_template(self):
         fake_server = deepcopy(CREATED_BASIC_PROFILE)
         fake_server['templateCompliance'] = 'Unknown'
@@ -281,13 +408,14 @@ class ServerProfileModuleSpec(unittest.TestCase,
         self.mock_ansible_module.exit_json.assert_called_once_with(
             changed=True, msg=ServerProfileModule.MSG_REMEDIATED_COMPLIANCE, ansible_facts=mock_facts)
 
-    def test_should_power_off_when_is_offline_update(self):
+    @mock.patch('oneview_server_profile.set_server_hardware_power_state')
+    def test_should_power_off_when_is_offline_update(self, mock_set_power_state):
         fake_server = deepcopy(CREATED_BASIC_PROFILE)
         fake_server['templateCompliance'] = 'NonCompliant'
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = fake_server
         self.mock_ov_client.server_profiles.patch.return_value = CREATED_BASIC_PROFILE
-        self.mock_ov_client.server_hardware.update_power_state.return_value = {}
+        mock_set_power_state.return_value = {fake_server['serverHardwareUri']: 'On'}
 
         self.mock_ansible_module.params = deepcopy(PARAMS_FOR_COMPLIANT)
 
@@ -300,14 +428,30 @@ class ServerProfileModuleSpec(unittest.TestCase,
             CREATED_BASIC_PROFILE['uri'], 'replace', '/templateCompliance', 'Compliant')
 
         power_set_calls = [
-            mock.call(dict(powerState='Off', powerControl='PressAndHold'), fake_server['serverHardwareUri']),
-            mock.call(dict(powerState='On', powerControl='MomentaryPress'), fake_server['serverHardwareUri'])]
+            mock.call(self.mock_ov_client, [fake_server['serverHardwareUri']], 'Off'),
+            mock.call(self.mock_ov_client, [fake_server['serverHardwareUri']], 'On')]
 
-        self.mock_ov_client.server_hardware.update_power_state.assert_has_calls(power_set_calls)
+        self.assertEqual(mock_set_power_state.mock_calls, power_set_calls)
 
         self.mock_ansible_module.exit_json.assert_called_once_with(
             changed=True, msg=ServerProfileModule.MSG_REMEDIATED_COMPLIANCE, ansible_facts=mock_facts)
 
+    @mock.patch('oneview_server_profile.set_server_hardware_power_state')
+    def test_should_keep_powered_off_after_offline_update_when_it_was_off(self, mock_set_power_state):
+        fake_server = deepcopy(CREATED_BASIC_PROFILE)
+        fake_server['templateCompliance'] = 'NonCompliant'
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = fake_server
+        self.mock_ov_client.server_profiles.patch.return_value = CREATED_BASIC_PROFILE
+        mock_set_power_state.return_value = {fake_server['serverHardwareUri']: 'Off'}
+
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_COMPLIANT)
+        gather_facts(self.mock_ov_client, online_update=False)
+
+        ServerProfileModule().run()
+
+        mock_set_power_state.assert_called_once_with(self.mock_ov_client, [fake_server['serverHardwareUri']], 'Off')
+
     def test_should_create_with_automatically_selected_hardware_when_not_exists(self):
         profile_data = deepcopy(BASIC_PROFILE)
         profile_data['serverHardwareUri'] = '/rest/server-hardware/31393736-3831-4753-567h-30335837524E'
@@ -516,6 +660,56 @@ class ServerProfileModuleSpec(unittest.TestCase,
             msg=ServerProfileModule.MSG_ERROR_ALLOCATE_SERVER_HARDWARE
         )
 
+    @mock.patch('oneview_server_profile.get_backoff_delay')
+    def test_should_wait_with_backoff_before_trying_create_again(self, mock_get_backoff_delay):
+        mock_get_backoff_delay.side_effect = lambda attempt: attempt * 0.5
+        self.mock_ov_client.server_profiles.get_by_name.return_value = None
+        self.mock_ov_client.server_profiles.create.side_effect = [TASK_ERROR, TASK_ERROR, CREATED_BASIC_PROFILE]
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+        gather_facts(self.mock_ov_client, created=True)
+
+        with mock.patch('time.sleep') as mock_sleep:
+            ServerProfileModule().run()
+
+        mock_sleep.assert_has_calls([mock.call(0.5), mock.call(1.0)])
+        self.assertEqual(self.mock_ov_client.server_profiles.create.call_count, 3)
+
+    @mock.patch('oneview_server_profile.ServerHardwareAllocationLedger')
+    def test_should_create_with_hardware_reserved_in_the_allocation_ledger(self, mock_ledger_class):
+        mock_ledger = mock_ledger_class.from_environment_variables.return_value
+        mock_ledger.reserve.return_value = AVAILABLE_TARGETS['targets'][2]['serverHardwareUri']
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = None
+        self.mock_ov_client.server_profiles.create.return_value = CREATED_BASIC_PROFILE
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+        gather_facts(self.mock_ov_client, created=True)
+
+        ServerProfileModule().run()
+
+        candidates = [target['serverHardwareUri'] for target in AVAILABLE_TARGETS['targets'][1:]]
+        mock_ledger.reserve.assert_called_once_with(candidates, SERVER_PROFILE_NAME)
+        self.assertEqual(self.mock_ov_client.server_profiles.create.call_args[0][0]['serverHardwareUri'],
+                         candidates[1])
+        mock_ledger.release.assert_called_once_with(candidates[1], SERVER_PROFILE_NAME)
+
+    @mock.patch('oneview_server_profile.ServerHardwareAllocationLedger')
+    def test_should_use_first_available_hardware_when_all_are_reserved(self, mock_ledger_class):
+        mock_ledger = mock_ledger_class.from_environment_variables.return_value
+        mock_ledger.reserve.return_value = None
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = None
+        self.mock_ov_client.server_profiles.create.return_value = CREATED_BASIC_PROFILE
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+        gather_facts(self.mock_ov_client, created=True)
+
+        ServerProfileModule().run()
+
+        self.assertEqual(self.mock_ov_client.server_profiles.create.call_args[0][0]['serverHardwareUri'],
+                         AVAILABLE_TARGETS['targets'][1]['serverHardwareUri'])
+
     def test_should_stop_trying_create_when_unexpected_error_code_is_raised(self):
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
         self.mock_ov_client.server_profiles.create.side_effect = HPOneViewTaskError(msg=FAKE_MSG_ERROR,
@@ -612,7 +806,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data'][SPKeys.OS_DEPLOYMENT] = dict(osDeploymentPlanName="Deployment Plan Name")
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.os_deployment_plans.get_by.return_value = [dict(uri=uri)]
+        self.mock_collection('os_deployment_plans', [dict(name="Deployment Plan Name", uri=uri)])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -625,7 +819,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data'][SPKeys.OS_DEPLOYMENT] = dict(osDeploymentPlanName="Deployment Plan Name")
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.os_deployment_plans.get_by.return_value = []
+        self.mock_collection('os_deployment_plans', [])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -640,7 +834,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data']['enclosureGroupName'] = "Enclosure Group Name"
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.enclosure_groups.get_by.return_value = [dict(uri=uri)]
+        self.mock_collection('enclosure_groups', [dict(name="Enclosure Group Name", uri=uri)])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -654,7 +848,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data']['enclosureGroupName'] = "Enclosure Group Name"
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.enclosure_groups.get_by.return_value = []
+        self.mock_collection('enclosure_groups', [])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -671,8 +865,8 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data'][SPKeys.CONNECTIONS] = [conn_1, conn_2, conn_3]
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.fc_networks.get_by.side_effect = [[dict(uri='/rest/fc-networks/14')], []]
-        self.mock_ov_client.ethernet_networks.get_by.return_value = [dict(uri='/rest/ethernet-networks/18')]
+        self.mock_collection('fc_networks', [dict(name='FC Network', uri='/rest/fc-networks/14')])
+        self.mock_collection('ethernet_networks', [dict(name='Ethernet Network', uri='/rest/ethernet-networks/18')])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -691,8 +885,8 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data'][SPKeys.CONNECTIONS] = [conn]
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.fc_networks.get_by.return_value = []
-        self.mock_ov_client.ethernet_networks.get_by.return_value = []
+        self.mock_collection('fc_networks', [])
+        self.mock_collection('ethernet_networks', [])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -706,7 +900,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data']['serverHardwareTypeName'] = "SY 480 Gen9 1"
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.server_hardware_types.get_by.return_value = [server_hardware_template]
+        self.mock_collection('server_hardware_types', [server_hardware_template])
 
         self.mock_ansible_module.params = params
 
@@ -721,7 +915,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data']['serverHardwareTypeName'] = "SY 480 Gen9 1"
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.server_hardware_types.get_by.return_value = []
+        self.mock_collection('server_hardware_types', [])
         self.mock_ansible_module.params = params
 
         ServerProfileModule().run()
@@ -770,7 +964,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.volumes.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_volume_name_when_volume_attachments_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -786,7 +980,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.volumes.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_volume_name_when_san_storage_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -800,7 +994,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.volumes.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_volume_name_not_found(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -835,7 +1029,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
                                                                "volumeStoragePoolUri": "/rest/storage-pools/2"}
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.storage_pools.get_by.side_effect = [[pool1], [pool2]]
+        self.mock_collection('storage_pools', [pool1, pool2])
 
         self.mock_ansible_module.params = params
 
@@ -861,7 +1055,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.storage_pools.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_storage_pool_name_when_volume_attachments_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -877,7 +1071,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.storage_pools.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_storage_pool_name_when_san_storage_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -891,7 +1085,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.storage_pools.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_storage_pool_name_not_found(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -902,7 +1096,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         }
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.storage_pools.get_by.return_value = []
+        self.mock_collection('storage_pools', [])
         self.mock_ansible_module.params = params
 
         ServerProfileModule().run()
@@ -927,7 +1121,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
                                                           "volumeStorageSystemUri": "/rest/storage-systems/2"}
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.storage_systems.get_by.side_effect = [[storage_system1], [storage_system2]]
+        self.mock_collection('storage_systems', [storage_system1, storage_system2])
 
         self.mock_ansible_module.params = params
 
@@ -953,7 +1147,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.storage_systems.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_storage_system_name_when_volume_attachments_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -969,7 +1163,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.storage_systems.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_storage_system_name_when_san_storage_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -983,7 +1177,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.storage_systems.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_storage_system_name_not_found(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -994,7 +1188,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         }
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.storage_systems.get_by.return_value = []
+        self.mock_collection('storage_systems', [])
         self.mock_ansible_module.params = params
 
         ServerProfileModule().run()
@@ -1071,7 +1265,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.interconnects.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_interconnect_name_when_connections_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -1085,7 +1279,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.interconnects.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_interconnect_name_not_found(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -1109,7 +1303,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         expected['firmware'] = {"firmwareBaselineUri": "/rest/firmware-drivers/1"}
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.firmware_drivers.get_by.return_value = [firmware_driver]
+        self.mock_collection('firmware_drivers', [firmware_driver])
 
         self.mock_ansible_module.params = params
 
@@ -1131,7 +1325,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.firmware_drivers.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_firmware_baseline_name_when_firmware_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -1145,14 +1339,14 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.firmware_drivers.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_firmware_baseline_name_not_found(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
         params['data']['firmware'] = {"firmwareBaselineName": "firmwareName001"}
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.firmware_drivers.get_by.return_value = None
+        self.mock_collection('firmware_drivers', [])
         self.mock_ansible_module.params = params
 
         ServerProfileModule().run()
@@ -1175,7 +1369,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         expected['localStorage']['sasLogicalJBODs'][1] = {"id": 2, "sasLogicalJBODUri": "/rest/sas-logical-jbods/2"}
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.sas_logical_jbods.get_by.side_effect = [[sas_logical_jbod1], [sas_logical_jbod2]]
+        self.mock_collection('sas_logical_jbods', [sas_logical_jbod1, sas_logical_jbod2])
 
         self.mock_ansible_module.params = params
 
@@ -1201,7 +1395,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.sas_logical_jbods.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_sas_logical_jbod_names_when_jbod_list_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -1217,7 +1411,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.sas_logical_jbods.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_not_replace_sas_logical_jbod_names_when_local_storage_is_none(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -1231,7 +1425,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
 
         args, _ = self.mock_ov_client.server_profiles.create.call_args
         self.assertEqual(args[0], expected_dict)
-        self.mock_ov_client.sas_logical_jbods.get_by.assert_not_called()
+        self.mock_resource_client.assert_not_called()
 
     def test_should_fail_when_sas_logical_jbod_name_not_found(self):
         params = deepcopy(PARAMS_FOR_PRESENT)
@@ -1242,7 +1436,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         }
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = None
-        self.mock_ov_client.sas_logical_jbods.get_by.return_value = []
+        self.mock_collection('sas_logical_jbods', [])
         self.mock_ansible_module.params = params
 
         ServerProfileModule().run()
@@ -1414,8 +1608,9 @@ class ServerProfileModuleSpec(unittest.TestCase,
             ansible_facts=mock_facts
         )
 
+    @mock.patch('oneview_server_profile.set_server_hardware_power_state')
     @mock.patch.object(ResourceComparator, 'compare')
-    def test_should_power_off_before_update_when_required(self, mock_resource_compare):
+    def test_should_power_off_before_update_when_required(self, mock_resource_compare, mock_set_power_state):
         fake_profile_data = deepcopy(BASIC_PROFILE)
         fake_profile_data['serverHardwareUri'] = SERVER_HARDWARE_TEMPLATE_URI
         power_on_msg = 'Some server profile attributes cannot be changed while the server hardware is powered on.'
@@ -1425,7 +1620,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         self.mock_ov_client.server_profiles.get_by_name.return_value = fake_profile_data
         self.mock_ov_client.server_profiles.update.side_effect = [HPOneViewException(power_on_msg),
                                                                   CREATED_BASIC_PROFILE]
-        self.mock_ov_client.server_hardware.update_power_state.return_value = {}
+        mock_set_power_state.return_value = {SERVER_HARDWARE_TEMPLATE_URI: 'On'}
         self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
 
         mock_facts = gather_facts(self.mock_ov_client)
@@ -1433,9 +1628,10 @@ class ServerProfileModuleSpec(unittest.TestCase,
         ServerProfileModule().run()
 
         power_set_calls = [
-            mock.call(dict(powerState='Off', powerControl='PressAndHold'), SERVER_HARDWARE_TEMPLATE_URI),
-            mock.call(dict(powerState='On', powerControl='MomentaryPress'), SERVER_HARDWARE_TEMPLATE_URI)]
-        self.mock_ov_client.server_hardware.update_power_state.assert_has_calls(power_set_calls)
+            mock.call(self.mock_ov_client, [SERVER_HARDWARE_TEMPLATE_URI, SERVER_HARDWARE_TEMPLATE_URI], 'Off'),
+            mock.call(self.mock_ov_client, [SERVER_HARDWARE_TEMPLATE_URI], 'On')]
+        self.assertEqual(mock_set_power_state.mock_calls, power_set_calls)
+        self.mock_ov_client.server_hardware.update_power_state.assert_not_called()
 
         assert self.mock_ov_client.server_profiles.update.mock_calls == [
             mock.call(fake_profile_data, SERVER_PROFILE_URI), mock.call(fake_profile_data, SERVER_PROFILE_URI)]
@@ -1446,6 +1642,29 @@ class ServerProfileModuleSpec(unittest.TestCase,
             ansible_facts=mock_facts
         )
 
+    @mock.patch('oneview_server_profile.set_server_hardware_power_state')
+    @mock.patch.object(ResourceComparator, 'compare')
+    def test_should_not_power_on_after_update_when_hardware_was_off(self, mock_resource_compare,
+                                                                    mock_set_power_state):
+        fake_profile_data = deepcopy(BASIC_PROFILE)
+        fake_profile_data['serverHardwareUri'] = SERVER_HARDWARE_TEMPLATE_URI
+        power_on_msg = 'Some server profile attributes cannot be changed while the server hardware is powered on.'
+
+        mock_resource_compare.return_value = False
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = fake_profile_data
+        self.mock_ov_client.server_profiles.update.side_effect = [HPOneViewException(power_on_msg),
+                                                                  CREATED_BASIC_PROFILE]
+        mock_set_power_state.return_value = {SERVER_HARDWARE_TEMPLATE_URI: 'Off'}
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+        gather_facts(self.mock_ov_client)
+
+        ServerProfileModule().run()
+
+        mock_set_power_state.assert_called_once_with(
+            self.mock_ov_client, [SERVER_HARDWARE_TEMPLATE_URI, SERVER_HARDWARE_TEMPLATE_URI], 'Off')
+        self.assertEqual(self.mock_ov_client.server_profiles.update.call_count, 2)
+
     @mock.patch.object(ResourceComparator, 'compare')
     def test_should_return_error_during_update_when_unrelated_to_power(self, mock_resource_compare):
         fake_profile_data = deepcopy(BASIC_PROFILE)
@@ -1576,7 +1795,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data'][SPKeys.OS_DEPLOYMENT] = dict(osDeploymentPlanName="Deployment Plan Name")
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(BASIC_PROFILE)
-        self.mock_ov_client.os_deployment_plans.get_by.return_value = [dict(uri=uri)]
+        self.mock_collection('os_deployment_plans', [dict(name="Deployment Plan Name", uri=uri)])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -1589,7 +1808,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data'][SPKeys.OS_DEPLOYMENT] = dict(osDeploymentPlanName="Deployment Plan Name")
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(BASIC_PROFILE)
-        self.mock_ov_client.os_deployment_plans.get_by.return_value = []
+        self.mock_collection('os_deployment_plans', [])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -1604,7 +1823,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data']['enclosureGroupName'] = "Enclosure Group Name"
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(BASIC_PROFILE)
-        self.mock_ov_client.enclosure_groups.get_by.return_value = [dict(uri=uri)]
+        self.mock_collection('enclosure_groups', [dict(name="Enclosure Group Name", uri=uri)])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -1618,7 +1837,7 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data']['enclosureGroupName'] = "Enclosure Group Name"
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(BASIC_PROFILE)
-        self.mock_ov_client.enclosure_groups.get_by.return_value = []
+        self.mock_collection('enclosure_groups', [])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -1635,8 +1854,8 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data'][SPKeys.CONNECTIONS] = [conn_1, conn_2, conn_3]
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(BASIC_PROFILE)
-        self.mock_ov_client.fc_networks.get_by.side_effect = [[dict(uri='/rest/fc-networks/14')], []]
-        self.mock_ov_client.ethernet_networks.get_by.return_value = [dict(uri='/rest/ethernet-networks/18')]
+        self.mock_collection('fc_networks', [dict(name='FC Network', uri='/rest/fc-networks/14')])
+        self.mock_collection('ethernet_networks', [dict(name='Ethernet Network', uri='/rest/ethernet-networks/18')])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -1655,8 +1874,8 @@ class ServerProfileModuleSpec(unittest.TestCase,
         params['data'][SPKeys.CONNECTIONS] = [conn]
 
         self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(BASIC_PROFILE)
-        self.mock_ov_client.fc_networks.get_by.return_value = []
-        self.mock_ov_client.ethernet_networks.get_by.return_value = []
+        self.mock_collection('fc_networks', [])
+        self.mock_collection('ethernet_networks', [])
         self.mock_ansible_module.params = deepcopy(params)
 
         ServerProfileModule().run()
@@ -1905,5 +2124,733 @@ class ServerProfileModuleSpec(unittest.TestCase,
         )
 
 
+PARAMS_FOR_PROFILES = dict(
+    config='config.json',
+    auto_assign_server_hardware=True,
+    state='present',
+    parallelism=8,
+    profiles=[dict(name="Profile-1", serverProfileTemplateName="Server-Template-7000"),
+              dict(name="Profile-2", serverProfileTemplateName="Server-Template-7000"),
+              dict(name="Profile-3", serverProfileTemplateName="Server-Template-7000")]
+)
+
+
+class ServerProfileModuleProfilesSpec(unittest.TestCase,
+                                      OneViewBaseTestCase):
+    def setUp(self):
+        self.configure_mocks(self, ServerProfileModule)
+        self.sleep_patch = mock.patch('time.sleep')
+        self.sleep_patch.start()
+
+        self.submit_task_patch = mock.patch('oneview_server_profile.submit_task')
+        self.mock_submit_task = self.submit_task_patch.start()
+        self.mock_submit_task.side_effect = lambda connection, uri, resource, default_values: (
+            dict(uri='/rest/tasks/' + resource['name']), None)
+
+        self.wait_for_tasks_patch = mock.patch('oneview_server_profile.wait_for_tasks')
+        self.mock_wait_for_tasks = self.wait_for_tasks_patch.start()
+        self.mock_wait_for_tasks.side_effect = lambda connection, tasks, max_workers: [
+            (dict(name=task['uri'].split('/')[-1], uri='/rest/server-profiles/' + task['uri'].split('/')[-1]), None)
+            for task in tasks]
+
+        self.mock_ov_client.server_profiles.get_all.return_value = []
+        self.mock_ov_client.server_profile_templates.get_by_name.return_value = deepcopy(BASIC_TEMPLATE)
+        self.mock_ov_client.server_profile_templates.get_new_profile.return_value = dict(affinity="Bay")
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+
+    def tearDown(self):
+        self.wait_for_tasks_patch.stop()
+        self.submit_task_patch.stop()
+        self.sleep_patch.stop()
+
+    def submitted_profiles(self):
+        return [call[0][2] for call in self.mock_submit_task.call_args_list]
+
+    def test_should_create_profiles_with_distinct_hardware_from_a_single_request_of_available_targets(self):
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PROFILES)
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profile_templates.get_by_name.assert_called_once_with("Server-Template-7000")
+        self.mock_ov_client.server_profile_templates.get_new_profile.assert_called_once_with(BASIC_TEMPLATE['uri'])
+        self.mock_ov_client.server_profiles.get_available_targets.assert_called_once_with(
+            enclosureGroupUri=ENCLOSURE_GROUP_URI, serverHardwareTypeUri=SERVER_HARDWARE_TEMPLATE_URI)
+        self.assertEqual(self.mock_wait_for_tasks.call_count, 1)
+
+        submitted = sorted(self.submitted_profiles(), key=lambda profile: profile['name'])
+        self.assertEqual([profile['serverHardwareUri'] for profile in submitted],
+                         [target['serverHardwareUri'] for target in AVAILABLE_TARGETS['targets'][1:]])
+        self.assertEqual(submitted[0], dict(affinity="Bay", name="Profile-1",
+                                            serverProfileTemplateUri=BASIC_TEMPLATE['uri'],
+                                            serverHardwareUri=AVAILABLE_TARGETS['targets'][1]['serverHardwareUri']))
+
+        results = self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']['server_profiles']
+        self.assertEqual([(result['name'], result['created']) for result in results],
+                         [("Profile-1", True), ("Profile-2", True), ("Profile-3", True)])
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=ServerProfileModule.MSG_PROFILES_PRESENT.format(3, 0, 0),
+            ansible_facts=mock.ANY
+        )
+
+    def test_should_not_claim_hardware_informed_for_another_profile(self):
+        params = deepcopy(PARAMS_FOR_PROFILES)
+        params['profiles'][0]['serverHardwareName'] = "Encl1, bay 4"
+        self.mock_ov_client.server_hardware.get_all.return_value = [
+            dict(name="Encl1, bay 4", uri=AVAILABLE_TARGETS['targets'][2]['serverHardwareUri'])]
+        self.mock_ansible_module.params = params
+
+        ServerProfileModule().run()
+
+        submitted = sorted(self.submitted_profiles(), key=lambda profile: profile['name'])
+        self.assertEqual([profile['serverHardwareUri'] for profile in submitted],
+                         [AVAILABLE_TARGETS['targets'][2]['serverHardwareUri'],
+                          AVAILABLE_TARGETS['targets'][1]['serverHardwareUri'],
+                          AVAILABLE_TARGETS['targets'][3]['serverHardwareUri']])
+
+    @mock.patch('oneview_server_profile.ServerHardwareAllocationLedger')
+    def test_should_claim_hardware_reserved_in_the_allocation_ledger(self, mock_ledger_class):
+        mock_ledger = mock_ledger_class.from_environment_variables.return_value
+        mock_ledger.reserve.side_effect = lambda candidates, owner: candidates[-1]
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PROFILES)
+
+        ServerProfileModule().run()
+
+        submitted = sorted(self.submitted_profiles(), key=lambda profile: profile['name'])
+        self.assertEqual([profile['serverHardwareUri'] for profile in submitted],
+                         [target['serverHardwareUri'] for target in reversed(AVAILABLE_TARGETS['targets'][1:])])
+        self.assertEqual(mock_ledger.release.call_count, 3)
+
+    def test_should_update_profiles_already_present_and_create_the_others(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = [dict(name="Profile-2", uri=SERVER_PROFILE_URI,
+                                                                         serverHardwareUri="/rest/server-hardware/1")]
+        self.mock_ov_client.server_profile_templates.get.return_value = deepcopy(BASIC_TEMPLATE)
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PROFILES)
+
+        with mock.patch.object(ResourceComparator, 'compare', return_value=True):
+            ServerProfileModule().run()
+
+        self.assertEqual(sorted(profile['name'] for profile in self.submitted_profiles()), ["Profile-1", "Profile-3"])
+        self.mock_ov_client.server_profiles.update.assert_not_called()
+
+        results = self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']['server_profiles']
+        self.assertEqual([(result['name'], result['created'], result['changed']) for result in results],
+                         [("Profile-1", True, True), ("Profile-2", False, False), ("Profile-3", True, True)])
+        self.assertEqual(self.mock_ansible_module.exit_json.call_args[1]['msg'],
+                         ServerProfileModule.MSG_PROFILES_PRESENT.format(2, 0, 1))
+
+    def test_should_claim_other_hardware_when_assignment_fails(self):
+        outcomes = [[(None, TASK_ERROR), (dict(name="Profile-2"), None), (dict(name="Profile-3"), None)],
+                    [(dict(name="Profile-1"), None)]]
+        self.mock_wait_for_tasks.side_effect = lambda connection, tasks, max_workers: outcomes.pop(0)
+        self.mock_ov_client.server_profiles.get_available_targets.side_effect = [
+            AVAILABLE_TARGETS, dict(targets=AVAILABLE_TARGETS['targets'][3:] + [dict(serverHardwareUri='/rest/sh/9')])]
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PROFILES)
+
+        ServerProfileModule().run()
+
+        self.assertEqual(self.mock_ov_client.server_profiles.get_available_targets.call_count, 2)
+        self.assertEqual(self.submitted_profiles()[-1]['name'], "Profile-1")
+        self.assertEqual(self.submitted_profiles()[-1]['serverHardwareUri'],
+                         AVAILABLE_TARGETS['targets'][3]['serverHardwareUri'])
+        self.assertEqual(self.mock_ansible_module.exit_json.call_args[1]['msg'],
+                         ServerProfileModule.MSG_PROFILES_PRESENT.format(3, 0, 0))
+
+    def test_should_fail_reporting_the_profiles_not_created(self):
+        self.mock_wait_for_tasks.side_effect = lambda connection, tasks, max_workers: [
+            (dict(name="Profile-1"), None), (None, HPOneViewException(FAKE_MSG_ERROR)), (dict(name="Profile-3"), None)]
+        params = deepcopy(PARAMS_FOR_PROFILES)
+        self.mock_ansible_module.params = params
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=ServerProfileModule.MSG_PROFILES_NOT_CREATED.format("Profile-2: " + FAKE_MSG_ERROR))
+
+    def test_should_fail_when_profile_names_are_repeated(self):
+        params = deepcopy(PARAMS_FOR_PROFILES)
+        params['profiles'][2]['name'] = "Profile-1"
+        self.mock_ansible_module.params = params
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(msg=ServerProfileModule.MSG_PROFILES_NAMES_REQUIRED)
+        self.mock_submit_task.assert_not_called()
+
+    def test_should_fail_when_profiles_are_informed_on_absent_state(self):
+        params = deepcopy(PARAMS_FOR_PROFILES)
+        params['state'] = 'absent'
+        self.mock_ansible_module.params = params
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=ServerProfileModule.MSG_PROFILES_STATE_NOT_SUPPORTED)
+
+    def test_should_fail_when_neither_data_nor_profiles_are_informed(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='present', data=None, profiles=None)
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(msg=ServerProfileModule.MSG_DATA_REQUIRED)
+
+
+class ServerProfileModuleAsyncTasksSpec(unittest.TestCase,
+                                        OneViewBaseTestCase):
+    def setUp(self):
+        self.configure_mocks(self, ServerProfileModule)
+        self.sleep_patch = mock.patch('time.sleep')
+        self.sleep_patch.start()
+
+        self.submit_task_patch = mock.patch('oneview_server_profile.submit_task')
+        self.mock_submit_task = self.submit_task_patch.start()
+        self.mock_submit_task.return_value = (dict(uri=TASK_URI), None)
+
+        self.wait_for_tasks_patch = mock.patch('oneview_server_profile.wait_for_tasks')
+        self.mock_wait_for_tasks = self.wait_for_tasks_patch.start()
+
+    def tearDown(self):
+        self.wait_for_tasks_patch.stop()
+        self.submit_task_patch.stop()
+        self.sleep_patch.stop()
+
+    def test_should_request_the_creation_without_waiting(self):
+        profile_data = deepcopy(BASIC_PROFILE)
+        profile_data['serverHardwareUri'] = AVAILABLE_TARGETS['targets'][1]['serverHardwareUri']
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = None
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PRESENT), async_tasks=True)
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profiles.create.assert_not_called()
+        self.mock_submit_task.assert_called_once_with(self.mock_ov_client.connection,
+                                                      self.mock_ov_client.server_profiles.URI, profile_data,
+                                                      self.mock_ov_client.server_profiles.DEFAULT_VALUES, 'post')
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=ServerProfileModule.MSG_TASKS_REQUESTED.format(TASK_URI),
+            ansible_facts=dict(task_uris=[TASK_URI])
+        )
+
+    @mock.patch.object(ResourceComparator, 'compare')
+    def test_should_request_the_update_without_waiting(self, mock_resource_compare):
+        mock_resource_compare.return_value = False
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(BASIC_PROFILE)
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PRESENT), async_tasks=True)
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profiles.update.assert_not_called()
+        self.assertEqual(self.mock_submit_task.call_args[0][1], SERVER_PROFILE_URI)
+        self.assertEqual(self.mock_submit_task.call_args[0][4], 'put')
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=ServerProfileModule.MSG_TASKS_REQUESTED.format(TASK_URI),
+            ansible_facts=dict(task_uris=[TASK_URI])
+        )
+
+    @mock.patch('oneview_server_profile.set_server_hardware_power_state')
+    @mock.patch.object(ResourceComparator, 'compare')
+    def test_should_wait_for_the_update_of_a_profile_with_server_hardware(self, mock_resource_compare,
+                                                                          mock_set_power_state):
+        fake_profile_data = deepcopy(BASIC_PROFILE)
+        fake_profile_data['serverHardwareUri'] = SERVER_HARDWARE_TEMPLATE_URI
+        power_on_msg = 'Some server profile attributes cannot be changed while the server hardware is powered on.'
+
+        mock_resource_compare.return_value = False
+        self.mock_ov_client.server_profiles.get_by_name.return_value = fake_profile_data
+        self.mock_ov_client.server_profiles.update.side_effect = [HPOneViewException(power_on_msg),
+                                                                  CREATED_BASIC_PROFILE]
+        mock_set_power_state.return_value = {SERVER_HARDWARE_TEMPLATE_URI: 'On'}
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PRESENT), async_tasks=True)
+
+        ServerProfileModule().run()
+
+        self.mock_submit_task.assert_not_called()
+        self.assertEqual(self.mock_ov_client.server_profiles.update.call_count, 2)
+        self.assertEqual(mock_set_power_state.mock_calls, [
+            mock.call(self.mock_ov_client, [SERVER_HARDWARE_TEMPLATE_URI, SERVER_HARDWARE_TEMPLATE_URI], 'Off'),
+            mock.call(self.mock_ov_client, [SERVER_HARDWARE_TEMPLATE_URI], 'On')])
+        self.assertEqual(self.mock_ansible_module.exit_json.call_args[1]['msg'], ServerProfileModule.MSG_UPDATED)
+
+    def test_should_request_the_online_compliance_remediation_without_waiting(self):
+        fake_server = deepcopy(CREATED_BASIC_PROFILE)
+        fake_server['templateCompliance'] = 'NonCompliant'
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = fake_server
+        self.mock_ov_client.server_profiles.get_compliance_preview.return_value = dict(isOnlineUpdate=True)
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_COMPLIANT), async_tasks=True)
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profiles.patch.assert_not_called()
+        self.mock_submit_task.assert_called_once_with(
+            self.mock_ov_client.connection, CREATED_BASIC_PROFILE['uri'],
+            [dict(op='replace', path='/templateCompliance', value='Compliant')], None, 'patch')
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=ServerProfileModule.MSG_TASKS_REQUESTED.format(TASK_URI),
+            ansible_facts=dict(task_uris=[TASK_URI])
+        )
+
+    @mock.patch('oneview_server_profile.set_server_hardware_power_state')
+    def test_should_wait_for_the_offline_compliance_remediation(self, mock_set_power_state):
+        fake_server = deepcopy(CREATED_BASIC_PROFILE)
+        fake_server['templateCompliance'] = 'NonCompliant'
+
+        self.mock_ov_client.server_profiles.get_by_name.return_value = fake_server
+        self.mock_ov_client.server_profiles.get_compliance_preview.return_value = dict(isOnlineUpdate=False)
+        self.mock_ov_client.server_profiles.patch.return_value = CREATED_BASIC_PROFILE
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_COMPLIANT), async_tasks=True)
+
+        ServerProfileModule().run()
+
+        self.mock_submit_task.assert_not_called()
+        self.mock_ov_client.server_profiles.patch.assert_called_once_with(
+            CREATED_BASIC_PROFILE['uri'], 'replace', '/templateCompliance', 'Compliant')
+        self.assertEqual(self.mock_ansible_module.exit_json.call_args[1]['msg'],
+                         ServerProfileModule.MSG_REMEDIATED_COMPLIANCE)
+
+    def test_should_request_the_creation_of_profiles_without_waiting(self):
+        self.mock_submit_task.side_effect = lambda connection, uri, resource, default_values: (
+            dict(uri='/rest/tasks/' + resource['name']), None)
+        self.mock_ov_client.server_profiles.get_all.return_value = []
+        self.mock_ov_client.server_profile_templates.get_by_name.return_value = deepcopy(BASIC_TEMPLATE)
+        self.mock_ov_client.server_profile_templates.get_new_profile.return_value = dict(affinity="Bay")
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PROFILES), async_tasks=True)
+
+        ServerProfileModule().run()
+
+        self.mock_wait_for_tasks.assert_not_called()
+
+        facts = self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']
+        self.assertEqual(sorted(facts['task_uris']),
+                         ['/rest/tasks/Profile-1', '/rest/tasks/Profile-2', '/rest/tasks/Profile-3'])
+        self.assertEqual([(result['name'], result['task_uri']) for result in facts['server_profiles']],
+                         [("Profile-1", '/rest/tasks/Profile-1'), ("Profile-2", '/rest/tasks/Profile-2'),
+                          ("Profile-3", '/rest/tasks/Profile-3')])
+
+
+class ServerProfileModuleTemplateComplianceSpec(unittest.TestCase,
+                                                OneViewBaseTestCase):
+    def setUp(self):
+        self.configure_mocks(self, ServerProfileModule)
+
+        self.submit_task_patch = mock.patch('oneview_server_profile.submit_task')
+        self.mock_submit_task = self.submit_task_patch.start()
+        self.mock_submit_task.side_effect = lambda connection, uri, patch, default_values, method: (
+            dict(uri='/rest/tasks/' + uri.split('/')[-1]), None)
+
+        self.wait_for_tasks_patch = mock.patch('oneview_server_profile.wait_for_tasks')
+        self.mock_wait_for_tasks = self.wait_for_tasks_patch.start()
+        self.mock_wait_for_tasks.side_effect = lambda connection, tasks, max_workers: [
+            (dict(uri='/rest/server-profiles/' + task['uri'].split('/')[-1]), None) for task in tasks]
+
+        self.power_state_patch = mock.patch('oneview_server_profile.set_server_hardware_power_state')
+        self.mock_set_power_state = self.power_state_patch.start()
+        self.mock_set_power_state.side_effect = self.__set_power_state('On')
+
+        self.mock_ov_client.server_profile_templates.get_by_name.return_value = deepcopy(BASIC_TEMPLATE)
+        self.mock_ov_client.server_profiles.get_compliance_preview.side_effect = lambda uri: dict(
+            isOnlineUpdate=not uri.endswith('offline'))
+
+    def tearDown(self):
+        self.power_state_patch.stop()
+        self.wait_for_tasks_patch.stop()
+        self.submit_task_patch.stop()
+
+    def __set_power_state(self, previous_state, error=None):
+        def set_power_state(client, uris, power_state, max_workers, previous_states=None):
+            if previous_states is not None:
+                previous_states.update((uri, previous_state) for uri in uris)
+            if error and power_state == 'Off':
+                raise error
+            return dict((uri, previous_state) for uri in uris)
+        return set_power_state
+
+    def __profiles(self, *names):
+        return [dict(name=name, uri='/rest/server-profiles/' + name, serverHardwareUri='/rest/server-hardware/' + name)
+                for name in names]
+
+    def __params(self, **params):
+        return dict(dict(config='config.json', state='compliant', data=dict(serverProfileTemplateName="Template101"),
+                         parallelism=8, wave_size=8, max_failures=0), **params)
+
+    def test_should_get_the_non_compliant_profiles_of_the_template_at_once(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = []
+        self.mock_ansible_module.params = self.__params()
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profiles.get_all.assert_called_once_with(filter=[
+            "serverProfileTemplateUri='{}'".format(BASIC_TEMPLATE['uri']), "templateCompliance='NonCompliant'"])
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=ServerProfileModule.MSG_PROFILES_REMEDIATED.format(0, 0, 0),
+            ansible_facts=dict(server_profiles=[])
+        )
+
+    def test_should_fail_when_the_template_is_not_found(self):
+        self.mock_ov_client.server_profile_templates.get_by_name.return_value = None
+        self.mock_ansible_module.params = self.__params()
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=ServerProfileModule.MSG_TEMPLATE_NOT_FOUND.format("Template101"))
+
+    def test_should_remediate_the_online_updates_before_the_offline_ones_in_waves(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = self.__profiles(
+            'p1-offline', 'p2', 'p3', 'p4-offline', 'p5')
+        self.mock_ansible_module.params = self.__params(wave_size=2)
+
+        ServerProfileModule().run()
+
+        waves = [[task['uri'].split('/')[-1] for task in call[0][1]]
+                 for call in self.mock_wait_for_tasks.call_args_list]
+        self.assertEqual(waves, [['p2', 'p3'], ['p5'], ['p1-offline', 'p4-offline']])
+
+        self.assertEqual(self.mock_set_power_state.call_args_list, [
+            mock.call(self.mock_ov_client, ['/rest/server-hardware/p1-offline', '/rest/server-hardware/p4-offline'],
+                      'Off', max_workers=8, previous_states=mock.ANY),
+            mock.call(self.mock_ov_client, ['/rest/server-hardware/p1-offline', '/rest/server-hardware/p4-offline'],
+                      'On', max_workers=8)])
+
+        facts = self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']
+        self.assertEqual([(result['name'], result['changed'], result['online_update'])
+                          for result in facts['server_profiles']],
+                         [('p1-offline', True, False), ('p2', True, True), ('p3', True, True),
+                          ('p4-offline', True, False), ('p5', True, True)])
+        self.assertEqual(self.mock_ansible_module.exit_json.call_args[1]['msg'],
+                         ServerProfileModule.MSG_PROFILES_REMEDIATED.format(5, 0, 0))
+
+    def test_should_not_power_on_the_hardware_that_was_off(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = self.__profiles('p1-offline')
+        self.mock_set_power_state.side_effect = self.__set_power_state('Off')
+        self.mock_ansible_module.params = self.__params()
+
+        ServerProfileModule().run()
+
+        self.mock_set_power_state.assert_called_once_with(
+            self.mock_ov_client, ['/rest/server-hardware/p1-offline'], 'Off', max_workers=8, previous_states=mock.ANY)
+
+    def test_should_restore_the_power_state_and_record_the_failure_when_the_power_off_fails(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = self.__profiles('p1', 'p2-offline', 'p3-offline')
+        self.mock_set_power_state.side_effect = self.__set_power_state(
+            'On', HPOneViewException(dict(message='Power off failed')))
+        self.mock_ansible_module.params = self.__params(max_failures=2)
+
+        ServerProfileModule().run()
+
+        self.assertEqual(self.mock_set_power_state.call_args_list[-1], mock.call(
+            self.mock_ov_client, ['/rest/server-hardware/p2-offline', '/rest/server-hardware/p3-offline'], 'On',
+            max_workers=8))
+        self.assertEqual(self.mock_wait_for_tasks.call_count, 1)
+
+        facts = self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']
+        self.assertEqual([(result['name'], result['changed'], result['msg']) for result in facts['server_profiles']],
+                         [('p1', True, ServerProfileModule.MSG_REMEDIATED_COMPLIANCE),
+                          ('p2-offline', False, 'Power off failed'),
+                          ('p3-offline', False, 'Power off failed')])
+        self.assertEqual(self.mock_ansible_module.exit_json.call_args[1]['msg'],
+                         ServerProfileModule.MSG_PROFILES_REMEDIATED.format(1, 2, 0))
+
+    def test_should_record_the_failure_on_the_remediated_profiles_when_the_power_on_fails(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = self.__profiles('p1-offline')
+        set_power_state = self.__set_power_state('On')
+
+        def fail_power_on(client, uris, power_state, max_workers, previous_states=None):
+            if power_state == 'On':
+                raise HPOneViewException(dict(message='Power on failed'))
+            return set_power_state(client, uris, power_state, max_workers, previous_states)
+
+        self.mock_set_power_state.side_effect = fail_power_on
+        self.mock_ansible_module.params = self.__params()
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=ServerProfileModule.MSG_PROFILES_NOT_REMEDIATED.format('p1-offline: Power on failed'),
+            ansible_facts=mock.ANY)
+        facts = self.mock_ansible_module.fail_json.call_args[1]['ansible_facts']
+        self.assertEqual([(result['name'], result['changed'], result['msg']) for result in facts['server_profiles']],
+                         [('p1-offline', True, 'Power on failed')])
+
+    def test_should_skip_the_remaining_waves_when_the_power_off_failures_exceed_the_budget(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = self.__profiles('p1-offline', 'p2-offline')
+        self.mock_set_power_state.side_effect = self.__set_power_state(
+            'On', HPOneViewException(dict(message='Power off failed')))
+        self.mock_ansible_module.params = self.__params(wave_size=1)
+
+        ServerProfileModule().run()
+
+        self.mock_wait_for_tasks.assert_not_called()
+        facts = self.mock_ansible_module.fail_json.call_args[1]['ansible_facts']
+        self.assertEqual([(result['name'], result['msg']) for result in facts['server_profiles']],
+                         [('p1-offline', 'Power off failed'),
+                          ('p2-offline', ServerProfileModule.MSG_REMEDIATION_SKIPPED)])
+
+    def test_should_skip_the_remaining_waves_when_the_failures_exceed_the_budget(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = self.__profiles('p1', 'p2', 'p3')
+        self.mock_wait_for_tasks.side_effect = lambda connection, tasks, max_workers: [
+            (None, HPOneViewException(dict(message='Failed')))]
+        self.mock_ansible_module.params = self.__params(wave_size=1)
+
+        ServerProfileModule().run()
+
+        self.assertEqual(self.mock_wait_for_tasks.call_count, 1)
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=ServerProfileModule.MSG_PROFILES_NOT_REMEDIATED.format('p1: Failed'), ansible_facts=mock.ANY)
+
+        facts = self.mock_ansible_module.fail_json.call_args[1]['ansible_facts']
+        self.assertEqual([(result['name'], result['msg']) for result in facts['server_profiles']],
+                         [('p1', 'Failed'), ('p2', ServerProfileModule.MSG_REMEDIATION_SKIPPED),
+                          ('p3', ServerProfileModule.MSG_REMEDIATION_SKIPPED)])
+
+    def test_should_continue_while_the_failures_are_within_the_budget(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = self.__profiles('p1', 'p2')
+        self.mock_submit_task.side_effect = [HPOneViewException(dict(message='Failed')),
+                                             (dict(uri='/rest/tasks/p2'), None)]
+        self.mock_ansible_module.params = self.__params(wave_size=1, max_failures=1)
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=ServerProfileModule.MSG_PROFILES_REMEDIATED.format(1, 1, 0),
+            ansible_facts=mock.ANY
+        )
+
+
+class ServerProfileModuleCheckModeSpec(unittest.TestCase,
+                                       OneViewBaseTestCase):
+    def setUp(self):
+        self.configure_mocks(self, ServerProfileModule)
+        self.mock_ansible_module.check_mode = True
+
+        self.power_state_patch = mock.patch('oneview_server_profile.set_server_hardware_power_state')
+        self.mock_set_power_state = self.power_state_patch.start()
+
+        self.mock_ov_client.server_hardware.get.return_value = dict(powerState='On')
+        self.mock_ov_client.server_profiles.get_compliance_preview.return_value = dict(isOnlineUpdate=True)
+
+    def tearDown(self):
+        self.power_state_patch.stop()
+        self.assert_nothing_changed()
+
+    def assert_nothing_changed(self):
+        self.mock_set_power_state.assert_not_called()
+        self.mock_ov_client.server_hardware.update_power_state.assert_not_called()
+        self.mock_ov_client.server_profiles.create.assert_not_called()
+        self.mock_ov_client.server_profiles.update.assert_not_called()
+        self.mock_ov_client.server_profiles.patch.assert_not_called()
+        self.mock_ov_client.server_profiles.delete.assert_not_called()
+
+    def get_plans(self):
+        return self.mock_ansible_module.exit_json.call_args[1]['ansible_facts']['server_profile_plans']
+
+    def test_should_plan_the_creation_with_a_power_cycle_of_the_server_hardware(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = None
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=ServerProfileModule.MSG_CHECK_MODE.format(1, 0, 0, 0, 1),
+            ansible_facts=mock.ANY
+        )
+        plan = self.get_plans()[0]
+        self.assertEqual(plan['action'], 'create')
+        self.assertEqual(plan['server_hardware_uri'], AVAILABLE_TARGETS['targets'][1]['serverHardwareUri'])
+        self.assertIn(dict(op='add', path='/name', value=SERVER_PROFILE_NAME), plan['changes'])
+        self.assertTrue(plan['power_cycle'])
+
+    def test_should_plan_the_creation_without_a_power_cycle_when_the_server_hardware_is_off(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = None
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+        self.mock_ov_client.server_hardware.get.return_value = dict(powerState='Off')
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+
+        ServerProfileModule().run()
+
+        self.assertFalse(self.get_plans()[0]['power_cycle'])
+
+    def test_should_plan_an_online_update_with_the_field_level_changes(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(CREATED_BASIC_PROFILE)
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PRESENT),
+                                               data=dict(name=SERVER_PROFILE_NAME, affinity="BayAndServer"))
+
+        ServerProfileModule().run()
+
+        self.assertEqual(self.get_plans(), [dict(name=SERVER_PROFILE_NAME, action='update',
+                                                 changes=[dict(op='replace', path='/affinity', value="BayAndServer")],
+                                                 server_hardware_uri=CREATED_BASIC_PROFILE['serverHardwareUri'],
+                                                 power_cycle=False)])
+
+    def test_should_predict_a_power_cycle_from_the_compliance_preview(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(CREATED_BASIC_PROFILE)
+        self.mock_ov_client.server_profiles.get_compliance_preview.return_value = dict(isOnlineUpdate=False)
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PRESENT),
+                                               data=dict(name=SERVER_PROFILE_NAME, affinity="BayAndServer"))
+
+        ServerProfileModule().run()
+
+        self.assertTrue(self.get_plans()[0]['power_cycle'])
+
+    def test_should_predict_a_power_cycle_when_the_profile_moves_to_another_server_hardware(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(CREATED_BASIC_PROFILE)
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PRESENT), data=dict(
+            name=SERVER_PROFILE_NAME, serverHardwareUri=FAKE_SERVER_HARDWARE['uri']))
+
+        ServerProfileModule().run()
+
+        plan = self.get_plans()[0]
+        self.assertEqual(plan['server_hardware_uri'], FAKE_SERVER_HARDWARE['uri'])
+        self.assertTrue(plan['power_cycle'])
+        self.mock_ov_client.server_profiles.get_compliance_preview.assert_not_called()
+
+    def test_should_plan_no_action_when_the_profile_is_already_present(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(CREATED_BASIC_PROFILE)
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PRESENT), data=dict(name=SERVER_PROFILE_NAME))
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=ServerProfileModule.MSG_CHECK_MODE.format(0, 0, 0, 0, 0),
+            ansible_facts=dict(server_profile_plans=[dict(
+                name=SERVER_PROFILE_NAME, action=None, changes=[],
+                server_hardware_uri=CREATED_BASIC_PROFILE['serverHardwareUri'], power_cycle=False)])
+        )
+
+    def test_should_plan_the_deletion(self):
+        self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(CREATED_BASIC_PROFILE)
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_ABSENT)
+
+        ServerProfileModule().run()
+
+        plan = self.get_plans()[0]
+        self.assertEqual(plan['action'], 'delete')
+        self.assertTrue(plan['power_cycle'])
+
+    def test_should_plan_an_offline_compliance_remediation(self):
+        server_profile = dict(deepcopy(CREATED_BASIC_PROFILE), templateCompliance='NonCompliant')
+        self.mock_ov_client.server_profiles.get_by_name.return_value = server_profile
+        self.mock_ov_client.server_profiles.get_compliance_preview.return_value = dict(isOnlineUpdate=False)
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_COMPLIANT)
+
+        ServerProfileModule().run()
+
+        plan = self.get_plans()[0]
+        self.assertEqual(plan['action'], 'remediate')
+        self.assertEqual(plan['changes'], [dict(op='replace', path='/templateCompliance', value='Compliant')])
+        self.assertTrue(plan['power_cycle'])
+
+    def test_should_fail_to_plan_the_compliance_remediation_of_a_profile_without_template(self):
+        server_profile = deepcopy(CREATED_BASIC_PROFILE)
+        server_profile.pop('serverProfileTemplateUri')
+        self.mock_ov_client.server_profiles.get_by_name.return_value = server_profile
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_COMPLIANT)
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(msg=MESSAGE_COMPLIANT_ERROR)
+
+    def test_should_plan_each_profile_informed_in_profiles(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = [deepcopy(CREATED_BASIC_PROFILE)]
+        self.mock_ov_client.server_profiles.get_available_targets.return_value = AVAILABLE_TARGETS
+        self.mock_ansible_module.params = dict(config='config.json', state='present', parallelism=8,
+                                               auto_assign_server_hardware=True,
+                                               profiles=[dict(name=SERVER_PROFILE_NAME), dict(name="Profile102")])
+
+        ServerProfileModule().run()
+
+        self.assertEqual([(plan['name'], plan['action']) for plan in self.get_plans()],
+                         [(SERVER_PROFILE_NAME, None), ("Profile102", 'create')])
+
+    def test_should_plan_the_remediation_of_the_profiles_of_a_template(self):
+        self.mock_ov_client.server_profile_templates.get_by_name.return_value = deepcopy(BASIC_TEMPLATE)
+        self.mock_ov_client.server_profiles.get_all.return_value = [
+            dict(deepcopy(CREATED_BASIC_PROFILE), name=name, templateCompliance='NonCompliant')
+            for name in ("Profile-1", "Profile-2")]
+        self.mock_ansible_module.params = dict(config='config.json', state='compliant', parallelism=8,
+                                               data=dict(serverProfileTemplateName="Template101"))
+
+        ServerProfileModule().run()
+
+        self.assertEqual([(plan['name'], plan['action']) for plan in self.get_plans()],
+                         [("Profile-1", 'remediate'), ("Profile-2", 'remediate')])
+
+    def test_should_plan_the_same_change_as_the_update(self):
+        profile_data = deepcopy(CREATED_BASIC_PROFILE)
+        profile_data['osDeploymentSettings'] = dict(osDeploymentPlanUri='/rest/fake',
+                                                    osCustomAttributes=[{'name': 'test.dhcp', 'value': 'true'}])
+        self.mock_ov_client.os_deployment_plans.get.return_value = dict(additionalParameters=[])
+        params = dict(deepcopy(PARAMS_FOR_PRESENT), data=dict(
+            name=SERVER_PROFILE_NAME, osDeploymentSettings=dict(osCustomAttributes=[{'name': 'test.dhcp',
+                                                                                     'value': True}])))
+
+        outcomes = []
+        for check_mode in (True, False):
+            self.mock_ov_client.server_profiles.get_by_name.return_value = deepcopy(profile_data)
+            self.mock_ansible_module.check_mode = check_mode
+            self.mock_ansible_module.params = deepcopy(params)
+            self.mock_ansible_module.exit_json.reset_mock()
+
+            ServerProfileModule().run()
+
+            result = self.mock_ansible_module.exit_json.call_args[1]
+            outcomes.append((result['changed'], result['msg']))
+
+        self.assertEqual(outcomes, [(False, ServerProfileModule.MSG_CHECK_MODE.format(0, 0, 0, 0, 0)),
+                                    (False, ServerProfileModule.MSG_ALREADY_PRESENT)])
+        self.mock_ov_client.server_profiles.update.assert_not_called()
+
+
+class ServerProfileModuleLookupKeySpec(unittest.TestCase,
+                                       OneViewBaseTestCase):
+    def setUp(self):
+        self.configure_mocks(self, ServerProfileModule)
+
+    def test_should_find_the_profile_by_the_lookup_key(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = [deepcopy(CREATED_BASIC_PROFILE)]
+        self.mock_ansible_module.params = dict(config='config.json', state='absent', lookup_key='serverHardwareUri',
+                                               data=dict(serverHardwareUri=CREATED_BASIC_PROFILE['serverHardwareUri']))
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profiles.get_by_name.assert_not_called()
+        self.mock_ov_client.server_profiles.get_all.assert_called_once_with(
+            filter="serverHardwareUri='{}'".format(CREATED_BASIC_PROFILE['serverHardwareUri']))
+        self.mock_ov_client.server_profiles.delete.assert_called_once_with(CREATED_BASIC_PROFILE)
+        self.mock_ansible_module.exit_json.assert_called_once_with(changed=True, msg=ServerProfileModule.MSG_DELETED)
+
+    def test_should_do_nothing_when_no_profile_has_the_lookup_key(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = []
+        self.mock_ansible_module.params = dict(config='config.json', state='absent', lookup_key='serialNumber',
+                                               data=dict(serialNumber='VCGGU8800W'))
+
+        ServerProfileModule().run()
+
+        self.mock_ov_client.server_profiles.delete.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(changed=False,
+                                                                   msg=ServerProfileModule.MSG_ALREADY_ABSENT)
+
+    def test_should_fail_when_the_lookup_key_is_not_in_data(self):
+        self.mock_ansible_module.params = dict(config='config.json', state='absent', lookup_key='uuid',
+                                               data=dict(name=SERVER_PROFILE_NAME))
+
+        ServerProfileModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=ServerProfileModule.MSG_LOOKUP_KEY_REQUIRED.format('uuid'))
+
+
 if __name__ == '__main__':
     unittest.main()
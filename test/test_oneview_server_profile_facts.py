@@ -123,6 +123,24 @@ class ServerProfileFactsSpec(unittest.TestCase,
             ansible_facts=dict(server_profiles=server_profiles)
         )
 
+    def test_should_get_by_names(self):
+        server_profiles = [{"name": "Server Profile Name 1"}, {"name": "Server Profile Name 2"}]
+        self.mock_ov_client.server_profiles.get_all.return_value = server_profiles
+
+        self.mock_ansible_module.params = dict(config='config.json',
+                                               names=["Server Profile Name 1", "Server Profile Name 2"])
+
+        ServerProfileFactsModule().run()
+
+        self.mock_ov_client.server_profiles.get_all.assert_called_once_with(
+            filter="name='Server Profile Name 1' OR name='Server Profile Name 2'")
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            ansible_facts=dict(server_profiles=server_profiles,
+                               server_profiles_by_name={"Server Profile Name 1": server_profiles[0],
+                                                        "Server Profile Name 2": server_profiles[1]})
+        )
+
     def test_should_get_by_name(self):
         servers = [{"name": "Server Profile Name", 'uri': '/rest/test/123'}]
 
@@ -137,6 +155,38 @@ class ServerProfileFactsSpec(unittest.TestCase,
             ansible_facts=dict(server_profiles=servers)
         )
 
+    def test_should_get_by_serial_number_with_a_filter(self):
+        server_profile = {"name": "Server Profile Name", "uri": PROFILE_URI, "serialNumber": "VCGE9KB041"}
+        self.mock_ov_client.server_profiles.get_all.return_value = [server_profile]
+        self.mock_ov_client.server_profiles.get_compliance_preview.return_value = {'isOnlineUpdate': True}
+
+        self.mock_ansible_module.params = dict(config='config.json', serial_number="VCGE9KB041",
+                                               options=['compliancePreview'])
+
+        ServerProfileFactsModule().run()
+
+        self.mock_ov_client.server_profiles.get_all.assert_called_once_with(filter="serialNumber='VCGE9KB041'")
+        self.mock_ov_client.server_profiles.get_compliance_preview.assert_called_once_with(PROFILE_URI)
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            ansible_facts=dict(server_profiles=[server_profile],
+                               server_profile_compliance_preview={'isOnlineUpdate': True})
+        )
+
+    def test_should_return_no_profiles_when_none_is_assigned_to_the_server_hardware(self):
+        self.mock_ov_client.server_profiles.get_all.return_value = []
+
+        self.mock_ansible_module.params = dict(config='config.json', server_hardware_uri=HARDWARE_URI)
+
+        ServerProfileFactsModule().run()
+
+        self.mock_ov_client.server_profiles.get_all.assert_called_once_with(
+            filter="serverHardwareUri='{}'".format(HARDWARE_URI))
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            ansible_facts=dict(server_profiles=[])
+        )
+
     def test_should_get_server_profile_by_name_with_all_options(self):
         mock_option_return = {'subresource': 'value'}
 
@@ -15,6 +15,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 ###
+import mock
 import unittest
 from copy import deepcopy
 from oneview_module_loader import ServerProfileTemplateModule
@@ -104,6 +105,34 @@ class ServerProfileTemplateModuleSpec(unittest.TestCase,
             ansible_facts=dict(server_profile_template=CREATED_BASIC_TEMPLATE)
         )
 
+    def test_should_not_get_the_template_by_name_when_it_is_still_converged(self):
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+
+        with mock.patch.object(ServerProfileTemplateModule, 'get_converged_resource',
+                               return_value=(CREATED_BASIC_TEMPLATE, True)) as mock_get_converged_resource:
+            ServerProfileTemplateModule().run()
+
+        mock_get_converged_resource.assert_called_once_with(PARAMS_FOR_PRESENT['data']['name'],
+                                                            PARAMS_FOR_PRESENT['data'])
+        self.resource.get_by_name.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=ServerProfileTemplateModule.MSG_ALREADY_PRESENT,
+            ansible_facts=dict(server_profile_template=CREATED_BASIC_TEMPLATE)
+        )
+
+    def test_should_store_the_converged_template(self):
+        self.resource.get_by_name.return_value = []
+        self.resource.create.return_value = CREATED_BASIC_TEMPLATE
+        self.mock_ansible_module.params = deepcopy(PARAMS_FOR_PRESENT)
+
+        with mock.patch.object(ServerProfileTemplateModule, 'get_converged_resource', return_value=(None, False)), \
+                mock.patch.object(ServerProfileTemplateModule, 'set_converged_resource') as mock_set_converged_resource:
+            ServerProfileTemplateModule().run()
+
+        mock_set_converged_resource.assert_called_once_with(PARAMS_FOR_PRESENT['data']['name'],
+                                                            PARAMS_FOR_PRESENT['data'], CREATED_BASIC_TEMPLATE)
+
     def test_should_not_modify_when_template_already_exists(self):
         self.resource.get_by_name.return_value = CREATED_BASIC_TEMPLATE
         self.resource.create.return_value = CREATED_BASIC_TEMPLATE
@@ -139,11 +168,50 @@ class ServerProfileTemplateModuleSpec(unittest.TestCase,
             ansible_facts=dict(server_profile_template=CREATED_BASIC_TEMPLATE)
         )
 
+    @mock.patch('oneview_server_profile_template.submit_task')
+    def test_should_request_the_creation_without_waiting(self, mock_submit_task):
+        mock_submit_task.return_value = (dict(uri='/rest/tasks/1'), None)
+        self.resource.get_by_name.return_value = []
+
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_PRESENT), async_tasks=True)
+
+        ServerProfileTemplateModule().run()
+
+        self.resource.create.assert_not_called()
+        mock_submit_task.assert_called_once_with(self.mock_ov_client.connection, self.resource.URI, mock.ANY,
+                                                 self.resource.DEFAULT_VALUES, 'post')
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=ServerProfileTemplateModule.MSG_TASK_REQUESTED.format('/rest/tasks/1'),
+            ansible_facts=dict(task_uris=['/rest/tasks/1'])
+        )
+
+    @mock.patch('oneview_server_profile_template.submit_task')
+    def test_should_request_the_update_without_waiting(self, mock_submit_task):
+        mock_submit_task.return_value = (dict(uri='/rest/tasks/1'), None)
+        self.resource.get_by_name.return_value = CREATED_BASIC_TEMPLATE
+
+        self.mock_ansible_module.params = dict(deepcopy(PARAMS_FOR_UPDATE), async_tasks=True)
+
+        ServerProfileTemplateModule().run()
+
+        expected = CREATED_BASIC_TEMPLATE.copy()
+        expected.update(BASIC_TEMPLATE_MODIFIED)
+
+        self.resource.update.assert_not_called()
+        mock_submit_task.assert_called_once_with(self.mock_ov_client.connection, expected['uri'], expected,
+                                                 self.resource.DEFAULT_VALUES, 'put')
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=True,
+            msg=ServerProfileTemplateModule.MSG_TASK_REQUESTED.format('/rest/tasks/1'),
+            ansible_facts=dict(task_uris=['/rest/tasks/1'])
+        )
+
     def test_update_using_names_for_dependecies(self):
         self.resource.get_by_name.return_value = CREATED_BASIC_TEMPLATE
         self.resource.update.return_value = CREATED_BASIC_TEMPLATE
-        self.mock_ov_client.enclosure_groups.get_by.return_value = [{'uri': ENCLOSURE_GROUP_URI}]
-        self.mock_ov_client.server_hardware_types.get_by.return_value = [{'uri': SHT_URI}]
+        self.mock_collection('enclosure_groups', [{'name': 'EG Name', 'uri': ENCLOSURE_GROUP_URI}])
+        self.mock_collection('server_hardware_types', [{'name': 'Srv HW Type Name', 'uri': SHT_URI}])
 
         self.mock_ansible_module.params = deepcopy(PARAMS_FOR_UPDATE_WITH_NAME)
 
@@ -163,8 +231,8 @@ class ServerProfileTemplateModuleSpec(unittest.TestCase,
     def test_should_fail_when_server_hardware_type_not_found(self):
         self.resource.get_by_name.return_value = CREATED_BASIC_TEMPLATE
         self.resource.update.return_value = CREATED_BASIC_TEMPLATE
-        self.mock_ov_client.enclosure_groups.get_by.return_value = [{'uri': ENCLOSURE_GROUP_URI}]
-        self.mock_ov_client.server_hardware_types.get_by.return_value = []
+        self.mock_collection('enclosure_groups', [{'name': 'EG Name', 'uri': ENCLOSURE_GROUP_URI}])
+        self.mock_collection('server_hardware_types', [])
 
         self.mock_ansible_module.params = deepcopy(PARAMS_FOR_UPDATE_WITH_NAME)
 
@@ -177,8 +245,8 @@ class ServerProfileTemplateModuleSpec(unittest.TestCase,
     def test_should_fail_when_enclosure_group_not_found(self):
         self.resource.get_by_name.return_value = CREATED_BASIC_TEMPLATE
         self.resource.update.return_value = CREATED_BASIC_TEMPLATE
-        self.mock_ov_client.enclosure_groups.get_by.return_value = []
-        self.mock_ov_client.server_hardware_types.get_by.return_value = [{'uri': SHT_URI}]
+        self.mock_collection('enclosure_groups', [])
+        self.mock_collection('server_hardware_types', [{'name': 'Srv HW Type Name', 'uri': SHT_URI}])
 
         self.mock_ansible_module.params = deepcopy(PARAMS_FOR_UPDATE_WITH_NAME)
 
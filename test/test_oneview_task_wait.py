@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+###
+# Copyright (2016) Hewlett Packard Enterprise Development LP
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# You may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+###
+
+import mock
+import unittest
+
+from oneview_module_loader import TaskWaitModule, HPOneViewException
+
+from hpe_test_utils import OneViewBaseTestCase
+
+TASK_URI_1 = '/rest/tasks/D2B856D2-5939-421B-BDCA-FBF7D8961A89'
+TASK_URI_2 = '/rest/tasks/5D7C2E5B-2BC7-4BB9-A8B2-0B2E7A3B4F11'
+
+RESOURCE_1 = dict(name='Profile101', uri='/rest/server-profiles/1')
+RESOURCE_2 = dict(name='Profile102', uri='/rest/server-profiles/2')
+
+PARAMS = dict(
+    config='config.json',
+    task_uris=[TASK_URI_1, TASK_URI_2],
+    timeout=-1,
+    parallelism=8,
+    fail_on_error=True
+)
+
+
+class TaskWaitModuleSpec(unittest.TestCase,
+                         OneViewBaseTestCase):
+
+    def setUp(self):
+        self.configure_mocks(self, TaskWaitModule)
+
+        patcher_wait_for_tasks = mock.patch('oneview_task_wait.wait_for_tasks')
+        self.mock_wait_for_tasks = patcher_wait_for_tasks.start()
+        self.addCleanup(patcher_wait_for_tasks.stop)
+
+    def test_should_wait_for_all_tasks(self):
+        self.mock_wait_for_tasks.return_value = [(RESOURCE_1, None), (RESOURCE_2, None)]
+        self.mock_ansible_module.params = PARAMS
+
+        TaskWaitModule().run()
+
+        self.mock_wait_for_tasks.assert_called_once_with(self.mock_ov_client.connection,
+                                                         [dict(uri=TASK_URI_1), dict(uri=TASK_URI_2)],
+                                                         timeout=-1, max_workers=8)
+
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=TaskWaitModule.MSG_COMPLETED,
+            ansible_facts=dict(task_results=[
+                dict(task_uri=TASK_URI_1, succeeded=True, resource=RESOURCE_1, error=None),
+                dict(task_uri=TASK_URI_2, succeeded=True, resource=RESOURCE_2, error=None)
+            ])
+        )
+
+    def test_should_fail_when_a_task_fails(self):
+        self.mock_wait_for_tasks.return_value = [(RESOURCE_1, None), (None, HPOneViewException('Task error'))]
+        self.mock_ansible_module.params = PARAMS
+
+        TaskWaitModule().run()
+
+        self.mock_ansible_module.fail_json.assert_called_once_with(
+            msg=TaskWaitModule.MSG_FAILED.format(TASK_URI_2 + ': Task error'),
+            ansible_facts=dict(task_results=[
+                dict(task_uri=TASK_URI_1, succeeded=True, resource=RESOURCE_1, error=None),
+                dict(task_uri=TASK_URI_2, succeeded=False, resource=None, error='Task error')
+            ])
+        )
+
+    def test_should_report_failed_tasks_when_not_failing_on_error(self):
+        self.mock_wait_for_tasks.return_value = [(None, HPOneViewException('Task error')), (RESOURCE_2, None)]
+        self.mock_ansible_module.params = dict(PARAMS, fail_on_error=False, timeout=60, parallelism=2)
+
+        TaskWaitModule().run()
+
+        self.mock_wait_for_tasks.assert_called_once_with(self.mock_ov_client.connection,
+                                                         [dict(uri=TASK_URI_1), dict(uri=TASK_URI_2)],
+                                                         timeout=60, max_workers=2)
+        self.mock_ansible_module.fail_json.assert_not_called()
+        self.mock_ansible_module.exit_json.assert_called_once_with(
+            changed=False,
+            msg=TaskWaitModule.MSG_FAILED.format(TASK_URI_1 + ': Task error'),
+            ansible_facts=dict(task_results=[
+                dict(task_uri=TASK_URI_1, succeeded=False, resource=None, error='Task error'),
+                dict(task_uri=TASK_URI_2, succeeded=True, resource=RESOURCE_2, error=None)
+            ])
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()